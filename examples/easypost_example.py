@@ -81,17 +81,17 @@ def main():
         }
         
         shipment = client.create_shipment(from_address, to_address, parcel)
-        print(f"✅ Shipment created: {shipment['id']}")
+        print(f"✅ Shipment created: {shipment.id}")
         print()
         
         # List available rates
         print("💰 Available shipping rates:")
         print("-" * 70)
-        rates = client.list_rates(shipment['id'])
+        rates = client.list_rates(shipment.id)
         
         for i, rate in enumerate(rates, 1):
-            delivery = f"{rate['delivery_days']} days" if rate['delivery_days'] else "Unknown"
-            print(f"{i}. {rate['carrier']:12} {rate['service']:25} ${rate['rate']:>6}  ({delivery})")
+            delivery = f"{rate.delivery_days} days" if rate.delivery_days else "Unknown"
+            print(f"{i}. {rate.carrier:12} {rate.service:25} ${rate.rate:>6}  ({delivery})")
         
         print("-" * 70)
         print(f"Total rates available: {len(rates)}")
@@ -99,7 +99,7 @@ def main():
         
         # Note about purchasing
         print("📋 Next Steps:")
-        print("  - To purchase a label, call: client.buy_shipment(shipment['id'])")
+        print("  - To purchase a label, call: client.buy_shipment(shipment)")
         print("  - This will charge your EasyPost account")
         print("  - The label can be downloaded and printed")
         print("  - A tracking code will be provided")
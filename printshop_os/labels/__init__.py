@@ -6,5 +6,7 @@ for printing on thermal printers (like Rollo).
 """
 
 from .formatter import LabelFormatter
+from .cache import RenderCache
+from .metrics import PipelineStats
 
-__all__ = ['LabelFormatter']
+__all__ = ['LabelFormatter', 'RenderCache', 'PipelineStats']
@@ -4,28 +4,92 @@ Flask API for Label Formatter Service
 Provides REST endpoints for uploading and processing shipping labels.
 """
 
+import io
+import json
 import os
+import shutil
 import tempfile
+import zipfile
 from pathlib import Path
-from flask import Flask, request, send_file, jsonify
+from PIL import Image
+from flask import Flask, Response, request, send_file, jsonify, stream_with_context
 from flask_cors import CORS
 from werkzeug.utils import secure_filename
 from .formatter import LabelFormatter
+from .cache import RenderCache
+from .jobs import JobQueue, QueueFullError
+from .metrics import PipelineStats, prometheus_histogram, prometheus_metric
+from .pdfstream import PdfStreamWriter
+from .spooler import LabelSpooler, parse_printers
 
 # Initialize Flask app
 app = Flask(__name__)
 CORS(app)  # Enable CORS for frontend integration
 
 # Configuration
-UPLOAD_FOLDER = tempfile.mkdtemp()
 ALLOWED_EXTENSIONS = {'pdf', 'png', 'jpg', 'jpeg', 'tiff'}
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
+MAX_BATCH_SIZE = int(os.getenv('LABEL_BATCH_MAX_MB', '100')) * 1024 * 1024
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# Response content types per output format
+OUTPUT_MIMETYPES = {
+    'pdf': 'application/pdf',
+    'png': 'image/png',
+    'zpl': 'application/octet-stream',
+    'epl': 'application/octet-stream',
+}
+
+# Preview encodings and the accepted preview resolution range
+PREVIEW_MIMETYPES = {
+    'png': 'image/png',
+    'webp': 'image/webp',
+}
+PREVIEW_MIN_DPI = 36
+PREVIEW_MAX_DPI = 150
+
+# Content types accepted as a raw (non-multipart) request body
+RAW_LABEL_TYPES = {
+    'application/pdf': 'pdf',
+    'image/png': 'png',
+    'image/jpeg': 'jpg',
+    'image/tiff': 'tiff',
+}
 
-app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = MAX_FILE_SIZE
 
-# Initialize formatter
-formatter = LabelFormatter()
+# Render cache for reprints (disk tier only when LABEL_CACHE_DIR is set)
+render_cache = RenderCache(
+    max_memory_bytes=int(os.getenv('LABEL_CACHE_MEMORY_MB', '64')) * 1024 * 1024,
+    cache_dir=os.getenv('LABEL_CACHE_DIR') or None,
+    max_disk_bytes=int(os.getenv('LABEL_CACHE_DISK_MB', '512')) * 1024 * 1024
+)
+
+# Per-stage pipeline latency, exported on /metrics
+pipeline_stats = PipelineStats()
+
+# Initialize formatter (1-bit end to end for thermal output when LABEL_BILEVEL is set)
+formatter = LabelFormatter(
+    cache=render_cache,
+    bilevel=os.getenv('LABEL_BILEVEL', 'false').lower() == 'true',
+    stats=pipeline_stats,
+    passthrough=os.getenv('LABEL_PASSTHROUGH', 'false').lower() == 'true'
+)
+
+# Asynchronous job queue (bounded worker pool with backpressure)
+job_queue = JobQueue(
+    formatter,
+    workers=int(os.getenv('LABEL_JOB_WORKERS', '2')),
+    max_pending=int(os.getenv('LABEL_JOB_QUEUE_DEPTH', '32')),
+    result_ttl=float(os.getenv('LABEL_JOB_RESULT_TTL', '600'))
+)
+
+# Print spooler, e.g. LABEL_PRINTERS="rollo=tcp://10.0.0.5:9100,office=dir:/var/spool/labels"
+spooler = LabelSpooler(
+    formatter,
+    parse_printers(os.getenv('LABEL_PRINTERS', '')),
+    max_queue=int(os.getenv('LABEL_SPOOL_QUEUE_DEPTH', '256'))
+)
 
 
 def allowed_file(filename: str) -> bool:
@@ -34,165 +98,566 @@ def allowed_file(filename: str) -> bool:
            filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 
+def get_label_upload():
+    """
+    Resolve the uploaded label stream from the current request.
+    
+    Labels may be sent as a multipart ``file`` field or as the raw request
+    body with a PDF/image Content-Type. Either way the stream is handed to
+    the formatter directly, without touching disk.
+    
+    Returns:
+        Tuple of (stream, filename, error_response). On success the error
+        response is None; otherwise stream and filename are None.
+    """
+    if request.mimetype in RAW_LABEL_TYPES:
+        filename = request.args.get('filename') or f"label.{RAW_LABEL_TYPES[request.mimetype]}"
+        return request.stream, filename, None
+    
+    if 'file' not in request.files:
+        return None, None, (jsonify({'error': 'No file provided'}), 400)
+    
+    file = request.files['file']
+    
+    if file.filename == '':
+        return None, None, (jsonify({'error': 'No file selected'}), 400)
+    
+    if not allowed_file(file.filename):
+        return None, None, (jsonify({
+            'error': f'File type not allowed. Allowed types: {", ".join(ALLOWED_EXTENSIONS)}'
+        }), 400)
+    
+    return file.stream, file.filename, None
+
+
+def get_batch_uploads():
+    """
+    Collect the label uploads of a batch request without reading them.
+    
+    Accepts any number of multipart ``files`` (or ``file``) fields, each a
+    label or a zip of labels, or a raw zip request body.
+    
+    Returns:
+        List of (filename, stream) pairs; zip archives are kept as single
+        entries and expanded lazily by iter_batch_labels()
+    """
+    if request.mimetype in ('application/zip', 'application/x-zip-compressed'):
+        # Copy the body in chunks; archives larger than a label spill to disk
+        archive = tempfile.SpooledTemporaryFile(max_size=MAX_FILE_SIZE)
+        shutil.copyfileobj(request.stream, archive, UPLOAD_CHUNK_SIZE)
+        archive.seek(0)
+        return [('labels.zip', archive)]
+    
+    return [
+        (file.filename, file.stream)
+        for field in ('files', 'file')
+        for file in request.files.getlist(field)
+        if file.filename and (file.filename.lower().endswith('.zip') or allowed_file(file.filename))
+    ]
+
+
+def iter_batch_labels(uploads):
+    """
+    Yield (filename, bytes) for every label in a batch, one at a time.
+    
+    Zip members are read only when the worker pool is ready for them;
+    directories and files with unsupported extensions are skipped.
+    """
+    for filename, stream in uploads:
+        if not filename.lower().endswith('.zip'):
+            yield filename, stream.read()
+            continue
+        
+        with zipfile.ZipFile(stream) as archive:
+            for member in archive.infolist():
+                name = member.filename
+                if member.is_dir() or name.startswith('__MACOSX/') or not allowed_file(name):
+                    continue
+                yield name, archive.read(member)
+
+
+class _ZipSink(io.RawIOBase):
+    """Write-only sink that lets ZipFile build an archive chunk by chunk."""
+    
+    def __init__(self):
+        self._chunks = []
+    
+    def writable(self):
+        return True
+    
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+    
+    def drain(self) -> bytes:
+        """Return and forget everything written since the last drain."""
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def stream_batch_zip(results, output_format):
+    """
+    Build a zip of formatted labels as a stream of chunks.
+    
+    Each label is written and flushed to the client as soon as it is
+    formatted, so only one label is held at a time. A batch_report.json
+    entry listing every input's status is written last.
+    """
+    sink = _ZipSink()
+    report = []
+    # PDFs and PNGs are already compressed; printer commands are not
+    compression = zipfile.ZIP_DEFLATED if output_format in formatter.PRINTER_FORMATS else zipfile.ZIP_STORED
+    
+    with zipfile.ZipFile(sink, 'w', compression=compression) as archive:
+        for index, (name, output, error) in enumerate(results, start=1):
+            entry = f"{index:04d}_{Path(secure_filename(Path(name).name)).stem}.{output_format}"
+            if error:
+                report.append({'source': name, 'output': None, 'error': error})
+            else:
+                archive.writestr(entry, output)
+                report.append({'source': name, 'output': entry, 'error': None})
+            yield sink.drain()
+        
+        archive.writestr('batch_report.json', json.dumps(report, indent=2))
+    
+    yield sink.drain()
+
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint."""
     return jsonify({
         'status': 'healthy',
         'service': 'label-formatter',
-        'version': '1.0.0'
+        'version': '1.0.0',
+        'cache': render_cache.stats(),
+        'raster_backend': formatter.raster_backend.name,
+        'orientation': formatter.orientation_stats.to_dict(),
+        'stages': pipeline_stats.summary(),
+        'jobs': job_queue.stats(),
+        'printers': spooler.stats()
     })
 
 
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """
+    Prometheus metrics endpoint.
+    
+    Exposes per-stage pipeline latency histograms (including labels
+    formatted by the job and batch workers), render cache counters, job
+    queue depth, print spooler queues and orientation outcomes in the
+    Prometheus text format.
+    """
+    cache = render_cache.stats()
+    jobs = job_queue.stats()
+    printers = spooler.stats()
+    rotations = formatter.orientation_stats.to_dict()['rotations']
+    
+    body = ''.join([
+        prometheus_histogram(
+            'label_stage_seconds', 'Label pipeline stage latency in seconds', pipeline_stats
+        ),
+        prometheus_metric(
+            'label_cache_hits_total', 'counter', 'Render cache hits',
+            [({'kind': kind}, c['hits']) for kind, c in cache['by_kind'].items()]
+        ),
+        prometheus_metric(
+            'label_cache_misses_total', 'counter', 'Render cache misses',
+            [({'kind': kind}, c['misses']) for kind, c in cache['by_kind'].items()]
+        ),
+        prometheus_metric(
+            'label_cache_bytes', 'gauge', 'Render cache size in bytes',
+            [({'tier': 'memory'}, cache['memory_bytes']), ({'tier': 'disk'}, cache['disk_bytes'])]
+        ),
+        prometheus_metric(
+            'label_jobs_pending', 'gauge', 'Queued and running label jobs',
+            [(None, jobs['pending'])]
+        ),
+        prometheus_metric(
+            'label_jobs_total', 'counter', 'Finished or rejected label jobs',
+            [({'status': status}, jobs[status]) for status in ('completed', 'failed', 'rejected')]
+        ),
+        prometheus_metric(
+            'label_spool_queue_depth', 'gauge', 'Labels waiting or being sent per printer',
+            [({'printer': name}, p['queue_depth']) for name, p in printers.items()]
+        ),
+        prometheus_metric(
+            'label_spool_labels_total', 'counter', 'Labels sent to or failed on each printer',
+            [({'printer': name, 'status': status}, p[f'labels_{status}'])
+             for name, p in printers.items() for status in ('printed', 'failed')]
+        ),
+        prometheus_metric(
+            'label_spool_jobs_total', 'counter', 'Coalesced print jobs sent per printer',
+            [({'printer': name}, p['jobs_sent']) for name, p in printers.items()]
+        ),
+        prometheus_metric(
+            'label_spool_bytes_total', 'counter', 'Bytes sent per printer',
+            [({'printer': name}, p['bytes_sent']) for name, p in printers.items()]
+        ),
+        prometheus_metric(
+            'label_orientation_total', 'counter', 'Labels by detected rotation angle',
+            [({'angle': angle}, count) for angle, count in rotations.items()]
+        ),
+    ])
+    return Response(body, mimetype='text/plain; version=0.0.4')
+
+
 @app.route('/api/labels/format', methods=['POST'])
 def format_label():
     """
     Format a shipping label for printing.
     
     Accepts:
-        - file: Label file (PDF or image)
-        - format: Output format (pdf or png, default: pdf)
+        - file: Label file (PDF or image), or the raw request body with a
+          PDF/image Content-Type
+        - format: Output format (pdf, png, zpl or epl, default: pdf)
         - auto_rotate: Auto-detect rotation (true/false, default: true)
         - optimize_bw: Optimize for B&W (true/false, default: true)
     
     Returns:
         Formatted label file ready for printing
     """
-    # Check if file was uploaded
-    if 'file' not in request.files:
-        return jsonify({'error': 'No file provided'}), 400
-    
-    file = request.files['file']
-    
-    if file.filename == '':
-        return jsonify({'error': 'No file selected'}), 400
-    
-    if not allowed_file(file.filename):
-        return jsonify({
-            'error': f'File type not allowed. Allowed types: {", ".join(ALLOWED_EXTENSIONS)}'
-        }), 400
-    
-    # Initialize paths
-    input_path = None
-    output_path = None
+    stream, filename, error = get_label_upload()
+    if error:
+        return error
     
     try:
-        # Get parameters
-        output_format = request.form.get('format', 'pdf').lower()
-        auto_rotate = request.form.get('auto_rotate', 'true').lower() == 'true'
-        optimize_bw = request.form.get('optimize_bw', 'true').lower() == 'true'
-        
-        if output_format not in ['pdf', 'png']:
-            return jsonify({'error': 'Invalid output format. Must be pdf or png'}), 400
+        # Get parameters (form fields or query string for raw uploads)
+        output_format = request.values.get('format', 'pdf').lower()
+        auto_rotate = request.values.get('auto_rotate', 'true').lower() == 'true'
+        optimize_bw = request.values.get('optimize_bw', 'true').lower() == 'true'
         
-        # Save uploaded file
-        filename = secure_filename(file.filename)
-        input_path = Path(app.config['UPLOAD_FOLDER']) / filename
-        file.save(input_path)
+        if output_format not in OUTPUT_MIMETYPES:
+            return jsonify({
+                'error': f'Invalid output format. Must be one of: {", ".join(OUTPUT_MIMETYPES)}'
+            }), 400
         
-        # Process label
-        output_filename = f"formatted_{Path(filename).stem}.{output_format}"
-        output_path = Path(app.config['UPLOAD_FOLDER']) / output_filename
-        
-        formatter.process_label(
-            input_path=input_path,
-            output_path=output_path,
+        # Process label entirely in memory
+        output = formatter.process_stream(
+            stream,
             output_format=output_format,
             auto_rotate=auto_rotate,
             optimize_bw=optimize_bw
         )
         
+        output_filename = f"formatted_{Path(secure_filename(filename)).stem}.{output_format}"
+        
         # Send processed file
         return send_file(
-            output_path,
+            output,
             as_attachment=True,
             download_name=output_filename,
-            mimetype='application/pdf' if output_format == 'pdf' else 'image/png'
+            mimetype=OUTPUT_MIMETYPES[output_format]
         )
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-    
-    finally:
-        # Clean up temporary files
-        try:
-            if input_path and input_path.exists():
-                input_path.unlink()
-            if output_path and output_path.exists() and output_path != input_path:
-                # Only delete if we're not in the middle of sending
-                pass  # File will be cleaned up by send_file
-        except:
-            pass
 
 
 @app.route('/api/labels/preview', methods=['POST'])
 def preview_label():
     """
-    Generate a preview of the formatted label (always returns PNG).
+    Generate a fast, screen-resolution preview of the formatted label.
+    
+    The label is rendered at a low DPI with a fast resize filter and no
+    PDF; the full-resolution render only happens in /api/labels/format.
     
     Accepts:
-        - file: Label file (PDF or image)
+        - file: Label file (PDF or image), or the raw request body with a
+          PDF/image Content-Type
+        - format: Preview encoding (png or webp, default: png)
+        - dpi: Preview resolution (36-150, default: 96)
     
     Returns:
-        PNG preview of formatted label
+        PNG or WebP preview of formatted label
     """
-    if 'file' not in request.files:
-        return jsonify({'error': 'No file provided'}), 400
+    stream, filename, error = get_label_upload()
+    if error:
+        return error
     
-    file = request.files['file']
-    
-    if file.filename == '':
-        return jsonify({'error': 'No file selected'}), 400
-    
-    if not allowed_file(file.filename):
+    preview_format = request.values.get('format', 'png').lower()
+    if preview_format not in PREVIEW_MIMETYPES:
         return jsonify({
-            'error': f'File type not allowed. Allowed types: {", ".join(ALLOWED_EXTENSIONS)}'
+            'error': f'Invalid preview format. Must be one of: {", ".join(PREVIEW_MIMETYPES)}'
         }), 400
     
-    # Initialize path
-    input_path = None
+    try:
+        dpi = int(request.values.get('dpi', formatter.PREVIEW_DPI))
+    except ValueError:
+        dpi = 0
+    if not PREVIEW_MIN_DPI <= dpi <= PREVIEW_MAX_DPI:
+        return jsonify({
+            'error': f'Invalid preview dpi. Must be between {PREVIEW_MIN_DPI} and {PREVIEW_MAX_DPI}'
+        }), 400
     
     try:
-        # Save uploaded file
-        filename = secure_filename(file.filename)
-        input_path = Path(app.config['UPLOAD_FOLDER']) / filename
-        file.save(input_path)
-        
-        # Generate preview (always PNG)
-        output_filename = f"preview_{Path(filename).stem}.png"
-        output_path = Path(app.config['UPLOAD_FOLDER']) / output_filename
-        
-        formatter.process_label(
-            input_path=input_path,
-            output_path=output_path,
-            output_format='png',
+        preview = formatter.preview(
+            stream.read(),
+            image_format=preview_format,
+            dpi=dpi,
             auto_rotate=True,
             optimize_bw=False  # Don't optimize for preview
         )
         
         # Send preview
         return send_file(
-            output_path,
-            mimetype='image/png'
+            io.BytesIO(preview),
+            mimetype=PREVIEW_MIMETYPES[preview_format]
         )
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/labels/jobs', methods=['POST'])
+def submit_label_job():
+    """
+    Queue a shipping label for asynchronous formatting.
+    
+    Accepts the same file and options as /api/labels/format.
+    
+    Returns:
+        202 with the job id and status URL, or 429 if the queue is full
+    """
+    stream, filename, error = get_label_upload()
+    if error:
+        return error
+    
+    output_format = request.values.get('format', 'pdf').lower()
+    if output_format not in OUTPUT_MIMETYPES:
+        return jsonify({
+            'error': f'Invalid output format. Must be one of: {", ".join(OUTPUT_MIMETYPES)}'
+        }), 400
+    
+    try:
+        job = job_queue.submit(
+            stream.read(),
+            output_format=output_format,
+            auto_rotate=request.values.get('auto_rotate', 'true').lower() == 'true',
+            optimize_bw=request.values.get('optimize_bw', 'true').lower() == 'true',
+            filename=secure_filename(filename) or 'label'
+        )
+    except QueueFullError as e:
+        response = jsonify({'error': str(e)})
+        response.headers['Retry-After'] = '1'
+        return response, 429
+    
+    return jsonify({
+        'job_id': job.id,
+        'status': job.status,
+        'status_url': f'/api/labels/jobs/{job.id}'
+    }), 202
+
+
+@app.route('/api/labels/jobs/<job_id>', methods=['GET'])
+def get_label_job(job_id):
+    """
+    Fetch the status or result of a label job.
+    
+    Returns:
+        The formatted label file once the job is done (timings in
+        X-Job-Queue-Time / X-Job-Processing-Time headers), otherwise the job
+        status as JSON: 202 while queued or running, 500 if it failed,
+        404 if the id is unknown or expired
+    """
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    status = job.status
+    if status in ('queued', 'running'):
+        return jsonify(job.to_dict()), 202
+    if status == 'failed':
+        return jsonify(job.to_dict()), 500
+    
+    response = send_file(
+        io.BytesIO(job.result),
+        as_attachment=True,
+        download_name=f"formatted_{Path(job.filename).stem}.{job.output_format}",
+        mimetype=OUTPUT_MIMETYPES[job.output_format]
+    )
+    response.headers['X-Job-Queue-Time'] = f"{job.queue_time:.4f}"
+    response.headers['X-Job-Processing-Time'] = f"{job.processing_time:.4f}"
+    return response
+
+
+@app.route('/api/labels/printers', methods=['GET'])
+def list_printers():
+    """
+    List configured printers with their queue depth and throughput.
+    
+    Returns:
+        Dictionary of printer name to spooler statistics
+    """
+    return jsonify(spooler.stats())
+
+
+@app.route('/api/labels/print', methods=['POST'])
+def print_label():
+    """
+    Format a shipping label and send it to a printer.
+    
+    The label is formatted in the printer's format (ZPL, EPL or PDF) and
+    queued; consecutive labels for the same printer are sent as one job.
+    
+    Accepts:
+        - file: Label file (PDF or image), or the raw request body with a
+          PDF/image Content-Type
+        - printer: Printer name (see /api/labels/printers)
+        - auto_rotate: Auto-detect rotation (true/false, default: true)
+        - optimize_bw: Optimize for B&W (true/false, default: true)
+    
+    Returns:
+        202 with the print job status, 404 for an unknown printer, or 429
+        if the printer's queue is full
+    """
+    stream, filename, error = get_label_upload()
+    if error:
+        return error
+    
+    printer = request.values.get('printer', '')
+    if printer not in spooler.printers:
+        return jsonify({'error': f'Unknown printer: {printer}'}), 404
+    
+    try:
+        job = spooler.print_label(
+            printer,
+            stream.read(),
+            auto_rotate=request.values.get('auto_rotate', 'true').lower() == 'true',
+            optimize_bw=request.values.get('optimize_bw', 'true').lower() == 'true',
+            filename=secure_filename(filename) or 'label'
+        )
+    except QueueFullError as e:
+        response = jsonify({'error': str(e)})
+        response.headers['Retry-After'] = '1'
+        return response, 429
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    
+    return jsonify({**job.to_dict(), 'status_url': f'/api/labels/print/{job.id}'}), 202
+
+
+@app.route('/api/labels/print/<job_id>', methods=['GET'])
+def get_print_job(job_id):
+    """
+    Fetch the status of a print job.
+    
+    Returns:
+        The job status as JSON, or 404 if the id is unknown or expired
+    """
+    job = spooler.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Print job not found'}), 404
+    return jsonify(job.to_dict())
+
+
+@app.route('/api/labels/batch', methods=['POST'])
+def batch_labels():
+    """
+    Format many shipping labels in one request.
+    
+    Accepts:
+        - files: Any number of label files and/or zip archives of labels,
+          or a raw zip request body
+        - bundle: 'pdf' for one merged print-ready PDF (default) or 'zip'
+          for a zip of individually formatted labels
+        - format: Per-label output format for zip bundles (pdf, png, zpl
+          or epl, default: pdf)
+        - auto_rotate: Auto-detect rotation (true/false, default: true)
+        - optimize_bw: Optimize for B&W (true/false, default: true)
+    
+    Returns:
+        Merged PDF (counts of formatted and failed inputs in X-Batch-Processed
+        and X-Batch-Failed), a streamed zip ending with batch_report.json, or
+        429 if the job queue is full
+    """
+    request.max_content_length = MAX_BATCH_SIZE
+    
+    bundle = request.values.get('bundle', 'pdf').lower()
+    output_format = 'pdf' if bundle == 'pdf' else request.values.get('format', 'pdf').lower()
+    # Merged PDFs are assembled from per-label page images
+    worker_format = 'png' if bundle == 'pdf' else output_format
+    
+    if bundle not in ('pdf', 'zip'):
+        return jsonify({'error': 'Invalid bundle. Must be one of: pdf, zip'}), 400
+    if output_format not in OUTPUT_MIMETYPES:
+        return jsonify({
+            'error': f'Invalid output format. Must be one of: {", ".join(OUTPUT_MIMETYPES)}'
+        }), 400
+    
+    uploads = get_batch_uploads()
+    if not uploads:
+        return jsonify({'error': 'No label files provided'}), 400
+    
+    # Reject bad archives before a streamed response has started
+    for filename, stream in uploads:
+        if filename.lower().endswith('.zip'):
+            if not zipfile.is_zipfile(stream):
+                return jsonify({'error': f'Invalid zip archive: {filename}'}), 400
+            stream.seek(0)
+    
+    try:
+        results = job_queue.map(
+            iter_batch_labels(uploads),
+            output_format=worker_format,
+            auto_rotate=request.values.get('auto_rotate', 'true').lower() == 'true',
+            optimize_bw=request.values.get('optimize_bw', 'true').lower() == 'true'
+        )
+    except QueueFullError as e:
+        response = jsonify({'error': str(e)})
+        response.headers['Retry-After'] = '1'
+        return response, 429
     
-    finally:
-        # Clean up
-        try:
-            if input_path and input_path.exists():
-                input_path.unlink()
-        except:
-            pass
+    try:
+        if bundle == 'zip':
+            return Response(
+                stream_with_context(stream_batch_zip(results, output_format)),
+                mimetype='application/zip',
+                headers={'Content-Disposition': 'attachment; filename=formatted_labels.zip'}
+            )
+        
+        # Stream each formatted page into the PDF as it arrives, so only
+        # one page is held at a time; output spills to disk once it
+        # outgrows memory
+        merged = tempfile.SpooledTemporaryFile(max_size=MAX_FILE_SIZE)
+        page_size = (formatter.LABEL_WIDTH_INCHES * 72, formatter.LABEL_HEIGHT_INCHES * 72)
+        writer = PdfStreamWriter(merged, page_size)
+        failed = []
+        for name, output, error in results:
+            if error:
+                failed.append(name)
+                continue
+            writer.add_page(Image.open(io.BytesIO(output)))
+        writer.close()
+        
+        if not writer.page_count:
+            merged.close()
+            return jsonify({'error': 'No labels could be formatted', 'failed': failed}), 422
+        
+        merged.seek(0)
+        
+        response = send_file(
+            merged,
+            as_attachment=True,
+            download_name='formatted_labels.pdf',
+            mimetype='application/pdf'
+        )
+        response.headers['X-Batch-Processed'] = str(writer.page_count)
+        response.headers['X-Batch-Failed'] = str(len(failed))
+        return response
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
 
 
 @app.errorhandler(413)
 def too_large(e):
-    """Handle file too large error."""
+    """Handle file too large error, reporting the limit of the route hit."""
+    limit = request.max_content_length or MAX_FILE_SIZE
     return jsonify({
-        'error': f'File too large. Maximum size is {MAX_FILE_SIZE / (1024*1024):.0f}MB'
+        'error': f'File too large. Maximum size is {limit / (1024*1024):.0f}MB'
     }), 413
 
 
@@ -209,8 +674,12 @@ def run_server(host='0.0.0.0', port=5001, debug=False):
     """Run the Flask server."""
     print(f"🚀 Label Formatter API starting on http://{host}:{port}")
     print(f"📝 Health check: http://{host}:{port}/health")
+    print(f"📈 Metrics: http://{host}:{port}/metrics")
     print(f"📋 Format endpoint: http://{host}:{port}/api/labels/format")
     print(f"👁️  Preview endpoint: http://{host}:{port}/api/labels/preview")
+    print(f"⏳ Job endpoint: http://{host}:{port}/api/labels/jobs")
+    print(f"📦 Batch endpoint: http://{host}:{port}/api/labels/batch")
+    print(f"🖨️  Print endpoint: http://{host}:{port}/api/labels/print")
     app.run(host=host, port=port, debug=debug)
 
 
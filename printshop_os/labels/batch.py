@@ -0,0 +1,137 @@
+"""
+Batch Engine - Parallel label processing
+
+Spreads label files across a process pool so CPU-bound PIL work (resize,
+autocontrast, thresholding) scales with the number of cores, and collects
+per-file results and errors into a structured report.
+"""
+
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+
+@dataclass
+class BatchResult:
+    """Outcome of processing a single label file in a batch."""
+    
+    source: Path
+    output: Optional[Path] = None
+    error: Optional[str] = None
+    elapsed: float = 0.0
+    
+    @property
+    def ok(self) -> bool:
+        """True if the label was processed successfully."""
+        return self.error is None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the result to a JSON-serializable dictionary."""
+        return {
+            "source": str(self.source),
+            "output": str(self.output) if self.output else None,
+            "error": self.error,
+            "elapsed": round(self.elapsed, 4),
+        }
+
+
+@dataclass
+class BatchReport:
+    """Structured report for a batch run, in input order."""
+    
+    results: List[BatchResult] = field(default_factory=list)
+    elapsed: float = 0.0
+    workers: int = 1
+    
+    @property
+    def processed(self) -> List[Path]:
+        """Output paths of successfully processed labels."""
+        return [r.output for r in self.results if r.ok]
+    
+    @property
+    def failed(self) -> List[BatchResult]:
+        """Results for labels that failed to process."""
+        return [r for r in self.results if not r.ok]
+    
+    @property
+    def labels_per_second(self) -> float:
+        """Overall throughput of the run."""
+        return len(self.results) / self.elapsed if self.elapsed else 0.0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the report to a JSON-serializable dictionary."""
+        return {
+            "total": len(self.results),
+            "succeeded": len(self.processed),
+            "failed": len(self.failed),
+            "workers": self.workers,
+            "elapsed": round(self.elapsed, 4),
+            "labels_per_second": round(self.labels_per_second, 2),
+            "results": [r.to_dict() for r in self.results],
+        }
+
+
+# Formatter used by each pool worker, set once per process by _init_worker
+_worker_formatter = None
+
+
+def _init_worker(formatter) -> None:
+    """Pool initializer: keep a formatter copy in the worker process."""
+    global _worker_formatter
+    _worker_formatter = formatter
+
+
+def _process_task(formatter, task: tuple) -> BatchResult:
+    """Process one (input, output, options) task, capturing any error."""
+    input_file, output_file, options = task
+    start = time.perf_counter()
+    try:
+        output = formatter.process_label(input_file, output_file, **options)
+        return BatchResult(input_file, output, elapsed=time.perf_counter() - start)
+    except Exception as e:
+        return BatchResult(input_file, error=str(e), elapsed=time.perf_counter() - start)
+
+
+def _worker_task(task: tuple) -> BatchResult:
+    """Pool entry point using the per-process formatter."""
+    return _process_task(_worker_formatter, task)
+
+
+def run_batch(
+    formatter,
+    tasks: Iterable[tuple],
+    workers: int = 1,
+    chunksize: Optional[int] = None
+) -> BatchReport:
+    """
+    Run label processing tasks serially or across a process pool.
+    
+    Args:
+        formatter: LabelFormatter whose settings are used for every task
+        tasks: Iterable of (input_path, output_path, process_label kwargs)
+        workers: Number of worker processes (1 processes in-line)
+        chunksize: Tasks sent to a worker per dispatch. Defaults to spreading
+                   the batch into roughly four chunks per worker.
+    
+    Returns:
+        BatchReport with one result per task, in input order
+    """
+    tasks = list(tasks)
+    workers = max(1, workers)
+    start = time.perf_counter()
+    
+    if workers == 1 or len(tasks) <= 1:
+        results = [_process_task(formatter, task) for task in tasks]
+    else:
+        if chunksize is None:
+            chunksize = max(1, len(tasks) // (workers * 4))
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(formatter,)
+        ) as executor:
+            results = list(executor.map(_worker_task, tasks, chunksize=chunksize))
+    
+    return BatchReport(results=results, elapsed=time.perf_counter() - start, workers=workers)
@@ -0,0 +1,248 @@
+"""
+Render Cache - Content-addressed cache for label rendering
+
+Reprints of the same label are common (printer jams, reprints from the
+dashboard), and rasterizing a PDF at 300 DPI is the most expensive step of
+the pipeline. RenderCache stores rasterized pages and final outputs keyed by
+the SHA-256 of the input bytes plus the processing options, with
+size-bounded LRU eviction in memory and, optionally, on local disk.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+
+class RenderCache:
+    """
+    Two-level (memory + disk) LRU cache of rendered label bytes.
+    
+    Entries are grouped by kind ('raster' for rasterized PDF pages,
+    'output' for finished PDFs/PNGs) so hit/miss counters can be reported
+    per stage.
+    
+    Attributes:
+        max_memory_bytes (int): Memory budget for cached entries
+        cache_dir (Path): Directory for the disk cache, or None for memory only
+        max_disk_bytes (int): Disk budget for cached entries
+    """
+    
+    def __init__(
+        self,
+        max_memory_bytes: int = 64 * 1024 * 1024,
+        cache_dir: Optional[Union[str, Path]] = None,
+        max_disk_bytes: int = 512 * 1024 * 1024
+    ):
+        """
+        Initialize the render cache.
+        
+        Args:
+            max_memory_bytes: Memory budget in bytes (default: 64MB)
+            cache_dir: Directory for the disk cache. If not provided, only
+                       the in-memory cache is used.
+            max_disk_bytes: Disk budget in bytes (default: 512MB)
+        """
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        
+        self._lock = threading.Lock()
+        self._memory: OrderedDict = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_bytes = 0
+        self._counters: Dict[str, Dict[str, int]] = {}
+        
+        if self.cache_dir:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self._disk_bytes = sum(p.stat().st_size for p in self._disk_entries())
+    
+    @staticmethod
+    def make_key(data: bytes, **options: Any) -> str:
+        """
+        Build a content-addressed key for input bytes and processing options.
+        
+        Args:
+            data: Raw input bytes (PDF or image)
+            **options: Processing options that affect the output
+                       (dpi, auto_rotate, optimize_bw, output_format, ...)
+        
+        Returns:
+            Hex SHA-256 digest identifying the rendered result
+        """
+        digest = hashlib.sha256(data)
+        digest.update(json.dumps(options, sort_keys=True).encode())
+        return digest.hexdigest()
+    
+    def get(self, kind: str, key: str) -> Optional[bytes]:
+        """
+        Look up a cached entry, checking memory first and then disk.
+        
+        Args:
+            kind: Entry kind ('raster' or 'output')
+            key: Key from make_key()
+        
+        Returns:
+            Cached bytes, or None on a miss
+        """
+        with self._lock:
+            value = self._memory.get((kind, key))
+            if value is not None:
+                self._memory.move_to_end((kind, key))
+                self._count(kind, 'hits')
+                return value
+        
+        value = self._disk_get(kind, key)
+        
+        with self._lock:
+            if value is None:
+                self._count(kind, 'misses')
+                return None
+            self._count(kind, 'hits')
+            self._memory_put((kind, key), value)
+        
+        return value
+    
+    def put(self, kind: str, key: str, value: bytes) -> None:
+        """
+        Store an entry in memory and, if configured, on disk.
+        
+        Args:
+            kind: Entry kind ('raster' or 'output')
+            key: Key from make_key()
+            value: Rendered bytes to cache
+        """
+        with self._lock:
+            self._memory_put((kind, key), value)
+        
+        self._disk_put(kind, key, value)
+    
+    def clear(self) -> None:
+        """Remove all entries from memory and disk and reset counters."""
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            self._counters.clear()
+            if self.cache_dir:
+                for path in self._disk_entries():
+                    path.unlink(missing_ok=True)
+                self._disk_bytes = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+        
+        Returns:
+            Dictionary with overall and per-kind hit/miss counters and the
+            current memory/disk usage
+        """
+        with self._lock:
+            hits = sum(c['hits'] for c in self._counters.values())
+            misses = sum(c['misses'] for c in self._counters.values())
+            return {
+                'hits': hits,
+                'misses': misses,
+                'hit_ratio': round(hits / (hits + misses), 4) if hits + misses else 0.0,
+                'memory_entries': len(self._memory),
+                'memory_bytes': self._memory_bytes,
+                'disk_bytes': self._disk_bytes,
+                'by_kind': {kind: dict(c) for kind, c in self._counters.items()},
+            }
+    
+    def _count(self, kind: str, counter: str) -> None:
+        """Increment a hit/miss counter (caller holds the lock)."""
+        counters = self._counters.setdefault(kind, {'hits': 0, 'misses': 0})
+        counters[counter] += 1
+    
+    def _memory_put(self, entry: tuple, value: bytes) -> None:
+        """Insert into the memory LRU and evict (caller holds the lock)."""
+        if len(value) > self.max_memory_bytes:
+            return
+        
+        previous = self._memory.pop(entry, None)
+        if previous is not None:
+            self._memory_bytes -= len(previous)
+        
+        self._memory[entry] = value
+        self._memory_bytes += len(value)
+        
+        while self._memory_bytes > self.max_memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+    
+    def _disk_path(self, kind: str, key: str) -> Path:
+        """Path of a disk entry, sharded by key prefix."""
+        return self.cache_dir / kind / key[:2] / key
+    
+    def _disk_entries(self) -> list:
+        """All entry files currently in the disk cache."""
+        return [
+            p for p in self.cache_dir.glob('*/*/*')
+            if p.is_file() and not p.name.endswith('.tmp')
+        ]
+    
+    def _disk_get(self, kind: str, key: str) -> Optional[bytes]:
+        """Read a disk entry and mark it recently used."""
+        if not self.cache_dir:
+            return None
+        
+        path = self._disk_path(kind, key)
+        try:
+            value = path.read_bytes()
+            os.utime(path)
+            return value
+        except FileNotFoundError:
+            return None
+    
+    def _disk_put(self, kind: str, key: str, value: bytes) -> None:
+        """Write a disk entry atomically and evict least recently used files."""
+        if not self.cache_dir or len(value) > self.max_disk_bytes:
+            return
+        
+        path = self._disk_path(kind, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{key}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(value)
+        
+        with self._lock:
+            existing = path.stat().st_size if path.exists() else 0
+            os.replace(tmp_path, path)
+            self._disk_bytes += len(value) - existing
+            if self._disk_bytes > self.max_disk_bytes:
+                self._evict_disk()
+    
+    def _evict_disk(self) -> None:
+        """Remove least recently used disk entries (caller holds the lock)."""
+        entries = []
+        for path in self._disk_entries():
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        
+        # Re-sync with files written by other processes sharing the directory
+        self._disk_bytes = sum(size for _, size, _ in entries)
+        
+        for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+            if self._disk_bytes <= self.max_disk_bytes:
+                break
+            path.unlink(missing_ok=True)
+            self._disk_bytes -= size
+    
+    def __getstate__(self) -> Dict[str, Any]:
+        """Pickle without the lock or memory entries (for worker processes)."""
+        state = self.__dict__.copy()
+        del state['_lock']
+        state['_memory'] = OrderedDict()
+        state['_memory_bytes'] = 0
+        state['_counters'] = {}
+        return state
+    
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        """Restore a pickled cache with a fresh lock."""
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
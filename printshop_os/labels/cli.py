@@ -5,17 +5,30 @@ Command-line interface for the Label Formatter.
 Usage:
     python -m printshop_os.labels.cli format input.pdf output.pdf
     python -m printshop_os.labels.cli batch input_dir/ output_dir/
+    python -m printshop_os.labels.cli pages manifest.pdf labels.pdf
 """
 
 import argparse
+import json
 import sys
 from pathlib import Path
 from .formatter import LabelFormatter
 
 
+def build_formatter(args):
+    """Create a LabelFormatter from common CLI options."""
+    return LabelFormatter(
+        dpi=args.dpi,
+        use_numpy=args.numpy,
+        threshold='adaptive' if args.adaptive else 'fixed',
+        bilevel=args.bilevel,
+        passthrough=args.passthrough
+    )
+
+
 def format_command(args):
     """Format a single label file."""
-    formatter = LabelFormatter(dpi=args.dpi)
+    formatter = build_formatter(args)
     
     try:
         output_path = formatter.process_label(
@@ -32,24 +45,86 @@ def format_command(args):
         return 1
 
 
+def pages_command(args):
+    """Format every label page of a multi-page PDF."""
+    formatter = build_formatter(args)
+    
+    try:
+        written = formatter.process_pages(
+            input_path=args.input,
+            output_path=args.output,
+            output_format=args.format,
+            split=args.split,
+            auto_rotate=not args.no_rotate,
+            optimize_bw=not args.no_optimize
+        )
+        if args.split:
+            print(f"✓ Successfully formatted {len(written)} labels into {args.output}")
+        else:
+            print(f"✓ Successfully formatted labels: {written[0]}")
+        return 0
+    except Exception as e:
+        print(f"✗ Error: {str(e)}", file=sys.stderr)
+        return 1
+
+
 def batch_command(args):
     """Batch process multiple label files."""
-    formatter = LabelFormatter(dpi=args.dpi)
+    formatter = build_formatter(args)
     
     try:
-        processed = formatter.batch_process(
+        report = formatter.batch_report(
             input_dir=args.input_dir,
             output_dir=args.output_dir,
             output_format=args.format,
-            pattern=args.pattern
+            pattern=args.pattern,
+            workers=args.workers,
+            chunksize=args.chunksize
         )
-        print(f"\n✓ Successfully processed {len(processed)} labels")
-        return 0
+        for failure in report.failed:
+            print(f"✗ Failed to process {failure.source.name}: {failure.error}", file=sys.stderr)
+        
+        print(
+            f"\n✓ Successfully processed {len(report.processed)} labels "
+            f"in {report.elapsed:.1f}s ({report.labels_per_second:.1f} labels/sec, "
+            f"{report.workers} worker(s))"
+        )
+        
+        if args.report:
+            with open(args.report, 'w') as f:
+                json.dump(report.to_dict(), f, indent=2)
+            print(f"📝 Report written to {args.report}")
+        
+        return 1 if report.failed else 0
     except Exception as e:
         print(f"✗ Error: {str(e)}", file=sys.stderr)
         return 1
 
 
+def add_image_options(parser):
+    """Add image-processing options shared by all commands."""
+    parser.add_argument(
+        '--numpy',
+        action='store_true',
+        help='Use the vectorized NumPy image path'
+    )
+    parser.add_argument(
+        '--adaptive',
+        action='store_true',
+        help='Use an adaptive (local-mean) B&W threshold (requires NumPy)'
+    )
+    parser.add_argument(
+        '--bilevel',
+        action='store_true',
+        help='Keep output 1-bit (CCITT G4 in PDFs) for thermal printers'
+    )
+    parser.add_argument(
+        '--passthrough',
+        action='store_true',
+        help='Copy PDFs that are already 4x6 to PDF output without rasterizing'
+    )
+
+
 def main():
     """Main CLI entry point."""
     parser = argparse.ArgumentParser(
@@ -63,11 +138,23 @@ Examples:
   # Format with specific options
   python -m printshop_os.labels.cli format input.pdf output.png --format png --no-rotate
   
+  # Raw ZPL for a Zebra printer
+  python -m printshop_os.labels.cli format input.pdf label.zpl --format zpl
+  
+  # Split a multi-label PDF into one 4x6 page per label
+  python -m printshop_os.labels.cli pages manifest.pdf labels.pdf
+  
+  # One file per label page
+  python -m printshop_os.labels.cli pages manifest.pdf labels/ --split --format png
+  
   # Batch process a directory
   python -m printshop_os.labels.cli batch labels/ formatted_labels/
   
   # Batch process with pattern
   python -m printshop_os.labels.cli batch labels/ formatted/ --pattern "*.pdf"
+  
+  # Batch process on 8 cores with a JSON report
+  python -m printshop_os.labels.cli batch labels/ formatted/ --workers 8 --report report.json
         """
     )
     
@@ -80,7 +167,7 @@ Examples:
     format_parser.add_argument('output', type=str, help='Output file path')
     format_parser.add_argument(
         '--format', '-f',
-        choices=['pdf', 'png'],
+        choices=['pdf', 'png', 'zpl', 'epl'],
         default='pdf',
         help='Output format (default: pdf)'
     )
@@ -100,15 +187,50 @@ Examples:
         action='store_true',
         help='Disable black & white optimization'
     )
+    add_image_options(format_parser)
     format_parser.set_defaults(func=format_command)
     
+    # Pages command
+    pages_parser = subparsers.add_parser('pages', help='Format every label in a multi-page PDF')
+    pages_parser.add_argument('input', type=str, help='Input PDF path')
+    pages_parser.add_argument('output', type=str, help='Output PDF path, or directory with --split')
+    pages_parser.add_argument(
+        '--format', '-f',
+        choices=['pdf', 'png', 'zpl', 'epl'],
+        default='pdf',
+        help='Output format (default: pdf)'
+    )
+    pages_parser.add_argument(
+        '--split',
+        action='store_true',
+        help='Write one file per page instead of a single multi-page PDF'
+    )
+    pages_parser.add_argument(
+        '--dpi',
+        type=int,
+        default=300,
+        help='Output resolution in DPI (default: 300)'
+    )
+    pages_parser.add_argument(
+        '--no-rotate',
+        action='store_true',
+        help='Disable automatic rotation'
+    )
+    pages_parser.add_argument(
+        '--no-optimize',
+        action='store_true',
+        help='Disable black & white optimization'
+    )
+    add_image_options(pages_parser)
+    pages_parser.set_defaults(func=pages_command)
+    
     # Batch command
     batch_parser = subparsers.add_parser('batch', help='Batch process multiple labels')
     batch_parser.add_argument('input_dir', type=str, help='Input directory')
     batch_parser.add_argument('output_dir', type=str, help='Output directory')
     batch_parser.add_argument(
         '--format', '-f',
-        choices=['pdf', 'png'],
+        choices=['pdf', 'png', 'zpl', 'epl'],
         default='pdf',
         help='Output format (default: pdf)'
     )
@@ -124,6 +246,25 @@ Examples:
         default=300,
         help='Output resolution in DPI (default: 300)'
     )
+    batch_parser.add_argument(
+        '--workers', '-w',
+        type=int,
+        default=1,
+        help='Number of worker processes (default: 1)'
+    )
+    batch_parser.add_argument(
+        '--chunksize',
+        type=int,
+        default=None,
+        help='Files dispatched to a worker at a time (default: auto)'
+    )
+    batch_parser.add_argument(
+        '--report',
+        type=str,
+        default=None,
+        help='Write a JSON report of per-file results to this path'
+    )
+    add_image_options(batch_parser)
     batch_parser.set_defaults(func=batch_command)
     
     # Parse and execute
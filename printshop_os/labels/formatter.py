@@ -11,15 +11,24 @@ Supports:
 - PDF and image input/output
 """
 
+import hashlib
 import io
 import os
+import time
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Union, Tuple, Optional, Literal
+from typing import Any, BinaryIO, Callable, Dict, Iterator, Union, Tuple, Optional, Literal
 from PIL import Image, ImageOps
 import PyPDF2
-from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import inch
-from reportlab.lib.utils import ImageReader
+
+from .batch import BatchReport, run_batch
+from .cache import RenderCache
+from .metrics import PipelineStats
+from .pdfstream import PdfStreamWriter
+from . import orientation, raster, thermal, vectorized
+
+OutputFormat = Literal['pdf', 'png', 'zpl', 'epl']
 
 
 class LabelFormatter:
@@ -40,22 +49,92 @@ class LabelFormatter:
     LABEL_WIDTH_PX = int(LABEL_WIDTH_INCHES * DPI)
     LABEL_HEIGHT_PX = int(LABEL_HEIGHT_INCHES * DPI)
     
-    def __init__(self, dpi: int = 300):
+    # PIL formats accepted for in-memory image input
+    SUPPORTED_IMAGE_FORMATS = {'PNG', 'JPEG', 'TIFF', 'BMP'}
+    
+    # Raw printer command formats (written as bytes, not images)
+    PRINTER_FORMATS = {'zpl', 'epl'}
+    
+    # Preview rendering: screen resolution and encodings
+    PREVIEW_DPI = 96
+    PREVIEW_FORMATS = {'png': 'PNG', 'webp': 'WEBP'}
+    
+    # Page size slack (PDF points) for treating a PDF page as already 4x6
+    PASSTHROUGH_TOLERANCE_PT = 2.0
+    
+    def __init__(
+        self,
+        dpi: int = 300,
+        cache: Optional[RenderCache] = None,
+        use_numpy: bool = False,
+        threshold: Literal['fixed', 'adaptive'] = 'fixed',
+        bilevel: bool = False,
+        stats: Optional[PipelineStats] = None,
+        on_stage: Optional[Callable[[str, float], None]] = None,
+        passthrough: bool = False,
+        raster_backend: Union[str, 'raster.RasterBackend', None] = None
+    ):
         """
         Initialize the label formatter.
         
         Args:
             dpi: Resolution in dots per inch (default: 300)
+            cache: Optional RenderCache for rasterized pages and final outputs.
+                   Reprints of identical input are then served without
+                   re-rendering.
+            use_numpy: Run cropping and B&W optimization as NumPy array
+                       operations instead of chained PIL images
+            threshold: B&W threshold mode - 'fixed' (level 128) or
+                       'adaptive' (local mean, requires NumPy)
+            bilevel: Keep B&W-optimized labels 1-bit end to end. PDFs then
+                     embed a CCITT G4 image instead of 24-bit RGB.
+            stats: Optional PipelineStats that records per-stage latency
+                   (passthrough, load, rotate, crop, resize, threshold,
+                   save, total)
+            on_stage: Optional callback called as on_stage(stage, seconds)
+                      after every pipeline stage. It is not passed on to
+                      worker processes.
+            passthrough: Copy PDF labels whose page is already 4x6 (or
+                         6x4, rotated upright) straight to PDF output,
+                         keeping the original vector content instead of
+                         rasterizing it. Off by default: copied pages skip
+                         content-based upside-down detection and
+                         optimize_bw.
+            raster_backend: PDF renderer, by name ('pdfium', 'mupdf',
+                            'poppler', 'pdf2image', 'embedded') or as a
+                            RasterBackend. Default: the fastest installed
+                            backend, chosen once per process.
+            
+        Raises:
+            ImportError: If the NumPy path is requested but not installed
+            ValueError: If the threshold mode is unknown, or the raster
+                        backend is unknown or not installed
         """
+        if threshold not in ('fixed', 'adaptive'):
+            raise ValueError(f"Unknown threshold mode: {threshold}")
+        if use_numpy or threshold == 'adaptive':
+            vectorized.require_numpy()
+        
         self.dpi = dpi
+        self.cache = cache
+        self.use_numpy = use_numpy
+        self.threshold = threshold
+        self.bilevel = bilevel
+        self.stats = stats
+        self.on_stage = on_stage
+        self.passthrough = passthrough
+        if isinstance(raster_backend, str):
+            raster_backend = raster.get_backend(raster_backend)
+        self.raster_backend = raster_backend or raster.select_backend()
         self.label_width_px = int(self.LABEL_WIDTH_INCHES * dpi)
         self.label_height_px = int(self.LABEL_HEIGHT_INCHES * dpi)
+        self.orientation_stats = orientation.OrientationStats()
     
     def process_label(
         self,
         input_path: Union[str, Path],
         output_path: Union[str, Path],
-        output_format: Literal['pdf', 'png'] = 'pdf',
+        output_format: OutputFormat = 'pdf',
         auto_rotate: bool = True,
         optimize_bw: bool = True
     ) -> Path:
@@ -65,7 +144,7 @@ class LabelFormatter:
         Args:
             input_path: Path to input file (PDF or image)
             output_path: Path for output file
-            output_format: Output format ('pdf' or 'png')
+            output_format: Output format ('pdf', 'png', 'zpl' or 'epl')
             auto_rotate: Automatically detect and correct rotation
             optimize_bw: Optimize for black & white printing
             
@@ -82,71 +161,584 @@ class LabelFormatter:
         if not input_path.exists():
             raise FileNotFoundError(f"Input file not found: {input_path}")
         
-        # Convert input to PIL Image
-        image = self._load_image(input_path)
+        with self._stage('total'):
+            # Read the input once for the cache key, pass-through and rendering
+            is_pdf = input_path.suffix.lower() == '.pdf'
+            data = input_path.read_bytes() if self.cache is not None or is_pdf else None
+            
+            # Serve reprints of identical input from the cache
+            cache_key = None
+            if self.cache is not None:
+                cache_key = self._output_key(data, output_format, auto_rotate, optimize_bw)
+                cached = self.cache.get('output', cache_key)
+                if cached is not None:
+                    output_path.write_bytes(cached)
+                    return output_path
+            
+            # Labels that are already 4x6 PDFs skip rasterization entirely
+            if is_pdf:
+                result = self._try_passthrough(data, output_format, auto_rotate)
+                if result is not None:
+                    output_path.write_bytes(result)
+                    if cache_key:
+                        self.cache.put('output', cache_key, result)
+                    return output_path
+            
+            # Convert input to PIL Image
+            with self._stage('load'):
+                image = self._load_image(input_path, data)
+            image = self._format_image(image, auto_rotate, optimize_bw)
+            with self._stage('save'):
+                self._save(image, output_path, output_format)
+            
+            if cache_key:
+                self.cache.put('output', cache_key, output_path.read_bytes())
+            
+            return output_path
+    
+    def process_bytes(
+        self,
+        data: bytes,
+        output_format: OutputFormat = 'pdf',
+        auto_rotate: bool = True,
+        optimize_bw: bool = True
+    ) -> bytes:
+        """
+        Process a shipping label held in memory.
+        
+        The input type (PDF or image) is detected from the content itself,
+        so no filename or temporary file is needed.
+        
+        Args:
+            data: Raw bytes of the input label (PDF or image)
+            output_format: Output format ('pdf', 'png', 'zpl' or 'epl')
+            auto_rotate: Automatically detect and correct rotation
+            optimize_bw: Optimize for black & white printing
+            
+        Returns:
+            The formatted label as bytes
+            
+        Raises:
+            ValueError: If the content is not a supported PDF or image
+        """
+        with self._stage('total'):
+            cache_key = None
+            if self.cache is not None:
+                cache_key = self._output_key(data, output_format, auto_rotate, optimize_bw)
+                cached = self.cache.get('output', cache_key)
+                if cached is not None:
+                    return cached
+            
+            # Labels that are already 4x6 PDFs skip rasterization entirely
+            result = self._try_passthrough(data, output_format, auto_rotate)
+            if result is not None:
+                if cache_key:
+                    self.cache.put('output', cache_key, result)
+                return result
+            
+            output = io.BytesIO()
+            with self._stage('load'):
+                image = self._load_image_bytes(data)
+            image = self._format_image(image, auto_rotate, optimize_bw)
+            with self._stage('save'):
+                self._save(image, output, output_format)
+            result = output.getvalue()
+            
+            if cache_key:
+                self.cache.put('output', cache_key, result)
+            
+            return result
+    
+    def process_stream(
+        self,
+        stream: BinaryIO,
+        output_format: OutputFormat = 'pdf',
+        auto_rotate: bool = True,
+        optimize_bw: bool = True
+    ) -> io.BytesIO:
+        """
+        Process a shipping label read from a file-like object.
+        
+        Args:
+            stream: Readable binary stream containing a PDF or image
+            output_format: Output format ('pdf', 'png', 'zpl' or 'epl')
+            auto_rotate: Automatically detect and correct rotation
+            optimize_bw: Optimize for black & white printing
+            
+        Returns:
+            BytesIO containing the formatted label, positioned at the start
+        """
+        return io.BytesIO(
+            self.process_bytes(stream.read(), output_format, auto_rotate, optimize_bw)
+        )
+    
+    def preview(
+        self,
+        data: bytes,
+        image_format: str = 'png',
+        dpi: Optional[int] = None,
+        auto_rotate: bool = True,
+        optimize_bw: bool = False
+    ) -> bytes:
+        """
+        Render a small, screen-resolution preview of a formatted label.
+        
+        PDFs are rasterized directly at the preview DPI and images are
+        downscaled right after decoding, so the pipeline runs on a few
+        hundred pixels with a fast resampling filter and no PDF is built.
+        Use process_bytes() for the full-resolution print output.
+        
+        Args:
+            data: Raw bytes of the input label (PDF or image)
+            image_format: Preview encoding ('png' or 'webp')
+            dpi: Preview resolution (default: PREVIEW_DPI)
+            auto_rotate: Automatically detect and correct rotation
+            optimize_bw: Optimize for black & white printing
+            
+        Returns:
+            The preview image as PNG or WebP bytes
+            
+        Raises:
+            ValueError: If the content or preview format is not supported
+        """
+        image_format = image_format.lower()
+        if image_format not in self.PREVIEW_FORMATS:
+            raise ValueError(f"Unsupported preview format: {image_format}")
+        dpi = dpi or self.PREVIEW_DPI
+        
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self._settings_key(
+                data, auto_rotate, optimize_bw, dpi=self.dpi, preview_dpi=dpi, image_format=image_format
+            )
+            cached = self.cache.get('preview', cache_key)
+            if cached is not None:
+                return cached
+        
+        size = (int(self.LABEL_WIDTH_INCHES * dpi), int(self.LABEL_HEIGHT_INCHES * dpi))
+        with self._stage('load'):
+            image = self._load_preview_image(data, dpi, size)
+        image = self._format_image(
+            image, auto_rotate, optimize_bw, size=size, resample=Image.Resampling.BILINEAR, dpi=dpi
+        )
+        
+        output = io.BytesIO()
+        with self._stage('save'):
+            if image_format == 'webp':
+                # WebP has no 1-bit mode; method 0 is its fastest encoder
+                image = image.convert('L') if image.mode == '1' else image
+                image.save(output, format='WEBP', quality=80, method=0)
+            else:
+                image.save(output, format='PNG', compress_level=1)
+        result = output.getvalue()
+        
+        if cache_key:
+            self.cache.put('preview', cache_key, result)
         
+        return result
+    
+    def iter_labels(
+        self,
+        source: Union[str, Path, bytes],
+        auto_rotate: bool = True,
+        optimize_bw: bool = True
+    ) -> Iterator[Image.Image]:
+        """
+        Yield one formatted label image per page of a multi-label PDF.
+        
+        Pages are rasterized lazily, one at a time, so a large carrier
+        manifest never has to be held fully rendered in memory. Image
+        inputs yield a single label.
+        
+        Args:
+            source: Path to a PDF/image file, or raw PDF/image bytes
+            auto_rotate: Automatically detect and correct rotation
+            optimize_bw: Optimize for black & white printing
+            
+        Yields:
+            Formatted 4x6 label images in page order
+            
+        Raises:
+            FileNotFoundError: If the input path doesn't exist
+            ValueError: If the input format is not supported
+        """
+        if isinstance(source, bytes):
+            is_pdf = source[:1024].lstrip().startswith(b'%PDF-')
+        else:
+            source = Path(source)
+            if not source.exists():
+                raise FileNotFoundError(f"Input file not found: {source}")
+            is_pdf = source.suffix.lower() == '.pdf'
+        
+        if not is_pdf:
+            with self._stage('load'):
+                if isinstance(source, bytes):
+                    image = self._load_image_bytes(source)
+                else:
+                    image = self._load_image(source)
+            yield self._format_image(image, auto_rotate, optimize_bw)
+            return
+        
+        # Hash the document once, not once per page, for the raster cache keys
+        digest = self._document_digest(source) if self.cache is not None else None
+        for page_number in range(1, self._pdf_page_count(source) + 1):
+            with self._stage('load'):
+                image = self._render_page(source, page_number, digest=digest)
+            yield self._format_image(image, auto_rotate, optimize_bw)
+    
+    def process_pages(
+        self,
+        input_path: Union[str, Path],
+        output_path: Union[str, Path],
+        output_format: OutputFormat = 'pdf',
+        split: bool = False,
+        auto_rotate: bool = True,
+        optimize_bw: bool = True
+    ) -> list[Path]:
+        """
+        Format every label in a multi-page PDF.
+        
+        Args:
+            input_path: Path to input file (usually a multi-page PDF)
+            output_path: Output PDF/ZPL/EPL path, or output directory when split
+            output_format: Output format ('pdf', 'png', 'zpl' or 'epl')
+            split: Write one file per page instead of a single multi-page PDF
+            auto_rotate: Automatically detect and correct rotation
+            optimize_bw: Optimize for black & white printing
+            
+        Returns:
+            List of written file paths
+            
+        Raises:
+            ValueError: If PNG output is requested without split
+        """
+        input_path = Path(input_path)
+        output_path = Path(output_path)
+        labels = self.iter_labels(input_path, auto_rotate, optimize_bw)
+        
+        if not split and output_format.lower() in self.PRINTER_FORMATS:
+            # Printer command streams simply concatenate one label per page
+            with open(output_path, 'wb') as output:
+                for image in labels:
+                    with self._stage('save'):
+                        output.write(self._encode_printer_commands(image, output_format.lower()))
+            return [output_path]
+        
+        if not split:
+            if output_format.lower() != 'pdf':
+                raise ValueError("Multi-page output requires PDF format; use split for PNG")
+            # Pages are streamed to disk as they are formatted, so memory
+            # stays at one page however many labels the PDF holds
+            with PdfStreamWriter(output_path, self._page_size()) as writer:
+                for image in labels:
+                    with self._stage('save'):
+                        writer.add_page(image)
+            return [output_path]
+        
+        output_path.mkdir(parents=True, exist_ok=True)
+        written = []
+        for page_number, image in enumerate(labels, start=1):
+            page_path = output_path / f"{input_path.stem}_p{page_number:03d}.{output_format}"
+            with self._stage('save'):
+                self._save(image, page_path, output_format)
+            written.append(page_path)
+        
+        return written
+    
+    def _format_image(
+        self,
+        image: Image.Image,
+        auto_rotate: bool = True,
+        optimize_bw: bool = True,
+        size: Optional[Tuple[int, int]] = None,
+        resample: Image.Resampling = Image.Resampling.LANCZOS,
+        dpi: Optional[int] = None
+    ) -> Image.Image:
+        """
+        Run the rotate/crop/resize/B&W pipeline on a loaded image.
+        
+        size, resample and dpi override the output label size (default: 4x6
+        at the formatter DPI), resize filter and the resolution the B&W
+        step assumes, for previews.
+        """
         # Auto-rotate if needed
         if auto_rotate:
-            image = self._auto_rotate(image)
+            with self._stage('rotate'):
+                image = self._auto_rotate(image)
         
         # Crop to label boundaries
-        image = self._crop_to_label(image)
+        with self._stage('crop'):
+            image = self._crop_to_label(image)
         
         # Resize to standard dimensions
-        image = self._resize_to_standard(image)
+        with self._stage('resize'):
+            image = self._resize_to_standard(image, size, resample)
         
         # Optimize for B&W if requested
         if optimize_bw:
-            image = self._optimize_bw(image)
+            with self._stage('threshold'):
+                image = self._optimize_bw(image, dpi)
         
-        # Save in requested format
-        if output_format.lower() == 'pdf':
-            self._save_as_pdf(image, output_path)
+        return image
+    
+    @contextmanager
+    def _stage(self, name: str) -> Iterator[None]:
+        """Time a pipeline stage into stats / on_stage, if either is set."""
+        if self.stats is None and self.on_stage is None:
+            yield
+            return
+        
+        start = time.perf_counter()
+        yield
+        elapsed = time.perf_counter() - start
+        
+        if self.stats is not None:
+            self.stats.record(name, elapsed)
+        if self.on_stage is not None:
+            self.on_stage(name, elapsed)
+    
+    def _save(
+        self,
+        image: Image.Image,
+        output: Union[Path, BinaryIO],
+        output_format: str
+    ) -> None:
+        """Save a formatted image to a path or writable buffer."""
+        output_format = output_format.lower()
+        if output_format == 'pdf':
+            self._save_as_pdf(image, output)
+        elif output_format in self.PRINTER_FORMATS:
+            self._save_as_printer_commands(image, output, output_format)
+        elif isinstance(output, Path):
+            self._save_as_image(image, output)
         else:
-            self._save_as_image(image, output_path)
-        
-        return output_path
+            self._save_as_image(image, output, image_format='PNG')
     
-    def _load_image(self, path: Path) -> Image.Image:
-        """Load image from PDF or image file."""
+    def _load_image(self, path: Path, data: Optional[bytes] = None) -> Image.Image:
+        """Load image from PDF or image file (from data when already read)."""
         suffix = path.suffix.lower()
         
         if suffix == '.pdf':
-            return self._pdf_to_image(path)
+            return self._render_page(path if data is None else data)
         elif suffix in ['.png', '.jpg', '.jpeg', '.tiff', '.bmp']:
-            return Image.open(path).convert('RGB')
+            return Image.open(path if data is None else io.BytesIO(data)).convert('RGB')
         else:
             raise ValueError(f"Unsupported file format: {suffix}")
     
-    def _pdf_to_image(self, pdf_path: Path) -> Image.Image:
-        """Convert first page of PDF to image."""
+    def _load_image_bytes(self, data: bytes) -> Image.Image:
+        """Load image from in-memory PDF or image bytes."""
+        if data[:1024].lstrip().startswith(b'%PDF-'):
+            return self._render_page(data)
+        
+        try:
+            image = Image.open(io.BytesIO(data))
+        except Exception:
+            raise ValueError("Unsupported file format: content is not a PDF or image")
+        
+        if image.format not in self.SUPPORTED_IMAGE_FORMATS:
+            raise ValueError(f"Unsupported file format: {image.format}")
+        
+        return image.convert('RGB')
+    
+    def _load_preview_image(self, data: bytes, dpi: int, size: Tuple[int, int]) -> Image.Image:
+        """
+        Load input bytes at roughly preview resolution.
+        
+        PDFs are rasterized at the preview DPI. Images are decoded with
+        JPEG draft mode where possible and box-reduced to at most twice the
+        preview label size, leaving headroom for cropping away margins.
+        """
+        if data[:1024].lstrip().startswith(b'%PDF-'):
+            return self._render_page(data, dpi=dpi)
+        
         try:
-            # Try using PyPDF2 to extract images
-            with open(pdf_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                page = pdf_reader.pages[0]
-                
-                # Get page dimensions and convert to image
-                # For complex PDFs, we'll need to render using an external tool
-                # For now, we'll use a simpler approach with pdf2image if available
-                try:
-                    from pdf2image import convert_from_path
-                    images = convert_from_path(pdf_path, dpi=self.dpi, first_page=1, last_page=1)
-                    return images[0].convert('RGB')
-                except ImportError:
-                    # Fallback: try to extract embedded images
-                    if '/XObject' in page['/Resources']:
-                        x_object = page['/Resources']['/XObject'].get_object()
-                        for obj in x_object:
-                            if x_object[obj]['/Subtype'] == '/Image':
-                                data = x_object[obj].get_data()
-                                return Image.open(io.BytesIO(data)).convert('RGB')
-                    
-                    # If no images found, raise error with helpful message
-                    raise ImportError(
-                        "pdf2image not available and no embedded images found. "
-                        "Install pdf2image: pip install pdf2image"
-                    )
+            image = Image.open(io.BytesIO(data))
+        except Exception:
+            raise ValueError("Unsupported file format: content is not a PDF or image")
+        
+        if image.format not in self.SUPPORTED_IMAGE_FORMATS:
+            raise ValueError(f"Unsupported file format: {image.format}")
+        
+        limit = 2 * max(size)
+        image.draft('RGB', (limit, limit))
+        factor = max(image.size) // limit
+        image = image.convert('RGB')
+        
+        return image.reduce(factor) if factor > 1 else image
+    
+    def _try_passthrough(
+        self,
+        data: bytes,
+        output_format: str,
+        auto_rotate: bool
+    ) -> Optional[bytes]:
+        """Pass-through PDF output for data, or None to use the raster path."""
+        if not self.passthrough or output_format.lower() != 'pdf':
+            return None
+        if not data[:1024].lstrip().startswith(b'%PDF-'):
+            return None
+        
+        with self._stage('passthrough'):
+            return self._passthrough_pdf(data, auto_rotate)
+    
+    def _passthrough_pdf(self, data: bytes, auto_rotate: bool = True) -> Optional[bytes]:
+        """
+        Copy the first page of a PDF that is already label-sized.
+        
+        The page's visible (crop) box, after any /Rotate, must be 4x6
+        inches, or 6x4 when auto_rotate is set, in which case the page is
+        turned upright by setting /Rotate (counter-clockwise, matching the
+        raster path's aspect-ratio fallback). The media box is normalized
+        to the crop box. Content streams are copied as-is, never decoded
+        or rasterized, so barcodes stay vector.
+        
+        Returns:
+            The single-page PDF, or None if the page is not label-sized
+            or the PDF cannot be read
+        """
+        try:
+            reader = PyPDF2.PdfReader(io.BytesIO(data))
+            if reader.is_encrypted:
+                return None
+            page = reader.pages[0]
+            crop_box = page.cropbox
+            width, height = float(crop_box.width), float(crop_box.height)
+            rotation = (page.rotation or 0) % 360
+        except Exception:
+            # Let the raster path raise its usual error
+            return None
+        
+        if rotation % 180:
+            width, height = height, width
+        
+        label_width, label_height = self._page_size()
+        if self._matches_size(width, height, label_width, label_height):
+            turn = 0
+        elif auto_rotate and self._matches_size(width, height, label_height, label_width):
+            turn = 270
+        else:
+            return None
+        
+        if list(crop_box) != list(page.mediabox):
+            page.mediabox = crop_box
+        if turn:
+            page.rotate(turn)
+        
+        writer = PyPDF2.PdfWriter()
+        writer.add_page(page)
+        output = io.BytesIO()
+        writer.write(output)
+        return output.getvalue()
+    
+    def _matches_size(self, width: float, height: float, target_width: float, target_height: float) -> bool:
+        """Whether a page size equals a target within PASSTHROUGH_TOLERANCE_PT."""
+        return (
+            abs(width - target_width) <= self.PASSTHROUGH_TOLERANCE_PT
+            and abs(height - target_height) <= self.PASSTHROUGH_TOLERANCE_PT
+        )
+    
+    def _output_key(
+        self,
+        data: bytes,
+        output_format: str,
+        auto_rotate: bool,
+        optimize_bw: bool
+    ) -> str:
+        """Cache key for a finished label output."""
+        return self._settings_key(
+            data, auto_rotate, optimize_bw, dpi=self.dpi, output_format=output_format.lower()
+        )
+    
+    def _settings_key(
+        self,
+        data: bytes,
+        auto_rotate: bool,
+        optimize_bw: bool,
+        **options: Any
+    ) -> str:
+        """
+        Cache key for an output or preview rendered from data.
+        
+        Covers every formatter setting that changes the rendered bytes, plus
+        the call's options, so formatters with different settings can share
+        one cache.
+        """
+        return self.cache.make_key(
+            data,
+            auto_rotate=auto_rotate,
+            optimize_bw=optimize_bw,
+            threshold=self.threshold,
+            bilevel=self.bilevel,
+            passthrough=self.passthrough,
+            use_numpy=self.use_numpy,
+            raster_backend=self.raster_backend.name,
+            **options
+        )
+    
+    def _render_page(
+        self,
+        pdf: Union[Path, bytes],
+        page_number: int = 1,
+        dpi: Optional[int] = None,
+        digest: Optional[str] = None
+    ) -> Image.Image:
+        """
+        Rasterize a PDF page, reusing a cached raster when available.
+        
+        digest is the document's _document_digest(), computed here when not
+        given; multi-page callers pass it so each page doesn't rehash the PDF.
+        """
+        render_args = (pdf, page_number) if dpi is None else (pdf, page_number, dpi)
+        dpi = dpi or self.dpi
+        if self.cache is None:
+            return self._pdf_to_image(*render_args)
+        
+        digest = digest or self._document_digest(pdf)
+        # Backends differ in output (e.g. 'embedded' ignores vectors and DPI)
+        cache_key = self.cache.make_key(
+            digest.encode(), dpi=dpi, page=page_number, raster_backend=self.raster_backend.name
+        )
+        cached = self.cache.get('raster', cache_key)
+        if cached is not None:
+            return Image.open(io.BytesIO(cached)).convert('RGB')
+        
+        image = self._pdf_to_image(*render_args)
+        
+        # Fast PNG compression: the raster is re-read far more often than written
+        buffer = io.BytesIO()
+        image.save(buffer, format='PNG', compress_level=1)
+        self.cache.put('raster', cache_key, buffer.getvalue())
+        
+        return image
+    
+    def _document_digest(self, pdf: Union[Path, bytes]) -> str:
+        """Return the SHA-256 hex digest of a PDF (a file path or raw bytes)."""
+        data = pdf if isinstance(pdf, bytes) else Path(pdf).read_bytes()
+        return hashlib.sha256(data).hexdigest()
+    
+    def _pdf_page_count(self, pdf: Union[Path, bytes]) -> int:
+        """Return the number of pages in a PDF (a file path or raw bytes)."""
+        try:
+            pdf_file = io.BytesIO(pdf) if isinstance(pdf, bytes) else open(pdf, 'rb')
+            with pdf_file as file:
+                return len(PyPDF2.PdfReader(file).pages)
+        except Exception as e:
+            raise ValueError(f"Failed to process PDF: {str(e)}")
+    
+    def _pdf_to_image(
+        self,
+        pdf: Union[Path, bytes],
+        page_number: int = 1,
+        dpi: Optional[int] = None
+    ) -> Image.Image:
+        """
+        Convert one page of a PDF (a file path or raw bytes) to image.
+        
+        Only the requested page is rasterized, by the formatter's raster
+        backend, at dpi (default: the formatter DPI).
+        """
+        try:
+            return self.raster_backend.render(pdf, page_number, dpi or self.dpi)
         except Exception as e:
             raise ValueError(f"Failed to process PDF: {str(e)}")
     
@@ -154,20 +746,16 @@ class LabelFormatter:
         """
         Automatically detect and correct image orientation.
         
-        Uses aspect ratio and content analysis to determine if rotation is needed.
+        Orientation (including upside-down labels) is detected from the
+        label content on a downsampled copy; see orientation.py. The
+        rotation is then applied once to the full-resolution image, and
+        detection timings are accumulated in orientation_stats.
         """
-        width, height = image.size
-        aspect_ratio = width / height
+        result = orientation.detect_orientation(image)
+        self.orientation_stats.record(result)
         
-        # Standard label is portrait (4x6), aspect ratio ~0.67
-        # If landscape (wider than tall), rotate 90 degrees
-        if aspect_ratio > 1.0:
-            # Image is landscape, rotate to portrait
-            image = image.rotate(90, expand=True)
-        
-        # Check if we need to flip 180 degrees
-        # This would require OCR or barcode detection for accuracy
-        # For now, we'll trust the 90-degree rotation is sufficient
+        if result.angle:
+            image = image.rotate(result.angle, expand=True)
         
         return image
     
@@ -177,15 +765,19 @@ class LabelFormatter:
         
         Uses edge detection to find label boundaries.
         """
-        # Convert to grayscale for processing
-        gray = image.convert('L')
-        
-        # Use ImageOps to find the bounding box of non-white content
-        # Invert so content is white on black
-        inverted = ImageOps.invert(gray)
-        
-        # Get bounding box (removes pure white borders)
-        bbox = inverted.getbbox()
+        if self.use_numpy:
+            # Bounding box straight from the grayscale array, no inverted copy
+            bbox = vectorized.content_bbox(vectorized.gray_array(image))
+        else:
+            # Convert to grayscale for processing
+            gray = image.convert('L')
+            
+            # Use ImageOps to find the bounding box of non-white content
+            # Invert so content is white on black
+            inverted = ImageOps.invert(gray)
+            
+            # Get bounding box (removes pure white borders)
+            bbox = inverted.getbbox()
         
         if bbox:
             # Add small margin (2% on each side)
@@ -203,10 +795,23 @@ class LabelFormatter:
         
         return image
     
-    def _resize_to_standard(self, image: Image.Image) -> Image.Image:
+    def _resize_to_standard(
+        self,
+        image: Image.Image,
+        size: Optional[Tuple[int, int]] = None,
+        resample: Image.Resampling = Image.Resampling.LANCZOS
+    ) -> Image.Image:
         """
         Resize image to standard 4x6 label dimensions while maintaining aspect ratio.
+        
+        Args:
+            image: Cropped label image
+            size: Target (width, height) in pixels (default: 4x6 at the
+                  formatter DPI)
+            resample: Resampling filter (default: LANCZOS)
         """
+        label_width_px, label_height_px = size or (self.label_width_px, self.label_height_px)
+        
         # Calculate aspect ratios
         img_aspect = image.width / image.height
         label_aspect = self.LABEL_WIDTH_INCHES / self.LABEL_HEIGHT_INCHES
@@ -214,76 +819,112 @@ class LabelFormatter:
         # Determine target size based on aspect ratio
         if img_aspect > label_aspect:
             # Image is wider, fit to width
-            new_width = self.label_width_px
+            new_width = label_width_px
             new_height = int(new_width / img_aspect)
         else:
             # Image is taller, fit to height
-            new_height = self.label_height_px
+            new_height = label_height_px
             new_width = int(new_height * img_aspect)
         
-        # Resize with high-quality resampling
-        image = image.resize((new_width, new_height), Image.Resampling.LANCZOS)
+        # Resize (high-quality LANCZOS unless a faster filter is requested)
+        image = image.resize((new_width, new_height), resample)
         
         # Create canvas with standard size and paste resized image centered
-        canvas_img = Image.new('RGB', (self.label_width_px, self.label_height_px), 'white')
-        offset_x = (self.label_width_px - new_width) // 2
-        offset_y = (self.label_height_px - new_height) // 2
+        canvas_img = Image.new('RGB', (label_width_px, label_height_px), 'white')
+        offset_x = (label_width_px - new_width) // 2
+        offset_y = (label_height_px - new_height) // 2
         canvas_img.paste(image, (offset_x, offset_y))
         
         return canvas_img
     
-    def _optimize_bw(self, image: Image.Image) -> Image.Image:
+    def _optimize_bw(self, image: Image.Image, dpi: Optional[int] = None) -> Image.Image:
         """
         Optimize image for black and white thermal printing.
         
-        Increases contrast and converts to pure black and white.
+        Increases contrast and converts to pure black and white, using either
+        a fixed threshold or an adaptive (local-mean) threshold, which
+        preserves barcode quality better on unevenly printed labels. dpi is
+        the image's resolution (default: the formatter DPI).
         """
-        # Convert to grayscale
-        gray = image.convert('L')
-        
-        # Increase contrast
-        gray = ImageOps.autocontrast(gray, cutoff=2)
-        
-        # Convert to pure B&W using adaptive threshold
-        # This preserves barcode quality better than simple threshold
-        bw = gray.point(lambda x: 0 if x < 128 else 255, '1')
+        if self.use_numpy or self.threshold == 'adaptive':
+            gray = vectorized.gray_array(image)
+            if self.threshold == 'adaptive':
+                white = vectorized.adaptive_threshold(gray, block_size=self._adaptive_block_size(dpi))
+            else:
+                white = vectorized.threshold(gray)
+            bw = vectorized.to_bilevel(white)
+        else:
+            # Convert to grayscale
+            gray = image.convert('L')
+            
+            # Increase contrast
+            gray = ImageOps.autocontrast(gray, cutoff=2)
+            
+            # Convert to pure B&W using a fixed threshold
+            bw = gray.point(lambda x: 0 if x < 128 else 255, '1')
         
-        # Convert back to RGB for consistent output
-        return bw.convert('RGB')
+        # Keep 1-bit for thermal output, otherwise back to RGB for consistency
+        return bw if self.bilevel else bw.convert('RGB')
     
-    def _save_as_pdf(self, image: Image.Image, output_path: Path) -> None:
-        """Save image as PDF with exact 4x6 inch dimensions."""
-        # Create PDF with 4x6 inch page size
-        pdf_canvas = canvas.Canvas(
-            str(output_path),
-            pagesize=(self.LABEL_WIDTH_INCHES * inch, self.LABEL_HEIGHT_INCHES * inch)
-        )
-        
-        # Save image to temporary buffer
-        img_buffer = io.BytesIO()
-        image.save(img_buffer, format='PNG')
-        img_buffer.seek(0)
-        
-        # Draw image on PDF
-        pdf_canvas.drawImage(
-            ImageReader(img_buffer),
-            0, 0,
-            width=self.LABEL_WIDTH_INCHES * inch,
-            height=self.LABEL_HEIGHT_INCHES * inch
-        )
+    def _adaptive_block_size(self, dpi: Optional[int] = None) -> int:
+        """Adaptive threshold window: about 1/8 inch at dpi (default: the formatter DPI), always odd."""
+        return ((dpi or self.dpi) // 8) | 1
+    
+    def _save_as_pdf(self, image: Image.Image, output: Union[Path, BinaryIO]) -> None:
+        """
+        Save image as PDF with exact 4x6 inch dimensions.
         
-        pdf_canvas.save()
+        1-bit labels are embedded as CCITT G4, others as Flate-compressed
+        pixels; see pdfstream.py.
+        """
+        with PdfStreamWriter(output, self._page_size()) as writer:
+            writer.add_page(image)
+    
+    def _page_size(self) -> Tuple[float, float]:
+        """Label page size in PDF points."""
+        return (self.LABEL_WIDTH_INCHES * inch, self.LABEL_HEIGHT_INCHES * inch)
     
-    def _save_as_image(self, image: Image.Image, output_path: Path) -> None:
-        """Save image in requested format."""
-        image.save(output_path, dpi=(self.dpi, self.dpi))
+    def _save_as_image(
+        self,
+        image: Image.Image,
+        output: Union[Path, BinaryIO],
+        image_format: Optional[str] = None
+    ) -> None:
+        """Save image in requested format (inferred from the path if not given)."""
+        image.save(output, format=image_format, dpi=(self.dpi, self.dpi))
+    
+    def _save_as_printer_commands(
+        self,
+        image: Image.Image,
+        output: Union[Path, BinaryIO],
+        output_format: str
+    ) -> None:
+        """Save image as raw ZPL or EPL printer commands."""
+        data = self._encode_printer_commands(image, output_format)
+        if isinstance(output, Path):
+            output.write_bytes(data)
+        else:
+            output.write(data)
+    
+    def _encode_printer_commands(self, image: Image.Image, output_format: str) -> bytes:
+        """Encode a label image as ZPL or EPL."""
+        if output_format == 'zpl':
+            return thermal.to_zpl(image)
+        return thermal.to_epl(image)
+    
+    def __getstate__(self) -> Dict[str, Any]:
+        """Pickle without the on_stage callback (for worker processes)."""
+        state = self.__dict__.copy()
+        state['on_stage'] = None
+        return state
     
     def batch_process(
         self,
         input_dir: Union[str, Path],
         output_dir: Union[str, Path],
-        output_format: Literal['pdf', 'png'] = 'pdf',
-        pattern: str = '*'
+        output_format: OutputFormat = 'pdf',
+        pattern: str = '*',
+        workers: int = 1
     ) -> list[Path]:
         """
         Batch process multiple label files.
@@ -293,27 +934,59 @@ class LabelFormatter:
             output_dir: Directory for output files
             output_format: Output format for all files
             pattern: Glob pattern for matching files (default: all files)
+            workers: Number of worker processes (default: 1, in-process)
             
         Returns:
             List of processed file paths
         """
+        report = self.batch_report(input_dir, output_dir, output_format, pattern, workers)
+        return report.processed
+    
+    def batch_report(
+        self,
+        input_dir: Union[str, Path],
+        output_dir: Union[str, Path],
+        output_format: OutputFormat = 'pdf',
+        pattern: str = '*',
+        workers: int = 1,
+        chunksize: Optional[int] = None,
+        auto_rotate: bool = True,
+        optimize_bw: bool = True
+    ) -> BatchReport:
+        """
+        Batch process multiple label files and return a structured report.
+        
+        With ``workers`` > 1 files are spread across a process pool in
+        chunks; results and errors are collected per file in input order.
+        
+        Args:
+            input_dir: Directory containing input files
+            output_dir: Directory for output files
+            output_format: Output format for all files
+            pattern: Glob pattern for matching files (default: all files)
+            workers: Number of worker processes (default: 1, in-process)
+            chunksize: Files dispatched to a worker at a time (default: auto)
+            auto_rotate: Automatically detect and correct rotation
+            optimize_bw: Optimize for black & white printing
+            
+        Returns:
+            BatchReport with per-file results, errors and timing
+        """
         input_dir = Path(input_dir)
         output_dir = Path(output_dir)
         output_dir.mkdir(parents=True, exist_ok=True)
         
-        processed_files = []
+        options = {
+            'output_format': output_format,
+            'auto_rotate': auto_rotate,
+            'optimize_bw': optimize_bw,
+        }
         
         # Find all matching files
-        for input_file in input_dir.glob(pattern):
-            if input_file.is_file():
-                # Generate output filename
-                output_file = output_dir / f"{input_file.stem}.{output_format}"
-                
-                try:
-                    result = self.process_label(input_file, output_file, output_format)
-                    processed_files.append(result)
-                    print(f"✓ Processed: {input_file.name} -> {output_file.name}")
-                except Exception as e:
-                    print(f"✗ Failed to process {input_file.name}: {str(e)}")
-        
-        return processed_files
+        tasks = [
+            (input_file, output_dir / f"{input_file.stem}.{output_format}", options)
+            for input_file in sorted(input_dir.glob(pattern))
+            if input_file.is_file()
+        ]
+        
+        return run_batch(self, tasks, workers=workers, chunksize=chunksize)
@@ -0,0 +1,374 @@
+"""
+Label Job Queue - Asynchronous, worker-pooled label formatting
+
+Runs label formatting in a bounded process pool so a slow PDF render never
+blocks a web request thread. Jobs are submitted with their input bytes,
+return an id immediately, and are polled for the result. A queue-depth
+limit provides backpressure, and every job records how long it waited and
+how long it took to process.
+"""
+
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted while the queue is at capacity."""
+
+
+@dataclass
+class LabelJob:
+    """A submitted label formatting job and its timing."""
+    
+    id: str
+    output_format: str
+    filename: str
+    submitted_at: float
+    future: Future
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[bytes] = None
+    error: Optional[str] = None
+    
+    @property
+    def status(self) -> str:
+        """One of 'queued', 'running', 'done' or 'failed'."""
+        if self.finished_at is not None:
+            return 'failed' if self.error else 'done'
+        return 'running' if self.future.running() or self.future.done() else 'queued'
+    
+    @property
+    def queue_time(self) -> Optional[float]:
+        """Seconds spent waiting for a worker."""
+        if self.started_at is None:
+            return None
+        return max(0.0, self.started_at - self.submitted_at)
+    
+    @property
+    def processing_time(self) -> Optional[float]:
+        """Seconds spent formatting in the worker."""
+        if self.started_at is None or self.finished_at is None:
+            return None
+        return self.finished_at - self.started_at
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the job status to a JSON-serializable dictionary."""
+        return {
+            'id': self.id,
+            'status': self.status,
+            'output_format': self.output_format,
+            'filename': self.filename,
+            'error': self.error,
+            'queue_time': self.queue_time,
+            'processing_time': self.processing_time,
+        }
+
+
+# Formatter used by each pool worker, set once per process by _init_worker
+_worker_formatter = None
+
+# Stage timings of the job currently running in this worker
+_worker_timings: List[Tuple[str, float]] = []
+
+
+def _init_worker(formatter) -> None:
+    """Pool initializer: keep a formatter copy in the worker process."""
+    global _worker_formatter
+    _worker_formatter = formatter
+    _worker_formatter.on_stage = lambda stage, seconds: _worker_timings.append((stage, seconds))
+
+
+def _run_job(data: bytes, options: Dict[str, Any]) -> tuple:
+    """
+    Format one label in a worker.
+    
+    Returns:
+        Tuple of (bytes, started, finished, stage timings); the timings are
+        recorded into the parent's PipelineStats
+    """
+    _worker_timings.clear()
+    started = time.time()
+    result = _worker_formatter.process_bytes(data, **options)
+    return result, started, time.time(), list(_worker_timings)
+
+
+class JobQueue:
+    """
+    Bounded process-pool queue for label formatting jobs.
+    
+    Attributes:
+        workers (int): Number of worker processes
+        max_pending (int): Maximum queued + running jobs before rejecting
+        result_ttl (float): Seconds finished jobs are kept for retrieval
+    """
+    
+    def __init__(
+        self,
+        formatter,
+        workers: int = 2,
+        max_pending: int = 32,
+        result_ttl: float = 600.0
+    ):
+        """
+        Initialize the job queue.
+        
+        Args:
+            formatter: LabelFormatter whose settings every worker uses
+            workers: Number of worker processes (default: 2)
+            max_pending: Queue-depth limit; submissions beyond it raise
+                         QueueFullError (default: 32)
+            result_ttl: Seconds to keep finished jobs (default: 600)
+        """
+        self.workers = workers
+        self.max_pending = max_pending
+        self.result_ttl = result_ttl
+        self.pipeline_stats = formatter.stats
+        
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(formatter,)
+        )
+        self._lock = threading.Lock()
+        self._slot_freed = threading.Condition(self._lock)
+        self._jobs: Dict[str, LabelJob] = {}
+        self._pending = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+    
+    def submit(
+        self,
+        data: bytes,
+        output_format: str = 'pdf',
+        auto_rotate: bool = True,
+        optimize_bw: bool = True,
+        filename: str = 'label'
+    ) -> LabelJob:
+        """
+        Queue a label for formatting.
+        
+        Args:
+            data: Raw input label bytes (PDF or image)
+            output_format: Output format passed to LabelFormatter
+            auto_rotate: Automatically detect and correct rotation
+            optimize_bw: Optimize for black & white printing
+            filename: Original filename, for the download name
+        
+        Returns:
+            The queued LabelJob
+        
+        Raises:
+            QueueFullError: If max_pending jobs are already queued or running
+        """
+        options = {
+            'output_format': output_format,
+            'auto_rotate': auto_rotate,
+            'optimize_bw': optimize_bw,
+        }
+        
+        with self._lock:
+            self._purge_expired()
+            self._check_capacity()
+            self._pending += 1
+        
+        submitted_at = time.time()
+        try:
+            future = self._executor.submit(_run_job, data, options)
+        except Exception:
+            self._release_slots(1)
+            raise
+        
+        job = LabelJob(
+            id=uuid.uuid4().hex,
+            output_format=output_format,
+            filename=filename,
+            submitted_at=submitted_at,
+            future=future,
+        )
+        with self._lock:
+            self._jobs[job.id] = job
+        job.future.add_done_callback(lambda future: self._finish(job))
+        
+        return job
+    
+    def map(
+        self,
+        items: Iterable[Tuple[str, bytes]],
+        output_format: str = 'pdf',
+        auto_rotate: bool = True,
+        optimize_bw: bool = True,
+        window: Optional[int] = None
+    ) -> Iterator[Tuple[str, Optional[bytes], Optional[str]]]:
+        """
+        Format a batch of labels on the worker pool, yielding results in order.
+        
+        Inputs are pulled from items lazily and at most window labels are in
+        flight at once, so memory use does not grow with the batch size.
+        Every label in flight counts against max_pending, like a submitted
+        job. When async jobs hold the free slots, the batch waits for its own
+        labels instead of submitting more, so it cannot starve the queue.
+        
+        Args:
+            items: Iterable of (name, input bytes) pairs
+            output_format: Output format passed to LabelFormatter
+            auto_rotate: Automatically detect and correct rotation
+            optimize_bw: Optimize for black & white printing
+            window: Labels in flight at once (default: 2 per worker)
+        
+        Returns:
+            Iterator of (name, output bytes, error) per label; exactly one of
+            output bytes and error is None
+        
+        Raises:
+            QueueFullError: If max_pending jobs are already queued or running
+        """
+        with self._lock:
+            self._purge_expired()
+            self._check_capacity()
+        
+        options = {
+            'output_format': output_format,
+            'auto_rotate': auto_rotate,
+            'optimize_bw': optimize_bw,
+        }
+        return self._run_batch(items, options, window or self.workers * 2)
+    
+    def get(self, job_id: str) -> Optional[LabelJob]:
+        """Look up a job by id, or None if unknown or expired."""
+        with self._lock:
+            self._purge_expired()
+            return self._jobs.get(job_id)
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get queue statistics.
+        
+        Returns:
+            Dictionary with worker count, queue depth and job counters
+        """
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'max_pending': self.max_pending,
+                'pending': self._pending,
+                'completed': self._completed,
+                'failed': self._failed,
+                'rejected': self._rejected,
+            }
+    
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker pool."""
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+    
+    def _run_batch(
+        self,
+        items: Iterable[Tuple[str, bytes]],
+        options: Dict[str, Any],
+        window: int
+    ) -> Iterator[Tuple[str, Optional[bytes], Optional[str]]]:
+        """Run a batch for map(), holding one max_pending slot per label in flight."""
+        in_flight = deque()
+        
+        try:
+            for name, data in items:
+                # With the window full or no slot free, wait for the oldest label
+                while in_flight and (len(in_flight) >= window or not self._take_slot(wait=False)):
+                    result = self._collect(*in_flight.popleft())
+                    self._release_slots(1)
+                    yield result
+                if not in_flight:
+                    self._take_slot(wait=True)
+                try:
+                    future = self._executor.submit(_run_job, data, options)
+                except Exception:
+                    self._release_slots(1)
+                    raise
+                in_flight.append((name, future))
+            while in_flight:
+                result = self._collect(*in_flight.popleft())
+                self._release_slots(1)
+                yield result
+        finally:
+            # Abandoned batches (e.g. client disconnects) free their workers
+            for _, future in in_flight:
+                future.cancel()
+            self._release_slots(len(in_flight))
+    
+    def _check_capacity(self) -> None:
+        """Raise QueueFullError if no slot is free (caller holds the lock)."""
+        if self._pending >= self.max_pending:
+            self._rejected += 1
+            raise QueueFullError(f"Label queue is full ({self.max_pending} jobs pending)")
+    
+    def _take_slot(self, wait: bool) -> bool:
+        """
+        Count a batch label against max_pending.
+        
+        Args:
+            wait: Block until a slot is free instead of giving up
+        
+        Returns:
+            True if a slot was taken
+        """
+        with self._slot_freed:
+            while self._pending >= self.max_pending:
+                if not wait:
+                    return False
+                self._slot_freed.wait()
+            self._pending += 1
+            return True
+    
+    def _release_slots(self, count: int) -> None:
+        """Free max_pending slots and wake batches waiting for one."""
+        if count:
+            with self._slot_freed:
+                self._pending -= count
+                self._slot_freed.notify_all()
+    
+    def _collect(self, name: str, future: Future) -> Tuple[str, Optional[bytes], Optional[str]]:
+        """Wait for one batch label and unpack its result or error."""
+        try:
+            result, _, _, timings = future.result()
+        except Exception as e:
+            return name, None, str(e) or e.__class__.__name__
+        self._record_stages(timings)
+        return name, result, None
+    
+    def _record_stages(self, timings: List[Tuple[str, float]]) -> None:
+        """Add a worker's stage timings to the formatter's PipelineStats."""
+        if self.pipeline_stats is not None:
+            for stage, seconds in timings:
+                self.pipeline_stats.record(stage, seconds)
+    
+    def _finish(self, job: LabelJob) -> None:
+        """Record a job's result and timing when its future completes."""
+        try:
+            job.result, job.started_at, job.finished_at, timings = job.future.result()
+            self._record_stages(timings)
+        except Exception as e:
+            job.error = str(e) or e.__class__.__name__
+            job.finished_at = time.time()
+        
+        with self._slot_freed:
+            self._pending -= 1
+            self._slot_freed.notify_all()
+            if job.error:
+                self._failed += 1
+            else:
+                self._completed += 1
+    
+    def _purge_expired(self) -> None:
+        """Drop finished jobs older than result_ttl (caller holds the lock)."""
+        cutoff = time.time() - self.result_ttl
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished_at is not None and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
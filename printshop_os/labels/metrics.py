@@ -0,0 +1,168 @@
+"""
+Pipeline Metrics - Per-stage timing for the label pipeline
+
+PipelineStats collects a latency histogram per pipeline stage (PDF
+pass-through, load, rotate, crop, resize, threshold, save and the
+per-label total), so it is visible which step dominates label latency.
+The helpers at the bottom render stats in the Prometheus text exposition
+format for the API's /metrics endpoint.
+"""
+
+import threading
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+# Pipeline stages recorded by LabelFormatter, in pipeline order
+STAGES = ('passthrough', 'load', 'rotate', 'crop', 'resize', 'threshold', 'save', 'total')
+
+# Histogram bucket upper bounds in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class PipelineStats:
+    """
+    Thread-safe per-stage latency histograms.
+    
+    Pass an instance to LabelFormatter(stats=...) to record every stage of
+    every label processed.
+    
+    Attributes:
+        buckets (tuple): Histogram bucket upper bounds in seconds
+    """
+    
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS):
+        """
+        Initialize empty stats.
+        
+        Args:
+            buckets: Histogram bucket upper bounds in seconds
+        """
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._stages: Dict[str, Dict[str, Any]] = {}
+    
+    def record(self, stage: str, seconds: float) -> None:
+        """
+        Record one timing for a stage.
+        
+        Args:
+            stage: Stage name (see STAGES)
+            seconds: Elapsed time in seconds
+        """
+        with self._lock:
+            entry = self._stages.get(stage)
+            if entry is None:
+                entry = self._stages[stage] = {
+                    'count': 0,
+                    'sum': 0.0,
+                    'max': 0.0,
+                    'buckets': [0] * len(self.buckets),
+                }
+            entry['count'] += 1
+            entry['sum'] += seconds
+            entry['max'] = max(entry['max'], seconds)
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    entry['buckets'][i] += 1
+    
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get a copy of the per-stage counters.
+        
+        Returns:
+            Dictionary of stage name to count, sum, max and cumulative
+            bucket counts, with stages in pipeline order
+        """
+        with self._lock:
+            order = sorted(
+                self._stages,
+                key=lambda s: (STAGES.index(s) if s in STAGES else len(STAGES), s)
+            )
+            return {
+                stage: {**self._stages[stage], 'buckets': list(self._stages[stage]['buckets'])}
+                for stage in order
+            }
+    
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Get mean and max milliseconds per stage.
+        
+        Returns:
+            Dictionary of stage name to count, mean_ms and max_ms
+        """
+        return {
+            stage: {
+                'count': entry['count'],
+                'mean_ms': round(entry['sum'] / entry['count'] * 1000, 3),
+                'max_ms': round(entry['max'] * 1000, 3),
+            }
+            for stage, entry in self.snapshot().items()
+        }
+    
+    def reset(self) -> None:
+        """Discard all recorded timings."""
+        with self._lock:
+            self._stages.clear()
+    
+    def __getstate__(self) -> Dict[str, Any]:
+        """Pickle without the lock or recorded timings (for worker processes)."""
+        return {'buckets': self.buckets}
+    
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        """Restore a pickled stats object empty, with a fresh lock."""
+        self.__init__(state['buckets'])
+
+
+def _format_labels(labels: Optional[Dict[str, Any]]) -> str:
+    """Render a Prometheus label set, e.g. {stage="load"}."""
+    if not labels:
+        return ''
+    pairs = ','.join(f'{key}="{value}"' for key, value in labels.items())
+    return '{' + pairs + '}'
+
+
+def prometheus_metric(
+    name: str,
+    kind: str,
+    help_text: str,
+    samples: Iterable[Tuple[Optional[Dict[str, Any]], float]]
+) -> str:
+    """
+    Render one metric family in the Prometheus text format.
+    
+    Args:
+        name: Metric name
+        kind: Metric type ('counter' or 'gauge')
+        help_text: HELP line text
+        samples: (labels, value) pairs
+    
+    Returns:
+        Exposition text, ending with a newline
+    """
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    for labels, value in samples:
+        lines.append(f"{name}{_format_labels(labels)} {value}")
+    return '\n'.join(lines) + '\n'
+
+
+def prometheus_histogram(name: str, help_text: str, stats: PipelineStats) -> str:
+    """
+    Render per-stage latency histograms in the Prometheus text format.
+    
+    Args:
+        name: Metric name (e.g. 'label_stage_seconds')
+        help_text: HELP line text
+        stats: PipelineStats to render, one series per stage
+    
+    Returns:
+        Exposition text, ending with a newline
+    """
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+    for stage, entry in stats.snapshot().items():
+        for bound, count in zip(stats.buckets, entry['buckets']):
+            labels = _format_labels({'stage': stage, 'le': bound})
+            lines.append(f"{name}_bucket{labels} {count}")
+        labels = _format_labels({'stage': stage, 'le': '+Inf'})
+        lines.append(f"{name}_bucket{labels} {entry['count']}")
+        lines.append(f"{name}_sum{_format_labels({'stage': stage})} {entry['sum']:.6f}")
+        lines.append(f"{name}_count{_format_labels({'stage': stage})} {entry['count']}")
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,360 @@
+"""
+Orientation Detection - Content-based label orientation on a downsampled copy
+
+Decides how a label must be rotated to read upright from what is printed on
+it, not just from the page's aspect ratio:
+
+- Barcode stripes: the bars of the linear barcodes on shipping labels run
+  vertically on an upright label, so stripe-like regions have strong
+  horizontal edges and almost no vertical ones.
+- Text-line projection profiles: upright text leaves blank rows between
+  lines, so the row profile has gaps the column profile does not.
+- Layout: the tracking barcode sits in the lower half of carrier labels and
+  text is left-aligned, which separates upright from upside-down.
+
+All measurements run on a copy reduced to at most DETECT_MAX_SIDE pixels,
+so detection costs a few milliseconds; the caller applies the resulting
+rotation once to the full-resolution image.
+"""
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Tuple
+from PIL import Image, ImageChops
+
+# Longest side of the downsampled copy used for detection
+DETECT_MAX_SIDE = 320
+
+# Gray level below which a pixel counts as ink
+INK_LEVEL = 160
+
+# Block size (in downsampled pixels) for stripe detection
+STRIPE_BLOCK = 16
+
+# Minimum edge density and edge anisotropy for a block to count as stripes
+STRIPE_MIN_DENSITY = 0.3
+STRIPE_MIN_ANISOTROPY = 0.6
+
+# Rows/columns with less ink than this fraction count as blank
+BLANK_LINE_INK = 0.02
+
+# Rows/columns with more ink than this fraction are borders or rules
+RULE_INK = 0.5
+
+# Minimum |score| for a cue to override the aspect-ratio fallback
+DECISION_THRESHOLD = 0.15
+
+# (block row, anisotropy, edge density) of a barcode-like block
+StripeBlock = Tuple[int, float, float]
+
+_INK_LUT = [255 if level < INK_LEVEL else 0 for level in range(256)]
+
+
+@dataclass
+class OrientationResult:
+    """
+    Detected label orientation.
+    
+    Attributes:
+        angle (int): Counter-clockwise rotation to apply (0, 90, 180 or 270)
+        sideways_score (float): Evidence the content runs sideways
+                                (> 0 sideways, < 0 upright or upside-down)
+        flip_score (float): Evidence the content is upside-down
+                            (> 0 upside-down, < 0 upright)
+        cues (dict): Individual cue scores, for debugging
+        elapsed (float): Detection time in seconds
+    """
+    
+    angle: int
+    sideways_score: float
+    flip_score: float
+    cues: Dict[str, float] = field(default_factory=dict)
+    elapsed: float = 0.0
+
+
+class OrientationStats:
+    """
+    Thread-safe running timing and outcome counters for orientation detection.
+    
+    Attributes:
+        count (int): Detections recorded
+        total_seconds (float): Total detection time
+        max_seconds (float): Slowest detection
+        rotations (dict): Detections per angle (0, 90, 180, 270)
+    """
+    
+    def __init__(self):
+        """Initialize empty stats."""
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.rotations: Dict[int, int] = {0: 0, 90: 0, 180: 0, 270: 0}
+    
+    def record(self, result: OrientationResult) -> None:
+        """Add one detection to the counters."""
+        with self._lock:
+            self.count += 1
+            self.total_seconds += result.elapsed
+            self.max_seconds = max(self.max_seconds, result.elapsed)
+            self.rotations[result.angle] += 1
+    
+    @property
+    def mean_ms(self) -> float:
+        """Mean detection time in milliseconds."""
+        with self._lock:
+            return self.total_seconds / self.count * 1000 if self.count else 0.0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert stats to a JSON-serializable dictionary."""
+        mean_ms = self.mean_ms
+        with self._lock:
+            return {
+                'count': self.count,
+                'mean_ms': round(mean_ms, 3),
+                'max_ms': round(self.max_seconds * 1000, 3),
+                'rotations': {str(angle): n for angle, n in self.rotations.items()},
+            }
+    
+    def __getstate__(self) -> Dict[str, Any]:
+        """Pickle without the lock or recorded counters (for worker processes)."""
+        return {}
+    
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        """Restore a pickled stats object empty, with a fresh lock."""
+        self.__init__()
+
+
+def ink_map(image: Image.Image, max_side: int = DETECT_MAX_SIDE) -> Image.Image:
+    """
+    Downsample a label to its content and binarize it (ink = 255, paper = 0).
+    
+    Uses Image.reduce (box averaging by an integer factor), which is much
+    cheaper than a resampling resize and keeps wide barcode bars distinct.
+    When the content covers only part of the page (a 4x6 label on a letter
+    sheet), the content region is reduced again at a finer factor so the
+    label itself gets the full detection resolution.
+    """
+    if image.mode not in ('L', 'RGB'):
+        image = image.convert('L')
+    
+    def reduced(region):
+        factor = max(1, -(-max(region.size) // max_side))
+        small = region.reduce(factor) if factor > 1 else region
+        return small.convert('L').point(_INK_LUT), factor
+    
+    ink, factor = reduced(image)
+    bbox = ink.getbbox()
+    if bbox and (bbox[2] - bbox[0]) * (bbox[3] - bbox[1]) < ink.size[0] * ink.size[1] // 2:
+        full_box = tuple(min(v * factor, limit) for v, limit in zip(bbox, image.size * 2))
+        ink, _ = reduced(image.crop(full_box))
+    return ink
+
+
+def _profile(ink: Image.Image, axis: int) -> List[float]:
+    """Ink fraction per row (axis=0) or per column (axis=1)."""
+    width, height = ink.size
+    size = (1, height) if axis == 0 else (width, 1)
+    return [v / 255 for v in ink.resize(size, Image.Resampling.BOX).tobytes()]
+
+
+def _erase_rules(ink: Image.Image) -> Image.Image:
+    """
+    Remove borders and rules running across most of the label.
+    
+    They carry no orientation information, but would add identical peaks
+    to the projection profiles and pin every line's start and end.
+    """
+    width, height = ink.size
+    rows, cols = _profile(ink, 0), _profile(ink, 1)
+    if not any(v > RULE_INK for v in rows + cols):
+        return ink
+    
+    ink = ink.copy()
+    for y, value in enumerate(rows):
+        if value > RULE_INK:
+            ink.paste(0, (0, y, width, y + 1))
+    for x, value in enumerate(cols):
+        if value > RULE_INK:
+            ink.paste(0, (x, 0, x + 1, height))
+    return ink
+
+
+def _peakiness(profile: List[float]) -> float:
+    """
+    Coefficient of variation of a projection profile over its inked span.
+    
+    Profiles across text lines alternate between inked lines and blank
+    gaps, so they vary far more than profiles along the lines.
+    """
+    inked = [i for i, v in enumerate(profile) if v >= BLANK_LINE_INK]
+    if len(inked) < 2:
+        return 0.0
+    span = profile[inked[0]:inked[-1] + 1]
+    mean = sum(span) / len(span)
+    variance = sum((v - mean) ** 2 for v in span) / len(span)
+    return variance ** 0.5 / mean
+
+
+def _text_bands(profile: List[float]) -> List[Tuple[int, int]]:
+    """Runs of inked lines in a row profile, as (first, last + 1) pairs."""
+    bands, start = [], None
+    for i, value in enumerate(profile + [0.0]):
+        if value >= BLANK_LINE_INK and start is None:
+            start = i
+        elif value < BLANK_LINE_INK and start is not None:
+            bands.append((start, i))
+            start = None
+    return bands
+
+
+def _stripe_blocks(ink: Image.Image) -> List[StripeBlock]:
+    """
+    Find barcode-like blocks from horizontal vs vertical edge density.
+    
+    A block counts when its edges are dense and nearly all in one
+    direction, and its neighbour along the bars does too: barcode bars are
+    long, while the strokes of downsampled text are not.
+    
+    Returns:
+        List of (block row, anisotropy, density); anisotropy > 0 means
+        vertical bars (horizontal edges dominate), < 0 horizontal bars
+    """
+    width, height = ink.size
+    cols, rows = (width - 1) // STRIPE_BLOCK, (height - 1) // STRIPE_BLOCK
+    if cols < 1 or rows < 1:
+        return []
+    
+    box = (0, 0, cols * STRIPE_BLOCK, rows * STRIPE_BLOCK)
+    shifted_x = ink.crop((1, 0, box[2] + 1, box[3]))
+    shifted_y = ink.crop((0, 1, box[2], box[3] + 1))
+    base = ink.crop(box)
+    
+    # Block means of the edge maps: fraction of ink/paper transitions
+    grid = (cols, rows)
+    dx = ImageChops.difference(shifted_x, base).resize(grid, Image.Resampling.BOX).tobytes()
+    dy = ImageChops.difference(shifted_y, base).resize(grid, Image.Resampling.BOX).tobytes()
+    
+    # Direction of each stripe-like block: +1 vertical bars, -1 horizontal
+    direction = [0] * (cols * rows)
+    for index, (ex, ey) in enumerate(zip(dx, dy)):
+        density = (ex + ey) / 255
+        if density >= STRIPE_MIN_DENSITY and abs(ex - ey) / (ex + ey) >= STRIPE_MIN_ANISOTROPY:
+            direction[index] = 1 if ex > ey else -1
+    
+    blocks = []
+    for index, sign in enumerate(direction):
+        if not sign:
+            continue
+        row, col = divmod(index, cols)
+        if sign > 0:
+            neighbours = [index - cols if row > 0 else None, index + cols if row < rows - 1 else None]
+        else:
+            neighbours = [index - 1 if col > 0 else None, index + 1 if col < cols - 1 else None]
+        if any(n is not None and direction[n] == sign for n in neighbours):
+            ex, ey = dx[index], dy[index]
+            blocks.append((row, (ex - ey) / (ex + ey), (ex + ey) / 255))
+    return blocks
+
+
+def _alignment_score(ink: Image.Image) -> float:
+    """
+    Left-alignment evidence from where text lines start and end.
+    
+    Left-aligned text makes line starts cluster while line ends are ragged;
+    on an upside-down label it is the other way round.
+    
+    Returns:
+        Score in [-1, 1]; > 0 when lines share a left edge (upright)
+    """
+    width = ink.size[0]
+    starts, ends = [], []
+    for top, bottom in _text_bands(_profile(ink, 0)):
+        bbox = ink.crop((0, top, width, bottom)).getbbox()
+        if bbox:
+            starts.append(bbox[0])
+            ends.append(bbox[2])
+    if len(starts) < 3:
+        return 0.0
+    
+    tolerance = max(1, width // 100)
+    
+    def clustered(edges):
+        return max(sum(abs(e - m) <= tolerance for e in edges) for m in edges) / len(edges)
+    
+    return clustered(starts) - clustered(ends)
+
+
+def _sideways_score(ink: Image.Image, blocks: List[StripeBlock], cues: Dict[str, float]) -> float:
+    """Evidence that text lines and barcode bars run vertically."""
+    total = sum(density for _, _, density in blocks)
+    # Horizontal bars (negative anisotropy) mean the label is sideways
+    stripes = -sum(a * d for _, a, d in blocks) / total if total else 0.0
+    rows, cols = _peakiness(_profile(ink, 0)), _peakiness(_profile(ink, 1))
+    lines = (cols - rows) / (cols + rows) if rows + cols else 0.0
+    
+    cues['stripes'] = stripes
+    cues['lines'] = lines
+    return stripes + lines
+
+
+def _flip_score(ink: Image.Image, blocks: List[StripeBlock], cues: Dict[str, float]) -> float:
+    """Evidence that an upright-or-upside-down label is upside-down."""
+    rows = (ink.size[1] - 1) // STRIPE_BLOCK
+    bars = [(row, d) for row, a, d in blocks if a > 0]
+    mass = sum(d for _, d in bars)
+    
+    barcode = 0.0
+    if rows and mass:
+        # Barcode centroid in the upper half means upside-down
+        centroid = sum((row + 0.5) * d for row, d in bars) / mass / rows
+        barcode = max(-1.0, min(1.0, (0.5 - centroid) * 4))
+    alignment = -_alignment_score(ink)
+    
+    cues['barcode_position'] = barcode
+    cues['alignment'] = alignment
+    return barcode + alignment
+
+
+def detect_orientation(image: Image.Image, max_side: int = DETECT_MAX_SIDE) -> OrientationResult:
+    """
+    Detect how a label must be rotated to read upright.
+    
+    Falls back to the aspect ratio (portrait is upright) when the content
+    gives no clear answer for the 90 degree decision, and leaves the label
+    unflipped when there is no clear evidence it is upside-down.
+    
+    Args:
+        image: Full-resolution label image
+        max_side: Longest side of the downsampled detection copy
+    
+    Returns:
+        OrientationResult with the counter-clockwise angle to apply
+    """
+    start = time.perf_counter()
+    ink = _erase_rules(ink_map(image, max_side))
+    cues: Dict[str, float] = {}
+    
+    blocks = _stripe_blocks(ink)
+    sideways = _sideways_score(ink, blocks, cues)
+    if abs(sideways) >= DECISION_THRESHOLD:
+        angle = 90 if sideways > 0 else 0
+    else:
+        angle = 90 if image.width > image.height else 0
+    
+    if angle:
+        ink = ink.rotate(angle, expand=True)
+        blocks = _stripe_blocks(ink)
+    
+    flip = _flip_score(ink, blocks, cues)
+    if flip >= DECISION_THRESHOLD:
+        angle = (angle + 180) % 360
+    
+    return OrientationResult(
+        angle=angle,
+        sideways_score=sideways,
+        flip_score=flip,
+        cues=cues,
+        elapsed=time.perf_counter() - start
+    )
@@ -0,0 +1,178 @@
+"""
+Streaming PDF Writer - Memory-bounded multi-page label PDFs
+
+Writes one image page at a time straight to the output. Each page's
+image, content stream and page object are written as soon as the page is
+added, and only the byte offsets needed for the cross-reference table are
+kept. Peak memory is therefore one encoded page, however many labels the
+document holds. reportlab, by contrast, keeps every page until save().
+
+1-bit labels are embedded as CCITT G4 (when Pillow has libtiff); other
+images are Flate-compressed raw pixels, so nothing is round-tripped
+through an intermediate PNG.
+"""
+
+import io
+import math
+import zlib
+from pathlib import Path
+from typing import BinaryIO, List, Optional, Tuple, Union
+from PIL import Image, features
+
+# Object numbers reserved for the catalog and the page tree, which are
+# written last once every page is known
+CATALOG_REF = 1
+PAGES_REF = 2
+
+# zlib level for non-bilevel pages: labels are mostly white, so fast
+# compression loses little size
+FLATE_LEVEL = 1
+
+
+def encode_image(image: Image.Image) -> Tuple[str, bytes]:
+    """
+    Encode an image as a PDF image XObject.
+    
+    Args:
+        image: Label image in any mode
+    
+    Returns:
+        Tuple of (dictionary entries, stream data) for the XObject
+    """
+    width, height = image.size
+    
+    if image.mode == '1' and features.check('libtiff'):
+        # Single-strip G4 TIFF; the strip follows the 8-byte header
+        buffer = io.BytesIO()
+        image.save(buffer, format='TIFF', compression='group4', strip_size=math.ceil(width / 8) * height)
+        entries = (
+            f"/ColorSpace /DeviceGray /BitsPerComponent 1 /Filter [/CCITTFaxDecode] "
+            f"/DecodeParms [<< /K -1 /BlackIs1 true /Columns {width} /Rows {height} >>]"
+        )
+        return entries, buffer.getvalue()[8:]
+    
+    if image.mode not in ('L', 'RGB'):
+        image = image.convert('L' if image.mode in ('1', 'LA') else 'RGB')
+    color_space = '/DeviceGray' if image.mode == 'L' else '/DeviceRGB'
+    entries = f"/ColorSpace {color_space} /BitsPerComponent 8 /Filter /FlateDecode"
+    return entries, zlib.compress(image.tobytes(), FLATE_LEVEL)
+
+
+class PdfStreamWriter:
+    """
+    Incremental writer for image-per-page PDFs.
+    
+    Pages are written as they are added; close() (or leaving the with
+    block) writes the page tree, cross-reference table and trailer.
+    
+    Attributes:
+        page_size (tuple): Page width and height in PDF points
+        page_count (int): Pages written so far
+    """
+    
+    def __init__(self, output: Union[str, Path, BinaryIO], page_size: Tuple[float, float]):
+        """
+        Start a PDF document.
+        
+        Args:
+            output: Path to write, or a writable binary stream (need not be
+                    seekable; it is left open on close)
+            page_size: Page width and height in PDF points
+        """
+        self.page_size = page_size
+        self.page_count = 0
+        
+        self._owns_output = not hasattr(output, 'write')
+        self._output: Optional[BinaryIO] = open(output, 'wb') if self._owns_output else output
+        self._position = 0
+        # Byte offset of every object, indexed by object number - 1
+        self._offsets: List[int] = [0, 0]
+        self._page_refs: List[int] = []
+        
+        self._write(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+    
+    def add_page(self, image: Image.Image) -> None:
+        """
+        Write one label image as a full page.
+        
+        The image is encoded and written immediately; no reference to it
+        is kept, so the caller can release it right away.
+        
+        Raises:
+            ValueError: If the writer is already closed
+        """
+        if self._output is None:
+            raise ValueError("PDF writer is closed")
+        
+        width, height = self.page_size
+        entries, data = encode_image(image)
+        image_ref = self._write_object(
+            f"<< /Type /XObject /Subtype /Image /Width {image.width} /Height {image.height} "
+            f"{entries} /Length {len(data)} >>",
+            data
+        )
+        del data
+        
+        content = f"q {width:.4f} 0 0 {height:.4f} 0 0 cm /Im0 Do Q".encode('ascii')
+        content_ref = self._write_object(f"<< /Length {len(content)} >>", content)
+        
+        page_ref = self._write_object(
+            f"<< /Type /Page /Parent {PAGES_REF} 0 R /MediaBox [0 0 {width:.4f} {height:.4f}] "
+            f"/Resources << /XObject << /Im0 {image_ref} 0 R >> /ProcSet [/PDF /ImageB /ImageC] >> "
+            f"/Contents {content_ref} 0 R >>"
+        )
+        self._page_refs.append(page_ref)
+        self.page_count += 1
+        self._output.flush()
+    
+    def close(self) -> None:
+        """Write the page tree, cross-reference table and trailer."""
+        if self._output is None:
+            return
+        
+        kids = ' '.join(f"{ref} 0 R" for ref in self._page_refs)
+        self._write_object(f"<< /Type /Pages /Kids [{kids}] /Count {self.page_count} >>", ref=PAGES_REF)
+        self._write_object(f"<< /Type /Catalog /Pages {PAGES_REF} 0 R >>", ref=CATALOG_REF)
+        
+        xref_position = self._position
+        lines = [f"xref\n0 {len(self._offsets) + 1}\n", "0000000000 65535 f \n"]
+        lines.extend(f"{offset:010d} 00000 n \n" for offset in self._offsets)
+        lines.append(
+            f"trailer\n<< /Size {len(self._offsets) + 1} /Root {CATALOG_REF} 0 R >>\n"
+            f"startxref\n{xref_position}\n%%EOF\n"
+        )
+        self._write(''.join(lines).encode('ascii'))
+        
+        self._output.flush()
+        if self._owns_output:
+            self._output.close()
+        self._output = None
+    
+    def __enter__(self) -> 'PdfStreamWriter':
+        return self
+    
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        elif self._owns_output and self._output is not None:
+            self._output.close()
+            self._output = None
+    
+    def _write_object(self, dictionary: str, stream: Optional[bytes] = None, ref: Optional[int] = None) -> int:
+        """Write an indirect object (a new one unless ref is reserved); return its number."""
+        if ref is None:
+            self._offsets.append(0)
+            ref = len(self._offsets)
+        self._offsets[ref - 1] = self._position
+        
+        self._write(f"{ref} 0 obj\n{dictionary}\n".encode('ascii'))
+        if stream is not None:
+            self._write(b'stream\n')
+            self._write(stream)
+            self._write(b'\nendstream\n')
+        self._write(b'endobj\n')
+        return ref
+    
+    def _write(self, data: bytes) -> None:
+        self._output.write(data)
+        self._position += len(data)
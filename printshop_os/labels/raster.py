@@ -0,0 +1,366 @@
+"""
+PDF Raster Backends - Pluggable PDF page renderers
+
+LabelFormatter rasterizes PDF pages through a RasterBackend. In-process
+renderers (pypdfium2, PyMuPDF, python-poppler) keep the PDF library loaded
+in the Python process, so there is no per-label process spawn. pdf2image
+runs a poppler subprocess per page. The embedded backend needs no
+renderer at all; it only works for scanned PDFs that wrap a single image.
+
+select_backend() picks the fastest installed backend once per process by
+timing a small probe render with each. Set LABEL_RASTER_BACKEND to force
+one by name.
+
+PDFium and MuPDF are not thread-safe, even on separate documents, so the
+pdfium and mupdf backends render one page at a time per process behind a
+module-level lock. Threads sharing a formatter still overlap everything
+around the render (decoding, rotation, thresholding, encoding).
+"""
+
+import io
+import os
+import shutil
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, List, Optional, Type, Union
+from PIL import Image, ImageOps
+import PyPDF2
+
+PdfSource = Union[Path, bytes]
+
+# DPI and number of renders used when timing backends
+PROBE_DPI = 150
+PROBE_ROUNDS = 3
+
+
+def _probe_pdf() -> bytes:
+    """Build a small vector PDF (a 4x6 page with text-like bars) to time backends."""
+    content = b' '.join(
+        f"36 {y} {72 + (y * 7) % 144} 8 re f".encode('ascii') for y in range(36, 396, 14)
+    )
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 288 432] /Contents 4 0 R >>",
+        b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content),
+    ]
+    output = io.BytesIO()
+    output.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(output.tell())
+        output.write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+    xref = output.tell()
+    output.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    output.write(b"".join(b"%010d 00000 n \n" % offset for offset in offsets))
+    output.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return output.getvalue()
+
+
+PROBE_PDF = _probe_pdf()
+
+# PDFium and MuPDF must not be entered by two threads at once
+_PDFIUM_LOCK = threading.Lock()
+_MUPDF_LOCK = threading.Lock()
+
+
+class RasterBackend(ABC):
+    """
+    Base class for PDF page renderers.
+    
+    Subclasses set name and implement available() and render(); a backend
+    without render() can't be instantiated.
+    """
+    
+    name = 'base'
+    
+    # Whether the backend renders vector content (the embedded fallback does not)
+    renders_vectors = True
+    
+    @classmethod
+    def available(cls) -> bool:
+        """Whether the backend's library (or binary) is installed."""
+        return False
+    
+    @abstractmethod
+    def render(self, pdf: PdfSource, page_number: int, dpi: int) -> Image.Image:
+        """
+        Rasterize one page.
+        
+        Args:
+            pdf: Path to a PDF file, or raw PDF bytes
+            page_number: 1-based page number
+            dpi: Render resolution
+        
+        Returns:
+            RGB image of the page
+        """
+        raise NotImplementedError
+    
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} {self.name}>"
+
+
+class PdfiumBackend(RasterBackend):
+    """
+    In-process rendering with pypdfium2 (PDFium, as used by Chrome).
+    
+    PDFium is not thread-safe: renders are serialized by _PDFIUM_LOCK.
+    """
+    
+    name = 'pdfium'
+    
+    @classmethod
+    def available(cls) -> bool:
+        try:
+            import pypdfium2  # noqa: F401
+        except ImportError:
+            return False
+        return True
+    
+    def render(self, pdf: PdfSource, page_number: int, dpi: int) -> Image.Image:
+        import pypdfium2
+        
+        with _PDFIUM_LOCK:
+            document = pypdfium2.PdfDocument(pdf if isinstance(pdf, bytes) else str(pdf))
+            try:
+                page = document[page_number - 1]
+                try:
+                    bitmap = page.render(scale=dpi / 72)
+                    return bitmap.to_pil().convert('RGB')
+                finally:
+                    page.close()
+            finally:
+                document.close()
+
+
+class MuPdfBackend(RasterBackend):
+    """
+    In-process rendering with PyMuPDF (MuPDF).
+    
+    PyMuPDF is not thread-safe: renders are serialized by _MUPDF_LOCK.
+    """
+    
+    name = 'mupdf'
+    
+    @classmethod
+    def available(cls) -> bool:
+        return cls._module() is not None
+    
+    @staticmethod
+    def _module():
+        """The PyMuPDF module (imported as fitz before 1.24), or None."""
+        try:
+            import pymupdf
+        except ImportError:
+            try:
+                import fitz as pymupdf
+            except ImportError:
+                return None
+        return pymupdf
+    
+    def render(self, pdf: PdfSource, page_number: int, dpi: int) -> Image.Image:
+        pymupdf = self._module()
+        with _MUPDF_LOCK:
+            if isinstance(pdf, bytes):
+                document = pymupdf.open(stream=pdf, filetype='pdf')
+            else:
+                document = pymupdf.open(str(pdf))
+            try:
+                pixmap = document[page_number - 1].get_pixmap(dpi=dpi, alpha=False)
+                return Image.frombytes('RGB', (pixmap.width, pixmap.height), pixmap.samples)
+            finally:
+                document.close()
+
+
+class PopplerBackend(RasterBackend):
+    """
+    In-process rendering with the python-poppler binding.
+    
+    libpoppler stays loaded in the process, so this avoids the per-page
+    pdftoppm spawn of the pdf2image backend while rendering identically.
+    """
+    
+    name = 'poppler'
+    
+    @classmethod
+    def available(cls) -> bool:
+        try:
+            import poppler  # noqa: F401
+        except ImportError:
+            return False
+        return True
+    
+    def render(self, pdf: PdfSource, page_number: int, dpi: int) -> Image.Image:
+        import poppler
+        
+        if isinstance(pdf, bytes):
+            document = poppler.load_from_data(pdf)
+        else:
+            document = poppler.load_from_file(str(pdf))
+        page = document.create_page(page_number - 1)
+        image = poppler.PageRenderer().render_page(page, xres=dpi, yres=dpi)
+        
+        # argb32 is stored as native-endian 32-bit words: BGRA on little-endian
+        return Image.frombytes(
+            'RGBA', (image.width, image.height), image.data, 'raw', 'BGRA', image.bytes_per_row
+        ).convert('RGB')
+
+
+class Pdf2ImageBackend(RasterBackend):
+    """Rendering through pdf2image, which spawns pdftoppm for every page."""
+    
+    name = 'pdf2image'
+    
+    @classmethod
+    def available(cls) -> bool:
+        try:
+            import pdf2image  # noqa: F401
+        except ImportError:
+            return False
+        return shutil.which('pdftoppm') is not None
+    
+    def render(self, pdf: PdfSource, page_number: int, dpi: int) -> Image.Image:
+        from pdf2image import convert_from_bytes, convert_from_path
+        
+        window = {'first_page': page_number, 'last_page': page_number}
+        if isinstance(pdf, bytes):
+            images = convert_from_bytes(pdf, dpi=dpi, **window)
+        else:
+            images = convert_from_path(pdf, dpi=dpi, **window)
+        return images[0].convert('RGB')
+
+
+class EmbeddedImageBackend(RasterBackend):
+    """
+    Fallback that extracts the largest embedded image from the page.
+    
+    Needs no renderer, but vector content is ignored and the image keeps
+    its own resolution (dpi is not applied). Suitable for scanned labels
+    only.
+    """
+    
+    name = 'embedded'
+    renders_vectors = False
+    
+    @classmethod
+    def available(cls) -> bool:
+        return True
+    
+    def render(self, pdf: PdfSource, page_number: int, dpi: int) -> Image.Image:
+        source = io.BytesIO(pdf) if isinstance(pdf, bytes) else open(pdf, 'rb')
+        with source:
+            page = PyPDF2.PdfReader(source).pages[page_number - 1]
+            images = page.images if '/XObject' in page.get('/Resources', {}) else []
+            if not images:
+                raise ValueError(
+                    "No raster backend installed and the page has no embedded image. "
+                    "Install pypdfium2: pip install pypdfium2"
+                )
+            
+            best = max(images, key=lambda image_file: len(image_file.data))
+            image = Image.open(io.BytesIO(best.data))
+            image.load()
+            
+            # PyPDF2 ignores /BlackIs1, which inverts CCITT images
+            xobject = page['/Resources']['/XObject'].get_object()
+            name = '/' + best.name.rsplit('.', 1)[0]
+            if name in xobject and self._black_is_1(xobject[name].get_object()):
+                image = ImageOps.invert(image.convert('L'))
+        
+        return image.convert('RGB')
+    
+    @staticmethod
+    def _black_is_1(xobject) -> bool:
+        """Whether a CCITT image XObject declares /BlackIs1 true."""
+        params = xobject.get('/DecodeParms')
+        if isinstance(params, list):
+            params = params[0] if params else None
+        return bool(params and params.get_object().get('/BlackIs1', False))
+
+
+# Backends in order of preference when timing is not used
+BACKENDS: Dict[str, Type[RasterBackend]] = {
+    backend.name: backend
+    for backend in (PdfiumBackend, MuPdfBackend, PopplerBackend, Pdf2ImageBackend, EmbeddedImageBackend)
+}
+
+# Backend chosen by select_backend(), once per process
+_selected: Optional[RasterBackend] = None
+
+
+def available_backends() -> List[str]:
+    """Names of the installed backends, in order of preference."""
+    return [name for name, backend in BACKENDS.items() if backend.available()]
+
+
+def get_backend(name: str) -> RasterBackend:
+    """
+    Create a backend by name.
+    
+    Raises:
+        ValueError: If the name is unknown or the backend is not installed
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown raster backend: {name}. Choose from: {', '.join(BACKENDS)}")
+    if not BACKENDS[name].available():
+        raise ValueError(f"Raster backend {name} is not installed")
+    return BACKENDS[name]()
+
+
+def probe(backend: RasterBackend, rounds: int = PROBE_ROUNDS) -> Optional[float]:
+    """
+    Time a backend on the built-in probe PDF.
+    
+    Returns:
+        Best-of-rounds render time in seconds, or None if it failed
+    """
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        try:
+            backend.render(PROBE_PDF, 1, PROBE_DPI)
+        except Exception:
+            return None
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def select_backend(refresh: bool = False) -> RasterBackend:
+    """
+    Pick the backend to use for this process.
+    
+    LABEL_RASTER_BACKEND forces a backend by name. Otherwise every
+    installed vector renderer is timed on a probe render and the fastest
+    wins, falling back to the embedded image extractor when none works.
+    The choice is cached for the life of the process.
+    
+    Args:
+        refresh: Ignore the cached choice and select again
+    
+    Returns:
+        The selected backend
+    """
+    global _selected
+    if _selected is not None and not refresh:
+        return _selected
+    
+    forced = os.getenv('LABEL_RASTER_BACKEND')
+    if forced:
+        _selected = get_backend(forced)
+        return _selected
+    
+    timings = []
+    for name in available_backends():
+        backend = BACKENDS[name]()
+        if not backend.renders_vectors:
+            continue
+        elapsed = probe(backend)
+        if elapsed is not None:
+            timings.append((elapsed, backend))
+    
+    _selected = min(timings, key=lambda timing: timing[0])[1] if timings else EmbeddedImageBackend()
+    return _selected
@@ -0,0 +1,523 @@
+"""
+Label Spooler - Printer-aware print queuing
+
+Sends formatted labels straight to thermal printers instead of leaving
+staff to print each file by hand. Labels are queued per printer, and each
+printer has one worker thread. That thread coalesces whatever is waiting
+(up to max_batch labels) into a single multi-label job, so the printer's
+per-job overhead is paid once per batch rather than once per label.
+
+Jobs go out over raw TCP (port 9100, the AppSocket/JetDirect protocol
+spoken by Zebra, Rollo and most thermal printers) or are written to a
+local spool directory watched by CUPS or a print agent. Queue depth and
+throughput are tracked per printer.
+
+Delivery to spool directories is at-least-once: jobs are renamed into
+place atomically, so a failed write is retried. Raw TCP delivery is
+at-most-once: only failures to connect are retried, because once payload
+bytes may have reached the printer a resend would reprint the whole batch.
+"""
+
+import io
+import os
+import socket
+import threading
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+import PyPDF2
+
+from .jobs import QueueFullError
+
+# Raw printing port (AppSocket / JetDirect)
+DEFAULT_PORT = 9100
+
+# Label formats a printer can be fed
+SPOOL_FORMATS = ('zpl', 'epl', 'pdf')
+
+
+@dataclass
+class Printer:
+    """
+    A print destination: a raw TCP printer or a spool directory.
+    
+    Exactly one of host and spool_dir must be set.
+    """
+    
+    name: str
+    host: Optional[str] = None
+    port: int = DEFAULT_PORT
+    spool_dir: Optional[str] = None
+    output_format: str = 'zpl'
+    max_batch: int = 50
+    timeout: float = 10.0
+    
+    def __post_init__(self):
+        if (self.host is None) == (self.spool_dir is None):
+            raise ValueError(f"Printer {self.name!r} needs exactly one of host or spool_dir")
+        if self.output_format not in SPOOL_FORMATS:
+            raise ValueError(f"Unsupported printer format: {self.output_format}")
+        if self.max_batch < 1:
+            raise ValueError("max_batch must be at least 1")
+    
+    @classmethod
+    def from_uri(cls, name: str, uri: str, **options) -> 'Printer':
+        """
+        Build a printer from a URI.
+        
+        Accepts tcp://host[:port] and dir:/path, with optional format and
+        batch query parameters, e.g. tcp://10.0.0.5:9100?format=epl&batch=20.
+        
+        Raises:
+            ValueError: If the URI scheme is not tcp or dir
+        """
+        parsed = urlparse(uri)
+        query = {key: values[-1] for key, values in parse_qs(parsed.query).items()}
+        if 'format' in query:
+            options.setdefault('output_format', query['format'].lower())
+        if 'batch' in query:
+            options.setdefault('max_batch', int(query['batch']))
+        
+        if parsed.scheme == 'tcp':
+            return cls(name, host=parsed.hostname, port=parsed.port or DEFAULT_PORT, **options)
+        if parsed.scheme == 'dir':
+            return cls(name, spool_dir=parsed.netloc + parsed.path, **options)
+        raise ValueError(f"Unsupported printer URI: {uri}")
+    
+    @property
+    def target(self) -> str:
+        """Where jobs are sent, as a URI."""
+        if self.host is not None:
+            return f"tcp://{self.host}:{self.port}"
+        return f"dir:{self.spool_dir}"
+
+
+@dataclass
+class PrintJob:
+    """One label submitted to a printer."""
+    
+    id: str
+    printer: str
+    filename: str
+    submitted_at: float
+    printed_at: Optional[float] = None
+    error: Optional[str] = None
+    batch_size: Optional[int] = None
+    
+    @property
+    def status(self) -> str:
+        """One of 'queued', 'printed' or 'failed'."""
+        if self.error:
+            return 'failed'
+        return 'queued' if self.printed_at is None else 'printed'
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the job status to a JSON-serializable dictionary."""
+        return {
+            'id': self.id,
+            'status': self.status,
+            'printer': self.printer,
+            'filename': self.filename,
+            'error': self.error,
+            'batch_size': self.batch_size,
+            'wait_time': None if self.printed_at is None else self.printed_at - self.submitted_at,
+        }
+
+
+@dataclass
+class _PrinterQueue:
+    """Per-printer queue, worker thread and counters."""
+    
+    printer: Printer
+    condition: threading.Condition = field(default_factory=threading.Condition)
+    pending: Deque[Tuple[PrintJob, bytes]] = field(default_factory=deque)
+    in_flight: int = 0
+    jobs_sent: int = 0
+    labels_printed: int = 0
+    labels_failed: int = 0
+    bytes_sent: int = 0
+    send_seconds: float = 0.0
+    last_error: Optional[str] = None
+    thread: Optional[threading.Thread] = None
+
+
+def coalesce(labels: List[bytes], output_format: str) -> bytes:
+    """
+    Merge formatted labels into one multi-label print job.
+    
+    ZPL and EPL label programs are simply concatenated; PDFs are merged
+    into one multi-page document.
+    
+    Args:
+        labels: Formatted labels, in print order
+        output_format: Format of every label ('zpl', 'epl' or 'pdf')
+    
+    Returns:
+        The combined job
+    """
+    if output_format != 'pdf':
+        return b''.join(labels)
+    if len(labels) == 1:
+        return labels[0]
+    
+    writer = PyPDF2.PdfWriter()
+    for label in labels:
+        for page in PyPDF2.PdfReader(io.BytesIO(label)).pages:
+            writer.add_page(page)
+    output = io.BytesIO()
+    writer.write(output)
+    return output.getvalue()
+
+
+class UncertainDeliveryError(OSError):
+    """A raw job failed after connecting; some or all of it may have printed."""
+
+
+def send_raw(host: str, port: int, payload: bytes, timeout: float = 10.0) -> None:
+    """
+    Send a job to a raw TCP (port 9100) printer.
+    
+    Raises:
+        OSError: If the printer cannot be reached (nothing was sent)
+        UncertainDeliveryError: If the connection failed after it was made
+    """
+    conn = socket.create_connection((host, port), timeout=timeout)
+    try:
+        with conn:
+            conn.sendall(payload)
+            # Half-close so the printer sees the end of the job before we hang up
+            conn.shutdown(socket.SHUT_WR)
+    except OSError as e:
+        raise UncertainDeliveryError(f"Send to {host}:{port} failed after connecting: {e}") from e
+
+
+def write_spool(directory: str, payload: bytes, extension: str) -> Path:
+    """
+    Write a job into a spool directory.
+    
+    The job is written under a temporary name and renamed into place, so a
+    watcher never picks up a partially written file.
+    
+    Returns:
+        Path of the spooled job
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    name = f"{time.time_ns()}_{uuid.uuid4().hex[:8]}.{extension}"
+    temp_path = directory / f".{name}.tmp"
+    temp_path.write_bytes(payload)
+    os.replace(temp_path, directory / name)
+    return directory / name
+
+
+def parse_printers(spec: str) -> List[Printer]:
+    """
+    Parse a printer list such as "rollo=tcp://10.0.0.5,backup=dir:/var/spool/labels".
+    
+    Raises:
+        ValueError: If an entry is not name=uri or its URI is invalid
+    """
+    printers = []
+    for entry in filter(None, (part.strip() for part in spec.split(','))):
+        name, sep, uri = entry.partition('=')
+        if not sep or not name.strip():
+            raise ValueError(f"Invalid printer entry (expected name=uri): {entry}")
+        printers.append(Printer.from_uri(name.strip(), uri.strip()))
+    return printers
+
+
+class LabelSpooler:
+    """
+    Per-printer print queues with job coalescing.
+    
+    Attributes:
+        max_queue (int): Labels waiting per printer before rejecting
+        linger (float): Seconds a worker waits for more labels to join a
+                        batch before sending
+        retries (int): Extra send attempts before a batch fails (a raw TCP
+                       batch is only resent if nothing was sent)
+        retry_delay (float): Base delay between attempts, doubled each time
+    """
+    
+    def __init__(
+        self,
+        formatter=None,
+        printers: Iterable[Printer] = (),
+        max_queue: int = 256,
+        linger: float = 0.05,
+        retries: int = 2,
+        retry_delay: float = 0.5,
+        result_ttl: float = 600.0
+    ):
+        """
+        Initialize the spooler and start one worker per printer.
+        
+        Args:
+            formatter: LabelFormatter used by print_label() (optional when
+                       only already-formatted labels are submitted)
+            printers: Printers to serve
+            max_queue: Labels waiting per printer before submit() raises
+                       QueueFullError (default: 256)
+            linger: Seconds to wait for more labels to join a batch
+                    (default: 0.05)
+            retries: Extra send attempts for a failed batch (default: 2)
+            retry_delay: Base delay between attempts in seconds (default: 0.5)
+            result_ttl: Seconds to keep finished jobs (default: 600)
+        """
+        self.formatter = formatter
+        self.max_queue = max_queue
+        self.linger = linger
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.result_ttl = result_ttl
+        
+        self._lock = threading.Lock()
+        self._queues: Dict[str, _PrinterQueue] = {}
+        self._jobs: Dict[str, PrintJob] = {}
+        self._closed = False
+        
+        for printer in printers:
+            self.add_printer(printer)
+    
+    @property
+    def printers(self) -> List[str]:
+        """Names of the configured printers."""
+        return list(self._queues)
+    
+    def add_printer(self, printer: Printer) -> None:
+        """
+        Register a printer and start its worker.
+        
+        Raises:
+            ValueError: If a printer with the same name already exists
+        """
+        with self._lock:
+            if printer.name in self._queues:
+                raise ValueError(f"Printer already configured: {printer.name}")
+            state = _PrinterQueue(printer)
+            state.thread = threading.Thread(
+                target=self._run, args=(state,), name=f"spooler-{printer.name}", daemon=True
+            )
+            self._queues[printer.name] = state
+        state.thread.start()
+    
+    def submit(self, printer: str, label: bytes, filename: str = 'label') -> PrintJob:
+        """
+        Queue an already formatted label for printing.
+        
+        Args:
+            printer: Printer name
+            label: Label in the printer's output_format
+            filename: Original filename, for job status
+        
+        Returns:
+            The queued PrintJob
+        
+        Raises:
+            KeyError: If the printer is unknown
+            QueueFullError: If max_queue labels are already waiting
+        """
+        state = self._queues[printer]
+        job = PrintJob(uuid.uuid4().hex, printer, filename, time.time())
+        
+        with state.condition:
+            if self._closed:
+                raise RuntimeError("Spooler is shut down")
+            if len(state.pending) >= self.max_queue:
+                raise QueueFullError(f"Print queue for {printer} is full ({self.max_queue} labels)")
+            state.pending.append((job, label))
+            state.condition.notify_all()
+        
+        with self._lock:
+            self._purge_expired()
+            self._jobs[job.id] = job
+        
+        return job
+    
+    def print_label(
+        self,
+        printer: str,
+        data: bytes,
+        auto_rotate: bool = True,
+        optimize_bw: bool = True,
+        filename: str = 'label'
+    ) -> PrintJob:
+        """
+        Format a raw label for a printer and queue it.
+        
+        Args:
+            printer: Printer name
+            data: Raw input label bytes (PDF or image)
+            auto_rotate: Automatically detect and correct rotation
+            optimize_bw: Optimize for black & white printing
+            filename: Original filename, for job status
+        
+        Returns:
+            The queued PrintJob
+        
+        Raises:
+            KeyError: If the printer is unknown
+            QueueFullError: If the printer's queue is full
+            ValueError: If the label cannot be formatted
+        """
+        output_format = self._queues[printer].printer.output_format
+        label = self.formatter.process_bytes(
+            data,
+            output_format=output_format,
+            auto_rotate=auto_rotate,
+            optimize_bw=optimize_bw
+        )
+        return self.submit(printer, label, filename)
+    
+    def get(self, job_id: str) -> Optional[PrintJob]:
+        """Look up a job by id, or None if unknown or expired."""
+        with self._lock:
+            self._purge_expired()
+            return self._jobs.get(job_id)
+    
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get per-printer queue statistics.
+        
+        Returns:
+            Dictionary of printer name to target, queue depth (waiting and
+            being sent), job and label counters, mean batch size and
+            send throughput in labels per second
+        """
+        result = {}
+        for name, state in list(self._queues.items()):
+            with state.condition:
+                jobs_sent, printed, seconds = state.jobs_sent, state.labels_printed, state.send_seconds
+                result[name] = {
+                    'target': state.printer.target,
+                    'output_format': state.printer.output_format,
+                    'queue_depth': len(state.pending) + state.in_flight,
+                    'jobs_sent': state.jobs_sent,
+                    'labels_printed': state.labels_printed,
+                    'labels_failed': state.labels_failed,
+                    'bytes_sent': state.bytes_sent,
+                    'mean_batch_size': round(printed / jobs_sent, 2) if jobs_sent else 0.0,
+                    'labels_per_second': round(printed / seconds, 2) if seconds else 0.0,
+                    'last_error': state.last_error,
+                }
+        return result
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every printer's queue has drained.
+        
+        Returns:
+            True if all queues drained, False on timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for state in list(self._queues.values()):
+            with state.condition:
+                while state.pending or state.in_flight:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return False
+                    state.condition.wait(remaining)
+        return True
+    
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop accepting labels; with wait, print what is queued first."""
+        if wait:
+            self.flush()
+        self._closed = True
+        for state in list(self._queues.values()):
+            with state.condition:
+                state.condition.notify_all()
+            if wait and state.thread is not None:
+                state.thread.join()
+    
+    def _run(self, state: _PrinterQueue) -> None:
+        """Worker loop: take a coalesced batch and send it, until shut down."""
+        printer = state.printer
+        while True:
+            with state.condition:
+                while not state.pending and not self._closed:
+                    state.condition.wait()
+                if not state.pending:
+                    return
+                
+                # Give labels submitted right behind this one a chance to join
+                deadline = time.monotonic() + self.linger
+                while len(state.pending) < printer.max_batch and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    state.condition.wait(remaining)
+                
+                size = min(len(state.pending), printer.max_batch)
+                batch = [state.pending.popleft() for _ in range(size)]
+                state.in_flight = len(batch)
+            
+            self._send_batch(state, batch)
+    
+    def _send_batch(self, state: _PrinterQueue, batch: List[Tuple[PrintJob, bytes]]) -> None:
+        """Coalesce and deliver one batch, retrying with backoff while that cannot reprint."""
+        printer = state.printer
+        error = None
+        started = time.perf_counter()
+        
+        try:
+            payload = coalesce([label for _, label in batch], printer.output_format)
+        except Exception as e:
+            payload = None
+            error = f"Failed to combine labels: {e}"
+        
+        for attempt in range(self.retries + 1 if payload is not None else 0):
+            try:
+                self._deliver(printer, payload)
+                error = None
+                break
+            except UncertainDeliveryError as e:
+                # Resending could reprint every label in the batch
+                error = str(e)
+                break
+            except OSError as e:
+                error = str(e) or e.__class__.__name__
+                if attempt < self.retries:
+                    time.sleep(self.retry_delay * 2 ** attempt)
+        
+        elapsed = time.perf_counter() - started
+        finished_at = time.time()
+        for job, _ in batch:
+            job.batch_size = len(batch)
+            if error:
+                job.error = error
+            else:
+                job.printed_at = finished_at
+        
+        with state.condition:
+            state.in_flight = 0
+            if error:
+                state.labels_failed += len(batch)
+                state.last_error = error
+            else:
+                state.jobs_sent += 1
+                state.labels_printed += len(batch)
+                state.bytes_sent += len(payload)
+                state.send_seconds += elapsed
+            state.condition.notify_all()
+    
+    def _deliver(self, printer: Printer, payload: bytes) -> None:
+        """Send a coalesced job to its printer or spool directory."""
+        if printer.host is not None:
+            send_raw(printer.host, printer.port, payload, printer.timeout)
+        else:
+            write_spool(printer.spool_dir, payload, printer.output_format)
+    
+    def _purge_expired(self) -> None:
+        """Drop finished jobs older than result_ttl (caller holds the lock)."""
+        cutoff = time.time() - self.result_ttl
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.status != 'queued' and (job.printed_at or job.submitted_at) < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
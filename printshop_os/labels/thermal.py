@@ -0,0 +1,137 @@
+"""
+Thermal Printer Encoding - ZPL and EPL graphic commands
+
+Encodes 1-bit label images as raw printer command streams, so Zebra (ZPL)
+and Eltron/EPL-compatible thermal printers can be fed bytes directly
+instead of a rasterized PDF. ZPL output uses Zebra's ASCII compression
+scheme, which collapses the long white runs typical of shipping labels.
+"""
+
+from PIL import Image
+
+# Zebra ASCII compression repeat counts: G-Y encode 1-19, g-z encode 20-400
+_REPEAT_LOW = 'GHIJKLMNOPQRSTUVWXY'
+_REPEAT_HIGH = 'ghijklmnopqrstuvwxyz'
+_MAX_RUN = 400 + 19
+
+# Swap 0/1 bits: PIL stores black as 0, ZPL expects black dots as 1
+_INVERT = bytes(255 - b for b in range(256))
+
+
+def to_bilevel(image: Image.Image) -> Image.Image:
+    """
+    Return the image in 1-bit mode, converting only if needed.
+    
+    Conversion uses a plain threshold rather than dithering, which would
+    break up barcode edges.
+    """
+    if image.mode == '1':
+        return image
+    return image.convert('L').convert('1', dither=Image.Dither.NONE)
+
+
+def _repeat_prefix(count: int) -> str:
+    """Encode a repeat count (1-419) as ZPL compression characters."""
+    prefix = ''
+    if count >= 20:
+        prefix += _REPEAT_HIGH[count // 20 - 1]
+        count %= 20
+    if count:
+        prefix += _REPEAT_LOW[count - 1]
+    return prefix
+
+
+def _compress_row(hex_row: str) -> str:
+    """Compress one row of hex digits with ZPL ASCII compression."""
+    stripped = hex_row.rstrip('0')
+    if len(stripped) < len(hex_row):
+        suffix = ','
+    else:
+        stripped = hex_row.rstrip('F')
+        suffix = '!' if len(stripped) < len(hex_row) else ''
+    
+    parts = []
+    i = 0
+    while i < len(stripped):
+        char = stripped[i]
+        run = 1
+        while i + run < len(stripped) and stripped[i + run] == char and run < _MAX_RUN:
+            run += 1
+        parts.append(_repeat_prefix(run) + char if run > 1 else char)
+        i += run
+    
+    return ''.join(parts) + suffix
+
+
+def to_zpl(image: Image.Image, compress: bool = True) -> bytes:
+    """
+    Encode a label image as a ZPL II ^GF graphic field.
+    
+    Args:
+        image: Label image (converted to 1-bit if needed)
+        compress: Use Zebra ASCII compression (default: True)
+    
+    Returns:
+        Complete ZPL label (^XA ... ^XZ) as ASCII bytes
+    """
+    image = to_bilevel(image)
+    width, height = image.size
+    bytes_per_row = (width + 7) // 8
+    raw = image.tobytes().translate(_INVERT)
+    
+    # Clear the padding bits inverted into the last byte of each row
+    pad_bits = bytes_per_row * 8 - width
+    rows = [raw[y * bytes_per_row:(y + 1) * bytes_per_row] for y in range(height)]
+    if pad_bits:
+        mask = (0xFF << pad_bits) & 0xFF
+        rows = [row[:-1] + bytes([row[-1] & mask]) for row in rows]
+    
+    if compress:
+        lines = []
+        previous = None
+        for row in rows:
+            lines.append(':' if row == previous else _compress_row(row.hex().upper()))
+            previous = row
+        data = ''.join(lines)
+    else:
+        data = b''.join(rows).hex().upper()
+    
+    total = bytes_per_row * height
+    return (
+        f"^XA^PW{width}^LL{height}"
+        f"^FO0,0^GFA,{total},{total},{bytes_per_row},{data}^FS^XZ\n"
+    ).encode('ascii')
+
+
+def to_epl(image: Image.Image) -> bytes:
+    """
+    Encode a label image as an EPL2 GW (direct graphic write) command.
+    
+    Args:
+        image: Label image (converted to 1-bit if needed)
+    
+    Returns:
+        Complete EPL2 label as bytes (binary graphic data, 0 bits print)
+    """
+    image = to_bilevel(image)
+    width, height = image.size
+    bytes_per_row = (width + 7) // 8
+    
+    # PIL's 1-bit layout (MSB first, rows padded to a byte, 0 = black)
+    # is what GW expects, apart from padding bits which must be white
+    data = image.tobytes()
+    pad_bits = bytes_per_row * 8 - width
+    if pad_bits:
+        fill = (1 << pad_bits) - 1
+        data = b''.join(
+            data[y * bytes_per_row:(y + 1) * bytes_per_row - 1]
+            + bytes([data[(y + 1) * bytes_per_row - 1] | fill])
+            for y in range(height)
+        )
+    
+    return b''.join([
+        f"\r\nN\r\nq{width}\r\nQ{height},24\r\n".encode('ascii'),
+        f"GW0,0,{bytes_per_row},{height},".encode('ascii'),
+        data,
+        b"\r\nP1\r\n",
+    ])
@@ -3,6 +3,29 @@ PrintShop OS - Shipping Module
 Handles shipping integrations including label creation, tracking, and fulfillment.
 """
 
+from .address_cache import AddressCache
 from .easypost_client import EasyPostClient
+from .label_store import LabelStore
+from .models import Label, Rate, Shipment, Tracker, TrackingEvent
+from .pipeline import ShipPipeline
+from .rate_shopping import RateShopper
+from .tracking import TrackingService, TrackingStore
+from .transport import CircuitBreaker, CircuitOpenError, RetryPolicy
 
-__all__ = ["EasyPostClient"]
+__all__ = [
+    "AddressCache",
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "EasyPostClient",
+    "Label",
+    "LabelStore",
+    "Rate",
+    "RateShopper",
+    "RetryPolicy",
+    "ShipPipeline",
+    "Shipment",
+    "Tracker",
+    "TrackingEvent",
+    "TrackingService",
+    "TrackingStore",
+]
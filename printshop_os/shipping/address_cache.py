@@ -0,0 +1,156 @@
+"""
+Address Verification Cache for PrintShop OS
+
+Repeat customers ship to the same addresses again and again, and every
+EasyPost verification is a billed round-trip. AddressCache stores
+verification results in SQLite keyed by the SHA-256 of a canonicalized
+address (case, punctuation and whitespace do not matter), so each
+distinct address is verified once per TTL, across processes and restarts.
+
+Environment Variables:
+- EASYPOST_ADDRESS_CACHE: SQLite file for EasyPostClient's address cache
+  (unset: no cache)
+"""
+
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+# Seconds a verification result is reused (30 days)
+ADDRESS_TTL = 30 * 24 * 3600.0
+
+# Fields that determine the verification result
+ADDRESS_FIELDS = ("street1", "street2", "city", "state", "zip", "country")
+
+
+def canonicalize_address(address: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Normalize the fields of an address that verification depends on.
+    
+    Values are upper-cased, punctuation other than '#', '-' and '/' is
+    dropped and whitespace is collapsed, so "123 Main St." and
+    "123  MAIN ST" are the same address. Country defaults to US.
+    
+    Args:
+        address: Address dictionary (street1, street2, city, state, zip, country)
+    
+    Returns:
+        Dictionary of the canonical ADDRESS_FIELDS
+    """
+    canonical = {}
+    for field in ADDRESS_FIELDS:
+        value = re.sub(r"[^\w#/\- ]", " ", str(address.get(field) or "").upper())
+        canonical[field] = " ".join(value.split())
+    canonical["country"] = canonical["country"] or "US"
+    return canonical
+
+
+def address_key(address: Dict[str, Any]) -> str:
+    """Hex SHA-256 of the canonical address."""
+    canonical = json.dumps(canonicalize_address(address), sort_keys=True)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class AddressCache:
+    """
+    SQLite-backed cache of address verification results.
+    
+    Thread-safe; results expire after ttl seconds.
+    
+    Attributes:
+        path (str): SQLite database file, or ':memory:'
+        ttl (float): Seconds a result stays valid
+    """
+    
+    def __init__(self, path: Union[str, Path] = ":memory:", ttl: float = ADDRESS_TTL):
+        """
+        Open (or create) the address cache.
+        
+        Args:
+            path: SQLite database file. Defaults to an in-memory database.
+            ttl: Seconds a result stays valid (default: 30 days)
+        """
+        self.path = str(path)
+        self.ttl = ttl
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        with self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS addresses ("
+                "key TEXT PRIMARY KEY, result TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+    
+    def get(self, address: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Look up the verification result for an address.
+        
+        Returns:
+            The cached validate_address() result, or None on a miss
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT result FROM addresses WHERE key = ? AND expires_at > ?",
+                (address_key(address), time.time())
+            ).fetchone()
+            if row is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+        return json.loads(row[0])
+    
+    def put(self, address: Dict[str, Any], result: Dict[str, Any]) -> None:
+        """Store the verification result for an address."""
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO addresses (key, result, expires_at) VALUES (?, ?, ?)",
+                (address_key(address), json.dumps(result), time.time() + self.ttl)
+            )
+    
+    def purge(self) -> int:
+        """
+        Delete expired results.
+        
+        Returns:
+            Number of results deleted
+        """
+        with self._lock, self._db:
+            return self._db.execute("DELETE FROM addresses WHERE expires_at <= ?", (time.time(),)).rowcount
+    
+    def clear(self) -> None:
+        """Delete all results and reset counters."""
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM addresses")
+            self._hits = 0
+            self._misses = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+        
+        Returns:
+            Dictionary with hits, misses, hit_ratio and stored entries
+        """
+        with self._lock:
+            total = self._hits + self._misses
+            entries = self._db.execute("SELECT COUNT(*) FROM addresses").fetchone()[0]
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": round(self._hits / total, 4) if total else 0.0,
+                "entries": entries,
+            }
+    
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            self._db.close()
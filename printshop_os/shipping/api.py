@@ -0,0 +1,142 @@
+"""
+Flask API for Shipping Tracking
+
+Receives EasyPost webhooks and serves tracking status from the local
+tracking store, so order status pages never wait on the EasyPost API.
+
+Environment Variables:
+- EASYPOST_WEBHOOK_SECRET: Shared secret for webhook HMAC signatures
+  (when unset, webhooks are rejected)
+- EASYPOST_WEBHOOK_INSECURE: Set to 'true' to accept unsigned webhooks
+  when no secret is configured (local development only)
+- TRACKING_POLL_INTERVAL: Seconds between polling rounds (default: 60)
+"""
+
+import json
+import logging
+import os
+from typing import Optional
+from easypost.errors import SignatureVerificationError
+from easypost.util import validate_webhook
+from flask import Flask, jsonify, request
+from flask_cors import CORS
+from .easypost_client import EasyPostClient
+from .tracking import TrackingService
+
+logger = logging.getLogger(__name__)
+
+
+def create_app(
+    tracking: TrackingService,
+    webhook_secret: Optional[str] = None,
+    allow_unsigned_webhooks: bool = False
+) -> Flask:
+    """
+    Create the shipping API app.
+    
+    Args:
+        tracking: Tracking service backing the endpoints
+        webhook_secret: EasyPost webhook secret. Webhooks without a valid
+                        X-Hmac-Signature are rejected.
+        allow_unsigned_webhooks: Accept webhooks without checking signatures
+                                 when no secret is set. Anyone who can reach
+                                 the endpoint can then rewrite tracking state,
+                                 so use this for local development only.
+    
+    Returns:
+        Flask application
+    """
+    if not webhook_secret:
+        if allow_unsigned_webhooks:
+            logger.warning("No EasyPost webhook secret set: accepting unsigned webhooks")
+        else:
+            logger.warning("No EasyPost webhook secret set: webhooks will be rejected")
+    
+    app = Flask(__name__)
+    CORS(app)
+    app.config['TRACKING'] = tracking
+    
+    @app.route('/health', methods=['GET'])
+    def health_check():
+        """Health check endpoint."""
+        return jsonify({
+            'status': 'healthy',
+            'service': 'shipping',
+            'tracking': tracking.stats(),
+        })
+    
+    @app.route('/api/shipping/webhooks/easypost', methods=['POST'])
+    def easypost_webhook():
+        """
+        Receive an EasyPost webhook event.
+        
+        Tracker events update the local store; other events are
+        acknowledged and ignored so EasyPost does not retry them.
+        """
+        if not webhook_secret and not allow_unsigned_webhooks:
+            return jsonify({'error': 'Webhook secret not configured'}), 403
+        
+        body = request.get_data()
+        try:
+            if webhook_secret:
+                event = validate_webhook(body, request.headers, webhook_secret)
+            else:
+                event = json.loads(body)
+        except SignatureVerificationError:
+            return jsonify({'error': 'Invalid webhook signature'}), 401
+        except ValueError:
+            return jsonify({'error': 'Invalid JSON body'}), 400
+        
+        if not isinstance(event, dict):
+            return jsonify({'error': 'Invalid event'}), 400
+        
+        record = tracking.handle_webhook(event)
+        return jsonify({'received': True, 'updated': record is not None})
+    
+    @app.route('/api/shipping/tracking', methods=['POST'])
+    def register_tracker():
+        """Start tracking a package. Body: {"tracking_code": ..., "carrier": ...}."""
+        data = request.get_json(silent=True) or {}
+        tracking_code = data.get('tracking_code')
+        if not tracking_code:
+            return jsonify({'error': 'tracking_code is required'}), 400
+        
+        known = tracking.get(tracking_code) is not None
+        try:
+            record = tracking.register(tracking_code, data.get('carrier'))
+        except Exception as e:
+            return jsonify({'error': str(e)}), 500
+        return jsonify(record), 200 if known else 201
+    
+    @app.route('/api/shipping/tracking/<tracking_code>', methods=['GET'])
+    def get_tracking(tracking_code):
+        """Last-known tracking status from the local store."""
+        record = tracking.get(tracking_code)
+        if record is None:
+            return jsonify({'error': 'Tracking code not registered'}), 404
+        return jsonify(record)
+    
+    return app
+
+
+def run_server(host='0.0.0.0', port=5002, debug=False):
+    """Run the shipping API with background tracker polling."""
+    tracking = TrackingService(EasyPostClient())
+    tracking.start(interval=float(os.getenv('TRACKING_POLL_INTERVAL', '60')))
+    app = create_app(
+        tracking,
+        webhook_secret=os.getenv('EASYPOST_WEBHOOK_SECRET'),
+        allow_unsigned_webhooks=os.getenv('EASYPOST_WEBHOOK_INSECURE', 'false').lower() == 'true',
+    )
+    
+    print(f"🚚 Shipping API starting on http://{host}:{port}")
+    print(f"📝 Health check: http://{host}:{port}/health")
+    print(f"🔔 Webhook endpoint: http://{host}:{port}/api/shipping/webhooks/easypost")
+    print(f"📍 Tracking endpoint: http://{host}:{port}/api/shipping/tracking/<tracking_code>")
+    app.run(host=host, port=port, debug=debug)
+
+
+if __name__ == '__main__':
+    # Only enable debug mode if explicitly set via environment variable
+    debug_mode = os.getenv('FLASK_DEBUG', 'false').lower() == 'true'
+    run_server(debug=debug_mode)
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Command-line interface for shipping.
+
+Usage:
+    python -m printshop_os.shipping.cli ship orders.csv labels/ --from-address shop.json
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from .easypost_client import EasyPostClient
+from .label_store import LabelStore
+from .pipeline import DEFAULT_STAGE_WORKERS, DEFAULT_WINDOW, STAGES, Checkpoint, ShipPipeline, read_orders
+from .rate_shopping import POLICIES
+
+
+def print_summary(report) -> None:
+    """Print failures and the throughput summary of a pipeline run."""
+    for failure in report.failed:
+        print(f"✗ Order {failure.order_id} failed at {failure.stage}: {failure.error}", file=sys.stderr)
+    
+    print(
+        f"\n✓ Shipped {len(report.succeeded)} orders in {report.elapsed:.1f}s "
+        f"({report.orders_per_second:.1f} orders/sec); "
+        f"{len(report.skipped)} already done, {len(report.failed)} failed"
+    )
+    for stage, stats in report.stages.items():
+        print(
+            f"  {stage:<9} {stats['orders']:>6} orders  {stats['failed']:>4} failed  "
+            f"{stats['avg_seconds'] * 1000:>8.1f} ms avg  ({stats['workers']} worker(s))"
+        )
+
+
+def ship_command(args):
+    """Create, buy, download and format labels for a file of orders."""
+    try:
+        from_address = None
+        if args.from_address:
+            with open(args.from_address) as f:
+                from_address = json.load(f)
+        
+        # The pipeline downloads labels in its own stage
+        client = EasyPostClient(label_store=False)
+        store = LabelStore(args.label_dir)
+        checkpoint = Checkpoint(args.checkpoint or Path(args.output_dir) / "checkpoint.jsonl")
+        pipeline = ShipPipeline(
+            client,
+            store,
+            args.output_dir,
+            from_address=from_address,
+            output_format=args.format,
+            policy=args.policy,
+            max_days=args.max_days,
+            workers={stage: getattr(args, f"{stage}_workers") for stage in STAGES},
+            window=args.window,
+            checkpoint=checkpoint,
+        )
+        
+        try:
+            report = pipeline.run(read_orders(args.orders))
+        finally:
+            checkpoint.close()
+            store.close()
+        
+        print_summary(report)
+        if args.report:
+            with open(args.report, 'w') as f:
+                json.dump(report.to_dict(), f, indent=2)
+            print(f"📝 Report written to {args.report}")
+        
+        return 1 if report.failed else 0
+    except Exception as e:
+        print(f"✗ Error: {str(e)}", file=sys.stderr)
+        return 1
+
+
+def main():
+    """Main CLI entry point."""
+    parser = argparse.ArgumentParser(
+        description="PrintShop OS Shipping - Buy and format shipping labels for a day's orders",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Ship every order in a CSV, writing ZPL labels to labels/
+  python -m printshop_os.shipping.cli ship orders.csv labels/ --from-address shop.json
+  
+  # Cheapest rate delivering within 3 days, PDF labels, JSON report
+  python -m printshop_os.shipping.cli ship orders.jsonl labels/ --from-address shop.json \\
+      --policy cheapest_within --max-days 3 --format pdf --report report.json
+  
+  # Resume an interrupted run (finished orders are skipped, none is bought twice)
+  python -m printshop_os.shipping.cli ship orders.csv labels/ --from-address shop.json
+        """
+    )
+    
+    subparsers = parser.add_subparsers(dest='command', help='Command to execute')
+    subparsers.required = True
+    
+    # Ship command
+    ship_parser = subparsers.add_parser('ship', help='Ship a file of orders')
+    ship_parser.add_argument('orders', type=str, help='Orders file (.csv or .jsonl)')
+    ship_parser.add_argument('output_dir', type=str, help='Directory for formatted labels')
+    ship_parser.add_argument(
+        '--from-address',
+        type=str,
+        default=None,
+        help='JSON file with the sender address (for orders without from_address)'
+    )
+    ship_parser.add_argument(
+        '--format', '-f',
+        choices=['pdf', 'png', 'zpl', 'epl'],
+        default='zpl',
+        help='Output format (default: zpl)'
+    )
+    ship_parser.add_argument(
+        '--policy',
+        choices=POLICIES,
+        default='cheapest',
+        help='Rate selection policy (default: cheapest)'
+    )
+    ship_parser.add_argument(
+        '--max-days',
+        type=int,
+        default=None,
+        help='Delivery day limit for the cheapest_within policy'
+    )
+    ship_parser.add_argument(
+        '--checkpoint',
+        type=str,
+        default=None,
+        help='Checkpoint file to resume from (default: OUTPUT_DIR/checkpoint.jsonl)'
+    )
+    ship_parser.add_argument(
+        '--label-dir',
+        type=str,
+        default=None,
+        help='Label store directory (default: EASYPOST_LABEL_DIR or data/labels)'
+    )
+    for stage in STAGES:
+        ship_parser.add_argument(
+            f'--{stage}-workers',
+            type=int,
+            default=DEFAULT_STAGE_WORKERS[stage],
+            help=f'Worker threads for the {stage} stage (default: {DEFAULT_STAGE_WORKERS[stage]})'
+        )
+    ship_parser.add_argument(
+        '--window',
+        type=int,
+        default=DEFAULT_WINDOW,
+        help=f'Maximum orders in flight (default: {DEFAULT_WINDOW})'
+    )
+    ship_parser.add_argument(
+        '--report',
+        type=str,
+        default=None,
+        help='Write a JSON report of per-order results to this path'
+    )
+    ship_parser.set_defaults(func=ship_command)
+    
+    # Parse and execute
+    args = parser.parse_args()
+    sys.exit(args.func(args))
+
+
+if __name__ == '__main__':
+    main()
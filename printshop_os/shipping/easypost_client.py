@@ -12,11 +12,71 @@ Documentation:
 Environment Variables:
 - EASYPOST_API_KEY: Your EasyPost API key (required)
 - EASYPOST_MODE: 'test' or 'production' (default: 'test')
+- EASYPOST_API_BASE: API base URL override, e.g. for a local stub server
+- EASYPOST_ADDRESS_CACHE: SQLite file caching address verifications (optional)
+- EASYPOST_LABEL_DIR: Directory where purchased labels are stored (optional)
+
+Results are Shipment, Rate and Tracker models (see models.py). They
+still support the dictionary access of earlier releases (shipment["id"]),
+which is deprecated.
+
+Requests go through a pooled HTTP session with per-operation timeouts,
+retries for idempotent calls and a circuit breaker (see transport.py).
+The SDK has no public setting for its HTTP session; if a release drops
+the attribute the session is installed through, the SDK's own transport
+is used and only request stats are kept, through the SDK's response hook.
 """
 
+import logging
 import os
-from typing import Dict, Optional, Any
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
 import easypost
+from easypost.errors import (
+    EasyPostError,
+    GatewayTimeoutError,
+    HttpError,
+    InternalServerError,
+    RateLimitError,
+    ServiceUnavailableError,
+    TimeoutError as EasyPostTimeoutError,
+)
+from .address_cache import AddressCache, address_key
+from .label_store import LabelStore
+from .models import Rate, Shipment, Tracker
+from .transport import (
+    DEFAULT_POOL_SIZE,
+    DEFAULT_TIMEOUTS,
+    CircuitBreaker,
+    CircuitOpenError,
+    PooledSession,
+    RetryPolicy,
+)
+
+logger = logging.getLogger(__name__)
+
+# Concurrency cap and retry policy for the bulk methods
+DEFAULT_BULK_WORKERS = 8
+DEFAULT_BULK_RETRIES = 2
+DEFAULT_RETRY_DELAY = 0.5
+
+# Seconds a created shipment is served from the client's cache
+SHIPMENT_CACHE_TTL = 300.0
+
+# Error code prefix of EasyPost's address verification failures
+ADDRESS_VERIFY_ERROR = "ADDRESS.VERIFY."
+
+# Errors worth retrying: network failures, timeouts, throttling and 5xx
+RETRYABLE_ERRORS = (
+    EasyPostTimeoutError,
+    HttpError,
+    RateLimitError,
+    InternalServerError,
+    ServiceUnavailableError,
+    GatewayTimeoutError,
+)
 
 
 class EasyPostClient:
@@ -30,9 +90,31 @@ class EasyPostClient:
         api_key (str): EasyPost API key for authentication
         client (easypost.EasyPostClient): Initialized EasyPost client instance
         mode (str): Operation mode - 'test' or 'production'
+        cache_ttl (float): Seconds shipments stay in the shipment cache
+        address_cache (AddressCache): Cache of address verifications, or None
+        label_store (LabelStore): Store that purchased labels are downloaded to, or None
+        session (PooledSession): HTTP session used for all API requests
+        pooled (bool): Whether the SDK sends requests through session; when
+                       False the SDK's default transport is used and session
+                       only collects stats
+        retry_policy (RetryPolicy): Backoff for retried calls
+        circuit_breaker (CircuitBreaker): Breaker shared by all requests, or None
     """
     
-    def __init__(self, api_key: Optional[str] = None, mode: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        mode: Optional[str] = None,
+        api_base: Optional[str] = None,
+        timeout: Optional[float] = None,
+        cache_ttl: float = SHIPMENT_CACHE_TTL,
+        address_cache: Optional[AddressCache] = None,
+        label_store: Union[LabelStore, bool, None] = None,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        timeouts: Optional[Dict[str, float]] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Union[CircuitBreaker, bool] = True
+    ):
         """
         Initialize the EasyPost client.
         
@@ -41,6 +123,30 @@ class EasyPostClient:
                      environment variable.
             mode: Operation mode - 'test' or 'production'. If not provided, reads from
                   EASYPOST_MODE environment variable, defaulting to 'test'.
+            api_base: API base URL (e.g. "http://127.0.0.1:8080/v2"). If not provided,
+                      reads from EASYPOST_API_BASE, defaulting to the EasyPost API.
+            timeout: Read timeout in seconds for every operation not in timeouts.
+                     If not provided, each operation uses its DEFAULT_TIMEOUTS entry.
+            cache_ttl: Seconds a shipment returned by create_shipment() is reused by
+                       buy_shipment(), get_label_url() and list_rates() instead of
+                       being retrieved again. 0 disables the cache.
+            address_cache: Cache for validate_address() results. If not provided,
+                           an SQLite cache is opened at EASYPOST_ADDRESS_CACHE
+                           when that is set.
+            label_store: Store that buy_shipment() downloads each purchased
+                         label to in the background. If not provided, one is
+                         opened at EASYPOST_LABEL_DIR when that is set; False
+                         never opens one.
+            pool_size: Keep-alive connections kept to the API (default: 16);
+                       size it to at least the bulk max_workers
+            timeouts: Read timeouts per operation ('create', 'buy', 'retrieve',
+                      'verify', 'track', 'poll'), overriding the defaults
+            retry_policy: Jittered backoff for idempotent requests and for the
+                          bulk methods' retries (default: RetryPolicy())
+            circuit_breaker: Breaker that fails requests fast after repeated
+                             5xx responses or network errors. True (default)
+                             uses a CircuitBreaker() with default settings;
+                             False disables it.
         
         Raises:
             ValueError: If API key is not provided and not found in environment.
@@ -53,7 +159,54 @@ class EasyPostClient:
             )
         
         self.mode = mode if mode is not None else os.getenv("EASYPOST_MODE", "test")
-        self.client = easypost.EasyPostClient(self.api_key)
+        
+        options = {}
+        api_base = api_base or os.getenv("EASYPOST_API_BASE")
+        if api_base:
+            options["api_base"] = api_base
+        if timeout is not None:
+            options["timeout"] = timeout
+        self.client = easypost.EasyPostClient(self.api_key, **options)
+        
+        operation_timeouts = dict(DEFAULT_TIMEOUTS) if timeout is None else {}
+        operation_timeouts.update(timeouts or {})
+        self.retry_policy = retry_policy or RetryPolicy()
+        if circuit_breaker is True:
+            circuit_breaker = CircuitBreaker()
+        self.circuit_breaker = circuit_breaker or None
+        self.session = PooledSession(
+            pool_size=pool_size,
+            timeouts=operation_timeouts,
+            default_timeout=self.client.timeout,
+            retry_policy=self.retry_policy,
+            breaker=self.circuit_breaker,
+        )
+        # The SDK has no public setting for its HTTP session, only the private
+        # _requests_session. Releases without it keep their default transport.
+        self.pooled = hasattr(self.client, "_requests_session")
+        if self.pooled:
+            self.client._requests_session = self.session
+        else:
+            logger.warning(
+                "easypost %s has no _requests_session: using the SDK's transport "
+                "without pooling, per-operation timeouts, retries or circuit breaker",
+                getattr(easypost, "__version__", "?"),
+            )
+            self.client.subscribe_to_response_hook(self._record_response)
+        self._call_retries = 0
+        
+        self.cache_ttl = cache_ttl
+        # Shipment ID -> (expiry time, shipment object)
+        self._shipments: Dict[str, Tuple[float, Any]] = {}
+        self._cache_lock = threading.Lock()
+        
+        if address_cache is None and os.getenv("EASYPOST_ADDRESS_CACHE"):
+            address_cache = AddressCache(os.getenv("EASYPOST_ADDRESS_CACHE"))
+        self.address_cache = address_cache
+        
+        if label_store is None and os.getenv("EASYPOST_LABEL_DIR"):
+            label_store = LabelStore(os.getenv("EASYPOST_LABEL_DIR"))
+        self.label_store = label_store or None
     
     def create_shipment(
         self,
@@ -61,7 +214,7 @@ class EasyPostClient:
         to_address: Dict[str, str],
         parcel: Dict[str, float],
         **kwargs
-    ) -> Dict[str, Any]:
+    ) -> Shipment:
         """
         Create a shipment with EasyPost.
         
@@ -75,11 +228,8 @@ class EasyPostClient:
             **kwargs: Additional optional parameters (customs_info, options, etc.)
         
         Returns:
-            Dictionary containing shipment details including:
-            - id: Shipment ID
-            - rates: Available shipping rates
-            - tracking_code: Tracking number (if available)
-            - postage_label: Label information (if purchased)
+            Shipment with id, rates, tracking_code (if available) and
+            postage_label (if purchased); call to_dict() for a dictionary
         
         Raises:
             easypost.Error: If shipment creation fails
@@ -118,48 +268,178 @@ class EasyPostClient:
             parcel=parcel,
             **kwargs
         )
+        result = Shipment.from_sdk(shipment)
+        self._cache_shipment(result)
         
-        return self._shipment_to_dict(shipment)
+        return result
     
     def buy_shipment(
         self,
-        shipment_id: str,
+        shipment: Union[str, Shipment],
         rate_id: Optional[str] = None
-    ) -> Dict[str, Any]:
+    ) -> Shipment:
         """
         Purchase a shipping label for a shipment.
         
+        Pass the Shipment returned by create_shipment() to buy with the
+        rates it already holds: the label then costs one API call. A
+        shipment ID is looked up in the shipment cache and only retrieved
+        from EasyPost when it is not cached. With a label_store, the label
+        is downloaded (and its thermal version rendered) in the background.
+        
         Args:
-            shipment_id: The ID of the shipment to purchase
+            shipment: The Shipment from create_shipment(), or the ID of the
+                      shipment to purchase
             rate_id: The ID of the rate to purchase. If not provided,
                     uses the lowest rate automatically.
         
         Returns:
-            Dictionary containing updated shipment details with:
-            - postage_label: Label URL and details
-            - tracking_code: Package tracking number
-            - selected_rate: The purchased rate information
+            The purchased Shipment, with postage_label (label URL and
+            details), tracking_code and selected_rate
         
         Raises:
             easypost.Error: If label purchase fails
+            ValueError: If the rate is not one of the shipment's rates
         
         Example:
-            >>> label = client.buy_shipment("shp_123456")
+            >>> shipment = client.create_shipment(from_addr, to_addr, parcel)
+            >>> label = client.buy_shipment(shipment)
+            >>> label = client.buy_shipment("shp_123456", rate_id="rate_789")
         """
-        shipment = self.client.shipment.retrieve(shipment_id)
+        if isinstance(shipment, str):
+            shipment = self._get_shipment(shipment)
         
         # If no rate specified, use the lowest rate
-        if not rate_id and shipment.rates:
-            rate = shipment.lowest_rate()
-        else:
-            rate = next((r for r in shipment.rates if r.id == rate_id), None)
-            if not rate:
-                raise ValueError(f"Rate {rate_id} not found for shipment {shipment_id}")
+        rate = shipment.find_rate(rate_id) if rate_id else shipment.lowest_rate()
+        if not rate:
+            raise ValueError(f"Rate {rate_id} not found for shipment {shipment.id}")
         
         # Buy the shipment with selected rate
-        bought_shipment = self.client.shipment.buy(shipment_id, rate=rate)
+        self._forget_shipment(shipment.id)
+        bought_shipment = Shipment.from_sdk(self.client.shipment.buy(shipment.id, rate={"id": rate.id}))
+        self._cache_shipment(bought_shipment)
+        if self.label_store and bought_shipment.postage_label:
+            self.label_store.prefetch(bought_shipment)
         
-        return self._shipment_to_dict(bought_shipment)
+        return bought_shipment
+    
+    def create_shipments_bulk(
+        self,
+        shipments: Iterable[Dict[str, Any]],
+        max_workers: int = DEFAULT_BULK_WORKERS,
+        retries: int = DEFAULT_BULK_RETRIES,
+        retry_delay: float = DEFAULT_RETRY_DELAY
+    ) -> List[Dict[str, Any]]:
+        """
+        Create many shipments concurrently.
+        
+        At most max_workers API calls are in flight at once. Each call is
+        retried on network errors, timeouts, rate limiting and 5xx responses
+        with exponential backoff; other errors (bad addresses, etc.) fail
+        that shipment only and never stop the rest of the batch.
+        
+        Args:
+            shipments: Dictionaries of create_shipment() arguments, each with
+                from_address, to_address, parcel and any extra parameters
+            max_workers: Maximum number of concurrent API calls
+            retries: Retries per shipment after the first attempt
+            retry_delay: Base retry delay in seconds (doubles each retry, with jitter)
+        
+        Returns:
+            One result per input, in input order, each containing:
+            - index: Position of the shipment in the input
+            - shipment: Shipment, or None if it failed
+            - error: None, or a dictionary with type, message and http_status
+            - attempts: Number of API attempts made
+        
+        Example:
+            >>> results = client.create_shipments_bulk([
+            ...     {"from_address": shop, "to_address": order["address"], "parcel": box}
+            ...     for order in orders
+            ... ], max_workers=10)
+            >>> failed = [r for r in results if r["error"]]
+        """
+        return self._run_bulk(
+            lambda spec: self.create_shipment(**spec),
+            shipments, max_workers, retries, retry_delay
+        )
+    
+    def buy_shipments_bulk(
+        self,
+        purchases: Iterable[Union[str, Shipment, Tuple[Union[str, Shipment], Optional[str]]]],
+        max_workers: int = DEFAULT_BULK_WORKERS,
+        retries: int = DEFAULT_BULK_RETRIES,
+        retry_delay: float = DEFAULT_RETRY_DELAY
+    ) -> List[Dict[str, Any]]:
+        """
+        Purchase labels for many shipments concurrently.
+        
+        Runs buy_shipment_with_retry() for each purchase with the same
+        concurrency cap and result format as create_shipments_bulk(). A
+        purchase that fails is only retried once the shipment has been
+        retrieved and found to have no label; if it has one, the purchase
+        went through and that shipment is returned.
+        
+        Args:
+            purchases: Shipments as accepted by buy_shipment() (IDs or
+                Shipments from create_shipment(), bought at the lowest rate),
+                or (shipment, rate_id) tuples
+            max_workers: Maximum number of concurrent API calls
+            retries: Retries per purchase after the first attempt
+            retry_delay: Base retry delay in seconds (doubles each retry, with jitter)
+        
+        Returns:
+            One result per input, in input order (see create_shipments_bulk)
+        
+        Example:
+            >>> created = client.create_shipments_bulk(specs)
+            >>> bought = client.buy_shipments_bulk(
+            ...     [r["shipment"] for r in created if r["shipment"]]
+            ... )
+        """
+        return self._run_bulk(
+            lambda purchase: purchase if isinstance(purchase, tuple) else (purchase, None),
+            purchases, max_workers, retries, retry_delay, attempt=self._attempt_buy
+        )
+    
+    def buy_shipment_with_retry(
+        self,
+        shipment: Union[str, Shipment],
+        rate_id: Optional[str] = None,
+        retries: int = DEFAULT_BULK_RETRIES,
+        retry_delay: float = DEFAULT_RETRY_DELAY
+    ) -> Shipment:
+        """
+        Purchase a label, retrying only when nothing was bought.
+        
+        A failed purchase may still have gone through (the response can be
+        lost after EasyPost sold the label), so after any API error the
+        shipment is retrieved: if it has a postage_label, it is returned.
+        Otherwise transient errors are retried as in call_with_retry().
+        If the shipment cannot be retrieved, the purchase error is raised
+        without a retry.
+        
+        Args:
+            shipment: The Shipment from create_shipment(), or a shipment ID
+            rate_id: The ID of the rate to purchase (default: lowest rate)
+            retries: Retries after the first attempt
+            retry_delay: Base retry delay in seconds (doubles each retry, with jitter)
+        
+        Returns:
+            The purchased Shipment
+        
+        Raises:
+            easypost.Error: The last purchase error
+            CircuitOpenError: If the circuit breaker rejected the purchase
+            ValueError: If the rate is not one of the shipment's rates
+        
+        Example:
+            >>> label = client.buy_shipment_with_retry(shipment, rate_id="rate_789")
+        """
+        result, error, _ = self._attempt_buy(lambda _: (shipment, rate_id), None, retries, retry_delay)
+        if error is not None:
+            raise error
+        return result
     
     def get_label_url(self, shipment_id: str) -> Optional[str]:
         """
@@ -175,14 +455,73 @@ class EasyPostClient:
             >>> url = client.get_label_url("shp_123456")
             >>> # Download or display the label at this URL
         """
-        shipment = self.client.shipment.retrieve(shipment_id)
+        shipment = self._get_shipment(shipment_id)
         
         if shipment.postage_label:
             return shipment.postage_label.label_url
         
         return None
     
-    def track_shipment(self, tracking_code: str) -> Dict[str, Any]:
+    def retrieve_shipment(self, shipment_id: str) -> Shipment:
+        """
+        Retrieve a shipment's current state from EasyPost, bypassing the cache.
+        
+        Use this to find out whether a purchase whose response was lost
+        went through: a purchased shipment has a postage_label.
+        
+        Args:
+            shipment_id: The ID of the shipment
+        
+        Returns:
+            The Shipment, which also replaces any cached copy
+        
+        Raises:
+            easypost.Error: If the shipment cannot be retrieved
+        
+        Example:
+            >>> shipment = client.retrieve_shipment("shp_123456")
+            >>> purchased = shipment.postage_label is not None
+        """
+        shipment = Shipment.from_sdk(self.client.shipment.retrieve(shipment_id))
+        self._cache_shipment(shipment)
+        return shipment
+    
+    def call_with_retry(
+        self,
+        call: Callable[[], Any],
+        retries: int = DEFAULT_BULK_RETRIES,
+        retry_delay: float = DEFAULT_RETRY_DELAY
+    ) -> Any:
+        """
+        Call an API function, retrying it on transient errors.
+        
+        Uses the same policy as the bulk methods: network errors, timeouts,
+        rate limiting and 5xx responses are retried with jittered
+        exponential backoff; other errors, and calls rejected by an open
+        circuit, are raised at once. Only pass calls that are safe to
+        repeat: a purchase whose response was lost may have gone through.
+        
+        Args:
+            call: Function of no arguments making the API call
+            retries: Retries after the first attempt
+            retry_delay: Base retry delay in seconds (doubles each retry, with jitter)
+        
+        Returns:
+            The call's return value
+        
+        Raises:
+            easypost.Error: The last error, once retries are used up
+            CircuitOpenError: If the circuit breaker rejected the call
+        
+        Example:
+            >>> shipment = client.call_with_retry(lambda: client.retrieve_shipment("shp_123456"))
+        """
+        result, error, _ = self._attempt(lambda _: call(), None, retries, retry_delay)
+        if error is not None:
+            raise error
+        return result
+    
+    def track_shipment(self, tracking_code: str) -> Tracker:
         """
         Get tracking information for a shipment.
         
@@ -190,42 +529,65 @@ class EasyPostClient:
             tracking_code: The tracking code/number for the package
         
         Returns:
-            Dictionary containing tracking information:
-            - status: Current delivery status
-            - tracking_details: List of tracking events
-            - est_delivery_date: Estimated delivery date (if available)
+            Tracker with status, est_delivery_date (if available) and
+            events (the tracking history)
         
         Raises:
             easypost.Error: If tracking lookup fails
         
+        Note:
+            Every call creates a tracker with EasyPost. For repeated status
+            checks use TrackingService, which registers each code once and
+            serves status from a local store.
+        
         Example:
             >>> tracking = client.track_shipment("9400111899562539802544")
-            >>> print(tracking['status'])
+            >>> print(tracking.status)
         """
-        tracker = self.client.tracker.create(tracking_code=tracking_code)
+        return self.create_tracker(tracking_code)
+    
+    def create_tracker(self, tracking_code: str, carrier: Optional[str] = None) -> Tracker:
+        """
+        Create an EasyPost tracker for a package.
         
-        return {
-            "id": tracker.id,
-            "tracking_code": tracker.tracking_code,
-            "status": tracker.status,
-            "status_detail": tracker.status_detail,
-            "est_delivery_date": tracker.est_delivery_date,
-            "tracking_details": [
-                {
-                    "message": detail.message,
-                    "status": detail.status,
-                    "datetime": detail.datetime,
-                    "tracking_location": {
-                        "city": detail.tracking_location.city if detail.tracking_location else None,
-                        "state": detail.tracking_location.state if detail.tracking_location else None,
-                        "country": detail.tracking_location.country if detail.tracking_location else None,
-                    } if detail.tracking_location else None
-                }
-                for detail in (tracker.tracking_details or [])
-            ]
-        }
+        Args:
+            tracking_code: The tracking code/number for the package
+            carrier: Carrier name, if known (speeds up EasyPost's detection)
+        
+        Returns:
+            The new Tracker
+        
+        Raises:
+            easypost.Error: If the tracker cannot be created
+        
+        Example:
+            >>> tracker = client.create_tracker("9400111899562539802544", carrier="USPS")
+        """
+        params = {"tracking_code": tracking_code}
+        if carrier:
+            params["carrier"] = carrier
+        return Tracker.from_sdk(self.client.tracker.create(**params))
     
-    def list_rates(self, shipment_id: str) -> list:
+    def list_trackers(self, tracking_codes: List[str]) -> List[Tracker]:
+        """
+        Get the current state of existing trackers in one request.
+        
+        Args:
+            tracking_codes: Tracking codes to look up (at most 100)
+        
+        Returns:
+            Trackers found for the codes; unknown codes are left out
+        
+        Raises:
+            easypost.Error: If the lookup fails
+        
+        Example:
+            >>> trackers = client.list_trackers(["9400111899562539802544"])
+        """
+        response = self.client.tracker.all(tracking_codes=tracking_codes, page_size=len(tracking_codes))
+        return [Tracker.from_sdk(tracker) for tracker in response.get("trackers") or []]
+    
+    def list_rates(self, shipment_id: str) -> List[Rate]:
         """
         Get available shipping rates for a shipment.
         
@@ -233,7 +595,7 @@ class EasyPostClient:
             shipment_id: The ID of the shipment
         
         Returns:
-            List of rate dictionaries, each containing:
+            List of Rates, each with:
             - id: Rate ID
             - carrier: Shipping carrier name
             - service: Service level
@@ -243,23 +605,9 @@ class EasyPostClient:
         Example:
             >>> rates = client.list_rates("shp_123456")
             >>> for rate in rates:
-            ...     print(f"{rate['carrier']} {rate['service']}: ${rate['rate']}")
-        """
-        shipment = self.client.shipment.retrieve(shipment_id)
-        
-        return [
-            {
-                "id": rate.id,
-                "carrier": rate.carrier,
-                "service": rate.service,
-                "rate": rate.rate,
-                "currency": rate.currency,
-                "delivery_days": rate.delivery_days,
-                "delivery_date": rate.delivery_date,
-                "delivery_date_guaranteed": rate.delivery_date_guaranteed,
-            }
-            for rate in (shipment.rates or [])
-        ]
+            ...     print(f"{rate.carrier} {rate.service}: ${rate.rate}")
+        """
+        return list(self._get_shipment(shipment_id).rates)
     
     def validate_address(self, address: Dict[str, str]) -> Dict[str, Any]:
         """
@@ -273,6 +621,9 @@ class EasyPostClient:
             - valid: Boolean indicating if address is valid
             - address: Validated/corrected address if valid
             - errors: List of validation errors if invalid
+            Only verification results are cached. API errors (network,
+            authentication, payment, ...) also come back as invalid
+            results, but are never cached.
         
         Example:
             >>> result = client.validate_address({
@@ -283,77 +634,319 @@ class EasyPostClient:
             ...     "country": "US"
             ... })
         """
+        cached = self._cached_address(address)
+        if cached is not None:
+            return cached
+        
         try:
-            verified_address = self.client.address.create_and_verify(**address)
-            
-            return {
-                "valid": True,
-                "address": {
-                    "street1": verified_address.street1,
-                    "street2": verified_address.street2,
-                    "city": verified_address.city,
-                    "state": verified_address.state,
-                    "zip": verified_address.zip,
-                    "country": verified_address.country,
-                },
-                "errors": []
-            }
-        except easypost.Error as e:
-            return {
-                "valid": False,
-                "address": address,
-                "errors": [str(e)]
-            }
+            result = self._verify_address(address)
+        except EasyPostError as e:
+            # API failures say nothing about the address; never cache them
+            return self._invalid_address(address, e)
+        
+        if self.address_cache is not None:
+            self.address_cache.put(address, result)
+        return result
     
-    def _shipment_to_dict(self, shipment) -> Dict[str, Any]:
+    def validate_addresses(
+        self,
+        addresses: Iterable[Dict[str, str]],
+        max_workers: int = DEFAULT_BULK_WORKERS,
+        retries: int = DEFAULT_BULK_RETRIES,
+        retry_delay: float = DEFAULT_RETRY_DELAY
+    ) -> List[Dict[str, Any]]:
         """
-        Convert an EasyPost shipment object to a dictionary.
+        Validate many addresses, verifying only cache misses.
+        
+        Cached results are returned straight away. The remaining distinct
+        addresses (duplicates in the batch are verified once) are verified
+        concurrently, with the concurrency cap and retry policy of
+        create_shipments_bulk(), and cached.
         
         Args:
-            shipment: EasyPost shipment object
+            addresses: Address dictionaries to validate
+            max_workers: Maximum number of concurrent verifications
+            retries: Retries per address after the first attempt
+            retry_delay: Base retry delay in seconds (doubles each retry, with jitter)
         
         Returns:
-            Dictionary representation of the shipment
-        """
-        result = {
-            "id": shipment.id,
-            "tracking_code": shipment.tracking_code,
-            "status": shipment.status,
-            "created_at": shipment.created_at,
-            "updated_at": shipment.updated_at,
-        }
+            One validate_address() result per input, in input order
         
-        # Add rates if available
-        if shipment.rates:
-            result["rates"] = [
-                {
-                    "id": rate.id,
-                    "carrier": rate.carrier,
-                    "service": rate.service,
-                    "rate": rate.rate,
-                    "currency": rate.currency,
-                    "delivery_days": rate.delivery_days,
-                }
-                for rate in shipment.rates
-            ]
-        
-        # Add label information if purchased
-        if shipment.postage_label:
-            result["postage_label"] = {
-                "id": shipment.postage_label.id,
-                "label_url": shipment.postage_label.label_url,
-                "label_pdf_url": shipment.postage_label.label_pdf_url,
-                "label_size": shipment.postage_label.label_size,
-                "label_type": shipment.postage_label.label_type,
-            }
-        
-        # Add selected rate if purchased
-        if shipment.selected_rate:
-            result["selected_rate"] = {
-                "id": shipment.selected_rate.id,
-                "carrier": shipment.selected_rate.carrier,
-                "service": shipment.selected_rate.service,
-                "rate": shipment.selected_rate.rate,
-            }
+        Example:
+            >>> results = client.validate_addresses([order["address"] for order in orders])
+            >>> invalid = [r for r in results if not r["valid"]]
+        """
+        addresses = list(addresses)
+        results: List[Optional[Dict[str, Any]]] = [None] * len(addresses)
+        # Canonical key -> input positions still to verify
+        pending: Dict[str, List[int]] = {}
+        for index, address in enumerate(addresses):
+            results[index] = self._cached_address(address)
+            if results[index] is None:
+                pending.setdefault(address_key(address), []).append(index)
+        
+        misses = [addresses[indices[0]] for indices in pending.values()]
+        outcomes = self._run_bulk(
+            self._verify_address, misses, max_workers, retries, retry_delay, result_key="result"
+        )
+        
+        for indices, outcome in zip(pending.values(), outcomes):
+            result = outcome["result"]
+            if result is not None and self.address_cache is not None:
+                self.address_cache.put(addresses[indices[0]], result)
+            for index in indices:
+                if result is None:
+                    results[index] = self._invalid_address(addresses[index], outcome["error"]["message"])
+                elif not result["valid"]:
+                    results[index] = dict(result, address=addresses[index])
+                else:
+                    results[index] = result
+        
+        return results
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get API client statistics.
         
+        Returns:
+            Dictionary with HTTP requests, failures (5xx and network errors)
+            and transport retries, call_retries made by the bulk methods,
+            latency_ms (count, p50, p90, p99, max) per operation, the
+            circuit breaker state and counters, and cached shipments
+        
+        Example:
+            >>> client.create_shipments_bulk(specs)
+            >>> client.stats()["latency_ms"]["create"]["p99"]
+        """
+        result = self.session.stats.to_dict()
+        with self._cache_lock:
+            result["call_retries"] = self._call_retries
+            result["cached_shipments"] = len(self._shipments)
+        result["circuit"] = self.circuit_breaker.stats() if self.circuit_breaker else None
         return result
+    
+    def _record_response(self, method, path, http_status, request_timestamp, response_timestamp, **kwargs) -> None:
+        """SDK response hook: record the request in the session's stats."""
+        seconds = (response_timestamp - request_timestamp).total_seconds()
+        self.session.record_response(getattr(method, "value", method), path, seconds, http_status)
+    
+    def _verify_address(self, address: Dict[str, str]) -> Dict[str, Any]:
+        """
+        Verify an address with EasyPost.
+        
+        Verification failures (ADDRESS.VERIFY.* errors, or delivery
+        verification errors on the returned address) are returned as
+        invalid results, safe to cache. Every other error is raised.
+        """
+        try:
+            verified_address = self.client.address.create_and_verify(**address)
+        except EasyPostError as e:
+            if str(getattr(e, "code", None) or "").startswith(ADDRESS_VERIFY_ERROR):
+                return self._invalid_address(address, e)
+            raise
+        
+        delivery = getattr(getattr(verified_address, "verifications", None), "delivery", None)
+        if delivery is not None and not getattr(delivery, "success", True):
+            errors = [getattr(error, "message", str(error)) for error in getattr(delivery, "errors", None) or []]
+            return {"valid": False, "address": address, "errors": errors or ["Address verification failed"]}
+        
+        return {
+            "valid": True,
+            "address": {
+                "street1": verified_address.street1,
+                "street2": verified_address.street2,
+                "city": verified_address.city,
+                "state": verified_address.state,
+                "zip": verified_address.zip,
+                "country": verified_address.country,
+            },
+            "errors": []
+        }
+    
+    def _cached_address(self, address: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        """Cached validation result for an address, or None."""
+        if self.address_cache is None:
+            return None
+        cached = self.address_cache.get(address)
+        if cached is not None and not cached["valid"]:
+            # Invalid results echo the caller's address, not the one cached
+            cached["address"] = address
+        return cached
+    
+    @staticmethod
+    def _invalid_address(address: Dict[str, str], error: Any) -> Dict[str, Any]:
+        """Validation result for an address that could not be verified."""
+        return {
+            "valid": False,
+            "address": address,
+            "errors": [str(error)]
+        }
+    
+    def _get_shipment(self, shipment_id: str) -> Shipment:
+        """Return a shipment from the cache, retrieving (and caching) it on a miss."""
+        now = time.monotonic()
+        with self._cache_lock:
+            entry = self._shipments.get(shipment_id)
+            if entry and entry[0] > now:
+                return entry[1]
+        
+        shipment = Shipment.from_sdk(self.client.shipment.retrieve(shipment_id))
+        self._cache_shipment(shipment)
+        return shipment
+    
+    def _cache_shipment(self, shipment: Shipment) -> None:
+        """Cache a shipment under its ID for cache_ttl seconds."""
+        if self.cache_ttl <= 0:
+            return
+        now = time.monotonic()
+        with self._cache_lock:
+            expired = [key for key, (expires, _) in self._shipments.items() if expires <= now]
+            for key in expired:
+                del self._shipments[key]
+            self._shipments[shipment.id] = (now + self.cache_ttl, shipment)
+    
+    def _forget_shipment(self, shipment_id: str) -> None:
+        """Drop a shipment from the cache."""
+        with self._cache_lock:
+            self._shipments.pop(shipment_id, None)
+    
+    def _run_bulk(
+        self,
+        call: Callable[[Any], Any],
+        items: Iterable[Any],
+        max_workers: int,
+        retries: int,
+        retry_delay: float,
+        result_key: str = "shipment",
+        attempt: Optional[Callable[..., Tuple[Any, Optional[Exception], int]]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Run call on every item in a bounded thread pool.
+        
+        attempt replaces _attempt() as the retry loop (see _attempt_buy).
+        
+        Returns:
+            Per-item result dictionaries in input order, with the call's
+            return value under result_key
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        
+        items = list(items)
+        if not items:
+            return []
+        
+        def run(indexed):
+            index, item = indexed
+            return self._call_with_retry(call, item, index, retries, retry_delay, result_key, attempt)
+        
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+            return list(executor.map(run, enumerate(items)))
+    
+    def _call_with_retry(
+        self,
+        call: Callable[[Any], Any],
+        item: Any,
+        index: int,
+        retries: int,
+        retry_delay: float,
+        result_key: str = "shipment",
+        attempt: Optional[Callable[..., Tuple[Any, Optional[Exception], int]]] = None
+    ) -> Dict[str, Any]:
+        """
+        Call with retries on transient errors; never raises.
+        
+        Returns:
+            Result dictionary with index, result_key, error and attempts
+        """
+        result, error, attempts = (attempt or self._attempt)(call, item, retries, retry_delay)
+        if error is None:
+            return {"index": index, result_key: result, "error": None, "attempts": attempts}
+        
+        return {
+            "index": index,
+            result_key: None,
+            "error": {
+                "type": type(error).__name__,
+                "message": str(error),
+                "http_status": getattr(error, "http_status", None),
+            },
+            "attempts": attempts,
+        }
+    
+    def _attempt(
+        self,
+        call: Callable[[Any], Any],
+        item: Any,
+        retries: int,
+        retry_delay: float
+    ) -> Tuple[Any, Optional[Exception], int]:
+        """
+        Call with retries on transient errors.
+        
+        Backoff follows retry_policy with retry_delay as the base delay.
+        Calls rejected by an open circuit are not retried.
+        
+        Returns:
+            Tuple of (result, final error or None, attempts made)
+        """
+        attempts = 0
+        while True:
+            attempts += 1
+            try:
+                return call(item), None, attempts
+            except RETRYABLE_ERRORS as e:
+                # The SDK wraps session errors, so an open circuit shows up as the context
+                if isinstance(e.__context__, CircuitOpenError):
+                    return None, e.__context__, attempts
+                if attempts > retries:
+                    return None, e, attempts
+                with self._cache_lock:
+                    self._call_retries += 1
+                time.sleep(self.retry_policy.delay(attempts, retry_delay))
+            except Exception as e:
+                return None, e, attempts
+    
+    def _attempt_buy(
+        self,
+        purchase: Callable[[Any], Tuple[Union[str, Shipment], Optional[str]]],
+        item: Any,
+        retries: int,
+        retry_delay: float
+    ) -> Tuple[Optional[Shipment], Optional[Exception], int]:
+        """
+        Purchase with retries, never buying a shipment twice.
+        
+        purchase(item) gives the (shipment, rate_id) to buy. After an API
+        error the shipment is retrieved: a label means the purchase went
+        through; no label and a transient error means it is safe to retry.
+        
+        Returns:
+            Tuple of (purchased Shipment, final error or None, purchase attempts made)
+        """
+        shipment, rate_id = purchase(item)
+        shipment_id = shipment if isinstance(shipment, str) else shipment.id
+        attempts = 0
+        while True:
+            attempts += 1
+            try:
+                return self.buy_shipment(shipment, rate_id), None, attempts
+            except EasyPostError as e:
+                error = e
+            except Exception as e:
+                return None, e, attempts
+            # An open circuit rejected the call before it was sent
+            if isinstance(error.__context__, CircuitOpenError):
+                return None, error.__context__, attempts
+            
+            # The label may have been sold even though the call failed
+            current, retrieve_error, _ = self._attempt(
+                lambda _: self.retrieve_shipment(shipment_id), None, retries, retry_delay
+            )
+            if current is not None and current.postage_label:
+                return current, None, attempts
+            if retrieve_error is not None or not isinstance(error, RETRYABLE_ERRORS) or attempts > retries:
+                return None, error, attempts
+            with self._cache_lock:
+                self._call_retries += 1
+            time.sleep(self.retry_policy.delay(attempts, retry_delay))
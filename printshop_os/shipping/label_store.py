@@ -0,0 +1,487 @@
+"""
+Label Store for PrintShop OS
+
+EasyPost only hands back a URL for a purchased label, so every print and
+reprint used to download it again. LabelStore downloads each shipment's
+label once (label_pdf_url when EasyPost provides one, else label_url),
+keeps it content-addressed by SHA-256 on local disk or in MinIO, and
+pre-renders the thermal printer version with LabelFormatter in the
+background. Reprints are then a local read.
+
+Blob layout (keys are the same on disk and in MinIO):
+- labels/<aa>/<sha256>.<ext>: The label as downloaded (pdf, png or zpl)
+- thermal/<aa>/<sha256>.<format>: Thermal rendering of that label,
+  keyed by the downloaded label's digest
+
+A small SQLite index maps shipment IDs to label digests.
+
+Environment Variables:
+- EASYPOST_LABEL_DIR: Directory for stored labels and the index
+  (default: data/labels); EasyPostClient stores purchased labels there
+  when set
+- MINIO_ENDPOINT, MINIO_ACCESS_KEY, MINIO_SECRET_KEY, MINIO_BUCKET,
+  MINIO_USE_SSL: MinIO connection for MinioBlobStore.from_env()
+"""
+
+import hashlib
+import io
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+import requests
+
+from .models import Shipment
+
+# Background download and render threads
+LABEL_STORE_WORKERS = 2
+
+# Seconds to wait for a label download
+DOWNLOAD_TIMEOUT = 30.0
+
+# Output format of the pre-rendered thermal label (see LabelFormatter)
+THERMAL_FORMAT = "zpl"
+
+
+def label_extension(data: bytes, url: str = "") -> str:
+    """
+    Detect a downloaded label's file type.
+    
+    Args:
+        data: Label bytes
+        url: URL the label was downloaded from, used when the content is
+             not recognized
+    
+    Returns:
+        File extension without the dot ('pdf', 'png', 'zpl', ...)
+    """
+    if data.startswith(b"%PDF"):
+        return "pdf"
+    if data.startswith(b"\x89PNG"):
+        return "png"
+    if data.lstrip().startswith(b"^XA"):
+        return "zpl"
+    suffix = Path(url.split("?")[0]).suffix.lstrip(".").lower()
+    return suffix or "bin"
+
+
+class FileBlobStore:
+    """
+    Blob storage in a local directory.
+    
+    Writes are atomic (temporary file, then rename), so concurrent writers
+    of the same content-addressed key never expose a partial file.
+    
+    Attributes:
+        root (Path): Directory holding the blobs
+    """
+    
+    def __init__(self, root: Union[str, Path]):
+        """
+        Initialize the blob store.
+        
+        Args:
+            root: Directory for blobs (created if missing)
+        """
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+    
+    def get(self, key: str) -> Optional[bytes]:
+        """Blob bytes, or None if the key is not stored."""
+        try:
+            return (self.root / key).read_bytes()
+        except FileNotFoundError:
+            return None
+    
+    def put(self, key: str, data: bytes) -> None:
+        """Store a blob."""
+        path = self.root / key
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+    
+    def exists(self, key: str) -> bool:
+        """Whether a blob is stored under the key."""
+        return (self.root / key).is_file()
+
+
+class MinioBlobStore:
+    """
+    Blob storage in a MinIO (S3-compatible) bucket.
+    
+    Attributes:
+        client (minio.Minio): MinIO client
+        bucket (str): Bucket holding the blobs
+    """
+    
+    def __init__(self, client, bucket: str):
+        """
+        Initialize the blob store.
+        
+        Args:
+            client: minio.Minio client
+            bucket: Bucket name (created if missing)
+        """
+        self.client = client
+        self.bucket = bucket
+        if not client.bucket_exists(bucket):
+            client.make_bucket(bucket)
+    
+    @classmethod
+    def from_env(cls) -> "MinioBlobStore":
+        """
+        Connect using the MINIO_* environment variables.
+        
+        Raises:
+            ImportError: If the minio package is not installed
+        """
+        from minio import Minio
+        
+        client = Minio(
+            os.getenv("MINIO_ENDPOINT", "localhost:9000"),
+            access_key=os.getenv("MINIO_ACCESS_KEY"),
+            secret_key=os.getenv("MINIO_SECRET_KEY"),
+            secure=os.getenv("MINIO_USE_SSL", "false").lower() == "true",
+        )
+        return cls(client, os.getenv("MINIO_BUCKET", "printshop"))
+    
+    def get(self, key: str) -> Optional[bytes]:
+        """Blob bytes, or None if the key is not stored."""
+        from minio.error import S3Error
+        
+        try:
+            response = self.client.get_object(self.bucket, key)
+        except S3Error as e:
+            if e.code == "NoSuchKey":
+                return None
+            raise
+        try:
+            return response.read()
+        finally:
+            response.close()
+            response.release_conn()
+    
+    def put(self, key: str, data: bytes) -> None:
+        """Store a blob."""
+        self.client.put_object(self.bucket, key, io.BytesIO(data), len(data))
+    
+    def exists(self, key: str) -> bool:
+        """Whether a blob is stored under the key."""
+        from minio.error import S3Error
+        
+        try:
+            self.client.stat_object(self.bucket, key)
+        except S3Error as e:
+            if e.code == "NoSuchKey":
+                return False
+            raise
+        return True
+
+
+class LabelStore:
+    """
+    Downloads purchased labels once and serves prints and reprints locally.
+    
+    Thread-safe. Labels are stored content-addressed, so identical label
+    files are kept once, and saving a shipment twice (even concurrently)
+    is harmless.
+    
+    Attributes:
+        blobs (FileBlobStore | MinioBlobStore): Label storage
+        index_path (str): SQLite index file, or ':memory:'
+        thermal_format (str): LabelFormatter output format pre-rendered
+                              for thermal printers
+        timeout (float): Download timeout in seconds
+    """
+    
+    def __init__(
+        self,
+        root: Optional[Union[str, Path]] = None,
+        blobs: Optional[Any] = None,
+        index: Optional[Union[str, Path]] = None,
+        formatter: Optional[Any] = None,
+        thermal_format: str = THERMAL_FORMAT,
+        workers: int = LABEL_STORE_WORKERS,
+        timeout: float = DOWNLOAD_TIMEOUT
+    ):
+        """
+        Open (or create) the label store.
+        
+        Args:
+            root: Directory for labels and the index. If not provided, reads
+                  EASYPOST_LABEL_DIR, defaulting to data/labels.
+            blobs: Blob storage (e.g. MinioBlobStore.from_env()). If not
+                   provided, labels are stored in root.
+            index: SQLite index file (default: index.sqlite3 in root)
+            formatter: LabelFormatter used for thermal renders. If not
+                       provided, a default LabelFormatter is created.
+            thermal_format: Output format to pre-render (default: 'zpl')
+            workers: Background download/render threads (default: 2)
+            timeout: Download timeout in seconds (default: 30)
+        """
+        root = Path(root or os.getenv("EASYPOST_LABEL_DIR", "data/labels"))
+        self.blobs = blobs or FileBlobStore(root)
+        self.index_path = str(index or root / "index.sqlite3")
+        self.thermal_format = thermal_format
+        self.timeout = timeout
+        
+        if formatter is None:
+            from ..labels import LabelFormatter
+            formatter = LabelFormatter()
+        self._formatter = formatter
+        
+        if self.index_path != ":memory:":
+            Path(self.index_path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.index_path, check_same_thread=False)
+        with self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS labels ("
+                "shipment_id TEXT PRIMARY KEY, tracking_code TEXT, digest TEXT NOT NULL, "
+                "ext TEXT NOT NULL, source_url TEXT, stored_at REAL NOT NULL)"
+            )
+        
+        self._session = requests.Session()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="label-store")
+        # Shipment ID -> pending prefetch, label digest -> pending thermal render
+        self._saves: Dict[str, Future] = {}
+        self._renders: Dict[str, Future] = {}
+        self._counters = {"downloads": 0, "reads": 0, "renders": 0, "render_errors": 0}
+    
+    def save(self, shipment: Shipment, render: bool = True) -> Dict[str, Any]:
+        """
+        Download and store a purchased shipment's label, once.
+        
+        Args:
+            shipment: Purchased Shipment (see EasyPostClient.buy_shipment)
+            render: Queue the thermal render in the background
+        
+        Returns:
+            Index record with shipment_id, tracking_code, digest, ext,
+            source_url and stored_at
+        
+        Raises:
+            ValueError: If the shipment has no label
+            requests.RequestException: If the download fails
+        
+        Example:
+            >>> store = LabelStore()
+            >>> store.save(client.buy_shipment(shipment))
+        """
+        record = self.record(shipment.id)
+        if record is None:
+            label = shipment.postage_label
+            url = label and (label.label_pdf_url or label.label_url)
+            if not url:
+                raise ValueError(f"Shipment {shipment.id} has no label")
+            
+            response = self._session.get(url, timeout=self.timeout)
+            response.raise_for_status()
+            data = response.content
+            self._count("downloads")
+            
+            digest = hashlib.sha256(data).hexdigest()
+            ext = label_extension(data, url)
+            key = self._label_key(digest, ext)
+            if not self.blobs.exists(key):
+                self.blobs.put(key, data)
+            
+            record = {
+                "shipment_id": shipment.id,
+                "tracking_code": shipment.tracking_code,
+                "digest": digest,
+                "ext": ext,
+                "source_url": url,
+                "stored_at": time.time(),
+            }
+            with self._lock, self._db:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO labels (shipment_id, tracking_code, digest, ext, source_url, stored_at) "
+                    "VALUES (:shipment_id, :tracking_code, :digest, :ext, :source_url, :stored_at)",
+                    record
+                )
+        
+        if render:
+            self._render_async(record)
+        return record
+    
+    def prefetch(self, shipment: Shipment) -> Future:
+        """
+        Save a shipment's label in the background.
+        
+        get() and get_thermal() wait for a prefetch still in progress
+        instead of failing or downloading again.
+        
+        Returns:
+            Future resolving to the index record (or raising the download error)
+        """
+        with self._lock:
+            future = self._saves.get(shipment.id)
+            if future is None:
+                future = self._executor.submit(self.save, shipment)
+                self._saves[shipment.id] = future
+        future.add_done_callback(lambda done: self._forget_save(shipment.id, done))
+        return future
+    
+    def record(self, shipment_id: str) -> Optional[Dict[str, Any]]:
+        """Index record for a shipment, or None if its label is not stored."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT shipment_id, tracking_code, digest, ext, source_url, stored_at "
+                "FROM labels WHERE shipment_id = ?", (shipment_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(("shipment_id", "tracking_code", "digest", "ext", "source_url", "stored_at"), row))
+    
+    def get(self, shipment: Union[str, Shipment]) -> bytes:
+        """
+        The label as downloaded from EasyPost.
+        
+        Args:
+            shipment: Shipment ID, or a purchased Shipment (downloaded on
+                      first use if it is not stored yet)
+        
+        Returns:
+            Label bytes (see record()["ext"] for the type)
+        
+        Raises:
+            KeyError: If no label is stored for the shipment ID
+        """
+        record = self._require(shipment)
+        self._count("reads")
+        return self._read(self._label_key(record["digest"], record["ext"]))
+    
+    def get_thermal(self, shipment: Union[str, Shipment]) -> bytes:
+        """
+        The label formatted for the thermal printer.
+        
+        Returns the pre-rendered label; waits for a render still in
+        progress, or renders now if none was queued. Labels EasyPost
+        already delivered in thermal_format are returned as downloaded.
+        
+        Args:
+            shipment: Shipment ID, or a purchased Shipment
+        
+        Returns:
+            Label bytes in thermal_format
+        
+        Raises:
+            KeyError: If no label is stored for the shipment ID
+            ValueError: If the label cannot be formatted
+        
+        Example:
+            >>> zpl = store.get_thermal("shp_123456")
+            >>> printer.send(zpl)
+        """
+        record = self._require(shipment)
+        if record["ext"] == self.thermal_format:
+            return self.get(record["shipment_id"])
+        
+        self._count("reads")
+        data = self.blobs.get(self._thermal_key(record["digest"]))
+        if data is not None:
+            return data
+        return self._render_async(record).result()
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get label store statistics.
+        
+        Returns:
+            Dictionary with stored labels, downloads, local reads, thermal
+            renders, failed renders and renders still pending
+        """
+        with self._lock:
+            labels = self._db.execute("SELECT COUNT(*) FROM labels").fetchone()[0]
+            pending = sum(1 for future in self._renders.values() if not future.done())
+            return dict(self._counters, labels=labels, pending_renders=pending)
+    
+    def close(self) -> None:
+        """Wait for background work and close the index."""
+        self._executor.shutdown(wait=True)
+        self._session.close()
+        with self._lock:
+            self._db.close()
+    
+    @staticmethod
+    def _label_key(digest: str, ext: str) -> str:
+        return f"labels/{digest[:2]}/{digest}.{ext}"
+    
+    def _thermal_key(self, digest: str) -> str:
+        return f"thermal/{digest[:2]}/{digest}.{self.thermal_format}"
+    
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            self._counters[counter] += 1
+    
+    def _require(self, shipment: Union[str, Shipment]) -> Dict[str, Any]:
+        """Index record for a shipment, saving a Shipment's label if needed."""
+        shipment_id = shipment.id if isinstance(shipment, Shipment) else shipment
+        record = self.record(shipment_id)
+        if record is not None:
+            return record
+        
+        with self._lock:
+            pending = self._saves.get(shipment_id)
+        if pending is not None:
+            try:
+                return pending.result()
+            except Exception:
+                # Fall through: a Shipment is downloaded again below
+                pass
+        
+        if isinstance(shipment, Shipment):
+            return self.save(shipment)
+        raise KeyError(f"No label stored for shipment {shipment_id}")
+    
+    def _forget_save(self, shipment_id: str, future: Future) -> None:
+        with self._lock:
+            if self._saves.get(shipment_id) is future:
+                del self._saves[shipment_id]
+    
+    def _read(self, key: str) -> bytes:
+        data = self.blobs.get(key)
+        if data is None:
+            raise KeyError(f"Label blob {key} is missing from the store")
+        return data
+    
+    def _render_async(self, record: Dict[str, Any]) -> Future:
+        """Queue the thermal render for a label, once per label digest."""
+        digest = record["digest"]
+        with self._lock:
+            future = self._renders.get(digest)
+            # A failed render is retried on the next request
+            if future is not None and not (future.done() and future.exception()):
+                return future
+            if record["ext"] == self.thermal_format:
+                future = Future()
+                future.set_result(None)
+                return future
+            future = self._executor.submit(self._render, record)
+            self._renders[digest] = future
+        return future
+    
+    def _render(self, record: Dict[str, Any]) -> bytes:
+        key = self._thermal_key(record["digest"])
+        data = self.blobs.get(key)
+        if data is None:
+            try:
+                data = self._formatter.process_bytes(
+                    self._read(self._label_key(record["digest"], record["ext"])),
+                    output_format=self.thermal_format
+                )
+            except Exception:
+                self._count("render_errors")
+                raise
+            self.blobs.put(key, data)
+            self._count("renders")
+        
+        with self._lock:
+            self._renders.pop(record["digest"], None)
+        return data
@@ -0,0 +1,282 @@
+"""
+Shipping Result Models for PrintShop OS
+
+Compact result types returned by EasyPostClient. Each is a slotted
+dataclass (no per-instance __dict__), so holding thousands of shipments
+during a batch run costs a fraction of the equivalent nested
+dictionaries. Only primitive fields are copied out of the SDK objects, so
+no SDK object outlives from_sdk(). Call to_dict() when a JSON-ready
+dictionary is needed.
+
+EasyPostClient used to return these results as dictionaries. For callers
+written against that, every model is also a read-only Mapping over its
+to_dict() keys (shipment["id"], rates[0]["carrier"]); that access is
+deprecated and emits a DeprecationWarning.
+"""
+
+import warnings
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+
+def _field(obj, name: str) -> Any:
+    """Read a field of an SDK object or of a plain dictionary."""
+    if isinstance(obj, dict):
+        return obj.get(name)
+    return getattr(obj, name, None)
+
+
+class _DictAccess(Mapping):
+    """
+    Deprecated dictionary-style access to a model's to_dict() keys.
+    
+    model["key"] returns model.to_dict()["key"], so nested values are
+    plain dictionaries, as EasyPostClient returned them before the models.
+    Use attributes instead.
+    """
+    
+    __slots__ = ()
+    
+    def __getitem__(self, key: str) -> Any:
+        """Look up a to_dict() key, with a DeprecationWarning."""
+        warnings.warn(
+            f"{type(self).__name__}[{key!r}] is deprecated; use attributes or to_dict()",
+            DeprecationWarning,
+            stacklevel=2,
+        )
+        return self.to_dict()[key]
+    
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the to_dict() keys."""
+        return iter(self.to_dict())
+    
+    def __len__(self) -> int:
+        """Number of to_dict() keys."""
+        return len(self.to_dict())
+    
+    def __contains__(self, key: object) -> bool:
+        """Whether key is a to_dict() key."""
+        return key in self.to_dict()
+
+
+@dataclass(slots=True)
+class Rate(_DictAccess):
+    """A carrier rate quote for a shipment."""
+    
+    id: str
+    carrier: str
+    service: str
+    rate: str
+    currency: str = "USD"
+    delivery_days: Optional[int] = None
+    delivery_date: Optional[str] = None
+    delivery_date_guaranteed: Optional[bool] = None
+    
+    @classmethod
+    def from_sdk(cls, rate) -> "Rate":
+        """Build from an EasyPost rate object."""
+        return cls(
+            id=rate.id,
+            carrier=rate.carrier,
+            service=rate.service,
+            rate=rate.rate,
+            currency=getattr(rate, "currency", "USD"),
+            delivery_days=getattr(rate, "delivery_days", None),
+            delivery_date=getattr(rate, "delivery_date", None),
+            delivery_date_guaranteed=getattr(rate, "delivery_date_guaranteed", None),
+        )
+    
+    @property
+    def price(self) -> float:
+        """The rate as a number."""
+        return float(self.rate)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Dictionary representation."""
+        return {
+            "id": self.id,
+            "carrier": self.carrier,
+            "service": self.service,
+            "rate": self.rate,
+            "currency": self.currency,
+            "delivery_days": self.delivery_days,
+            "delivery_date": self.delivery_date,
+            "delivery_date_guaranteed": self.delivery_date_guaranteed,
+        }
+
+
+@dataclass(slots=True)
+class Label(_DictAccess):
+    """A purchased postage label."""
+    
+    id: str
+    label_url: Optional[str]
+    label_pdf_url: Optional[str] = None
+    label_size: Optional[str] = None
+    label_type: Optional[str] = None
+    
+    @classmethod
+    def from_sdk(cls, label) -> "Label":
+        """Build from an EasyPost postage label object."""
+        return cls(
+            id=label.id,
+            label_url=label.label_url,
+            label_pdf_url=getattr(label, "label_pdf_url", None),
+            label_size=getattr(label, "label_size", None),
+            label_type=getattr(label, "label_type", None),
+        )
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Dictionary representation."""
+        return {
+            "id": self.id,
+            "label_url": self.label_url,
+            "label_pdf_url": self.label_pdf_url,
+            "label_size": self.label_size,
+            "label_type": self.label_type,
+        }
+
+
+@dataclass(slots=True)
+class Shipment(_DictAccess):
+    """
+    An EasyPost shipment.
+    
+    Rates are converted to Rate objects eagerly in from_sdk(), not on first
+    access: keeping the SDK rate objects alive until then retained more
+    memory than the converted tuple does.
+    """
+    
+    id: str
+    tracking_code: Optional[str]
+    status: Optional[str]
+    created_at: Optional[str] = None
+    updated_at: Optional[str] = None
+    postage_label: Optional[Label] = None
+    selected_rate: Optional[Rate] = None
+    rates: Tuple[Rate, ...] = ()
+    
+    @classmethod
+    def from_sdk(cls, shipment) -> "Shipment":
+        """Build from an EasyPost shipment object."""
+        label = getattr(shipment, "postage_label", None)
+        selected = getattr(shipment, "selected_rate", None)
+        return cls(
+            id=shipment.id,
+            tracking_code=getattr(shipment, "tracking_code", None),
+            status=getattr(shipment, "status", None),
+            created_at=getattr(shipment, "created_at", None),
+            updated_at=getattr(shipment, "updated_at", None),
+            postage_label=Label.from_sdk(label) if label else None,
+            selected_rate=Rate.from_sdk(selected) if selected else None,
+            rates=tuple(Rate.from_sdk(rate) for rate in (getattr(shipment, "rates", None) or ())),
+        )
+    
+    def lowest_rate(self) -> Optional[Rate]:
+        """The cheapest rate, or None if the shipment has no rates."""
+        return min(self.rates, key=lambda rate: rate.price, default=None)
+    
+    def find_rate(self, rate_id: str) -> Optional[Rate]:
+        """The rate with this ID, or None."""
+        return next((rate for rate in self.rates if rate.id == rate_id), None)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Dictionary representation (rates, label and selected rate only when present)."""
+        result = {
+            "id": self.id,
+            "tracking_code": self.tracking_code,
+            "status": self.status,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
+        if self.rates:
+            result["rates"] = [rate.to_dict() for rate in self.rates]
+        if self.postage_label:
+            result["postage_label"] = self.postage_label.to_dict()
+        if self.selected_rate:
+            result["selected_rate"] = self.selected_rate.to_dict()
+        return result
+
+
+@dataclass(slots=True)
+class TrackingEvent(_DictAccess):
+    """One scan or status event in a package's tracking history."""
+    
+    message: Optional[str]
+    status: Optional[str]
+    datetime: Optional[str]
+    city: Optional[str] = None
+    state: Optional[str] = None
+    country: Optional[str] = None
+    
+    @classmethod
+    def from_sdk(cls, detail) -> "TrackingEvent":
+        """Build from an EasyPost tracking detail object or its dictionary form."""
+        location = _field(detail, "tracking_location")
+        return cls(
+            message=_field(detail, "message"),
+            status=_field(detail, "status"),
+            datetime=_field(detail, "datetime"),
+            city=_field(location, "city") if location else None,
+            state=_field(location, "state") if location else None,
+            country=_field(location, "country") if location else None,
+        )
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Dictionary representation (tracking_location is None when no location is known)."""
+        has_location = self.city or self.state or self.country
+        return {
+            "message": self.message,
+            "status": self.status,
+            "datetime": self.datetime,
+            "tracking_location": {
+                "city": self.city,
+                "state": self.state,
+                "country": self.country,
+            } if has_location else None,
+        }
+
+
+@dataclass(slots=True)
+class Tracker(_DictAccess):
+    """A package tracker and its tracking history."""
+    
+    id: str
+    tracking_code: str
+    status: Optional[str]
+    status_detail: Optional[str] = None
+    est_delivery_date: Optional[str] = None
+    carrier: Optional[str] = None
+    public_url: Optional[str] = None
+    updated_at: Optional[str] = None
+    events: Tuple[TrackingEvent, ...] = ()
+    
+    @classmethod
+    def from_sdk(cls, tracker) -> "Tracker":
+        """
+        Build from an EasyPost tracker object, or its dictionary form (the
+        result of a tracker webhook event).
+        """
+        return cls(
+            id=_field(tracker, "id"),
+            tracking_code=_field(tracker, "tracking_code"),
+            status=_field(tracker, "status"),
+            status_detail=_field(tracker, "status_detail"),
+            est_delivery_date=_field(tracker, "est_delivery_date"),
+            carrier=_field(tracker, "carrier"),
+            public_url=_field(tracker, "public_url"),
+            updated_at=_field(tracker, "updated_at"),
+            events=tuple(TrackingEvent.from_sdk(detail) for detail in (_field(tracker, "tracking_details") or ())),
+        )
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Dictionary representation, with the events as tracking_details."""
+        return {
+            "id": self.id,
+            "tracking_code": self.tracking_code,
+            "status": self.status,
+            "status_detail": self.status_detail,
+            "est_delivery_date": self.est_delivery_date,
+            "tracking_details": [event.to_dict() for event in self.events],
+        }
@@ -0,0 +1,509 @@
+"""
+Ship-Day Pipeline for PrintShop OS
+
+Runs a file of orders through create -> rate select -> buy -> download ->
+format as a streaming pipeline. Each stage has its own thread pool sized
+for its bottleneck (API latency for create and buy, the label host for
+downloads, CPU for formatting), and an order moves to the next stage as
+soon as it leaves the previous one, so purchases, downloads and
+formatting overlap instead of running as separate passes. At most window
+orders are in flight, so memory stays flat for any input size.
+
+Progress is appended to a JSONL checkpoint: the shipment ID is written
+before the label is bought, and the label URLs after. A rerun with the
+same checkpoint skips finished orders, resumes purchased ones at the
+download stage, and retrieves created ones from EasyPost before buying,
+so no label is ever bought twice; orders that failed before a shipment
+was created are retried from the start.
+
+Purchases are never retried blindly. When a buy call fails, the response
+may have been lost after EasyPost sold the label, so the shipment is
+retrieved first and its label used if it has one.
+
+Orders are CSV rows or JSONL objects with an order_id, the recipient
+address (nested under to_address, or as flat name/street1/city/... columns)
+and the parcel (nested under parcel, or as flat length/width/height/weight
+columns). An order may carry its own from_address and options.
+"""
+
+import csv
+import json
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+
+from .easypost_client import DEFAULT_BULK_RETRIES, DEFAULT_RETRY_DELAY, EasyPostClient
+from .label_store import LabelStore
+from .models import Label, Shipment
+from .rate_shopping import select_rate
+
+STAGES = ("create", "buy", "download", "format")
+
+# Worker threads per stage
+DEFAULT_STAGE_WORKERS = {"create": 8, "buy": 8, "download": 4, "format": 2}
+
+# Orders in flight across all stages
+DEFAULT_WINDOW = 64
+
+ADDRESS_FIELDS = ("name", "company", "street1", "street2", "city", "state", "zip", "country", "phone", "email")
+PARCEL_FIELDS = ("length", "width", "height", "weight", "predefined_package")
+
+
+def read_orders(path: Union[str, Path]) -> Iterator[Dict[str, Any]]:
+    """
+    Stream raw order rows from a CSV or JSONL file.
+    
+    Args:
+        path: .csv file with a header row, or .jsonl/.ndjson file with one
+              JSON object per line
+    
+    Yields:
+        One dictionary per order, as read (see normalize_order)
+    """
+    path = Path(path)
+    with open(path, newline="") as f:
+        if path.suffix.lower() == ".csv":
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def normalize_order(row: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convert a raw order row to create_shipment() arguments.
+    
+    Empty CSV cells are dropped and parcel dimensions are converted to
+    numbers.
+    
+    Args:
+        row: Order from read_orders()
+    
+    Returns:
+        Dictionary with order_id, to_address, parcel and, when given,
+        from_address and options
+    
+    Raises:
+        ValueError: If the order ID, address or parcel weight is missing
+    """
+    order_id = str(row.get("order_id") or "").strip()
+    if not order_id:
+        raise ValueError("Order is missing order_id")
+    
+    to_address = row.get("to_address") or {field: row.get(field) for field in ADDRESS_FIELDS}
+    to_address = {key: value for key, value in to_address.items() if value not in (None, "")}
+    if not to_address.get("street1") or not to_address.get("zip"):
+        raise ValueError(f"Order {order_id} is missing street1 or zip")
+    
+    parcel = row.get("parcel") or {field: row.get(field) for field in PARCEL_FIELDS}
+    parcel = {key: value for key, value in parcel.items() if value not in (None, "")}
+    if "weight" not in parcel:
+        raise ValueError(f"Order {order_id} is missing the parcel weight")
+    for side in ("length", "width", "height", "weight"):
+        if side in parcel:
+            parcel[side] = float(parcel[side])
+    
+    order = {"order_id": order_id, "to_address": to_address, "parcel": parcel}
+    for key in ("from_address", "options"):
+        if row.get(key):
+            order[key] = row[key]
+    return order
+
+
+class Checkpoint:
+    """
+    Append-only JSONL log of pipeline progress, keyed by order ID.
+    
+    Each line is a record with order_id and stage ('created', 'bought' or
+    'done');
+    the last record for an order wins. Thread-safe, and every record is
+    flushed as it is written, so a crash loses at most the order in
+    progress.
+    
+    Attributes:
+        path (Path): Checkpoint file
+    """
+    
+    def __init__(self, path: Union[str, Path]):
+        """
+        Open a checkpoint, loading any records already in it.
+        
+        Args:
+            path: Checkpoint file (created if missing)
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._records: Dict[str, Dict[str, Any]] = {}
+        if self.path.exists():
+            with open(self.path) as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # A line cut short by a crash
+                        continue
+                    self._records[record["order_id"]] = record
+        self._file = open(self.path, "a")
+    
+    def get(self, order_id: str) -> Optional[Dict[str, Any]]:
+        """Latest record for an order, or None."""
+        with self._lock:
+            return self._records.get(order_id)
+    
+    def write(self, record: Dict[str, Any]) -> None:
+        """Append a record."""
+        with self._lock:
+            self._records[record["order_id"]] = record
+            self._file.write(json.dumps(record) + "\n")
+            self._file.flush()
+    
+    def close(self) -> None:
+        """Close the checkpoint file."""
+        with self._lock:
+            self._file.close()
+
+
+@dataclass
+class OrderResult:
+    """Outcome of one order in a pipeline run."""
+    
+    order_id: str
+    status: str = "done"
+    stage: Optional[str] = None
+    shipment_id: Optional[str] = None
+    tracking_code: Optional[str] = None
+    rate: Optional[str] = None
+    output: Optional[Path] = None
+    error: Optional[str] = None
+    elapsed: float = 0.0
+    
+    @property
+    def ok(self) -> bool:
+        """True if the order finished (now or in an earlier run)."""
+        return self.status in ("done", "skipped")
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the result to a JSON-serializable dictionary."""
+        return {
+            "order_id": self.order_id,
+            "status": self.status,
+            "stage": self.stage,
+            "shipment_id": self.shipment_id,
+            "tracking_code": self.tracking_code,
+            "rate": self.rate,
+            "output": str(self.output) if self.output else None,
+            "error": self.error,
+            "elapsed": round(self.elapsed, 4),
+        }
+
+
+@dataclass
+class PipelineReport:
+    """Structured report for a pipeline run, in input order."""
+    
+    results: List[OrderResult] = field(default_factory=list)
+    elapsed: float = 0.0
+    stages: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    
+    @property
+    def succeeded(self) -> List[OrderResult]:
+        """Orders finished in this run."""
+        return [r for r in self.results if r.status == "done"]
+    
+    @property
+    def skipped(self) -> List[OrderResult]:
+        """Orders already finished in an earlier run."""
+        return [r for r in self.results if r.status == "skipped"]
+    
+    @property
+    def failed(self) -> List[OrderResult]:
+        """Orders that failed; see each result's stage and error."""
+        return [r for r in self.results if r.status == "failed"]
+    
+    @property
+    def orders_per_second(self) -> float:
+        """Throughput of orders finished in this run."""
+        return len(self.succeeded) / self.elapsed if self.elapsed else 0.0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the report to a JSON-serializable dictionary."""
+        return {
+            "total": len(self.results),
+            "succeeded": len(self.succeeded),
+            "skipped": len(self.skipped),
+            "failed": len(self.failed),
+            "elapsed": round(self.elapsed, 4),
+            "orders_per_second": round(self.orders_per_second, 2),
+            "stages": self.stages,
+            "results": [r.to_dict() for r in self.results],
+        }
+
+
+class ShipPipeline:
+    """
+    Streaming create -> rate select -> buy -> download -> format pipeline.
+    
+    Attributes:
+        client (EasyPostClient): Client for shipment creation and purchase
+        label_store (LabelStore): Store labels are downloaded to
+        output_dir (Path): Directory formatted labels are written to
+        output_format (str): LabelFormatter output format
+        policy (str): Rate selection policy (see rate_shopping.POLICIES)
+        max_days (int): Delivery day limit for the cheapest_within policy
+        workers (dict): Worker threads per stage
+        window (int): Maximum orders in flight
+    """
+    
+    def __init__(
+        self,
+        client: EasyPostClient,
+        label_store: LabelStore,
+        output_dir: Union[str, Path],
+        from_address: Optional[Dict[str, Any]] = None,
+        output_format: str = "zpl",
+        policy: str = "cheapest",
+        max_days: Optional[int] = None,
+        formatter: Optional[Any] = None,
+        workers: Optional[Dict[str, int]] = None,
+        window: int = DEFAULT_WINDOW,
+        checkpoint: Optional[Checkpoint] = None,
+        retries: int = DEFAULT_BULK_RETRIES,
+        retry_delay: float = DEFAULT_RETRY_DELAY
+    ):
+        """
+        Initialize the pipeline.
+        
+        Args:
+            client: EasyPostClient for creating and buying shipments
+            label_store: LabelStore labels are downloaded to (reprints
+                         later come from the same store)
+            output_dir: Directory for formatted labels, named <order_id>.<format>
+            from_address: Sender address for orders without their own
+            output_format: Output format ('pdf', 'png', 'zpl' or 'epl')
+            policy: Rate selection policy (default: 'cheapest')
+            max_days: Delivery day limit for 'cheapest_within'
+            formatter: LabelFormatter. If not provided, a default one is created.
+            workers: Worker threads per stage, overriding DEFAULT_STAGE_WORKERS
+            window: Maximum orders in flight (default: 64)
+            checkpoint: Progress log to resume from and append to
+            retries: API retries per order on transient errors
+            retry_delay: Base retry delay in seconds (doubles each retry, with jitter)
+        
+        Raises:
+            ValueError: If a stage has fewer than one worker or window < 1
+        """
+        self.client = client
+        self.label_store = label_store
+        self.output_dir = Path(output_dir)
+        self.from_address = from_address
+        self.output_format = output_format
+        self.policy = policy
+        self.max_days = max_days
+        self.workers = dict(DEFAULT_STAGE_WORKERS, **(workers or {}))
+        self.window = window
+        self.checkpoint = checkpoint
+        self.retries = retries
+        self.retry_delay = retry_delay
+        
+        if min(self.workers[stage] for stage in STAGES) < 1 or window < 1:
+            raise ValueError("Every stage needs at least one worker and window must be at least 1")
+        
+        if formatter is None:
+            from ..labels import LabelFormatter
+            formatter = LabelFormatter()
+        self._formatter = formatter
+        self._lock = threading.Lock()
+        self._stage_stats: Dict[str, Dict[str, float]] = {}
+        self._pools: Dict[str, ThreadPoolExecutor] = {}
+    
+    def run(self, orders: Iterable[Dict[str, Any]]) -> PipelineReport:
+        """
+        Ship every order.
+        
+        Orders are read lazily, so a generator such as read_orders() is
+        streamed. A failed order never stops the rest of the run.
+        
+        Args:
+            orders: Raw order rows (see normalize_order)
+        
+        Returns:
+            PipelineReport with one result per order, in input order
+        
+        Example:
+            >>> pipeline = ShipPipeline(EasyPostClient(), LabelStore(), "labels/",
+            ...                         from_address=shop, checkpoint=Checkpoint("ship.jsonl"))
+            >>> report = pipeline.run(read_orders("orders.csv"))
+            >>> print(f"{len(report.succeeded)} labels at {report.orders_per_second:.1f}/sec")
+        """
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self._stage_stats = {stage: {"orders": 0, "failed": 0, "busy": 0.0} for stage in STAGES}
+        self._pools = {
+            stage: ThreadPoolExecutor(max_workers=self.workers[stage], thread_name_prefix=f"ship-{stage}")
+            for stage in STAGES
+        }
+        slots = threading.BoundedSemaphore(self.window)
+        pending: List[Future] = []
+        start = time.perf_counter()
+        
+        try:
+            for row in orders:
+                slots.acquire()
+                done: Future = Future()
+                done.add_done_callback(lambda _: slots.release())
+                pending.append(done)
+                self._start(row, done)
+            results = [done.result() for done in pending]
+        finally:
+            for pool in self._pools.values():
+                pool.shutdown(wait=True)
+        
+        elapsed = time.perf_counter() - start
+        stages = {
+            stage: {
+                "workers": self.workers[stage],
+                "orders": int(stats["orders"]),
+                "failed": int(stats["failed"]),
+                "busy": round(stats["busy"], 4),
+                "avg_seconds": round(stats["busy"] / stats["orders"], 4) if stats["orders"] else 0.0,
+            }
+            for stage, stats in self._stage_stats.items()
+        }
+        return PipelineReport(results=results, elapsed=elapsed, stages=stages)
+    
+    def _start(self, row: Dict[str, Any], done: Future) -> None:
+        """Route a new order to its first stage, or finish it from the checkpoint."""
+        started = time.perf_counter()
+        try:
+            order = normalize_order(row)
+        except (ValueError, TypeError) as e:
+            order_id = str(row.get("order_id") or "") if isinstance(row, dict) else ""
+            done.set_result(OrderResult(order_id, status="failed", stage="parse", error=str(e)))
+            return
+        
+        result = OrderResult(order["order_id"])
+        record = self.checkpoint.get(result.order_id) if self.checkpoint else None
+        if record and record["stage"] == "done":
+            result.status = "skipped"
+            result.shipment_id = record["shipment_id"]
+            result.tracking_code = record["tracking_code"]
+            result.output = Path(record["output"])
+            done.set_result(result)
+        elif record and record["stage"] == "bought":
+            # Never buy twice: rebuild the purchased shipment from the checkpoint
+            shipment = Shipment(
+                id=record["shipment_id"],
+                tracking_code=record["tracking_code"],
+                status=None,
+                postage_label=Label(id="", label_url=record["label_url"], label_pdf_url=record["label_pdf_url"]),
+            )
+            result.rate = record.get("rate")
+            self._submit("download", self._download, order, result, done, started, shipment)
+        elif record and record["stage"] == "created":
+            # The purchase may have gone through before the run stopped
+            self._submit("buy", self._resume, order, result, done, started, record["shipment_id"])
+        else:
+            self._submit("create", self._create, order, result, done, started)
+    
+    def _submit(self, stage: str, step, order, result: OrderResult, done: Future, started: float, *args) -> None:
+        """Run one stage of an order on the stage's pool."""
+        def run():
+            stage_start = time.perf_counter()
+            try:
+                step(order, result, done, started, *args)
+                failed = False
+            except Exception as e:
+                result.status, result.stage, result.error = "failed", stage, str(e) or type(e).__name__
+                result.elapsed = time.perf_counter() - started
+                done.set_result(result)
+                failed = True
+            with self._lock:
+                stats = self._stage_stats[stage]
+                stats["orders"] += 1
+                stats["failed"] += failed
+                stats["busy"] += time.perf_counter() - stage_start
+        
+        self._pools[stage].submit(run)
+    
+    def _call(self, call):
+        """Call the API with the client's retry policy, raising the final error."""
+        return self.client.call_with_retry(call, self.retries, self.retry_delay)
+    
+    def _create(self, order, result: OrderResult, done: Future, started: float) -> None:
+        from_address = order.get("from_address") or self.from_address
+        if not from_address:
+            raise ValueError("No from_address for the order or the pipeline")
+        extra = {"options": order["options"]} if order.get("options") else {}
+        shipment = self._call(
+            lambda: self.client.create_shipment(from_address, order["to_address"], order["parcel"], **extra)
+        )
+        result.shipment_id = shipment.id
+        if self.checkpoint:
+            self.checkpoint.write({"order_id": result.order_id, "stage": "created", "shipment_id": shipment.id})
+        rate = select_rate(shipment.rates, self.policy, self.max_days)
+        self._submit("buy", self._buy, order, result, done, started, shipment, rate)
+    
+    def _resume(self, order, result: OrderResult, done: Future, started: float, shipment_id: str) -> None:
+        shipment = self._call(lambda: self.client.retrieve_shipment(shipment_id))
+        result.shipment_id = shipment.id
+        if shipment.postage_label:
+            self._bought(order, result, done, started, shipment)
+        else:
+            rate = select_rate(shipment.rates, self.policy, self.max_days)
+            self._buy(order, result, done, started, shipment, rate)
+    
+    def _buy(self, order, result: OrderResult, done: Future, started: float, shipment, rate) -> None:
+        # Retried only once the shipment is known to have no label
+        bought = self.client.buy_shipment_with_retry(shipment, rate.id, self.retries, self.retry_delay)
+        self._bought(order, result, done, started, bought)
+    
+    def _bought(self, order, result: OrderResult, done: Future, started: float, bought) -> None:
+        """Checkpoint a purchased shipment and send it to the download stage."""
+        result.tracking_code = bought.tracking_code
+        rate = bought.selected_rate
+        if rate:
+            result.rate = f"{rate.carrier} {rate.service} {rate.rate}"
+        if self.checkpoint:
+            label = bought.postage_label
+            self.checkpoint.write({
+                "order_id": result.order_id,
+                "stage": "bought",
+                "shipment_id": bought.id,
+                "tracking_code": bought.tracking_code,
+                "rate": result.rate,
+                "label_url": label.label_url if label else None,
+                "label_pdf_url": label.label_pdf_url if label else None,
+            })
+        self._submit("download", self._download, order, result, done, started, bought)
+    
+    def _download(self, order, result: OrderResult, done: Future, started: float, shipment) -> None:
+        result.shipment_id = shipment.id
+        result.tracking_code = shipment.tracking_code
+        record = self.label_store.record(shipment.id) or self.label_store.save(shipment, render=False)
+        data = self.label_store.get(shipment.id)
+        self._submit("format", self._format, order, result, done, started, record, data)
+    
+    def _format(self, order, result: OrderResult, done: Future, started: float, record, data: bytes) -> None:
+        if record["ext"] != self.output_format:
+            data = self._formatter.process_bytes(data, output_format=self.output_format)
+        name = re.sub(r"[^\w.-]", "_", result.order_id)
+        output = self.output_dir / f"{name}.{self.output_format}"
+        output.write_bytes(data)
+        
+        result.output = output
+        result.elapsed = time.perf_counter() - started
+        if self.checkpoint:
+            self.checkpoint.write({
+                "order_id": result.order_id,
+                "stage": "done",
+                "shipment_id": result.shipment_id,
+                "tracking_code": result.tracking_code,
+                "rate": result.rate,
+                "output": str(output),
+            })
+        done.set_result(result)
@@ -0,0 +1,290 @@
+"""
+Rate Shopping for PrintShop OS
+
+Most shipments repeat the same lanes (the shop's ZIP to a few hundred
+customer ZIPs) with a handful of standard boxes, so carrier rates for a
+lane and box barely change within a few minutes. RateShopper caches rate
+quotes keyed by (from ZIP, to ZIP, parcel profile, options) with a short
+TTL and picks a rate by policy. A live quote (an EasyPost shipment) is
+only created on a cache miss or when buying, because a label must be
+bought from a shipment with the customer's full address.
+
+Policies:
+- cheapest: Lowest price
+- fastest: Fewest delivery days (ties go to the cheaper rate)
+- cheapest_within: Lowest price delivering within max_days
+"""
+
+import json
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .easypost_client import EasyPostClient
+from .models import Rate, Shipment
+
+POLICIES = ("cheapest", "fastest", "cheapest_within")
+
+# Seconds a quote is reused for the same lane and parcel profile
+QUOTE_TTL = 600.0
+
+# Maximum number of cached lane/profile quotes
+MAX_QUOTES = 10000
+
+
+def parcel_profile(parcel: Dict[str, Any]) -> Tuple:
+    """
+    Reduce a parcel to the fields that determine its rates.
+    
+    Dimensions are rounded to 0.1 inch and weight up to the next whole
+    ounce (carriers price by the ounce), so re-weighed copies of the same
+    box share a profile. Predefined packages are identified by name.
+    
+    Args:
+        parcel: EasyPost parcel dictionary (length, width, height, weight in
+                ounces, or predefined_package and weight)
+    
+    Returns:
+        Hashable profile tuple
+    """
+    weight = math.ceil(float(parcel["weight"]))
+    if parcel.get("predefined_package"):
+        return (parcel["predefined_package"], weight)
+    dimensions = tuple(round(float(parcel.get(side) or 0), 1) for side in ("length", "width", "height"))
+    return dimensions + (weight,)
+
+
+def select_rate(
+    rates: Sequence[Rate],
+    policy: str = "cheapest",
+    max_days: Optional[int] = None
+) -> Rate:
+    """
+    Pick a rate by policy.
+    
+    Args:
+        rates: Rates to choose from
+        policy: One of POLICIES
+        max_days: Delivery day limit for 'cheapest_within'
+    
+    Returns:
+        The selected Rate
+    
+    Raises:
+        ValueError: If the policy is unknown or no rate qualifies
+    """
+    if policy not in POLICIES:
+        raise ValueError(f"Unknown rate policy: {policy}. Choose from: {', '.join(POLICIES)}")
+    if policy == "cheapest_within" and max_days is None:
+        raise ValueError("The cheapest_within policy requires max_days")
+    
+    def days(rate):
+        # Rates without an estimate sort last and never meet a deadline
+        return rate.delivery_days if rate.delivery_days is not None else math.inf
+    
+    candidates = rates
+    if policy == "cheapest_within":
+        candidates = [rate for rate in rates if days(rate) <= max_days]
+    if not candidates:
+        detail = f" delivering within {max_days} days" if policy == "cheapest_within" else ""
+        raise ValueError(f"No rate available{detail}")
+    
+    if policy == "fastest":
+        return min(candidates, key=lambda rate: (days(rate), rate.price))
+    return min(candidates, key=lambda rate: rate.price)
+
+
+class RateShopper:
+    """
+    Cached rate quotes and policy-based label purchase.
+    
+    Thread-safe; one instance can be shared by the API and bulk jobs.
+    
+    Attributes:
+        client (EasyPostClient): Client used for live quotes and purchases
+        ttl (float): Seconds a cached quote stays valid
+        max_quotes (int): Maximum number of cached quotes (LRU eviction)
+    """
+    
+    def __init__(self, client: EasyPostClient, ttl: float = QUOTE_TTL, max_quotes: int = MAX_QUOTES):
+        """
+        Initialize the rate shopper.
+        
+        Args:
+            client: EasyPostClient for live quotes and purchases
+            ttl: Seconds a cached quote stays valid (default: 600)
+            max_quotes: Maximum number of cached quotes (default: 10000)
+        """
+        self.client = client
+        self.ttl = ttl
+        self.max_quotes = max_quotes
+        
+        self._lock = threading.Lock()
+        # Quote key -> (expiry time, tuple of Rates)
+        self._quotes: OrderedDict = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+    
+    @staticmethod
+    def make_key(
+        from_address: Dict[str, Any],
+        to_address: Dict[str, Any],
+        parcel: Dict[str, Any],
+        options: Optional[Dict[str, Any]] = None
+    ) -> Tuple:
+        """
+        Build the quote cache key for a lane, parcel profile and options.
+        
+        Returns:
+            Tuple of (from ZIP5, to ZIP5, country pair, parcel profile, options JSON)
+        """
+        return (
+            str(from_address.get("zip", ""))[:5],
+            str(to_address.get("zip", ""))[:5],
+            (from_address.get("country", "US"), to_address.get("country", "US")),
+            parcel_profile(parcel),
+            json.dumps(options or {}, sort_keys=True),
+        )
+    
+    def quote(
+        self,
+        from_address: Dict[str, Any],
+        to_address: Dict[str, Any],
+        parcel: Dict[str, Any],
+        options: Optional[Dict[str, Any]] = None
+    ) -> List[Rate]:
+        """
+        Get rates for a shipment, from the cache when possible.
+        
+        On a miss a live quote is created with EasyPost and cached for the
+        lane and parcel profile.
+        
+        Args:
+            from_address: Sender address (zip and country are used for the key)
+            to_address: Recipient address
+            parcel: Parcel dimensions and weight
+            options: EasyPost shipment options that affect rates
+        
+        Returns:
+            List of Rates. Rate IDs belong to the quoting shipment and
+            cannot be used to buy another shipment.
+        
+        Raises:
+            easypost.Error: If the live quote fails
+        
+        Example:
+            >>> shopper = RateShopper(EasyPostClient())
+            >>> rates = shopper.quote(shop, customer, {"length": 10, "width": 8,
+            ...                                        "height": 4, "weight": 15.5})
+        """
+        key = self.make_key(from_address, to_address, parcel, options)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._quotes.get(key)
+            if entry and entry[0] > now:
+                self._quotes.move_to_end(key)
+                self._hits += 1
+                return list(entry[1])
+            self._misses += 1
+        
+        shipment = self._live_quote(from_address, to_address, parcel, options)
+        return list(shipment.rates)
+    
+    def shop(
+        self,
+        from_address: Dict[str, Any],
+        to_address: Dict[str, Any],
+        parcel: Dict[str, Any],
+        policy: str = "cheapest",
+        max_days: Optional[int] = None,
+        options: Optional[Dict[str, Any]] = None
+    ) -> Rate:
+        """
+        Quote a shipment and pick a rate by policy.
+        
+        Returns:
+            The selected Rate
+        
+        Raises:
+            ValueError: If the policy is unknown or no rate qualifies
+        
+        Example:
+            >>> rate = shopper.shop(shop, customer, parcel, policy="cheapest_within", max_days=3)
+            >>> print(f"{rate.carrier} {rate.service}: ${rate.rate}")
+        """
+        rates = self.quote(from_address, to_address, parcel, options)
+        return select_rate(rates, policy, max_days)
+    
+    def buy(
+        self,
+        from_address: Dict[str, Any],
+        to_address: Dict[str, Any],
+        parcel: Dict[str, Any],
+        policy: str = "cheapest",
+        max_days: Optional[int] = None,
+        options: Optional[Dict[str, Any]] = None
+    ) -> Shipment:
+        """
+        Buy a label at the rate chosen by policy from a live quote.
+        
+        Cached quotes are never used to buy: the shipment is created live
+        (refreshing the cache for its lane), the policy is applied to its
+        rates, and the label is bought from it. Two API calls in total.
+        
+        Returns:
+            The purchased Shipment (see EasyPostClient.buy_shipment)
+        
+        Raises:
+            ValueError: If the policy is unknown or no rate qualifies
+            easypost.Error: If the quote or purchase fails
+        """
+        shipment = self._live_quote(from_address, to_address, parcel, options)
+        rate = select_rate(shipment.rates, policy, max_days)
+        return self.client.buy_shipment(shipment, rate_id=rate.id)
+    
+    def clear(self) -> None:
+        """Remove all cached quotes and reset counters."""
+        with self._lock:
+            self._quotes.clear()
+            self._hits = 0
+            self._misses = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get quote cache statistics.
+        
+        Returns:
+            Dictionary with hits, misses, hit_ratio and cached quote count
+        """
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": round(self._hits / total, 4) if total else 0.0,
+                "quotes": len(self._quotes),
+            }
+    
+    def _live_quote(
+        self,
+        from_address: Dict[str, Any],
+        to_address: Dict[str, Any],
+        parcel: Dict[str, Any],
+        options: Optional[Dict[str, Any]]
+    ) -> Shipment:
+        """Create a shipment for its rates and cache them for the lane."""
+        extra = {"options": options} if options else {}
+        shipment = self.client.create_shipment(from_address, to_address, parcel, **extra)
+        
+        rates = shipment.rates
+        if rates and self.ttl > 0:
+            key = self.make_key(from_address, to_address, parcel, options)
+            with self._lock:
+                self._quotes[key] = (time.monotonic() + self.ttl, rates)
+                self._quotes.move_to_end(key)
+                while len(self._quotes) > self.max_quotes:
+                    self._quotes.popitem(last=False)
+        
+        return shipment
@@ -0,0 +1,344 @@
+"""
+Record/Replay Transport for the EasyPost Client
+
+Captures EasyPost API responses to a JSON fixture file and replays them
+without a network or an API key, with injected latency. Replay keeps the
+client's whole stack in play (pooled session, timeouts, retries, circuit
+breaker, caches), so bulk, caching and pipeline changes can be measured
+offline; see tests/shipping/bench_shipping.py.
+
+Replayed responses are only as realistic as the fixture they come from.
+The checked-in tests/shipping/fixtures/easypost_replay_synthetic.json is
+synthetic: it was recorded from the local stub server
+(tests/shipping/easypost_stub.py), so it has the stub's IDs, timestamps
+and field set, not EasyPost's. Record easypost_replay.json against the
+EasyPost test API before drawing conclusions from benchmark numbers.
+
+Recording:
+    >>> client = EasyPostClient()              # test-mode API key
+    >>> recorder = record(client)
+    >>> shipment = client.buy_shipment(client.create_shipment(shop, customer, parcel))
+    >>> recorder.save("tests/shipping/fixtures/easypost_replay.json", source="EasyPost test API")
+
+Replaying:
+    >>> client = EasyPostClient(api_key="replay")
+    >>> replay(client, "tests/shipping/fixtures/easypost_replay.json", latency=0.05)
+
+Replayed responses are matched by operation (create, buy, retrieve,
+verify, track, poll; see transport.operation_for), cycling through the
+recordings of each. Object IDs and tracking codes are rewritten so every
+replayed shipment is distinct, and a shipment keeps the same IDs when it
+is bought or retrieved later. Fixtures contain whatever the API returned,
+including addresses: record with test data only.
+"""
+
+import itertools
+import json
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+from urllib.parse import parse_qs, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from .transport import DEFAULT_POOL_SIZE, operation_for
+
+# Fields whose values are rewritten per replayed object
+ID_FIELDS = ("id", "tracking_code")
+
+
+def _api_prefix(client) -> str:
+    """Mount prefix (scheme and host) of the client's API base URL."""
+    url = urlsplit(client.client.api_base)
+    return f"{url.scheme}://{url.netloc}/"
+
+
+def _mount(client, adapter: HTTPAdapter) -> None:
+    """Mount an adapter on the client's session for the API host."""
+    if not client.pooled:
+        raise RuntimeError("Record/replay needs the client's pooled session, which this easypost release does not use")
+    client.session.mount(_api_prefix(client), adapter)
+
+
+def _shipment_id(request) -> str:
+    """Shipment ID in a /shipments/<id> request path."""
+    path = urlsplit(request.url).path.strip("/").split("/")
+    return path[path.index("shipments") + 1]
+
+
+def load_fixtures(path: Union[str, Path]) -> List[Dict[str, Any]]:
+    """Recorded interactions from a fixture file."""
+    with open(path) as f:
+        return json.load(f)["interactions"]
+
+
+class RecordingAdapter(HTTPAdapter):
+    """
+    HTTPAdapter that sends requests normally and keeps every response.
+    
+    Attributes:
+        interactions (list): Recorded interactions, in order
+    """
+    
+    def __init__(self, pool_maxsize: int = DEFAULT_POOL_SIZE):
+        super().__init__(pool_connections=4, pool_maxsize=pool_maxsize, max_retries=3)
+        self.interactions: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+    
+    def send(self, request, **kwargs):
+        start = time.perf_counter()
+        response = super().send(request, **kwargs)
+        elapsed = time.perf_counter() - start
+        try:
+            body = response.json()
+        except ValueError:
+            return response
+        
+        with self._lock:
+            self.interactions.append({
+                "operation": operation_for(request.method, request.url),
+                "method": request.method,
+                "path": urlsplit(request.url).path,
+                "status": response.status_code,
+                "elapsed_ms": round(elapsed * 1000, 2),
+                "body": body,
+            })
+        return response
+    
+    def save(self, path: Union[str, Path], source: Optional[str] = None) -> None:
+        """
+        Write the recorded interactions to a fixture file.
+        
+        Args:
+            path: Fixture file to write
+            source: Where the responses came from (e.g. "EasyPost test API"),
+                    stored with the fixtures
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            fixtures = {
+                "recorded_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "source": source,
+                "interactions": list(self.interactions),
+            }
+        with open(path, "w") as f:
+            json.dump(fixtures, f, indent=2)
+            f.write("\n")
+
+
+class ReplayAdapter(HTTPAdapter):
+    """
+    HTTPAdapter that answers requests from recorded interactions.
+    
+    Thread-safe. Latency is slept (releasing the GIL, like a real request),
+    and a latency longer than the request's read timeout raises ReadTimeout
+    after the timeout, as a slow server would.
+    
+    Attributes:
+        latency (float | dict | None): Seconds per request, a dictionary of
+            seconds per operation, or None to use the recorded latency
+        jitter (float): Random extra latency, as a fraction of the latency
+        requests (int): Number of requests answered
+    """
+    
+    def __init__(
+        self,
+        interactions: List[Dict[str, Any]],
+        latency: Union[float, Dict[str, float], None] = 0.0,
+        jitter: float = 0.0,
+        seed: Optional[int] = None
+    ):
+        """
+        Initialize the replay adapter.
+        
+        Args:
+            interactions: Recorded interactions (see load_fixtures)
+            latency: Seconds per request, seconds per operation, or None to
+                     replay each interaction's recorded latency (default: 0)
+            jitter: Extra latency drawn uniformly from [0, jitter * latency]
+            seed: Random seed for the jitter
+        """
+        super().__init__()
+        self.latency = latency
+        self.jitter = jitter
+        self.requests = 0
+        
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+        self._cycles = {}
+        for operation in {interaction["operation"] for interaction in interactions}:
+            recorded = [i for i in interactions if i["operation"] == operation]
+            self._cycles[operation] = itertools.cycle(recorded)
+        # (operation, recorded shipment ID) -> interaction, for retrieve and buy
+        self._by_shipment = {
+            (i["operation"], i["body"]["id"]): i
+            for i in interactions
+            if i["operation"] in ("retrieve", "buy") and isinstance(i["body"], dict) and "id" in i["body"]
+        }
+        # Replayed shipment ID -> recorded shipment ID, and recorded value -> replayed value
+        self._origins: Dict[str, str] = {}
+        self._id_maps: Dict[str, Dict[str, str]] = {}
+        self._counter = itertools.count(1)
+    
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        operation = operation_for(request.method, request.url)
+        with self._lock:
+            self.requests += 1
+            interaction = self._select(operation, request)
+            delay = self._delay(operation, interaction)
+        
+        read_timeout = timeout[1] if isinstance(timeout, tuple) else timeout
+        if read_timeout is not None and delay > read_timeout:
+            time.sleep(read_timeout)
+            raise requests.exceptions.ReadTimeout(f"Replayed {operation} took longer than {read_timeout}s")
+        time.sleep(delay)
+        
+        if interaction is None:
+            status, body = 404, {"error": {
+                "code": "REPLAY.NO_FIXTURE",
+                "message": f"No recorded response for {request.method} {urlsplit(request.url).path}",
+            }}
+        else:
+            status, body = interaction["status"], self._rewrite(operation, request, interaction)
+        
+        response = requests.Response()
+        response.status_code = status
+        response.reason = "OK" if status < 400 else "Error"
+        response.headers = CaseInsensitiveDict({"Content-Type": "application/json"})
+        response._content = json.dumps(body).encode()
+        response.encoding = "utf-8"
+        response.url = request.url
+        response.request = request
+        return response
+    
+    def _select(self, operation: str, request) -> Optional[Dict[str, Any]]:
+        """Interaction to answer with (caller holds the lock)."""
+        if operation in ("retrieve", "buy"):
+            # Replay the recording of the shipment this one was created from
+            origin = self._origins.get(_shipment_id(request))
+            if (operation, origin) in self._by_shipment:
+                return self._by_shipment[(operation, origin)]
+        cycle = self._cycles.get(operation)
+        return next(cycle) if cycle else None
+    
+    def _delay(self, operation: str, interaction: Optional[Dict[str, Any]]) -> float:
+        """Latency for one request (caller holds the lock)."""
+        if self.latency is None:
+            base = interaction["elapsed_ms"] / 1000 if interaction else 0.0
+        elif isinstance(self.latency, dict):
+            base = self.latency.get(operation, self.latency.get("default", 0.0))
+        else:
+            base = self.latency
+        return base + self._random.uniform(0, self.jitter * base)
+    
+    def _rewrite(self, operation: str, request, interaction: Dict[str, Any]) -> Any:
+        """Recorded body with IDs and tracking codes made unique to this request."""
+        body = interaction["body"]
+        if interaction["status"] >= 400 or not isinstance(body, dict):
+            return body
+        
+        pinned: Dict[str, str] = {}
+        if operation in ("buy", "retrieve") and body.get("id"):
+            # Keep the IDs this shipment was given when it was created
+            shipment_id = _shipment_id(request)
+            pinned = self._id_maps.setdefault(shipment_id, {})
+            pinned.setdefault(body["id"], shipment_id)
+        elif operation == "track" and body.get("tracking_code"):
+            requested = json.loads(request.body or b"{}").get("tracker", {}).get("tracking_code")
+            if requested:
+                pinned = {body["tracking_code"]: requested}
+        elif operation == "poll" and body.get("trackers"):
+            codes = parse_qs(urlsplit(request.url).query).get("tracking_codes[]", [])
+            template = body["trackers"][0]
+            trackers = [self._rewrite_values(template, {template["tracking_code"]: code}) for code in codes]
+            return dict(body, trackers=trackers)
+        
+        result = self._rewrite_values(body, pinned)
+        if operation == "buy":
+            # Sell the rate that was asked for, as the API would
+            requested = json.loads(request.body or b"{}").get("rate", {}).get("id")
+            selected = next((rate for rate in result.get("rates") or [] if rate.get("id") == requested), None)
+            if selected:
+                result["selected_rate"] = selected
+        elif operation == "create":
+            with self._lock:
+                self._origins[result["id"]] = body["id"]
+                self._id_maps[result["id"]] = pinned
+        return result
+    
+    def _rewrite_values(self, body: Any, mapping: Dict[str, str]) -> Any:
+        """Replace ID field values through mapping, adding fresh values for new ones."""
+        def fresh(value: str) -> str:
+            # Keep the object prefix (shp_, rate_, trk_) so IDs still look like IDs
+            number = next(self._counter)
+            if "_" in value:
+                return f"{value.split('_', 1)[0]}_replay{number:010d}"
+            return f"RP{number:020d}"
+        
+        def walk(node):
+            if isinstance(node, dict):
+                result = {}
+                for key, value in node.items():
+                    if key in ID_FIELDS and isinstance(value, str):
+                        with self._lock:
+                            if value not in mapping:
+                                mapping[value] = fresh(value)
+                        result[key] = mapping[value]
+                    else:
+                        result[key] = walk(value)
+                return result
+            if isinstance(node, list):
+                return [walk(item) for item in node]
+            if isinstance(node, str) and node in mapping:
+                return mapping[node]
+            return node
+        
+        return walk(body)
+
+
+def record(client) -> RecordingAdapter:
+    """
+    Record every API response the client receives from now on.
+    
+    Args:
+        client: EasyPostClient to record
+    
+    Returns:
+        The RecordingAdapter; call save(path) to write the fixtures
+    """
+    adapter = RecordingAdapter(pool_maxsize=client.session.pool_size)
+    _mount(client, adapter)
+    return adapter
+
+
+def replay(
+    client,
+    fixtures: Union[str, Path, List[Dict[str, Any]]],
+    latency: Union[float, Dict[str, float], None] = 0.0,
+    jitter: float = 0.0,
+    seed: Optional[int] = None
+) -> ReplayAdapter:
+    """
+    Answer the client's API requests from fixtures instead of the network.
+    
+    Args:
+        client: EasyPostClient to replay into (any API key works)
+        fixtures: Fixture file path, or interactions from load_fixtures()
+        latency: Seconds per request, seconds per operation, or None for the
+                 recorded latency (see ReplayAdapter)
+        jitter: Extra latency, as a fraction of the latency
+        seed: Random seed for the jitter
+    
+    Returns:
+        The mounted ReplayAdapter
+    """
+    interactions = fixtures if isinstance(fixtures, list) else load_fixtures(fixtures)
+    adapter = ReplayAdapter(interactions, latency=latency, jitter=jitter, seed=seed)
+    _mount(client, adapter)
+    return adapter
@@ -0,0 +1,335 @@
+"""
+Shipment Tracking for PrintShop OS
+
+EasyPostClient.track_shipment() creates a tracker on every call, which is
+slow, billed, and leaves duplicate trackers behind. TrackingService instead
+registers each tracking code with EasyPost once and keeps the tracker ID
+and last-known state in a local SQLite store. Order status pages read from
+the store and never call the API.
+
+The store is kept current two ways:
+- Webhooks: EasyPost posts tracker.updated events to the shipping API
+  (see printshop_os.shipping.api), which hands them to handle_webhook().
+- Polling: trackers whose next poll time has passed are refreshed in
+  batches of up to 100 codes per API call. The interval adapts to the
+  status: minutes for out-for-delivery packages, hours in transit, a
+  daily check for a week after delivery, then never.
+
+Environment Variables:
+- EASYPOST_TRACKING_DB: SQLite file for the tracking store (default: in memory)
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from .easypost_client import EasyPostClient
+from .models import Tracker
+
+logger = logging.getLogger(__name__)
+
+# Seconds between polls by tracker status; None means never poll
+POLL_INTERVALS: Dict[str, Optional[float]] = {
+    "out_for_delivery": 15 * 60.0,
+    "available_for_pickup": 2 * 3600.0,
+    "in_transit": 2 * 3600.0,
+    "pre_transit": 6 * 3600.0,
+    "unknown": 3600.0,
+    "return_to_sender": 12 * 3600.0,
+    "failure": 12 * 3600.0,
+    "error": 12 * 3600.0,
+    "delivered": 24 * 3600.0,
+    "cancelled": None,
+}
+
+# Statuses that are normally final; polling stops once they are this old
+FINAL_STATUSES = ("delivered", "return_to_sender", "cancelled")
+FINAL_POLL_WINDOW = 7 * 24 * 3600.0
+
+# Tracking codes per list request when polling (EasyPost's page size limit)
+POLL_BATCH_SIZE = 100
+
+
+def next_poll_at(status: str, status_changed_at: float, now: float) -> Optional[float]:
+    """
+    When to poll a tracker next.
+    
+    Args:
+        status: Current tracker status
+        status_changed_at: Time the status last changed
+        now: Current time
+    
+    Returns:
+        Time of the next poll, or None to stop polling
+    """
+    interval = POLL_INTERVALS.get(status, POLL_INTERVALS["unknown"])
+    if interval is None:
+        return None
+    if status in FINAL_STATUSES and now - status_changed_at >= FINAL_POLL_WINDOW:
+        return None
+    return now + interval
+
+
+class TrackingStore:
+    """
+    SQLite store of tracker state, keyed by tracking code.
+    
+    Thread-safe. Records are Tracker.to_dict() fields plus carrier,
+    tracker_updated_at (EasyPost's updated_at), status_changed_at,
+    updated_at and next_poll_at.
+    
+    Attributes:
+        path (str): SQLite database file, or ':memory:'
+    """
+    
+    def __init__(self, path: Union[str, Path] = ":memory:"):
+        """
+        Open (or create) the tracking store.
+        
+        Args:
+            path: SQLite database file. Defaults to an in-memory database.
+        """
+        self.path = str(path)
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        with self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS trackers ("
+                "tracking_code TEXT PRIMARY KEY, status TEXT, record TEXT NOT NULL, next_poll_at REAL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS trackers_next_poll ON trackers (next_poll_at)")
+    
+    def get(self, tracking_code: str) -> Optional[Dict[str, Any]]:
+        """Stored record for a tracking code, or None."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT record FROM trackers WHERE tracking_code = ?", (tracking_code,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+    
+    def put(self, record: Dict[str, Any]) -> None:
+        """Insert or replace a record."""
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO trackers (tracking_code, status, record, next_poll_at) VALUES (?, ?, ?, ?)",
+                (record["tracking_code"], record["status"], json.dumps(record), record["next_poll_at"])
+            )
+    
+    def due(self, now: float, limit: int) -> List[str]:
+        """Tracking codes whose next poll time has passed, most overdue first."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT tracking_code FROM trackers WHERE next_poll_at <= ? ORDER BY next_poll_at LIMIT ?",
+                (now, limit)
+            ).fetchall()
+        return [row[0] for row in rows]
+    
+    def counts(self) -> Dict[str, int]:
+        """Number of trackers per status."""
+        with self._lock:
+            rows = self._db.execute("SELECT status, COUNT(*) FROM trackers GROUP BY status").fetchall()
+        return dict(rows)
+    
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            self._db.close()
+
+
+class TrackingService:
+    """
+    Registers trackers once and keeps their state in a TrackingStore.
+    
+    Attributes:
+        client (EasyPostClient): Client used to create and poll trackers
+        store (TrackingStore): Local tracker state
+        poll_batch_size (int): Tracking codes per poll request
+    """
+    
+    def __init__(
+        self,
+        client: EasyPostClient,
+        store: Optional[TrackingStore] = None,
+        poll_batch_size: int = POLL_BATCH_SIZE
+    ):
+        """
+        Initialize the tracking service.
+        
+        Args:
+            client: EasyPostClient for tracker creation and polling
+            store: Tracker store. If not provided, one is opened at
+                   EASYPOST_TRACKING_DB (or in memory when unset).
+            poll_batch_size: Tracking codes per poll request (default: 100)
+        """
+        self.client = client
+        self.store = store or TrackingStore(os.getenv("EASYPOST_TRACKING_DB", ":memory:"))
+        self.poll_batch_size = poll_batch_size
+        
+        self._register_lock = threading.Lock()
+        self._counter_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._counters = {"registered": 0, "webhooks": 0, "polls": 0, "polled": 0, "poll_errors": 0}
+    
+    def register(self, tracking_code: str, carrier: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Start tracking a package; a no-op for codes already registered.
+        
+        Args:
+            tracking_code: Carrier tracking number
+            carrier: Carrier name, if known (speeds up EasyPost's detection)
+        
+        Returns:
+            The stored tracking record
+        
+        Raises:
+            easypost.Error: If the tracker cannot be created
+        
+        Example:
+            >>> tracking = TrackingService(EasyPostClient())
+            >>> tracking.register(label["tracking_code"])
+        """
+        # Serialized so two callers never create a tracker for the same code
+        with self._register_lock:
+            record = self.store.get(tracking_code)
+            if record is not None:
+                return record
+            
+            tracker = self.client.create_tracker(tracking_code, carrier)
+            self._count("registered")
+            return self._update(tracker, force=True)
+    
+    def get(self, tracking_code: str) -> Optional[Dict[str, Any]]:
+        """
+        Last-known tracking state from the local store; never calls the API.
+        
+        Returns:
+            The tracking record, or None if the code is not registered
+        """
+        return self.store.get(tracking_code)
+    
+    def handle_webhook(self, event: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Apply an EasyPost webhook event.
+        
+        Only tracker.created and tracker.updated events are used; events
+        older than the stored state (EasyPost retries and may reorder
+        deliveries) are ignored.
+        
+        Args:
+            event: Parsed webhook body (an EasyPost Event)
+        
+        Returns:
+            The updated record, or None if the event was ignored
+        """
+        result = event.get("result") or {}
+        if not str(event.get("description", "")).startswith("tracker.") or result.get("object") != "Tracker":
+            return None
+        
+        self._count("webhooks")
+        return self._update(Tracker.from_sdk(result))
+    
+    def poll_due(self, now: Optional[float] = None) -> int:
+        """
+        Refresh every tracker whose next poll time has passed.
+        
+        Codes are fetched in batches of poll_batch_size with one list
+        request each. Trackers missing from a response are rescheduled
+        so they do not block the queue.
+        
+        Returns:
+            Number of trackers refreshed
+        """
+        now = time.time() if now is None else now
+        refreshed = 0
+        while True:
+            codes = self.store.due(now, self.poll_batch_size)
+            if not codes:
+                return refreshed
+            
+            trackers = self.client.list_trackers(codes)
+            self._count("polls")
+            for tracker in trackers:
+                if tracker.tracking_code in codes:
+                    self._update(tracker, now=now, force=True)
+                    codes.remove(tracker.tracking_code)
+                    refreshed += 1
+                    self._count("polled")
+            
+            for code in codes:
+                record = self.store.get(code)
+                record["next_poll_at"] = next_poll_at(record["status"], record["status_changed_at"], now)
+                self.store.put(record)
+    
+    def start(self, interval: float = 60.0) -> None:
+        """Poll due trackers every interval seconds in a background thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(interval,), name="tracking-poller", daemon=True)
+        self._thread.start()
+    
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop the background poller."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get tracking statistics.
+        
+        Returns:
+            Dictionary with trackers per status and counts of registrations,
+            webhook events, poll requests, trackers refreshed by polling
+            and failed background polling rounds (poll_errors)
+        """
+        with self._counter_lock:
+            counters = dict(self._counters)
+        return dict(counters, trackers=self.store.counts())
+    
+    def _count(self, counter: str) -> None:
+        with self._counter_lock:
+            self._counters[counter] += 1
+    
+    def _run(self, interval: float) -> None:
+        while not self._stop.is_set():
+            try:
+                self.poll_due()
+            except Exception:
+                # Keep polling; the next round retries the same due trackers
+                logger.exception("Tracking poll failed")
+                self._count("poll_errors")
+            self._stop.wait(interval)
+    
+    def _update(self, tracker: Tracker, now: Optional[float] = None, force: bool = False) -> Optional[Dict[str, Any]]:
+        """Store a tracker's state and schedule its next poll."""
+        now = time.time() if now is None else now
+        record = tracker.to_dict()
+        tracker_updated_at = tracker.updated_at
+        
+        previous = self.store.get(record["tracking_code"])
+        if previous and not force and tracker_updated_at and previous.get("tracker_updated_at") \
+                and tracker_updated_at < previous["tracker_updated_at"]:
+            return None
+        
+        changed = previous is None or previous["status"] != record["status"]
+        record.update({
+            "carrier": tracker.carrier,
+            "public_url": tracker.public_url,
+            "tracker_updated_at": tracker_updated_at,
+            "status_changed_at": now if changed else previous["status_changed_at"],
+            "updated_at": now,
+        })
+        record["next_poll_at"] = next_poll_at(record["status"], record["status_changed_at"], now)
+        self.store.put(record)
+        return record
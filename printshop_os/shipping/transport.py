@@ -0,0 +1,359 @@
+"""
+HTTP Transport for the EasyPost Client
+
+The EasyPost SDK sends every request through one requests.Session with a
+small connection pool, a single timeout for all calls and no retry on
+5xx responses. EasyPostClient replaces that session with PooledSession,
+which adds:
+
+- Connection pooling: keep-alive connections, pool_size per host, so
+  bulk jobs with many workers reuse connections instead of reconnecting.
+- Per-operation timeouts: a quick address check and a label purchase
+  get different read timeouts (see DEFAULT_TIMEOUTS).
+- Retries: idempotent calls (GET) are retried on connection errors,
+  timeouts, 429 and 5xx responses with jittered exponential backoff.
+  Purchases and other POSTs are never retried here; the bulk methods
+  decide that per call.
+- A circuit breaker: after failure_threshold consecutive 5xx responses
+  or network errors, requests fail fast with CircuitOpenError for
+  reset_timeout seconds, then a single trial request decides whether to
+  close the circuit again.
+- Counters and per-operation latency percentiles (see TransportStats).
+"""
+
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Read timeouts in seconds per operation (see operation_for)
+DEFAULT_TIMEOUTS = {
+    "create": 30.0,
+    "buy": 60.0,
+    "retrieve": 15.0,
+    "verify": 10.0,
+    "track": 30.0,
+    "poll": 30.0,
+}
+
+# Seconds to wait for a connection to be established
+CONNECT_TIMEOUT = 5.0
+
+# Keep-alive connections kept per host
+DEFAULT_POOL_SIZE = 16
+
+# Latency samples kept per operation for percentiles
+LATENCY_SAMPLES = 1024
+
+IDEMPOTENT_METHODS = ("GET", "HEAD")
+
+
+def operation_for(method: str, url: str) -> str:
+    """
+    Name the EasyPost operation of a request, for timeouts and stats.
+    
+    Returns:
+        'create', 'buy', 'retrieve', 'verify', 'track', 'poll' or 'other'
+    """
+    parts = urlsplit(url).path.strip("/").split("/")[1:]
+    method = method.upper()
+    if parts[:1] == ["shipments"]:
+        if len(parts) == 1 and method == "POST":
+            return "create"
+        if parts[2:] == ["buy"]:
+            return "buy"
+        if len(parts) == 2 and method == "GET":
+            return "retrieve"
+    if parts[:1] == ["addresses"] and method == "POST":
+        return "verify"
+    if parts == ["trackers"]:
+        return "track" if method == "POST" else "poll"
+    return "other"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request while the circuit is open."""
+
+
+@dataclass
+class RetryPolicy:
+    """
+    Jittered exponential backoff.
+    
+    The delay before retry n is drawn uniformly from
+    [0, min(max_delay, base_delay * 2 ** (n - 1))] ("full jitter"), so
+    clients that failed together do not retry together.
+    """
+    
+    retries: int = 2
+    base_delay: float = 0.5
+    max_delay: float = 8.0
+    
+    def delay(self, attempt: int, base_delay: Optional[float] = None) -> float:
+        """
+        Seconds to wait after a failed attempt.
+        
+        Args:
+            attempt: Number of the attempt that failed (1 for the first)
+            base_delay: Overrides the policy's base delay
+        """
+        base = self.base_delay if base_delay is None else base_delay
+        return random.uniform(0, min(self.max_delay, base * 2 ** (attempt - 1)))
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+    
+    Thread-safe. States are 'closed' (requests flow), 'open' (requests
+    are rejected) and 'half_open' (one trial request is let through).
+    
+    Attributes:
+        failure_threshold (int): Consecutive failures that open the circuit
+        reset_timeout (float): Seconds the circuit stays open before a trial
+    """
+    
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        """
+        Initialize the circuit breaker.
+        
+        Args:
+            failure_threshold: Consecutive failures that open the circuit (default: 5)
+            reset_timeout: Seconds before a trial request is allowed (default: 30)
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        
+        self._lock = threading.Lock()
+        self._state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._opened = 0
+        self._rejected = 0
+    
+    @property
+    def state(self) -> str:
+        """Current state: 'closed', 'open' or 'half_open'."""
+        with self._lock:
+            if self._state == "open" and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return "half_open"
+            return self._state
+    
+    def before_request(self) -> None:
+        """
+        Admit a request, or reject it while the circuit is open.
+        
+        Raises:
+            CircuitOpenError: If the circuit is open, or a trial request is
+                              already in flight
+        """
+        with self._lock:
+            if self._state == "closed":
+                return
+            if time.monotonic() - self._opened_at >= self.reset_timeout and not self._trial_in_flight:
+                self._state = "half_open"
+                self._trial_in_flight = True
+                return
+            self._rejected += 1
+            retry_in = max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+            raise CircuitOpenError(
+                f"EasyPost circuit open after {self._failures} consecutive failures; "
+                f"retry in {retry_in:.1f}s"
+            )
+    
+    def record_success(self) -> None:
+        """Close the circuit and reset the failure count."""
+        with self._lock:
+            self._state = "closed"
+            self._failures = 0
+            self._trial_in_flight = False
+    
+    def record_failure(self) -> None:
+        """Count a failure; open the circuit at the threshold or after a failed trial."""
+        with self._lock:
+            self._failures += 1
+            if self._state == "half_open" or self._failures >= self.failure_threshold:
+                if self._state != "open":
+                    self._opened += 1
+                self._state = "open"
+                self._opened_at = time.monotonic()
+                self._trial_in_flight = False
+    
+    def stats(self) -> Dict[str, Any]:
+        """State, consecutive failures, times opened and requests rejected."""
+        state = self.state
+        with self._lock:
+            return {
+                "state": state,
+                "consecutive_failures": self._failures,
+                "opened": self._opened,
+                "rejected": self._rejected,
+            }
+
+
+class TransportStats:
+    """
+    Request counters and latency percentiles per operation.
+    
+    Thread-safe. Latencies are kept for the last LATENCY_SAMPLES requests
+    of each operation.
+    """
+    
+    def __init__(self, samples: int = LATENCY_SAMPLES):
+        self._lock = threading.Lock()
+        self._samples = samples
+        self._latencies: Dict[str, deque] = {}
+        self._counters = {"requests": 0, "retries": 0, "failures": 0}
+    
+    def record(self, operation: str, seconds: float, failed: bool) -> None:
+        """Record one request's latency and outcome."""
+        with self._lock:
+            self._counters["requests"] += 1
+            self._counters["failures"] += failed
+            self._latencies.setdefault(operation, deque(maxlen=self._samples)).append(seconds)
+    
+    def retry(self) -> None:
+        """Count a retry."""
+        with self._lock:
+            self._counters["retries"] += 1
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Counters plus count, p50, p90, p99 and max latency (ms) per operation.
+        """
+        with self._lock:
+            latencies = {operation: sorted(samples) for operation, samples in self._latencies.items()}
+            result = dict(self._counters)
+        
+        def percentile(samples, p):
+            return round(samples[min(len(samples) - 1, int(p / 100 * len(samples)))] * 1000, 2)
+        
+        result["latency_ms"] = {
+            operation: {
+                "count": len(samples),
+                "p50": percentile(samples, 50),
+                "p90": percentile(samples, 90),
+                "p99": percentile(samples, 99),
+                "max": round(samples[-1] * 1000, 2),
+            }
+            for operation, samples in latencies.items() if samples
+        }
+        return result
+
+
+class PooledSession(requests.Session):
+    """
+    requests.Session with pooling, per-operation timeouts, retries and a
+    circuit breaker, for use as the EasyPost SDK's session.
+    
+    Attributes:
+        pool_size (int): Keep-alive connections per host
+        timeouts (dict): Read timeout per operation
+        default_timeout (float): Read timeout for operations not in timeouts
+        connect_timeout (float): Connection timeout
+        retry_policy (RetryPolicy): Backoff for idempotent requests
+        breaker (CircuitBreaker): Circuit breaker, or None
+        stats (TransportStats): Counters and latencies
+    """
+    
+    def __init__(
+        self,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        timeouts: Optional[Dict[str, float]] = None,
+        default_timeout: float = 60.0,
+        connect_timeout: float = CONNECT_TIMEOUT,
+        retry_policy: Optional[RetryPolicy] = None,
+        breaker: Optional[CircuitBreaker] = None
+    ):
+        """
+        Initialize the session.
+        
+        Args:
+            pool_size: Keep-alive connections per host (default: 16)
+            timeouts: Read timeout per operation (see operation_for)
+            default_timeout: Read timeout for other operations (default: 60)
+            connect_timeout: Connection timeout (default: 5)
+            retry_policy: Backoff for idempotent requests (default: RetryPolicy())
+            breaker: Circuit breaker; None disables it
+        """
+        super().__init__()
+        # Connection errors are retried by urllib3, as with the SDK's own adapter
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=3)
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+        
+        self.pool_size = pool_size
+        self.timeouts = dict(timeouts or {})
+        self.default_timeout = default_timeout
+        self.connect_timeout = connect_timeout
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.breaker = breaker
+        self.stats = TransportStats()
+    
+    def request(self, method, url, *args, **kwargs):
+        """Send a request with the operation's timeout, retries and circuit breaker."""
+        operation = operation_for(method, url)
+        read_timeout = self.timeouts.get(operation, self.default_timeout)
+        kwargs["timeout"] = (min(self.connect_timeout, read_timeout), read_timeout)
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+        
+        attempts = 0
+        while True:
+            attempts += 1
+            if self.breaker:
+                self.breaker.before_request()
+            
+            start = time.perf_counter()
+            try:
+                response = super().request(method, url, *args, **kwargs)
+            except requests.RequestException:
+                self._record(operation, start, failed=True)
+                if not idempotent or attempts > self.retry_policy.retries:
+                    raise
+                delay = self.retry_policy.delay(attempts)
+            except BaseException:
+                # Any other error still ends the request, releasing a half-open trial
+                self._record(operation, start, failed=True)
+                raise
+            else:
+                failed = response.status_code >= 500
+                self._record(operation, start, failed=failed)
+                retryable = failed or response.status_code == 429
+                if not retryable or not idempotent or attempts > self.retry_policy.retries:
+                    return response
+                delay = max(self.retry_policy.delay(attempts), self._retry_after(response))
+                response.close()
+            
+            self.stats.retry()
+            time.sleep(delay)
+    
+    def record_response(self, method: str, url: str, seconds: float, status: int) -> None:
+        """
+        Record a request this session did not send, for stats only.
+        
+        Used when the SDK keeps its own session (see EasyPostClient);
+        the circuit breaker is not involved.
+        """
+        self.stats.record(operation_for(method, url), seconds, status >= 500)
+    
+    def _record(self, operation: str, start: float, failed: bool) -> None:
+        self.stats.record(operation, time.perf_counter() - start, failed)
+        if self.breaker:
+            if failed:
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+    
+    def _retry_after(self, response) -> float:
+        """Seconds from a Retry-After header, capped at the policy's max delay."""
+        try:
+            return min(float(response.headers.get("Retry-After", 0)), self.retry_policy.max_delay)
+        except ValueError:
+            return 0.0
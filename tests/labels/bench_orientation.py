@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Benchmark: orientation detection overhead.
+
+Times content-based orientation detection against the full formatting
+pipeline on synthetic 4x6 labels at 300 and 600 DPI, in each of the four
+orientations, and checks that every rotation is corrected.
+
+Usage:
+    python -m tests.labels.bench_orientation [--repeat N]
+"""
+
+import argparse
+import statistics
+import time
+from printshop_os.labels import LabelFormatter
+from printshop_os.labels.orientation import detect_orientation
+from tests.labels.test_orientation import make_label
+
+
+def median_ms(func, repeat: int) -> float:
+    """Median milliseconds for one call of func."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    """Run the benchmark and print a comparison table."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=10, help='Runs per measurement (default: 10)')
+    args = parser.parse_args()
+    
+    print(f"{'DPI':>5} {'rotation':>9} {'detect ms':>10} {'pipeline ms':>12} {'overhead':>9} {'ok':>4}")
+    for dpi in (300, 600):
+        formatter = LabelFormatter(dpi=dpi)
+        upright = make_label().resize((4 * dpi, 6 * dpi))
+        for rotation in (0, 90, 180, 270):
+            image = upright.rotate(rotation, expand=True)
+            detect = median_ms(lambda: detect_orientation(image), args.repeat)
+            pipeline = median_ms(lambda: formatter._format_image(image), args.repeat)
+            ok = (rotation + detect_orientation(image).angle) % 360 == 0
+            print(f"{dpi:>5} {rotation:>9} {detect:>10.2f} {pipeline:>12.1f} "
+                  f"{detect / pipeline:>8.1%} {'yes' if ok else 'NO':>4}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Benchmark: label pipeline throughput and per-stage cost.
+
+Formats synthetic PNG and PDF labels at several page sizes and DPIs and
+reports throughput (labels/sec) plus, per pipeline stage, the mean time and
+the peak RSS reached by the end of that stage. Each configuration runs in
+a fresh child process so peak RSS figures do not leak between runs.
+
+PDF inputs need a vector raster backend (see raster.py); they are reported
+as skipped when none is installed. 4x6 PDFs formatted to PDF take the vector pass-through
+path and never need it.
+
+Usage:
+    python -m tests.labels.bench_pipeline [--labels N] [--dpi 203 300 600]
+                                          [--format pdf] [--json results.json]
+"""
+
+import argparse
+import io
+import json
+import multiprocessing
+import random
+import resource
+import sys
+import time
+from PIL import Image, ImageDraw
+from reportlab.lib.pagesizes import inch
+from reportlab.pdfgen import canvas
+from printshop_os.labels import LabelFormatter
+from printshop_os.labels.metrics import STAGES
+
+# Page sizes in inches: a bare 4x6 label and a 4x6 label on a letter sheet
+PAGE_SIZES = {
+    '4x6': (4, 6),
+    'letter': (8.5, 11),
+}
+
+
+def draw_label(draw, scale: float) -> None:
+    """Draw label content (text blocks, rules, barcode) at scale px/inch."""
+    rnd = random.Random(0)
+    unit = scale / 100
+    draw.rectangle([10 * unit, 10 * unit, 390 * unit, 590 * unit],
+                   outline='black', width=max(1, int(unit)))
+    for row, y in enumerate(range(30, 260, 25)):
+        width = 150 + (row * 37) % 200
+        draw.rectangle([30 * unit, y * unit, (30 + width) * unit, (y + 12) * unit], fill='black')
+    draw.rectangle([10 * unit, 280 * unit, 390 * unit, 283 * unit], fill='black')
+    x = 40
+    while x < 360:
+        bar = rnd.choice([1, 2, 3])
+        draw.rectangle([x * unit, 380 * unit, (x + bar) * unit, 520 * unit], fill='black')
+        x += bar + rnd.choice([1, 2, 3])
+
+
+def make_png(page: str, dpi: int) -> bytes:
+    """Create a synthetic PNG label scan."""
+    width, height = PAGE_SIZES[page]
+    image = Image.new('RGB', (int(width * dpi), int(height * dpi)), 'white')
+    draw_label(ImageDraw.Draw(image), dpi)
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+class _CanvasDraw:
+    """Minimal ImageDraw-like adapter drawing vector shapes onto a PDF canvas."""
+    
+    def __init__(self, pdf_canvas, page_height: float):
+        self.canvas = pdf_canvas
+        self.page_height = page_height
+    
+    def rectangle(self, box, fill=None, outline=None, width=1):
+        x1, y1, x2, y2 = box
+        self.canvas.setLineWidth(width)
+        self.canvas.rect(x1, self.page_height - y2, x2 - x1, y2 - y1,
+                         stroke=1 if outline else 0, fill=1 if fill else 0)
+
+
+def make_pdf(page: str) -> bytes:
+    """Create a synthetic vector PDF label (DPI is applied when rendering)."""
+    width, height = PAGE_SIZES[page]
+    buffer = io.BytesIO()
+    pdf_canvas = canvas.Canvas(buffer, pagesize=(width * inch, height * inch))
+    draw_label(_CanvasDraw(pdf_canvas, height * inch), inch)
+    pdf_canvas.showPage()
+    pdf_canvas.save()
+    return buffer.getvalue()
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far, in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def run_config(input_format: str, page: str, dpi: int, output_format: str, labels: int, results) -> None:
+    """Child process: format `labels` labels and report throughput per stage."""
+    data = make_png(page, dpi) if input_format == 'png' else make_pdf(page)
+    stages = {}
+    
+    def on_stage(stage, seconds):
+        entry = stages.setdefault(stage, {'seconds': 0.0, 'count': 0, 'peak_rss_mb': 0.0})
+        entry['seconds'] += seconds
+        entry['count'] += 1
+        entry['peak_rss_mb'] = max(entry['peak_rss_mb'], peak_rss_mb())
+    
+    formatter = LabelFormatter(dpi=dpi, on_stage=on_stage, passthrough=True)
+    try:
+        start = time.perf_counter()
+        for _ in range(labels):
+            formatter.process_bytes(data, output_format=output_format)
+        elapsed = time.perf_counter() - start
+    except Exception as e:
+        results.put({'error': str(e)})
+        return
+    
+    results.put({
+        'labels_per_second': labels / elapsed,
+        'stages': {
+            stage: {
+                'mean_ms': entry['seconds'] / entry['count'] * 1000,
+                'peak_rss_mb': entry['peak_rss_mb'],
+            }
+            for stage, entry in stages.items()
+        },
+    })
+
+
+def main():
+    """Run every configuration and print a per-stage table for each."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--labels', type=int, default=5, help='Labels per configuration (default: 5)')
+    parser.add_argument('--dpi', type=int, nargs='+', default=[203, 300, 600], help='DPIs to test')
+    parser.add_argument('--format', default='pdf', choices=['pdf', 'png', 'zpl', 'epl'],
+                        help='Output format (default: pdf)')
+    parser.add_argument('--json', help='Also write results to this JSON file')
+    args = parser.parse_args()
+    
+    context = multiprocessing.get_context('spawn')
+    all_results = []
+    
+    for input_format in ('png', 'pdf'):
+        for page in PAGE_SIZES:
+            for dpi in args.dpi:
+                results = context.Queue()
+                process = context.Process(
+                    target=run_config,
+                    args=(input_format, page, dpi, args.format, args.labels, results)
+                )
+                process.start()
+                result = results.get()
+                process.join()
+                
+                result.update({'input': input_format, 'page': page, 'dpi': dpi})
+                all_results.append(result)
+                
+                title = f"{input_format} {page} @ {dpi} DPI -> {args.format}"
+                if 'error' in result:
+                    print(f"{title}: skipped ({result['error']})\n")
+                    continue
+                
+                print(f"{title}: {result['labels_per_second']:.1f} labels/sec")
+                print(f"  {'stage':<10} {'mean ms':>9} {'peak RSS MB':>12}")
+                for stage in STAGES:
+                    if stage in result['stages']:
+                        entry = result['stages'][stage]
+                        print(f"  {stage:<10} {entry['mean_ms']:>9.1f} {entry['peak_rss_mb']:>12.1f}")
+                print()
+    
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(all_results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
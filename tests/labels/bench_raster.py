@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark: PDF raster backend latency.
+
+Renders synthetic 4x6 and letter-size label PDFs with every installed
+raster backend and reports per-page latency (first render, mean, p95).
+The first render includes library load and, for pdf2image, process spawn
+costs. The embedded-image fallback cannot render vector content, so it is
+timed on a scanned (image-only) PDF instead.
+
+Usage:
+    python -m tests.labels.bench_raster [--pages N] [--dpi 203 300]
+                                        [--json results.json]
+"""
+
+import argparse
+import io
+import json
+import statistics
+import time
+from PIL import Image, ImageDraw
+from printshop_os.labels import raster
+from printshop_os.labels.pdfstream import PdfStreamWriter
+from tests.labels.bench_pipeline import PAGE_SIZES, draw_label, make_pdf
+
+
+def make_scanned_pdf(page: str, dpi: int) -> bytes:
+    """Create an image-only PDF, like a scanned label."""
+    width, height = PAGE_SIZES[page]
+    image = Image.new('1', (int(width * dpi), int(height * dpi)), 1)
+    draw_label(ImageDraw.Draw(image), dpi)
+    buffer = io.BytesIO()
+    with PdfStreamWriter(buffer, (width * 72, height * 72)) as writer:
+        writer.add_page(image)
+    return buffer.getvalue()
+
+
+def bench_backend(backend, data: bytes, dpi: int, pages: int) -> dict:
+    """Render data `pages` times and summarize the latencies in ms."""
+    timings = []
+    for _ in range(pages):
+        start = time.perf_counter()
+        backend.render(data, 1, dpi)
+        timings.append((time.perf_counter() - start) * 1000)
+    
+    ordered = sorted(timings)
+    return {
+        'first_ms': timings[0],
+        'mean_ms': statistics.mean(timings),
+        'p95_ms': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+    }
+
+
+def main():
+    """Benchmark every installed backend and print a latency table."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--pages', type=int, default=10, help='Renders per configuration (default: 10)')
+    parser.add_argument('--dpi', type=int, nargs='+', default=[203, 300], help='DPIs to test')
+    parser.add_argument('--json', help='Also write results to this JSON file')
+    args = parser.parse_args()
+    
+    names = raster.available_backends()
+    print(f"Installed backends: {', '.join(names)}")
+    print(f"Auto-selected: {raster.select_backend().name}\n")
+    print(f"{'backend':<10} {'page':<7} {'dpi':>4} {'first ms':>9} {'mean ms':>9} {'p95 ms':>9}")
+    
+    all_results = []
+    for name in names:
+        backend = raster.get_backend(name)
+        for page in PAGE_SIZES:
+            for dpi in args.dpi:
+                data = make_pdf(page) if backend.renders_vectors else make_scanned_pdf(page, dpi)
+                try:
+                    result = bench_backend(backend, data, dpi, args.pages)
+                except Exception as e:
+                    result = {'error': str(e)}
+                result.update({'backend': name, 'page': page, 'dpi': dpi})
+                all_results.append(result)
+                
+                if 'error' in result:
+                    print(f"{name:<10} {page:<7} {dpi:>4}  failed: {result['error']}")
+                else:
+                    print(f"{name:<10} {page:<7} {dpi:>4} {result['first_ms']:>9.1f} "
+                          f"{result['mean_ms']:>9.1f} {result['p95_ms']:>9.1f}")
+    
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(all_results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmark: PIL vs vectorized NumPy image path.
+
+Times cropping and B&W optimization on synthetic 4x6 labels at 300 and
+600 DPI for the PIL path, the NumPy fixed-threshold path and the NumPy
+adaptive-threshold path.
+
+Usage:
+    python -m tests.labels.bench_vectorized [--repeat N]
+"""
+
+import argparse
+import statistics
+import time
+from PIL import Image, ImageDraw
+from printshop_os.labels import LabelFormatter
+
+
+def make_label(dpi: int) -> Image.Image:
+    """Create a synthetic landscape-sized label scan at the given DPI."""
+    width, height = int(4.25 * dpi), int(6.5 * dpi)
+    img = Image.new('RGB', (width, height), (240, 240, 240))
+    draw = ImageDraw.Draw(img)
+    unit = dpi // 100
+    
+    draw.rectangle([10 * unit, 10 * unit, width - 10 * unit, height - 10 * unit],
+                   outline='black', width=3 * unit)
+    draw.rectangle([20 * unit, 20 * unit, width - 20 * unit, 80 * unit], fill='black')
+    for y in range(100 * unit, 300 * unit, 12 * unit):
+        draw.rectangle([30 * unit, y, width // 2, y + 4 * unit], fill=(60, 60, 60))
+    for x in range(30 * unit, width - 30 * unit, 5 * unit):
+        draw.rectangle([x, 350 * unit, x + (x // unit) % 3 * unit + unit, 500 * unit], fill='black')
+    return img
+
+
+def time_path(formatter: LabelFormatter, image: Image.Image, repeat: int) -> float:
+    """Median milliseconds for crop + B&W optimization."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        formatter._optimize_bw(formatter._crop_to_label(image))
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    """Run the benchmark and print a comparison table."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=10, help='Runs per measurement (default: 10)')
+    args = parser.parse_args()
+    
+    print(f"{'DPI':>5} {'path':<18} {'median ms':>10} {'speedup':>8}")
+    for dpi in (300, 600):
+        image = make_label(dpi)
+        paths = {
+            'pil': LabelFormatter(dpi=dpi),
+            'numpy': LabelFormatter(dpi=dpi, use_numpy=True),
+            'numpy-adaptive': LabelFormatter(dpi=dpi, use_numpy=True, threshold='adaptive'),
+        }
+        baseline = None
+        for name, formatter in paths.items():
+            ms = time_path(formatter, image, args.repeat)
+            baseline = baseline or ms
+            print(f"{dpi:>5} {name:<18} {ms:>10.1f} {baseline / ms:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
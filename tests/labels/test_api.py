@@ -0,0 +1,290 @@
+"""
+Unit tests for the label formatter Flask API.
+"""
+
+import io
+import json
+import time
+import zipfile
+import pytest
+import PyPDF2
+from PIL import Image, ImageDraw
+from printshop_os.labels.api import app
+
+
+@pytest.fixture
+def client():
+    """Create a Flask test client."""
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+
+@pytest.fixture
+def label_png():
+    """Create sample label PNG bytes."""
+    img = Image.new('RGB', (1200, 1800), 'white')
+    draw = ImageDraw.Draw(img)
+    draw.rectangle([100, 100, 1100, 1700], outline='black', width=5)
+    draw.rectangle([200, 400, 1000, 600], fill='black')
+    
+    buffer = io.BytesIO()
+    img.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+class TestLabelAPI:
+    """Test suite for the label formatter endpoints."""
+    
+    def test_health(self, client):
+        """Test health check endpoint."""
+        response = client.get('/health')
+        assert response.status_code == 200
+        assert response.get_json()['status'] == 'healthy'
+    
+    def test_format_multipart(self, client, label_png):
+        """Test formatting a multipart upload."""
+        response = client.post(
+            '/api/labels/format',
+            data={'file': (io.BytesIO(label_png), 'label.png'), 'format': 'pdf'},
+            content_type='multipart/form-data'
+        )
+        
+        assert response.status_code == 200
+        assert response.mimetype == 'application/pdf'
+        assert response.data.startswith(b'%PDF-')
+        assert 'formatted_label.pdf' in response.headers['Content-Disposition']
+    
+    def test_format_raw_body(self, client, label_png):
+        """Test formatting a label sent as the raw request body."""
+        response = client.post(
+            '/api/labels/format?format=png',
+            data=label_png,
+            content_type='image/png'
+        )
+        
+        assert response.status_code == 200
+        assert response.mimetype == 'image/png'
+        assert Image.open(io.BytesIO(response.data)).size == (1200, 1800)
+        # 1-bit output is opt-in (LABEL_BILEVEL)
+        assert Image.open(io.BytesIO(response.data)).mode == 'RGB'
+    
+    def test_format_no_file(self, client):
+        """Test that a request without a file is rejected."""
+        response = client.post('/api/labels/format', data={}, content_type='multipart/form-data')
+        assert response.status_code == 400
+    
+    def test_format_disallowed_extension(self, client):
+        """Test that unsupported file types are rejected."""
+        response = client.post(
+            '/api/labels/format',
+            data={'file': (io.BytesIO(b'text'), 'label.txt')},
+            content_type='multipart/form-data'
+        )
+        assert response.status_code == 400
+    
+    def test_preview(self, client, label_png):
+        """Test preview endpoint returns a PNG."""
+        response = client.post(
+            '/api/labels/preview',
+            data={'file': (io.BytesIO(label_png), 'label.png')},
+            content_type='multipart/form-data'
+        )
+        
+        assert response.status_code == 200
+        assert response.mimetype == 'image/png'
+        assert Image.open(io.BytesIO(response.data)).size == (384, 576)
+    
+    def test_preview_webp(self, client, label_png):
+        """Test WebP previews and DPI validation."""
+        response = client.post(
+            '/api/labels/preview?format=webp&dpi=72',
+            data=label_png,
+            content_type='image/png'
+        )
+        assert response.status_code == 200
+        assert response.mimetype == 'image/webp'
+        
+        response = client.post(
+            '/api/labels/preview?dpi=600',
+            data=label_png,
+            content_type='image/png'
+        )
+        assert response.status_code == 400
+    
+    def test_health_reports_cache_stats(self, client):
+        """Test that cache counters are exposed on /health."""
+        response = client.get('/health')
+        cache = response.get_json()['cache']
+        assert 'hits' in cache
+        assert 'misses' in cache
+    
+    def test_job_submit_and_fetch(self, client, label_png):
+        """Test the asynchronous job endpoints."""
+        response = client.post(
+            '/api/labels/jobs',
+            data={'file': (io.BytesIO(label_png), 'label.png'), 'format': 'png'},
+            content_type='multipart/form-data'
+        )
+        assert response.status_code == 202
+        status_url = response.get_json()['status_url']
+        
+        deadline = time.time() + 30
+        response = client.get(status_url)
+        while response.status_code == 202 and time.time() < deadline:
+            time.sleep(0.05)
+            response = client.get(status_url)
+        
+        assert response.status_code == 200
+        assert response.mimetype == 'image/png'
+        assert float(response.headers['X-Job-Processing-Time']) > 0
+    
+    def test_job_queue_full(self, client, label_png, monkeypatch):
+        """Test that a full queue answers 429."""
+        from printshop_os.labels import api
+        monkeypatch.setattr(api.job_queue, 'max_pending', 0)
+        
+        response = client.post(
+            '/api/labels/jobs',
+            data={'file': (io.BytesIO(label_png), 'label.png')},
+            content_type='multipart/form-data'
+        )
+        assert response.status_code == 429
+        assert response.headers['Retry-After'] == '1'
+        
+        response = client.post(
+            '/api/labels/batch',
+            data={'files': [(io.BytesIO(label_png), 'a.png')]},
+            content_type='multipart/form-data'
+        )
+        assert response.status_code == 429
+    
+    def test_job_not_found(self, client):
+        """Test fetching an unknown job."""
+        assert client.get('/api/labels/jobs/missing').status_code == 404
+    
+    def test_batch_merged_pdf(self, client, label_png):
+        """Test merging a multi-file batch into one PDF."""
+        response = client.post(
+            '/api/labels/batch',
+            data={'files': [
+                (io.BytesIO(label_png), 'a.png'),
+                (io.BytesIO(b'not a label'), 'b.png'),
+                (io.BytesIO(label_png), 'c.png'),
+            ]},
+            content_type='multipart/form-data'
+        )
+        
+        assert response.status_code == 200
+        assert response.mimetype == 'application/pdf'
+        assert response.headers['X-Batch-Failed'] == '1'
+        assert len(PyPDF2.PdfReader(io.BytesIO(response.data)).pages) == 2
+    
+    def test_batch_zip_in_zip_out(self, client, label_png):
+        """Test a zip upload returned as a streamed zip."""
+        upload = io.BytesIO()
+        with zipfile.ZipFile(upload, 'w') as archive:
+            archive.writestr('labels/first.png', label_png)
+            archive.writestr('labels/second.png', label_png)
+            archive.writestr('labels/notes.txt', 'skipped')
+        
+        response = client.post(
+            '/api/labels/batch?bundle=zip&format=zpl',
+            data=upload.getvalue(),
+            content_type='application/zip'
+        )
+        
+        assert response.status_code == 200
+        with zipfile.ZipFile(io.BytesIO(response.data)) as archive:
+            names = archive.namelist()
+            report = json.loads(archive.read('batch_report.json'))
+            assert archive.read('0001_first.zpl').startswith(b'^XA')
+        
+        assert names == ['0001_first.zpl', '0002_second.zpl', 'batch_report.json']
+        assert [entry['error'] for entry in report] == [None, None]
+    
+    def test_batch_rejects_bad_input(self, client):
+        """Test batch validation errors."""
+        response = client.post('/api/labels/batch', data={}, content_type='multipart/form-data')
+        assert response.status_code == 400
+        
+        response = client.post(
+            '/api/labels/batch',
+            data={'files': (io.BytesIO(b'garbage'), 'labels.zip')},
+            content_type='multipart/form-data'
+        )
+        assert response.status_code == 400
+    
+    def test_too_large_reports_route_limit(self, client, monkeypatch):
+        """Test that a 413 names the size limit of the route that was hit."""
+        from printshop_os.labels import api
+        monkeypatch.setattr(api, 'MAX_BATCH_SIZE', 2 * 1024 * 1024)
+        upload = b'\0' * (3 * 1024 * 1024)
+        
+        response = client.post(
+            '/api/labels/batch',
+            data={'files': (io.BytesIO(upload), 'labels.zip')},
+            content_type='multipart/form-data'
+        )
+        assert response.status_code == 413
+        assert 'Maximum size is 2MB' in response.get_json()['error']
+        
+        response = client.post('/api/labels/batch', data=upload, content_type='application/zip')
+        assert response.status_code == 413
+        
+        response = client.post(
+            '/api/labels/format',
+            data={'file': (io.BytesIO(b'\0' * (11 * 1024 * 1024)), 'label.png')},
+            content_type='multipart/form-data'
+        )
+        assert response.status_code == 413
+        assert 'Maximum size is 10MB' in response.get_json()['error']
+    
+    def test_metrics(self, client, label_png):
+        """Test the Prometheus metrics endpoint."""
+        client.post(
+            '/api/labels/format',
+            data={'file': (io.BytesIO(label_png), 'label.png')},
+            content_type='multipart/form-data'
+        )
+        response = client.get('/metrics')
+        
+        assert response.status_code == 200
+        assert response.mimetype == 'text/plain'
+        text = response.get_data(as_text=True)
+        assert 'label_stage_seconds_count{stage="total"}' in text
+        assert 'label_jobs_pending' in text
+    
+    def test_print_to_spool_directory(self, client, label_png, monkeypatch, tmp_path):
+        """Test formatting a label and sending it to a configured printer."""
+        from printshop_os.labels import api
+        from printshop_os.labels.spooler import LabelSpooler, Printer
+        spooler = LabelSpooler(api.formatter, [Printer('office', spool_dir=str(tmp_path))])
+        monkeypatch.setattr(api, 'spooler', spooler)
+        
+        response = client.post(
+            '/api/labels/print?printer=office',
+            data={'file': (io.BytesIO(label_png), 'label.png')},
+            content_type='multipart/form-data'
+        )
+        assert response.status_code == 202
+        assert spooler.flush(timeout=10)
+        spooler.shutdown()
+        
+        status = client.get(response.get_json()['status_url']).get_json()
+        assert status['status'] == 'printed'
+        assert [p.suffix for p in tmp_path.iterdir()] == ['.zpl']
+        
+        printers = client.get('/api/labels/printers').get_json()
+        assert printers['office']['labels_printed'] == 1
+        assert 'label_spool_queue_depth{printer="office"} 0' in client.get('/metrics').get_data(as_text=True)
+    
+    def test_print_unknown_printer(self, client, label_png):
+        """Test printing to a printer that is not configured."""
+        response = client.post(
+            '/api/labels/print?printer=missing',
+            data={'file': (io.BytesIO(label_png), 'label.png')},
+            content_type='multipart/form-data'
+        )
+        assert response.status_code == 404
+        assert client.get('/api/labels/print/missing').status_code == 404
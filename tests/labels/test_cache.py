@@ -0,0 +1,235 @@
+"""
+Unit tests for the RenderCache.
+"""
+
+import io
+import os
+import pickle
+import pytest
+import tempfile
+from pathlib import Path
+from PIL import Image
+from printshop_os.labels import LabelFormatter, RenderCache
+from printshop_os.labels import raster
+
+
+@pytest.fixture
+def temp_dir():
+    """Create a temporary directory for cache files."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        yield Path(tmpdir)
+
+
+@pytest.fixture
+def label_bytes(temp_dir):
+    """Create sample label PNG bytes."""
+    path = temp_dir / 'label.png'
+    Image.new('RGB', (600, 900), 'white').save(path)
+    return path.read_bytes()
+
+
+class TestRenderCache:
+    """Test suite for RenderCache."""
+    
+    def test_make_key_depends_on_options(self):
+        """Test that keys change with content and options."""
+        key = RenderCache.make_key(b'label', dpi=300, output_format='pdf')
+        
+        assert key == RenderCache.make_key(b'label', output_format='pdf', dpi=300)
+        assert key != RenderCache.make_key(b'label', dpi=600, output_format='pdf')
+        assert key != RenderCache.make_key(b'other', dpi=300, output_format='pdf')
+    
+    def test_hit_and_miss_counters(self):
+        """Test hit/miss accounting per kind."""
+        cache = RenderCache()
+        
+        assert cache.get('output', 'abc') is None
+        cache.put('output', 'abc', b'data')
+        assert cache.get('output', 'abc') == b'data'
+        
+        stats = cache.stats()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+        assert stats['hit_ratio'] == 0.5
+        assert stats['by_kind']['output'] == {'hits': 1, 'misses': 1}
+    
+    def test_memory_lru_eviction(self):
+        """Test that least recently used entries are evicted first."""
+        cache = RenderCache(max_memory_bytes=10)
+        cache.put('output', 'a', b'aaaa')
+        cache.put('output', 'b', b'bbbb')
+        cache.get('output', 'a')
+        cache.put('output', 'c', b'cccc')
+        
+        assert cache.get('output', 'b') is None
+        assert cache.get('output', 'a') == b'aaaa'
+        assert cache.stats()['memory_bytes'] <= 10
+    
+    def test_disk_tier_survives_restart(self, temp_dir):
+        """Test that disk entries are visible to a new cache instance."""
+        RenderCache(cache_dir=temp_dir).put('raster', 'k' * 64, b'raster')
+        
+        cache = RenderCache(cache_dir=temp_dir)
+        assert cache.stats()['disk_bytes'] == len(b'raster')
+        assert cache.get('raster', 'k' * 64) == b'raster'
+    
+    def test_disk_lru_eviction(self, temp_dir):
+        """Test that the disk tier stays within its budget."""
+        cache = RenderCache(max_memory_bytes=0, cache_dir=temp_dir, max_disk_bytes=10)
+        cache.put('output', 'a' * 64, b'aaaaaa')
+        os.utime(cache._disk_path('output', 'a' * 64), (0, 0))
+        cache.put('output', 'b' * 64, b'bbbbbb')
+        
+        assert cache.stats()['disk_bytes'] <= 10
+        assert cache.get('output', 'b' * 64) == b'bbbbbb'
+    
+    def test_pickle_for_worker_processes(self, temp_dir):
+        """Test that a cache can be sent to pool workers."""
+        cache = RenderCache(cache_dir=temp_dir)
+        cache.put('output', 'a' * 64, b'data')
+        
+        restored = pickle.loads(pickle.dumps(cache))
+        assert restored.stats()['memory_entries'] == 0
+        assert restored.get('output', 'a' * 64) == b'data'
+
+
+class TestFormatterCaching:
+    """Test LabelFormatter integration with RenderCache."""
+    
+    def test_reprint_served_from_cache(self, label_bytes, monkeypatch):
+        """Test that identical input is only rendered once."""
+        formatter = LabelFormatter(cache=RenderCache())
+        calls = []
+        original = formatter._format_image
+        monkeypatch.setattr(
+            formatter, '_format_image',
+            lambda *args: calls.append(1) or original(*args)
+        )
+        
+        first = formatter.process_bytes(label_bytes, output_format='png')
+        second = formatter.process_bytes(label_bytes, output_format='png')
+        
+        assert first == second
+        assert len(calls) == 1
+        assert formatter.cache.stats()['by_kind']['output'] == {'hits': 1, 'misses': 1}
+    
+    def test_options_are_part_of_key(self, label_bytes):
+        """Test that different options miss the cache."""
+        formatter = LabelFormatter(cache=RenderCache())
+        
+        formatter.process_bytes(label_bytes, output_format='png')
+        formatter.process_bytes(label_bytes, output_format='png', optimize_bw=False)
+        
+        assert formatter.cache.stats()['misses'] == 2
+    
+    def test_shared_cache_keyed_by_formatter_settings(self, label_bytes):
+        """Test that formatters with different settings never share outputs."""
+        cache = RenderCache()
+        LabelFormatter(cache=cache).process_bytes(label_bytes, output_format='pdf')
+        LabelFormatter(cache=cache, passthrough=True).process_bytes(label_bytes, output_format='pdf')
+        LabelFormatter(cache=cache, use_numpy=True).process_bytes(label_bytes, output_format='pdf')
+        render = lambda self, pdf, page_number, dpi: Image.new('RGB', (10, 15), 'white')
+        probe = type('ProbeBackend', (raster.RasterBackend,), {'name': 'probe', 'render': render})()
+        LabelFormatter(cache=cache, raster_backend=probe).process_bytes(label_bytes, output_format='pdf')
+        
+        assert cache.stats()['by_kind']['output'] == {'hits': 0, 'misses': 4}
+    
+    def test_shared_cache_previews_keyed_by_formatter_settings(self, label_bytes):
+        """Test that previews are keyed by the same settings as outputs."""
+        cache = RenderCache()
+        LabelFormatter(cache=cache).preview(label_bytes)
+        LabelFormatter(cache=cache, threshold='adaptive').preview(label_bytes)
+        LabelFormatter(cache=cache, bilevel=True).preview(label_bytes)
+        LabelFormatter(cache=cache, use_numpy=True).preview(label_bytes)
+        LabelFormatter(cache=cache).preview(label_bytes)
+        
+        assert cache.stats()['by_kind']['preview'] == {'hits': 1, 'misses': 4}
+    
+    def test_shared_cache_previews_keyed_by_dpi(self, label_bytes):
+        """Test that formatters with different DPIs don't share previews."""
+        cache = RenderCache()
+        LabelFormatter(cache=cache, dpi=203).preview(label_bytes)
+        LabelFormatter(cache=cache, dpi=300).preview(label_bytes)
+        
+        assert cache.stats()['by_kind']['preview'] == {'hits': 0, 'misses': 2}
+    
+    def test_process_label_uses_cache(self, temp_dir, label_bytes):
+        """Test that file-based processing shares the output cache."""
+        formatter = LabelFormatter(cache=RenderCache())
+        input_path = temp_dir / 'in.png'
+        input_path.write_bytes(label_bytes)
+        
+        formatter.process_label(input_path, temp_dir / 'a.pdf')
+        formatter.process_label(input_path, temp_dir / 'b.pdf')
+        
+        assert (temp_dir / 'a.pdf').read_bytes() == (temp_dir / 'b.pdf').read_bytes()
+        assert formatter.cache.stats()['hits'] == 1
+    
+    def test_process_label_reads_input_once(self, temp_dir, label_bytes, monkeypatch):
+        """Test that the input file is read once for the key and the render."""
+        formatter = LabelFormatter(cache=RenderCache(), passthrough=False)
+        input_path = temp_dir / 'in.pdf'
+        Image.open(io.BytesIO(label_bytes)).save(input_path, format='PDF')
+        reads = []
+        read_bytes = Path.read_bytes
+        
+        def counting_read_bytes(path):
+            if path == input_path:
+                reads.append(path)
+            return read_bytes(path)
+        
+        monkeypatch.setattr(Path, 'read_bytes', counting_read_bytes)
+        formatter.process_label(input_path, temp_dir / 'out.pdf')
+        
+        assert len(reads) == 1
+    
+    def test_raster_cache(self, monkeypatch):
+        """Test that rasterized PDF pages are cached."""
+        formatter = LabelFormatter(cache=RenderCache())
+        calls = []
+        
+        def render(pdf, page_number=1):
+            calls.append(page_number)
+            return Image.new('RGB', (100, 150), 'white')
+        
+        monkeypatch.setattr(formatter, '_pdf_to_image', render)
+        
+        formatter._render_page(b'%PDF-1.4 fake', 1)
+        image = formatter._render_page(b'%PDF-1.4 fake', 1)
+        
+        assert calls == [1]
+        assert image.size == (100, 150)
+    
+    def test_raster_cache_hashes_document_once(self, monkeypatch):
+        """Test that a multi-page PDF is hashed once, not once per page."""
+        formatter = LabelFormatter(cache=RenderCache())
+        digests = []
+        document_digest = formatter._document_digest
+        
+        def digest(pdf):
+            digests.append(pdf)
+            return document_digest(pdf)
+        
+        monkeypatch.setattr(formatter, '_document_digest', digest)
+        monkeypatch.setattr(formatter, '_pdf_page_count', lambda pdf: 3)
+        monkeypatch.setattr(formatter, '_pdf_to_image', lambda pdf, page_number=1: Image.new('RGB', (100, 150), 'white'))
+        
+        labels = list(formatter.iter_labels(b'%PDF-1.4 fake', optimize_bw=False))
+        
+        assert len(labels) == 3
+        assert len(digests) == 1
+        assert formatter.cache.stats()['by_kind']['raster'] == {'hits': 0, 'misses': 3}
+    
+    def test_raster_cache_keyed_by_backend(self):
+        """Test that a shared raster cache never serves one backend's render to another."""
+        cache = RenderCache()
+        
+        def backend(name, color):
+            render = lambda self, pdf, page_number, dpi: Image.new('RGB', (10, 15), color)
+            return type(f'{name}Backend', (raster.RasterBackend,), {'name': name, 'render': render})()
+        
+        LabelFormatter(cache=cache, raster_backend=backend('embedded', 'black'))._render_page(b'%PDF-1.4 fake')
+        image = LabelFormatter(cache=cache, raster_backend=backend('pdfium', 'white'))._render_page(b'%PDF-1.4 fake')
+        
+        assert image.getpixel((0, 0)) == (255, 255, 255)
+        assert cache.stats()['by_kind']['raster'] == {'hits': 0, 'misses': 2}
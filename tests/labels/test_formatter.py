@@ -2,6 +2,7 @@
 Unit tests for LabelFormatter class.
 """
 
+import io
 import pytest
 import tempfile
 from pathlib import Path
@@ -221,3 +222,278 @@ class TestLabelFormatter:
         
         assert len(processed) == 1
         assert processed[0].stem == 'label_1'
+    
+    def test_process_bytes_png_to_pdf(self, formatter, sample_image):
+        """Test processing in-memory PNG bytes to PDF bytes."""
+        result = formatter.process_bytes(sample_image.read_bytes(), output_format='pdf')
+        
+        assert isinstance(result, bytes)
+        assert result.startswith(b'%PDF-')
+    
+    def test_process_bytes_png_to_png(self, formatter, sample_image):
+        """Test processing in-memory PNG bytes to PNG bytes."""
+        result = formatter.process_bytes(sample_image.read_bytes(), output_format='png')
+        
+        output_img = Image.open(io.BytesIO(result))
+        assert output_img.format == 'PNG'
+        assert output_img.size == (formatter.label_width_px, formatter.label_height_px)
+    
+    def test_process_bytes_unsupported_content(self, formatter):
+        """Test that non-image content is rejected."""
+        with pytest.raises(ValueError, match='Unsupported file format'):
+            formatter.process_bytes(b'not an image')
+    
+    def test_process_stream(self, formatter, sample_image):
+        """Test processing from a file-like object."""
+        with open(sample_image, 'rb') as stream:
+            output = formatter.process_stream(stream, output_format='png')
+        
+        assert output.tell() == 0
+        assert Image.open(output).size == (formatter.label_width_px, formatter.label_height_px)
+    
+    def test_preview_png(self, formatter, sample_image):
+        """Test that previews are rendered at screen resolution."""
+        result = formatter.preview(sample_image.read_bytes())
+        
+        preview = Image.open(io.BytesIO(result))
+        assert preview.format == 'PNG'
+        assert preview.size == (4 * formatter.PREVIEW_DPI, 6 * formatter.PREVIEW_DPI)
+    
+    def test_preview_webp_custom_dpi(self, formatter, sample_image):
+        """Test WebP previews at a custom DPI."""
+        result = formatter.preview(sample_image.read_bytes(), image_format='webp', dpi=72)
+        
+        preview = Image.open(io.BytesIO(result))
+        assert preview.format == 'WEBP'
+        assert preview.size == (288, 432)
+    
+    def test_preview_pdf_rasterized_at_preview_dpi(self, formatter, monkeypatch):
+        """Test that PDF previews are rasterized at the preview DPI."""
+        requested = []
+        
+        def fake_pdf_to_image(pdf, page_number=1, dpi=None):
+            requested.append(dpi)
+            return Image.new('RGB', (4 * dpi, 6 * dpi), 'white')
+        
+        monkeypatch.setattr(formatter, '_pdf_to_image', fake_pdf_to_image)
+        formatter.preview(b'%PDF-1.4 fake')
+        
+        assert requested == [formatter.PREVIEW_DPI]
+    
+    def test_preview_unsupported_format(self, formatter, sample_image):
+        """Test that unknown preview encodings are rejected."""
+        with pytest.raises(ValueError, match='Unsupported preview format'):
+            formatter.preview(sample_image.read_bytes(), image_format='gif')
+    
+    def test_batch_report_collects_errors(self, formatter, temp_dir):
+        """Test that batch failures are reported rather than raised."""
+        input_dir = temp_dir / 'input'
+        input_dir.mkdir()
+        output_dir = temp_dir / 'output'
+        
+        Image.new('RGB', (1200, 1800), 'white').save(input_dir / 'good.png')
+        (input_dir / 'broken.png').write_bytes(b'not really a png')
+        
+        report = formatter.batch_report(input_dir, output_dir, output_format='png')
+        
+        assert len(report.results) == 2
+        assert [p.name for p in report.processed] == ['good.png']
+        assert len(report.failed) == 1
+        assert report.failed[0].source.name == 'broken.png'
+        assert report.to_dict()['failed'] == 1
+    
+    def test_batch_process_parallel_workers(self, formatter, temp_dir):
+        """Test batch processing across a process pool."""
+        input_dir = temp_dir / 'input'
+        input_dir.mkdir()
+        output_dir = temp_dir / 'output'
+        
+        for i in range(4):
+            Image.new('RGB', (600, 900), 'white').save(input_dir / f'label_{i}.png')
+        
+        report = formatter.batch_report(
+            input_dir, output_dir, output_format='png', workers=2, chunksize=1
+        )
+        
+        assert report.workers == 2
+        assert [p.stem for p in report.processed] == [f'label_{i}' for i in range(4)]
+        assert all(p.exists() for p in report.processed)
+
+
+@pytest.fixture
+def multipage_pdf(temp_dir):
+    """Create a 3-page PDF (one label per page)."""
+    from reportlab.pdfgen import canvas
+    from reportlab.lib.pagesizes import inch
+    
+    path = temp_dir / 'manifest.pdf'
+    pdf = canvas.Canvas(str(path), pagesize=(4 * inch, 6 * inch))
+    for i in range(3):
+        pdf.drawString(72, 72, f"LABEL {i + 1}")
+        pdf.showPage()
+    pdf.save()
+    return path
+
+
+class TestMultiPageLabels:
+    """Test suite for multi-page PDF label splitting."""
+    
+    def _fake_render(self, calls):
+        """Build a _pdf_to_image stand-in that records requested pages."""
+        def render(pdf, page_number=1):
+            calls.append(page_number)
+            img = Image.new('RGB', (1200, 1800), 'white')
+            from PIL import ImageDraw
+            ImageDraw.Draw(img).rectangle([100, 100, 1100, 1700], fill='black')
+            return img
+        return render
+    
+    def test_iter_labels_renders_lazily(self, formatter, multipage_pdf, monkeypatch):
+        """Test that pages are rendered one at a time as they are consumed."""
+        calls = []
+        monkeypatch.setattr(formatter, '_pdf_to_image', self._fake_render(calls))
+        
+        labels = formatter.iter_labels(multipage_pdf)
+        assert calls == []
+        
+        first = next(labels)
+        assert calls == [1]
+        assert first.size == (formatter.label_width_px, formatter.label_height_px)
+        
+        assert len(list(labels)) == 2
+        assert calls == [1, 2, 3]
+    
+    def test_process_pages_multipage_pdf(self, formatter, multipage_pdf, temp_dir, monkeypatch):
+        """Test writing all pages into a single multi-page PDF."""
+        monkeypatch.setattr(formatter, '_pdf_to_image', self._fake_render([]))
+        output = temp_dir / 'labels.pdf'
+        
+        written = formatter.process_pages(multipage_pdf, output)
+        
+        assert written == [output]
+        import PyPDF2
+        assert len(PyPDF2.PdfReader(str(output)).pages) == 3
+    
+    def test_process_pages_split(self, formatter, multipage_pdf, temp_dir, monkeypatch):
+        """Test writing one file per page."""
+        monkeypatch.setattr(formatter, '_pdf_to_image', self._fake_render([]))
+        
+        written = formatter.process_pages(
+            multipage_pdf, temp_dir / 'split', output_format='png', split=True
+        )
+        
+        assert [p.name for p in written] == [
+            'manifest_p001.png', 'manifest_p002.png', 'manifest_p003.png'
+        ]
+        assert all(p.exists() for p in written)
+    
+    def test_process_pages_png_requires_split(self, formatter, multipage_pdf, temp_dir):
+        """Test that single-file PNG output is rejected."""
+        with pytest.raises(ValueError, match='requires PDF'):
+            formatter.process_pages(multipage_pdf, temp_dir / 'out.png', output_format='png')
+
+
+def make_pdf(width_in, height_in, rotate=0):
+    """Create a one-page vector PDF label of the given size in inches."""
+    from reportlab.pdfgen import canvas
+    from reportlab.lib.pagesizes import inch
+    import PyPDF2
+    
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=(width_in * inch, height_in * inch))
+    pdf.rect(36, 36, 72, 144, fill=1)
+    pdf.drawString(36, 200, "VECTOR LABEL")
+    pdf.showPage()
+    pdf.save()
+    if not rotate:
+        return buffer.getvalue()
+    
+    writer = PyPDF2.PdfWriter()
+    writer.add_page(PyPDF2.PdfReader(buffer).pages[0].rotate(rotate))
+    output = io.BytesIO()
+    writer.write(output)
+    return output.getvalue()
+
+
+class TestPdfPassthrough:
+    """Test suite for copying already label-sized PDFs without rasterizing."""
+    
+    @pytest.fixture(autouse=True)
+    def no_rasterize(self, formatter, monkeypatch):
+        """Enable pass-through and record any attempt to rasterize a PDF page."""
+        formatter.passthrough = True
+        self.rendered = []
+        
+        def render(pdf, page_number=1):
+            self.rendered.append(page_number)
+            return Image.new('RGB', (1200, 1800), 'white')
+        
+        monkeypatch.setattr(formatter, '_pdf_to_image', render)
+    
+    def _page(self, data):
+        import PyPDF2
+        reader = PyPDF2.PdfReader(io.BytesIO(data))
+        assert len(reader.pages) == 1
+        page = reader.pages[0]
+        return float(page.mediabox.width), float(page.mediabox.height), page.rotation
+    
+    def test_4x6_pdf_is_copied(self, formatter):
+        """Test that a 4x6 PDF keeps its vector content."""
+        result = formatter.process_bytes(make_pdf(4, 6))
+        
+        assert self.rendered == []
+        assert self._page(result) == (288.0, 432.0, 0)
+        assert b'/Subtype /Image' not in result
+    
+    def test_6x4_pdf_is_rotated(self, formatter):
+        """Test that a landscape 6x4 PDF is turned upright."""
+        result = formatter.process_bytes(make_pdf(6, 4))
+        
+        assert self.rendered == []
+        assert self._page(result) == (432.0, 288.0, 270)
+    
+    def test_rotated_page_counts_as_displayed(self, formatter):
+        """Test that /Rotate is taken into account when checking the size."""
+        result = formatter.process_bytes(make_pdf(6, 4, rotate=90))
+        
+        assert self.rendered == []
+        assert self._page(result) == (432.0, 288.0, 90)
+    
+    def test_6x4_without_auto_rotate_is_rasterized(self, formatter):
+        """Test that landscape pages are only passed through when rotating."""
+        formatter.process_bytes(make_pdf(6, 4), auto_rotate=False)
+        
+        assert self.rendered == [1]
+    
+    def test_other_sizes_are_rasterized(self, formatter):
+        """Test that letter-size PDFs still go through the raster pipeline."""
+        formatter.process_bytes(make_pdf(8.5, 11))
+        
+        assert self.rendered == [1]
+    
+    def test_image_output_is_rasterized(self, formatter):
+        """Test that pass-through only applies to PDF output."""
+        formatter.process_bytes(make_pdf(4, 6), output_format='png')
+        
+        assert self.rendered == [1]
+    
+    def test_passthrough_can_be_disabled(self, formatter):
+        """Test the passthrough=False opt-out."""
+        formatter.passthrough = False
+        formatter.process_bytes(make_pdf(4, 6))
+        
+        assert self.rendered == [1]
+    
+    def test_passthrough_off_by_default(self):
+        """Test that pass-through must be opted into."""
+        assert LabelFormatter().passthrough is False
+    
+    def test_process_label_file(self, formatter, temp_dir):
+        """Test pass-through for file input."""
+        input_path = temp_dir / 'label.pdf'
+        input_path.write_bytes(make_pdf(4, 6))
+        
+        output = formatter.process_label(input_path, temp_dir / 'out.pdf')
+        
+        assert self.rendered == []
+        assert self._page(output.read_bytes())[:2] == (288.0, 432.0)
@@ -0,0 +1,99 @@
+"""
+Unit tests for the asynchronous label JobQueue.
+"""
+
+import io
+import time
+import pytest
+from PIL import Image
+from printshop_os.labels import LabelFormatter
+from printshop_os.labels.jobs import JobQueue, QueueFullError
+
+
+@pytest.fixture
+def label_png():
+    """Create sample label PNG bytes."""
+    buffer = io.BytesIO()
+    Image.new('RGB', (600, 900), 'white').save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def job_queue():
+    """Create a small job queue and shut it down afterwards."""
+    queue = JobQueue(LabelFormatter(), workers=1, max_pending=4)
+    yield queue
+    queue.shutdown()
+
+
+def wait_for(job, timeout=30):
+    """Poll until a job leaves the queued/running states."""
+    deadline = time.time() + timeout
+    while job.status in ('queued', 'running') and time.time() < deadline:
+        time.sleep(0.05)
+    return job
+
+
+class TestJobQueue:
+    """Test suite for JobQueue."""
+    
+    def test_submit_and_complete(self, job_queue, label_png):
+        """Test that a job completes with output and timings."""
+        job = wait_for(job_queue.submit(label_png, output_format='png'))
+        
+        assert job.status == 'done'
+        assert Image.open(io.BytesIO(job.result)).format == 'PNG'
+        assert job.queue_time >= 0
+        assert job.processing_time > 0
+        assert job_queue.get(job.id) is job
+        assert job_queue.stats()['completed'] == 1
+    
+    def test_failed_job(self, job_queue):
+        """Test that processing errors are captured on the job."""
+        job = wait_for(job_queue.submit(b'not a label'))
+        
+        assert job.status == 'failed'
+        assert 'Unsupported file format' in job.error
+        assert job_queue.stats()['failed'] == 1
+    
+    def test_backpressure(self, label_png):
+        """Test that submissions beyond the queue depth are rejected."""
+        queue = JobQueue(LabelFormatter(), workers=1, max_pending=0)
+        try:
+            with pytest.raises(QueueFullError):
+                queue.submit(label_png)
+            assert queue.stats()['rejected'] == 1
+        finally:
+            queue.shutdown()
+    
+    def test_unknown_job(self, job_queue):
+        """Test looking up an unknown job id."""
+        assert job_queue.get('missing') is None
+    
+    def test_map_preserves_order(self, job_queue, label_png):
+        """Test that batch results come back in input order."""
+        items = [('a', label_png), ('bad', b'junk'), ('c', label_png)]
+        results = list(job_queue.map(iter(items), output_format='png', window=2))
+        
+        assert [name for name, _, _ in results] == ['a', 'bad', 'c']
+        assert results[0][1].startswith(b'\x89PNG')
+        assert results[1][1] is None and results[1][2]
+    
+    def test_map_counts_against_queue_depth(self, label_png):
+        """Test that batch labels hold queue slots and a full queue rejects batches."""
+        queue = JobQueue(LabelFormatter(), workers=1, max_pending=2)
+        try:
+            batch = queue.map(iter([(str(n), label_png) for n in range(4)]), output_format='png', window=4)
+            next(batch)
+            assert queue.stats()['pending'] <= 2
+            
+            job = queue.submit(label_png, output_format='png')
+            assert [name for name, _, _ in batch] == ['1', '2', '3']
+            assert wait_for(job).status == 'done'
+            assert queue.stats()['pending'] == 0
+            
+            queue.max_pending = 0
+            with pytest.raises(QueueFullError):
+                queue.map(iter([('a', label_png)]))
+        finally:
+            queue.shutdown()
@@ -0,0 +1,91 @@
+"""
+Unit tests for pipeline stage metrics.
+"""
+
+import io
+import pickle
+import pytest
+from PIL import Image, ImageDraw
+from printshop_os.labels import LabelFormatter
+from printshop_os.labels.metrics import PipelineStats, prometheus_histogram, prometheus_metric
+
+
+@pytest.fixture
+def label_png():
+    """Create sample label PNG bytes."""
+    img = Image.new('RGB', (600, 900), 'white')
+    ImageDraw.Draw(img).rectangle([50, 50, 550, 850], outline='black', width=3)
+    buffer = io.BytesIO()
+    img.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+class TestPipelineStats:
+    """Test suite for PipelineStats."""
+    
+    def test_record_and_summary(self):
+        """Test histogram counters and the summary view."""
+        stats = PipelineStats(buckets=(0.01, 0.1))
+        stats.record('crop', 0.005)
+        stats.record('crop', 0.05)
+        stats.record('load', 1.0)
+        
+        snapshot = stats.snapshot()
+        assert list(snapshot) == ['load', 'crop']
+        assert snapshot['crop']['buckets'] == [1, 2]
+        assert snapshot['load']['buckets'] == [0, 0]
+        assert stats.summary()['crop'] == {'count': 2, 'mean_ms': 27.5, 'max_ms': 50.0}
+    
+    def test_pickle_starts_empty(self):
+        """Test that worker copies do not carry recorded timings."""
+        stats = PipelineStats()
+        stats.record('load', 0.1)
+        
+        copy = pickle.loads(pickle.dumps(stats))
+        assert copy.snapshot() == {}
+        assert copy.buckets == stats.buckets
+    
+    def test_prometheus_format(self):
+        """Test the Prometheus text rendering."""
+        stats = PipelineStats(buckets=(0.1,))
+        stats.record('save', 0.05)
+        
+        text = prometheus_histogram('label_stage_seconds', 'Stage latency', stats)
+        assert '# TYPE label_stage_seconds histogram' in text
+        assert 'label_stage_seconds_bucket{stage="save",le="0.1"} 1' in text
+        assert 'label_stage_seconds_bucket{stage="save",le="+Inf"} 1' in text
+        assert 'label_stage_seconds_count{stage="save"} 1' in text
+        
+        text = prometheus_metric('label_jobs_pending', 'gauge', 'Pending jobs', [(None, 3)])
+        assert text.endswith('label_jobs_pending 3\n')
+
+
+class TestFormatterStages:
+    """Test suite for LabelFormatter stage hooks."""
+    
+    def test_stats_and_callback(self, label_png):
+        """Test that every stage is reported to stats and on_stage."""
+        calls = []
+        stats = PipelineStats()
+        formatter = LabelFormatter(stats=stats, on_stage=lambda stage, s: calls.append(stage))
+        
+        formatter.process_bytes(label_png, output_format='png')
+        
+        assert calls == ['load', 'rotate', 'crop', 'resize', 'threshold', 'save', 'total']
+        assert set(stats.snapshot()) == set(calls)
+    
+    def test_skipped_stages_not_reported(self, label_png):
+        """Test that disabled stages are not timed."""
+        calls = []
+        formatter = LabelFormatter(on_stage=lambda stage, s: calls.append(stage))
+        
+        formatter.process_bytes(label_png, output_format='png', auto_rotate=False, optimize_bw=False)
+        
+        assert 'rotate' not in calls
+        assert 'threshold' not in calls
+    
+    def test_callback_not_pickled(self):
+        """Test that formatters with a callback can still go to workers."""
+        formatter = LabelFormatter(on_stage=lambda stage, s: None)
+        
+        assert pickle.loads(pickle.dumps(formatter)).on_stage is None
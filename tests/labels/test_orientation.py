@@ -0,0 +1,115 @@
+"""
+Unit tests for content-based label orientation detection.
+"""
+
+import pickle
+import random
+import threading
+import pytest
+from PIL import Image, ImageDraw, ImageFont
+from printshop_os.labels import LabelFormatter
+from printshop_os.labels.orientation import OrientationResult, OrientationStats, detect_orientation
+
+
+def make_label(border: bool = True, barcode: bool = True) -> Image.Image:
+    """Create a synthetic upright 4x6 shipping label at 300 DPI."""
+    rnd = random.Random(0)
+    img = Image.new('RGB', (1200, 1800), 'white')
+    draw = ImageDraw.Draw(img)
+    small = ImageFont.load_default(size=36)
+    large = ImageFont.load_default(size=60)
+    
+    if border:
+        draw.rectangle([20, 20, 1180, 1780], outline='black', width=4)
+    draw.text((60, 60), "FROM: ACME PRINT SHOP", font=small, fill='black')
+    draw.text((60, 110), "123 Main Street Suite 4", font=small, fill='black')
+    draw.text((60, 160), "Springfield IL 62701", font=small, fill='black')
+    draw.line([20, 240, 1180, 240], fill='black', width=4)
+    draw.text((60, 280), "SHIP TO:", font=small, fill='black')
+    draw.text((100, 340), "JANE DOE", font=large, fill='black')
+    draw.text((100, 420), "456 Elm Avenue Apt 12", font=large, fill='black')
+    draw.text((100, 500), "Portland OR 97205", font=large, fill='black')
+    draw.text((60, 660), "PRIORITY MAIL 2-DAY", font=large, fill='black')
+    
+    if barcode:
+        x = 120
+        while x < 1080:
+            width = rnd.choice([4, 8, 12])
+            draw.rectangle([x, 1200, x + width - 1, 1550], fill='black')
+            x += width + rnd.choice([4, 8, 12])
+    
+    return img
+
+
+class TestDetectOrientation:
+    """Test suite for detect_orientation."""
+    
+    @pytest.mark.parametrize('rotation', [0, 90, 180, 270])
+    @pytest.mark.parametrize('border', [True, False])
+    def test_corrects_rotation(self, rotation, border):
+        """Test that every quarter-turn is undone."""
+        image = make_label(border=border).rotate(rotation, expand=True)
+        result = detect_orientation(image)
+        
+        assert (rotation + result.angle) % 360 == 0
+    
+    @pytest.mark.parametrize('rotation', [0, 90, 180, 270])
+    def test_text_only_label(self, rotation):
+        """Test detection from text lines alone, without a barcode."""
+        image = make_label(barcode=False).crop((0, 0, 1200, 900)).rotate(rotation, expand=True)
+        
+        assert (rotation + detect_orientation(image).angle) % 360 == 0
+    
+    def test_label_on_letter_page(self):
+        """Test an upside-down label placed on a mostly blank page."""
+        page = Image.new('RGB', (2550, 3300), 'white')
+        page.paste(make_label(), (100, 100))
+        
+        assert detect_orientation(page.rotate(180)).angle == 180
+    
+    def test_blank_image_falls_back_to_aspect_ratio(self):
+        """Test that blank input uses the aspect ratio."""
+        assert detect_orientation(Image.new('RGB', (1800, 1200), 'white')).angle == 90
+        assert detect_orientation(Image.new('RGB', (1200, 1800), 'white')).angle == 0
+    
+    def test_reports_timing(self):
+        """Test that detection time is recorded."""
+        result = detect_orientation(make_label())
+        
+        assert result.elapsed > 0
+        assert set(result.cues) == {'stripes', 'lines', 'barcode_position', 'alignment'}
+
+
+class TestOrientationStats:
+    """Test suite for OrientationStats."""
+    
+    def test_formatter_records_detections(self):
+        """Test that the formatter accumulates orientation stats."""
+        formatter = LabelFormatter()
+        formatter._auto_rotate(make_label().rotate(180))
+        formatter._auto_rotate(make_label())
+        
+        stats = formatter.orientation_stats.to_dict()
+        assert stats['count'] == 2
+        assert stats['rotations'] == {'0': 1, '90': 0, '180': 1, '270': 0}
+        assert 0 < stats['mean_ms'] <= stats['max_ms']
+    
+    def test_empty_stats(self):
+        """Test stats before any detection."""
+        assert OrientationStats().mean_ms == 0.0
+    
+    def test_concurrent_records(self):
+        """Test that detections recorded from many threads are all counted."""
+        stats = OrientationStats()
+        result = OrientationResult(angle=180, sideways_score=0.0, flip_score=1.0, elapsed=0.001)
+        threads = [
+            threading.Thread(target=lambda: [stats.record(result) for _ in range(1000)])
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert stats.to_dict()['rotations']['180'] == 8000
+        assert pickle.loads(pickle.dumps(stats)).count == 0
@@ -0,0 +1,83 @@
+"""
+Unit tests for the streaming PDF writer.
+"""
+
+import io
+import tracemalloc
+import pytest
+import PyPDF2
+from PIL import Image, ImageDraw
+from printshop_os.labels.pdfstream import PdfStreamWriter
+
+PAGE_SIZE = (288, 432)
+
+
+def label(mode='1', size=(1200, 1800)):
+    """A label image with a little content."""
+    image = Image.new(mode, size, 'white' if mode == 'RGB' else 255)
+    ImageDraw.Draw(image).rectangle([100, 100, size[0] // 2, size[1] // 2], fill=0)
+    return image
+
+
+def image_filter(page):
+    """The /Filter of a page's image XObject."""
+    xobject = list(page['/Resources']['/XObject'].values())[0].get_object()
+    return xobject['/Filter']
+
+
+class TestPdfStreamWriter:
+    """Test suite for PdfStreamWriter."""
+    
+    def test_multipage_document(self, tmp_path):
+        """Test writing pages of every image mode into one valid PDF."""
+        path = tmp_path / 'labels.pdf'
+        with PdfStreamWriter(path, PAGE_SIZE) as writer:
+            for mode in ('1', 'L', 'RGB'):
+                writer.add_page(label(mode))
+        
+        reader = PyPDF2.PdfReader(str(path), strict=True)
+        assert writer.page_count == 3
+        assert len(reader.pages) == 3
+        assert [float(x) for x in reader.pages[0].mediabox] == [0, 0, 288, 432]
+        assert image_filter(reader.pages[0]) == ['/CCITTFaxDecode']
+        assert image_filter(reader.pages[2]) == '/FlateDecode'
+    
+    def test_unseekable_stream(self):
+        """Test that output can go to a stream that only supports write()."""
+        chunks = []
+        
+        class Sink:
+            def write(self, data):
+                chunks.append(bytes(data))
+            
+            def flush(self):
+                pass
+        
+        with PdfStreamWriter(Sink(), PAGE_SIZE) as writer:
+            writer.add_page(label())
+            # The page is on its way out before the document is finished
+            assert sum(map(len, chunks)) > 0
+        
+        assert len(PyPDF2.PdfReader(io.BytesIO(b''.join(chunks))).pages) == 1
+    
+    def test_closed_writer(self):
+        """Test that pages cannot be added after close()."""
+        writer = PdfStreamWriter(io.BytesIO(), PAGE_SIZE)
+        writer.close()
+        with pytest.raises(ValueError, match='closed'):
+            writer.add_page(label())
+    
+    def test_memory_bounded_by_one_page(self, tmp_path):
+        """Test that peak memory does not grow with the number of pages."""
+        def peak_for(pages):
+            tracemalloc.start()
+            with PdfStreamWriter(tmp_path / f'{pages}.pdf', PAGE_SIZE) as writer:
+                for _ in range(pages):
+                    writer.add_page(label('RGB', (600, 900)))
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            return peak
+        
+        one_page = 600 * 900 * 3
+        assert peak_for(40) < 3 * one_page
+        assert peak_for(40) < 1.5 * peak_for(2)
@@ -0,0 +1,191 @@
+"""
+Unit tests for PDF raster backends and backend selection.
+"""
+
+import io
+import threading
+import time
+import pytest
+from PIL import Image, ImageDraw
+from printshop_os.labels import LabelFormatter, raster
+from printshop_os.labels.pdfstream import PdfStreamWriter
+
+
+class FakeBackend(raster.RasterBackend):
+    """Backend that renders a blank page after a fixed delay."""
+    
+    delay = 0.0
+    
+    def __init__(self):
+        self.calls = []
+    
+    @classmethod
+    def available(cls):
+        return True
+    
+    def render(self, pdf, page_number, dpi):
+        self.calls.append((page_number, dpi))
+        time.sleep(self.delay)
+        return Image.new('RGB', (4 * dpi, 6 * dpi), 'white')
+
+
+class SlowBackend(FakeBackend):
+    name = 'slow'
+    delay = 0.02
+
+
+class FastBackend(FakeBackend):
+    name = 'fast'
+
+
+class MissingBackend(FakeBackend):
+    name = 'missing'
+    
+    @classmethod
+    def available(cls):
+        return False
+
+
+@pytest.fixture
+def fake_backends(monkeypatch):
+    """Replace the backend registry and forget any cached selection."""
+    monkeypatch.setattr(raster, 'BACKENDS', {
+        'slow': SlowBackend,
+        'fast': FastBackend,
+        'missing': MissingBackend,
+        'embedded': raster.EmbeddedImageBackend,
+    })
+    monkeypatch.setattr(raster, '_selected', None)
+    monkeypatch.delenv('LABEL_RASTER_BACKEND', raising=False)
+
+
+def scanned_pdf():
+    """A 4x6 image-only PDF with a black box in the top-left quarter."""
+    image = Image.new('1', (400, 600), 1)
+    ImageDraw.Draw(image).rectangle([0, 0, 199, 299], fill=0)
+    buffer = io.BytesIO()
+    with PdfStreamWriter(buffer, (288, 432)) as writer:
+        writer.add_page(image)
+    return buffer.getvalue()
+
+
+class TestBackendSelection:
+    """Test suite for backend lookup and automatic selection."""
+    
+    def test_available_backends(self, fake_backends):
+        """Test that only installed backends are listed, in order."""
+        assert raster.available_backends() == ['slow', 'fast', 'embedded']
+    
+    def test_get_backend_errors(self, fake_backends):
+        """Test unknown and uninstalled backend names."""
+        with pytest.raises(ValueError, match='Unknown raster backend'):
+            raster.get_backend('nope')
+        with pytest.raises(ValueError, match='not installed'):
+            raster.get_backend('missing')
+    
+    def test_backend_without_render(self):
+        """Test that a backend missing render() fails when instantiated."""
+        class IncompleteBackend(raster.RasterBackend):
+            name = 'incomplete'
+        
+        with pytest.raises(TypeError, match='render'):
+            IncompleteBackend()
+    
+    def test_selects_fastest(self, fake_backends):
+        """Test that the fastest vector backend wins and the choice is cached."""
+        selected = raster.select_backend()
+        
+        assert selected.name == 'fast'
+        assert raster.select_backend() is selected
+    
+    def test_env_override(self, fake_backends, monkeypatch):
+        """Test forcing a backend with LABEL_RASTER_BACKEND."""
+        monkeypatch.setenv('LABEL_RASTER_BACKEND', 'slow')
+        
+        assert raster.select_backend(refresh=True).name == 'slow'
+    
+    def test_falls_back_to_embedded(self, fake_backends, monkeypatch):
+        """Test the fallback when no vector renderer is installed."""
+        monkeypatch.setattr(raster, 'BACKENDS', {'embedded': raster.EmbeddedImageBackend})
+        
+        assert raster.select_backend(refresh=True).name == 'embedded'
+
+
+class TestEmbeddedImageBackend:
+    """Test suite for the embedded image fallback."""
+    
+    def test_extracts_bilevel_image(self):
+        """Test that CCITT images keep their polarity."""
+        image = raster.EmbeddedImageBackend().render(scanned_pdf(), 1, 300)
+        
+        assert image.mode == 'RGB'
+        assert image.size == (400, 600)
+        assert image.getpixel((50, 50)) == (0, 0, 0)
+        assert image.getpixel((350, 550)) == (255, 255, 255)
+    
+    def test_vector_page_is_rejected(self):
+        """Test that pages without an embedded image raise ValueError."""
+        with pytest.raises(ValueError, match='no embedded image'):
+            raster.EmbeddedImageBackend().render(raster.PROBE_PDF, 1, 300)
+
+
+class TestThreadSafety:
+    """Test that non-thread-safe renderers are entered one thread at a time."""
+    
+    @pytest.mark.parametrize('backend_class, lock', [
+        (raster.PdfiumBackend, raster._PDFIUM_LOCK),
+        (raster.MuPdfBackend, raster._MUPDF_LOCK),
+    ])
+    def test_render_waits_for_lock(self, backend_class, lock):
+        """Test that a render does not start while another thread holds the lock."""
+        if not backend_class.available():
+            pytest.skip(f"{backend_class.name} is not installed")
+        results = []
+        thread = threading.Thread(target=lambda: results.append(backend_class().render(raster.PROBE_PDF, 1, 72)))
+        
+        with lock:
+            thread.start()
+            thread.join(0.2)
+            assert thread.is_alive()
+        thread.join(5)
+        
+        assert results[0].size == (288, 432)
+    
+    def test_concurrent_renders_match(self):
+        """Test that renders from several threads match a single-threaded render."""
+        backend = raster.select_backend()
+        if not backend.renders_vectors:
+            pytest.skip('no vector renderer installed')
+        expected = backend.render(raster.PROBE_PDF, 1, 100).tobytes()
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(backend.render(raster.PROBE_PDF, 1, 100).tobytes()))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert results == [expected] * 8
+
+
+class TestFormatterBackend:
+    """Test suite for the formatter's use of raster backends."""
+    
+    def test_uses_given_backend(self):
+        """Test that PDF pages are rendered by the configured backend."""
+        backend = FastBackend()
+        formatter = LabelFormatter(raster_backend=backend, passthrough=False)
+        
+        formatter.process_bytes(scanned_pdf(), output_format='png')
+        
+        assert backend.calls == [(1, 300)]
+    
+    def test_backend_by_name(self):
+        """Test selecting a backend by name."""
+        formatter = LabelFormatter(raster_backend='embedded')
+        
+        assert formatter.raster_backend.name == 'embedded'
+        with pytest.raises(ValueError, match='Unknown raster backend'):
+            LabelFormatter(raster_backend='nope')
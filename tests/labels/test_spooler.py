@@ -0,0 +1,267 @@
+"""
+Unit tests for the label print spooler.
+"""
+
+import io
+import socket
+import tempfile
+import threading
+from unittest import mock
+import pytest
+import PyPDF2
+from pathlib import Path
+from reportlab.pdfgen import canvas
+from printshop_os.labels.jobs import QueueFullError
+from printshop_os.labels.spooler import LabelSpooler, Printer, coalesce, parse_printers
+
+
+class FakePrinter:
+    """Raw TCP (port 9100 style) listener that records each job it receives."""
+    
+    def __init__(self):
+        self.jobs = []
+        self._received = threading.Condition()
+        self._server = socket.create_server(('127.0.0.1', 0))
+        self.port = self._server.getsockname()[1]
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+    
+    def _serve(self):
+        while True:
+            try:
+                conn, _ = self._server.accept()
+            except OSError:
+                return
+            with conn:
+                chunks = []
+                while True:
+                    data = conn.recv(65536)
+                    if not data:
+                        break
+                    chunks.append(data)
+                with self._received:
+                    self.jobs.append(b''.join(chunks))
+                    self._received.notify_all()
+    
+    def wait_for(self, count, timeout=5):
+        """Wait until count jobs have been fully received; return the jobs."""
+        with self._received:
+            self._received.wait_for(lambda: len(self.jobs) >= count, timeout)
+            return list(self.jobs)
+    
+    def close(self):
+        self._server.close()
+
+
+@pytest.fixture
+def fake_printer():
+    """Start a local TCP printer stand-in."""
+    printer = FakePrinter()
+    yield printer
+    printer.close()
+
+
+@pytest.fixture
+def temp_dir():
+    """Create a temporary directory for spooled jobs."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        yield Path(tmpdir)
+
+
+def zpl(n):
+    """A minimal ZPL label program."""
+    return f"^XA^FO50,50^FDLABEL {n}^FS^XZ".encode()
+
+
+def pdf_label():
+    """A one-page 4x6 PDF."""
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=(288, 432))
+    pdf.drawString(72, 72, "LABEL")
+    pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
+
+
+class TestPrinter:
+    """Test suite for printer configuration."""
+    
+    def test_from_uri(self):
+        """Test parsing tcp and dir printer URIs."""
+        printer = Printer.from_uri('rollo', 'tcp://10.0.0.5?format=epl&batch=20')
+        assert (printer.host, printer.port) == ('10.0.0.5', 9100)
+        assert (printer.output_format, printer.max_batch) == ('epl', 20)
+        
+        printer = Printer.from_uri('office', 'dir:/var/spool/labels')
+        assert printer.spool_dir == '/var/spool/labels'
+        assert printer.target == 'dir:/var/spool/labels'
+    
+    def test_invalid_printers(self):
+        """Test that bad printer definitions are rejected."""
+        with pytest.raises(ValueError):
+            Printer('both', host='10.0.0.5', spool_dir='/tmp')
+        with pytest.raises(ValueError):
+            Printer('bad', host='10.0.0.5', output_format='png')
+        with pytest.raises(ValueError):
+            Printer.from_uri('ipp', 'ipp://printer/queue')
+        with pytest.raises(ValueError):
+            parse_printers('no-uri')
+    
+    def test_parse_printers(self):
+        """Test parsing a comma-separated printer list."""
+        printers = parse_printers('a=tcp://10.0.0.5:9101, b=dir:/tmp/spool,')
+        
+        assert [p.name for p in printers] == ['a', 'b']
+        assert printers[0].port == 9101
+        assert parse_printers('') == []
+
+
+class TestCoalesce:
+    """Test suite for merging labels into one job."""
+    
+    def test_printer_commands_concatenate(self):
+        """Test that ZPL label programs are concatenated in order."""
+        assert coalesce([zpl(1), zpl(2)], 'zpl') == zpl(1) + zpl(2)
+    
+    def test_pdfs_merge(self):
+        """Test that PDFs are merged into one multi-page document."""
+        merged = coalesce([pdf_label(), pdf_label(), pdf_label()], 'pdf')
+        
+        assert len(PyPDF2.PdfReader(io.BytesIO(merged)).pages) == 3
+
+
+class TestLabelSpooler:
+    """Test suite for LabelSpooler."""
+    
+    def test_sends_over_tcp(self, fake_printer):
+        """Test that a label is delivered to a raw TCP printer."""
+        spooler = LabelSpooler(printers=[Printer('p', host='127.0.0.1', port=fake_printer.port)])
+        try:
+            job = spooler.submit('p', zpl(1))
+            assert spooler.flush(timeout=10)
+        finally:
+            spooler.shutdown()
+        
+        assert fake_printer.wait_for(1) == [zpl(1)]
+        assert job.status == 'printed'
+        assert spooler.get(job.id).to_dict()['batch_size'] == 1
+    
+    def test_coalesces_queued_labels(self, fake_printer):
+        """Test that labels waiting together are sent as one job."""
+        spooler = LabelSpooler(
+            printers=[Printer('p', host='127.0.0.1', port=fake_printer.port, max_batch=4)],
+            linger=0.5
+        )
+        try:
+            jobs = [spooler.submit('p', zpl(n)) for n in range(6)]
+            assert spooler.flush(timeout=10)
+            stats = spooler.stats()['p']
+        finally:
+            spooler.shutdown()
+        
+        assert fake_printer.wait_for(2) == [
+            b''.join(zpl(n) for n in range(4)),
+            b''.join(zpl(n) for n in range(4, 6)),
+        ]
+        assert [job.batch_size for job in jobs] == [4, 4, 4, 4, 2, 2]
+        assert stats['jobs_sent'] == 2
+        assert stats['labels_printed'] == 6
+        assert stats['mean_batch_size'] == 3.0
+        assert stats['queue_depth'] == 0
+        assert stats['labels_per_second'] > 0
+    
+    def test_spool_directory(self, temp_dir):
+        """Test that jobs are written whole into a spool directory."""
+        spooler = LabelSpooler(
+            printers=[Printer('p', spool_dir=str(temp_dir), output_format='pdf')],
+            linger=0.5
+        )
+        try:
+            spooler.submit('p', pdf_label())
+            spooler.submit('p', pdf_label())
+            assert spooler.flush(timeout=10)
+        finally:
+            spooler.shutdown()
+        
+        files = list(temp_dir.iterdir())
+        assert len(files) == 1
+        assert files[0].suffix == '.pdf'
+        assert len(PyPDF2.PdfReader(str(files[0])).pages) == 2
+    
+    def test_unreachable_printer_fails_after_retries(self):
+        """Test that send errors are retried, then reported on the job."""
+        with socket.create_server(('127.0.0.1', 0)) as server:
+            port = server.getsockname()[1]
+        spooler = LabelSpooler(
+            printers=[Printer('p', host='127.0.0.1', port=port, timeout=1)],
+            retries=1,
+            retry_delay=0
+        )
+        try:
+            job = spooler.submit('p', zpl(1))
+            assert spooler.flush(timeout=10)
+            stats = spooler.stats()['p']
+        finally:
+            spooler.shutdown()
+        
+        assert job.status == 'failed'
+        assert stats['labels_failed'] == 1
+        assert stats['last_error']
+    
+    def test_failed_send_is_not_resent(self):
+        """Test that a batch is never resent once its connection was made."""
+        conn = mock.MagicMock()
+        conn.__enter__.return_value = conn
+        conn.sendall.side_effect = ConnectionResetError("Connection reset by peer")
+        spooler = LabelSpooler(
+            printers=[Printer('p', host='127.0.0.1', timeout=1)],
+            retries=2,
+            retry_delay=0
+        )
+        try:
+            with mock.patch('printshop_os.labels.spooler.socket.create_connection', return_value=conn) as connect:
+                job = spooler.submit('p', zpl(1))
+                assert spooler.flush(timeout=10)
+        finally:
+            spooler.shutdown()
+        
+        assert connect.call_count == 1
+        assert job.status == 'failed'
+        assert 'after connecting' in job.error
+    
+    def test_queue_full(self, temp_dir):
+        """Test backpressure when a printer's queue is full."""
+        spooler = LabelSpooler(printers=[Printer('p', spool_dir=str(temp_dir))], max_queue=0)
+        try:
+            with pytest.raises(QueueFullError):
+                spooler.submit('p', zpl(1))
+        finally:
+            spooler.shutdown()
+    
+    def test_unknown_printer(self):
+        """Test that submitting to an unknown printer raises KeyError."""
+        spooler = LabelSpooler()
+        with pytest.raises(KeyError):
+            spooler.submit('missing', zpl(1))
+    
+    def test_print_label_formats_for_printer(self, fake_printer, temp_dir):
+        """Test that raw labels are formatted in the printer's format."""
+        from PIL import Image
+        from printshop_os.labels import LabelFormatter
+        
+        image = Image.new('RGB', (1200, 1800), 'white')
+        image.paste((0, 0, 0), (100, 100, 1100, 400))
+        buffer = io.BytesIO()
+        image.save(buffer, format='PNG')
+        
+        spooler = LabelSpooler(
+            LabelFormatter(bilevel=True),
+            printers=[Printer('p', host='127.0.0.1', port=fake_printer.port)]
+        )
+        try:
+            spooler.print_label('p', buffer.getvalue())
+            assert spooler.flush(timeout=10)
+        finally:
+            spooler.shutdown()
+        
+        assert fake_printer.wait_for(1)[0].startswith(b'^XA')
@@ -0,0 +1,142 @@
+"""
+Unit tests for thermal printer output (1-bit PDF, ZPL and EPL).
+"""
+
+import io
+import re
+import pytest
+from PIL import Image, ImageDraw
+from printshop_os.labels import LabelFormatter
+from printshop_os.labels import thermal
+
+
+REPEAT_LOW = 'GHIJKLMNOPQRSTUVWXY'
+REPEAT_HIGH = 'ghijklmnopqrstuvwxyz'
+
+
+def decode_zpl_graphic(zpl: bytes) -> tuple:
+    """Decode a ^GFA field with ASCII compression back to raw rows."""
+    match = re.search(rb'\^GFA,(\d+),(\d+),(\d+),(.*)\^FS', zpl)
+    total, bytes_per_row, data = int(match.group(1)), int(match.group(3)), match.group(4).decode()
+    row_chars = bytes_per_row * 2
+    
+    rows, current, count = [], '', 0
+    for char in data:
+        if char in REPEAT_HIGH:
+            count += (REPEAT_HIGH.index(char) + 1) * 20
+        elif char in REPEAT_LOW:
+            count += REPEAT_LOW.index(char) + 1
+        elif char == ',':
+            current += '0' * (row_chars - len(current))
+        elif char == '!':
+            current += 'F' * (row_chars - len(current))
+        elif char == ':':
+            current = rows[-1]
+        else:
+            current += char * (count or 1)
+            count = 0
+        if len(current) == row_chars:
+            rows.append(current)
+            current = ''
+    
+    return total, bytes_per_row, bytes.fromhex(''.join(rows))
+
+
+@pytest.fixture
+def bilevel_label():
+    """Create a 1-bit label with bars, blank rows and a solid block."""
+    img = Image.new('1', (203, 60), 1)
+    draw = ImageDraw.Draw(img)
+    for x in range(10, 190, 6):
+        draw.rectangle([x, 5, x + 2, 30], fill=0)
+    draw.rectangle([0, 40, 202, 50], fill=0)
+    return img
+
+
+class TestZPL:
+    """Test ZPL ^GF encoding."""
+    
+    def test_zpl_roundtrip(self, bilevel_label):
+        """Test that compressed ZPL decodes to the original bitmap."""
+        zpl = thermal.to_zpl(bilevel_label)
+        total, bytes_per_row, raw = decode_zpl_graphic(zpl)
+        
+        assert bytes_per_row == 26
+        assert total == 26 * 60
+        
+        decoded = Image.frombytes('1', (bytes_per_row * 8, 60), bytes(b ^ 0xFF for b in raw))
+        assert decoded.crop((0, 0, 203, 60)).tobytes() == bilevel_label.tobytes()
+    
+    def test_zpl_compression_shrinks_payload(self, bilevel_label):
+        """Test that compressed output is smaller than plain hex."""
+        assert len(thermal.to_zpl(bilevel_label)) < len(thermal.to_zpl(bilevel_label, compress=False))
+    
+    def test_zpl_label_framing(self, bilevel_label):
+        """Test label start/end and print width commands."""
+        zpl = thermal.to_zpl(bilevel_label)
+        assert zpl.startswith(b'^XA^PW203^LL60')
+        assert zpl.rstrip().endswith(b'^XZ')
+
+
+class TestEPL:
+    """Test EPL2 GW encoding."""
+    
+    def test_epl_graphic_write(self, bilevel_label):
+        """Test GW header and binary payload size."""
+        epl = thermal.to_epl(bilevel_label)
+        header = b'GW0,0,26,60,'
+        
+        start = epl.index(header) + len(header)
+        end = epl.index(b'\r\nP1\r\n')
+        assert end - start == 26 * 60
+    
+    def test_epl_padding_is_white(self, bilevel_label):
+        """Test that row padding bits do not print."""
+        epl = thermal.to_epl(bilevel_label)
+        start = epl.index(b'GW0,0,26,60,') + len(b'GW0,0,26,60,')
+        
+        # Row 45 is solid black; its 5 padding bits must stay white (1)
+        last_byte = epl[start + 45 * 26 + 25]
+        assert last_byte & 0b11111 == 0b11111
+
+
+class TestBilevelOutput:
+    """Test LabelFormatter thermal-native output."""
+    
+    @pytest.fixture
+    def label_png(self):
+        """Create sample label PNG bytes."""
+        img = Image.new('RGB', (1200, 1800), 'white')
+        ImageDraw.Draw(img).rectangle([200, 400, 1000, 600], fill='black')
+        buffer = io.BytesIO()
+        img.save(buffer, format='PNG')
+        return buffer.getvalue()
+    
+    def test_optimize_bw_stays_1bit(self):
+        """Test that bilevel mode skips the RGB round-trip."""
+        formatter = LabelFormatter(bilevel=True)
+        result = formatter._optimize_bw(Image.new('RGB', (120, 180), 'white'))
+        assert result.mode == '1'
+    
+    def test_bilevel_pdf_is_smaller(self, label_png):
+        """Test that 1-bit PDFs are smaller than 24-bit ones."""
+        rgb_pdf = LabelFormatter().process_bytes(label_png, output_format='pdf')
+        bw_pdf = LabelFormatter(bilevel=True).process_bytes(label_png, output_format='pdf')
+        
+        assert bw_pdf.startswith(b'%PDF')
+        assert len(bw_pdf) < len(rgb_pdf)
+    
+    def test_bilevel_png(self, label_png):
+        """Test that PNG output is 1-bit in bilevel mode."""
+        png = LabelFormatter(bilevel=True).process_bytes(label_png, output_format='png')
+        assert Image.open(io.BytesIO(png)).mode == '1'
+    
+    def test_process_bytes_zpl(self, label_png):
+        """Test direct ZPL output from the formatter."""
+        zpl = LabelFormatter().process_bytes(label_png, output_format='zpl')
+        assert zpl.startswith(b'^XA^PW1200^LL1800')
+    
+    def test_process_bytes_epl(self, label_png):
+        """Test direct EPL output from the formatter."""
+        epl = LabelFormatter(bilevel=True).process_bytes(label_png, output_format='epl')
+        assert b'GW0,0,150,1800,' in epl
@@ -0,0 +1,103 @@
+"""
+Unit tests for the vectorized NumPy image path.
+"""
+
+import io
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw, ImageOps
+from printshop_os.labels import LabelFormatter
+from printshop_os.labels import vectorized
+
+
+@pytest.fixture
+def label_image():
+    """Create a label-like image with gray background and dark content."""
+    img = Image.new('RGB', (600, 900), (235, 235, 235))
+    draw = ImageDraw.Draw(img)
+    draw.rectangle([0, 0, 599, 40], fill='white')
+    draw.rectangle([60, 80, 540, 820], outline=(20, 20, 20), width=4)
+    draw.rectangle([100, 300, 500, 420], fill=(40, 30, 20))
+    for x in range(100, 500, 12):
+        draw.rectangle([x, 500, x + 4, 650], fill='black')
+    return img
+
+
+class TestVectorizedOps:
+    """Test that array operations match the PIL path."""
+    
+    def test_gray_array_matches_pil(self, label_image):
+        """Test grayscale conversion matches convert('L')."""
+        expected = np.asarray(label_image.convert('L'))
+        assert np.array_equal(vectorized.gray_array(label_image), expected)
+    
+    def test_content_bbox_matches_getbbox(self, label_image):
+        """Test bounding box matches inverted getbbox."""
+        gray = label_image.convert('L')
+        expected = ImageOps.invert(gray).getbbox()
+        assert vectorized.content_bbox(np.asarray(gray)) == expected
+    
+    def test_content_bbox_blank(self):
+        """Test that a blank image has no bounding box."""
+        assert vectorized.content_bbox(np.full((10, 10), 255, dtype=np.uint8)) is None
+    
+    def test_autocontrast_matches_pil(self, label_image):
+        """Test autocontrast lookup table matches ImageOps.autocontrast."""
+        gray = label_image.convert('L')
+        expected = np.asarray(ImageOps.autocontrast(gray, cutoff=2))
+        lut = vectorized.autocontrast_lut(np.asarray(gray), cutoff=2)
+        assert np.array_equal(lut[np.asarray(gray)], expected)
+    
+    def test_adaptive_threshold_keeps_bars_and_solids(self, label_image):
+        """Test adaptive threshold keeps thin bars and solid areas black."""
+        gray = vectorized.gray_array(label_image)
+        white = vectorized.adaptive_threshold(gray, block_size=31)
+        
+        assert not white[575, 102]  # barcode bar
+        assert white[575, 108]  # gap between bars
+        assert not white[360, 300]  # centre of a solid block
+        assert white[200, 300]  # background
+
+
+class TestFormatterNumpyPath:
+    """Test LabelFormatter with the NumPy path enabled."""
+    
+    def test_numpy_path_matches_pil_path(self, label_image):
+        """Test that the fixed-threshold output is identical."""
+        pil_formatter = LabelFormatter()
+        np_formatter = LabelFormatter(use_numpy=True)
+        
+        expected = pil_formatter._optimize_bw(pil_formatter._crop_to_label(label_image))
+        result = np_formatter._optimize_bw(np_formatter._crop_to_label(label_image))
+        
+        assert result.mode == 'RGB'
+        assert result.tobytes() == expected.tobytes()
+    
+    def test_adaptive_threshold_mode(self, label_image):
+        """Test adaptive threshold produces a B&W image."""
+        formatter = LabelFormatter(threshold='adaptive')
+        result = formatter._optimize_bw(label_image)
+        
+        assert result.mode == 'RGB'
+        assert set(np.unique(np.asarray(result))) <= {0, 255}
+    
+    def test_adaptive_preview_block_size(self, label_image, monkeypatch):
+        """Test that the adaptive window of a preview follows the preview DPI."""
+        block_sizes = []
+        adaptive_threshold = vectorized.adaptive_threshold
+        
+        def record(gray, block_size, **kwargs):
+            block_sizes.append(block_size)
+            return adaptive_threshold(gray, block_size=block_size, **kwargs)
+        
+        monkeypatch.setattr(vectorized, 'adaptive_threshold', record)
+        buffer = io.BytesIO()
+        label_image.save(buffer, 'PNG')
+        LabelFormatter(threshold='adaptive').preview(buffer.getvalue(), dpi=80, optimize_bw=True)
+        
+        assert block_sizes == [11]
+    
+    def test_unknown_threshold_mode(self):
+        """Test that an unknown threshold mode is rejected."""
+        with pytest.raises(ValueError, match='Unknown threshold'):
+            LabelFormatter(threshold='otsu')
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Benchmark: shipping client throughput and API latency at volume.
+
+Drives shipment workloads through EasyPostClient with the API replaced by
+recorded fixtures (see printshop_os/shipping/replay.py), so no network or
+API key is needed and every run sees the same injected latency:
+
+- serial: create and buy one shipment at a time
+- bulk: create_shipments_bulk + buy_shipments_bulk at each worker count
+- buy_by_id: bulk purchases by shipment ID, with and without the shipment cache
+- quotes: RateShopper quotes over a fixed set of lanes (cache hit ratio)
+
+For each scenario it reports shipments/sec, API requests made and p50/p99
+latency per operation from client.stats().
+
+The checked-in fixtures (fixtures/easypost_replay_synthetic.json) are
+synthetic: they were recorded from the local stub server, so results
+measure the stub's response shapes, not EasyPost's. Record real fixtures
+with --record, against the API at EASYPOST_API_BASE with the test-mode
+key in EASYPOST_API_KEY (test labels are free); they are saved to
+fixtures/easypost_replay.json and replayed instead whenever present.
+
+Usage:
+    python -m tests.shipping.bench_shipping [--shipments 1000] [--latency 0.02]
+                                            [--workers 8 32] [--json results.json]
+    EASYPOST_API_KEY=EZTK... python -m tests.shipping.bench_shipping --record
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+from printshop_os.shipping.easypost_client import EasyPostClient
+from printshop_os.shipping.rate_shopping import RateShopper
+from printshop_os.shipping.replay import load_fixtures, record, replay
+from printshop_os.shipping.transport import TransportStats
+from tests.shipping.test_easypost_bulk import shipment_spec
+
+# Recorded from tests/shipping/easypost_stub.py, not the EasyPost API
+SYNTHETIC_FIXTURES = Path(__file__).parent / 'fixtures' / 'easypost_replay_synthetic.json'
+
+# Recorded from the EasyPost test API with --record
+RECORDED_FIXTURES = Path(__file__).parent / 'fixtures' / 'easypost_replay.json'
+
+# Distinct destination ZIPs in the quote workload
+QUOTE_LANES = 20
+
+
+def record_fixtures(client: EasyPostClient, path, shipments: int = 3) -> int:
+    """Record one of each replayed operation per shipment; returns interactions saved."""
+    recorder = record(client)
+    client.cache_ttl = 0
+    client.validate_address(shipment_spec(1)['to_address'])
+    created = [client.create_shipment(**shipment_spec(n)) for n in range(shipments)]
+    for shipment in created:
+        client.list_rates(shipment.id)
+    bought = [client.buy_shipment(shipment) for shipment in created]
+    for shipment in bought:
+        client.create_tracker(shipment.tracking_code)
+    client.list_trackers([shipment.tracking_code for shipment in bought])
+    recorder.save(path, source=client.client.api_base)
+    return len(recorder.interactions)
+
+
+def make_client(interactions, args, pool_size: int, **kwargs):
+    """Client answering from the fixtures with the configured latency."""
+    client = EasyPostClient(api_key='replay', api_base='https://api.easypost.com/v2',
+                            pool_size=pool_size, label_store=False, **kwargs)
+    replay(client, interactions, latency=args.latency, jitter=args.jitter, seed=0)
+    return client
+
+
+def summarize(name: str, client, shipments: int, elapsed: float, **extra) -> dict:
+    """Result row for one scenario."""
+    stats = client.stats()
+    return dict({
+        'scenario': name,
+        'shipments': shipments,
+        'seconds': round(elapsed, 3),
+        'shipments_per_second': round(shipments / elapsed, 1),
+        'requests': stats['requests'],
+        'retries': stats['retries'] + stats['call_retries'],
+        'latency_ms': {
+            operation: {'p50': latency['p50'], 'p99': latency['p99']}
+            for operation, latency in stats['latency_ms'].items()
+        },
+    }, **extra)
+
+
+def bench_serial(interactions, args) -> dict:
+    """Create and buy shipments one at a time."""
+    client = make_client(interactions, args, pool_size=1)
+    count = min(args.shipments, args.serial_shipments)
+    start = time.perf_counter()
+    for n in range(count):
+        client.buy_shipment(client.create_shipment(**shipment_spec(n)))
+    return summarize('serial', client, count, time.perf_counter() - start, workers=1)
+
+
+def bench_bulk(interactions, args, workers: int) -> dict:
+    """Create, then buy, every shipment with the bulk methods."""
+    client = make_client(interactions, args, pool_size=workers)
+    specs = [shipment_spec(n) for n in range(args.shipments)]
+    start = time.perf_counter()
+    created = client.create_shipments_bulk(specs, max_workers=workers)
+    bought = client.buy_shipments_bulk(
+        [r['shipment'] for r in created if r['shipment']], max_workers=workers
+    )
+    elapsed = time.perf_counter() - start
+    failed = sum(1 for r in created + bought if r['error'])
+    return summarize('bulk', client, args.shipments, elapsed, workers=workers, failed=failed)
+
+
+def bench_buy_by_id(interactions, args, workers: int, cache_ttl: float) -> dict:
+    """Buy shipments by ID, as the API does, with or without the shipment cache."""
+    client = make_client(interactions, args, pool_size=workers, cache_ttl=cache_ttl)
+    created = client.create_shipments_bulk(
+        [shipment_spec(n) for n in range(args.shipments)], max_workers=workers
+    )
+    ids = [r['shipment'].id for r in created if r['shipment']]
+    # Count the purchases only
+    client.session.stats = TransportStats()
+    start = time.perf_counter()
+    bought = client.buy_shipments_bulk(ids, max_workers=workers)
+    elapsed = time.perf_counter() - start
+    name = 'buy_by_id_cached' if cache_ttl else 'buy_by_id_uncached'
+    failed = sum(1 for r in bought if r['error'])
+    return summarize(name, client, len(ids), elapsed, workers=workers, failed=failed)
+
+
+def bench_quotes(interactions, args) -> dict:
+    """Quote every shipment through a RateShopper over QUOTE_LANES lanes."""
+    client = make_client(interactions, args, pool_size=1)
+    shopper = RateShopper(client)
+    start = time.perf_counter()
+    for n in range(args.shipments):
+        spec = shipment_spec(n)
+        spec['to_address']['zip'] = f"{90001 + n % QUOTE_LANES}"
+        shopper.quote(**spec)
+    elapsed = time.perf_counter() - start
+    return summarize('quotes', client, args.shipments, elapsed, workers=1,
+                     hit_ratio=shopper.stats()['hit_ratio'])
+
+
+def print_result(result: dict) -> None:
+    """Print one scenario as a summary line and a latency row per operation."""
+    extra = ''
+    if 'hit_ratio' in result:
+        extra = f"  hit ratio {result['hit_ratio']:.2f}"
+    elif result.get('failed'):
+        extra = f"  {result['failed']} failed"
+    print(f"{result['scenario']:<20} {result['workers']:>3} worker(s)  {result['shipments']:>6} shipments  "
+          f"{result['shipments_per_second']:>8.1f}/sec  {result['requests']:>6} requests{extra}")
+    for operation, latency in sorted(result['latency_ms'].items()):
+        print(f"    {operation:<10} p50 {latency['p50']:>8.2f} ms  p99 {latency['p99']:>8.2f} ms")
+
+
+def main():
+    """Run every scenario and print a table, or re-record the fixtures."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--shipments', type=int, default=1000, help='Shipments per scenario (default: 1000)')
+    parser.add_argument('--serial-shipments', type=int, default=100,
+                        help='Shipments for the serial scenario (default: 100)')
+    parser.add_argument('--latency', type=float, default=0.02,
+                        help='Injected seconds per API request (default: 0.02)')
+    parser.add_argument('--jitter', type=float, default=0.5,
+                        help='Extra random latency as a fraction of --latency (default: 0.5)')
+    parser.add_argument('--workers', type=int, nargs='+', default=[8, 32], help='Bulk worker counts to test')
+    parser.add_argument('--fixtures', help='Fixture file to replay or record (default: fixtures/easypost_replay.json '
+                                           'if recorded, else the synthetic fixtures)')
+    parser.add_argument('--record', action='store_true',
+                        help='Re-record the fixture file from the API instead of benchmarking')
+    parser.add_argument('--json', help='Also write results to this JSON file')
+    args = parser.parse_args()
+    
+    if args.record:
+        path = args.fixtures or RECORDED_FIXTURES
+        saved = record_fixtures(EasyPostClient(label_store=False), path)
+        print(f"Recorded {saved} interactions to {path}")
+        return
+    
+    path = args.fixtures or (RECORDED_FIXTURES if RECORDED_FIXTURES.exists() else SYNTHETIC_FIXTURES)
+    if Path(path) == SYNTHETIC_FIXTURES:
+        print("Replaying synthetic fixtures recorded from the local stub, not EasyPost; "
+              "record real ones with --record")
+    interactions = load_fixtures(path)
+    results = [bench_serial(interactions, args)]
+    for workers in args.workers:
+        results.append(bench_bulk(interactions, args, workers))
+    for cache_ttl in (0, 300):
+        results.append(bench_buy_by_id(interactions, args, max(args.workers), cache_ttl))
+    results.append(bench_quotes(interactions, args))
+    
+    print(f"Injected latency {args.latency * 1000:.0f} ms (+ up to {args.jitter:.0%} jitter) per request\n")
+    for result in results:
+        print_result(result)
+    
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'latency': args.latency, 'jitter': args.jitter, 'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,251 @@
+"""
+Local stub of the EasyPost shipments API for tests.
+
+Serves just enough of the API for EasyPostClient: shipment create,
+retrieve and buy, address verification, and tracker create and list.
+Purchased labels point back at the stub, which serves label_data for them.
+Shipments and trackers are kept in memory; addresses verify unless
+street1 contains "INVALID". Failures, lost responses and latency can be
+injected, and every request is recorded so tests can count API calls and
+measure concurrency.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+from typing import Dict, List, Optional, Tuple, Union
+
+RATES = (
+    ('USPS', 'Priority', '7.58', 2),
+    ('USPS', 'GroundAdvantage', '5.93', 5),
+    ('UPS', 'NextDayAir', '31.20', 1),
+)
+
+
+class EasyPostStub:
+    """
+    Threaded HTTP server answering EasyPost shipment calls.
+    
+    Attributes:
+        api_base (str): Base URL to pass to EasyPostClient
+        requests (list): (method, path) of every request received
+        max_in_flight (int): Highest number of requests handled at once
+        delay (float): Seconds to wait before answering each request
+        failures (dict): (method, path prefix) -> [status, ...] responses
+            to return before the real one, consumed in order
+        lost (dict): (method, path prefix) -> number of requests to carry
+            out normally but answer with a 504, as if the response was lost
+        label_data (bytes): Body served for every purchased label URL
+    """
+    
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.requests: List[Tuple[str, str]] = []
+        self.failures: Dict[Tuple[str, str], List[int]] = {}
+        self.lost: Dict[Tuple[str, str], int] = {}
+        self.shipments: Dict[str, dict] = {}
+        self.trackers: Dict[str, dict] = {}
+        self.label_data = b''
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+        self.base_url = f"http://127.0.0.1:{self._server.server_address[1]}"
+        self.api_base = f"{self.base_url}/v2"
+    
+    def __enter__(self) -> 'EasyPostStub':
+        self._thread = threading.Thread(target=self._server.serve_forever, args=(0.01,), daemon=True)
+        self._thread.start()
+        return self
+    
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+    
+    def fail(self, method: str, path: str, *statuses: int) -> None:
+        """Answer the next requests matching method and path prefix with these statuses."""
+        self.failures.setdefault((method, path), []).extend(statuses)
+    
+    def lose(self, method: str, path: str, count: int = 1) -> None:
+        """Carry out the next requests matching method and path prefix, but answer 504."""
+        self.lost[(method, path)] = self.lost.get((method, path), 0) + count
+    
+    def count(self, method: str, path: str = '') -> int:
+        """Number of requests received with this method and path prefix."""
+        return sum(1 for m, p in self.requests if m == method and p.startswith(path))
+    
+    def set_tracker_status(self, tracking_code: str, status: str, updated_at: str) -> dict:
+        """Change a tracker's status as the carrier would; returns the tracker."""
+        with self._lock:
+            tracker = self.trackers[tracking_code]
+            tracker.update({'status': status, 'updated_at': updated_at})
+            tracker['tracking_details'].append({
+                'object': 'TrackingDetail', 'message': status.replace('_', ' ').title(),
+                'status': status, 'datetime': updated_at, 'tracking_location': None,
+            })
+            return json.loads(json.dumps(tracker))
+    
+    def handle(self, method: str, path: str, body: dict, query: Optional[dict] = None) -> Tuple[int, Union[dict, bytes]]:
+        """Route one request; returns (status, JSON body or raw label bytes)."""
+        with self._lock:
+            self.requests.append((method, path))
+            for (fail_method, prefix), statuses in self.failures.items():
+                if fail_method == method and path.startswith(prefix) and statuses:
+                    status = statuses.pop(0)
+                    return status, {'error': {'code': 'STUB.ERROR', 'message': f'Injected {status}'}}
+        
+        parts = path.strip('/').split('/')
+        if method == 'GET' and parts[0] == 'labels':
+            return 200, self.label_data
+        if method == 'POST' and parts == ['v2', 'addresses', 'create_and_verify']:
+            return self._verify(body.get('address', {}))
+        if parts == ['v2', 'trackers']:
+            if method == 'POST':
+                return 201, self._create_tracker(body.get('tracker', {}))
+            codes = (query or {}).get('tracking_codes[]', [])
+            with self._lock:
+                trackers = [self.trackers[code] for code in codes if code in self.trackers]
+            return 200, {'trackers': trackers, 'has_more': False}
+        if method == 'POST' and parts == ['v2', 'shipments']:
+            return 201, self._create(body.get('shipment', {}))
+        if len(parts) >= 3 and parts[:2] == ['v2', 'shipments']:
+            shipment = self.shipments.get(parts[2])
+            if shipment is None:
+                return 404, {'error': {'code': 'NOT_FOUND', 'message': 'The requested resource could not be found.'}}
+            if method == 'GET' and len(parts) == 3:
+                return 200, shipment
+            if method == 'POST' and parts[3:] == ['buy']:
+                return self._buy(shipment, body.get('rate', {}))
+        return 404, {'error': {'code': 'NOT_FOUND', 'message': f'No route for {method} {path}'}}
+    
+    def _create(self, params: dict) -> dict:
+        with self._lock:
+            shipment_id = f"shp_{len(self.shipments) + 1:04d}"
+            shipment = {
+                'object': 'Shipment',
+                'id': shipment_id,
+                'status': 'unknown',
+                'tracking_code': None,
+                'created_at': '2024-01-01T00:00:00Z',
+                'updated_at': '2024-01-01T00:00:00Z',
+                'to_address': params.get('to_address'),
+                'from_address': params.get('from_address'),
+                'parcel': params.get('parcel'),
+                'postage_label': None,
+                'selected_rate': None,
+                'rates': [
+                    {
+                        'object': 'Rate',
+                        'id': f"rate_{shipment_id}_{number}",
+                        'shipment_id': shipment_id,
+                        'carrier': carrier,
+                        'service': service,
+                        'rate': rate,
+                        'currency': 'USD',
+                        'delivery_days': days,
+                        'delivery_date': None,
+                        'delivery_date_guaranteed': False,
+                    }
+                    for number, (carrier, service, rate, days) in enumerate(RATES)
+                ],
+            }
+            self.shipments[shipment_id] = shipment
+        return shipment
+    
+    def _create_tracker(self, params: dict) -> dict:
+        with self._lock:
+            code = params['tracking_code']
+            tracker = {
+                'object': 'Tracker',
+                'id': f"trk_{len(self.trackers) + 1:04d}",
+                'tracking_code': code,
+                'carrier': params.get('carrier') or 'USPS',
+                'status': 'pre_transit',
+                'status_detail': 'label_created',
+                'est_delivery_date': None,
+                'public_url': f"https://track.example.com/{code}",
+                'updated_at': '2024-01-01T00:00:00Z',
+                'tracking_details': [],
+            }
+            # Like EasyPost, creating a tracker twice returns a new tracker object
+            self.trackers[code] = tracker
+            return tracker
+    
+    def _verify(self, params: dict) -> Tuple[int, dict]:
+        if 'INVALID' in str(params.get('street1', '')).upper():
+            return 422, {'error': {'code': 'ADDRESS.VERIFY.FAILURE', 'message': 'Address not found'}}
+        address = {'object': 'Address', 'id': 'adr_stub', 'street2': None, 'country': 'US'}
+        address.update({key: str(value).upper() for key, value in params.items()})
+        return 200, {'address': address}
+    
+    def _buy(self, shipment: dict, rate: dict) -> Tuple[int, dict]:
+        with self._lock:
+            if shipment['postage_label']:
+                return 422, {'error': {'code': 'SHIPMENT.POSTAGE.EXISTS', 'message': 'Postage already exists.'}}
+            selected = next((r for r in shipment['rates'] if r['id'] == rate.get('id')), None)
+            if selected is None:
+                return 422, {'error': {'code': 'SHIPMENT.RATE.INVALID', 'message': 'Invalid rate.'}}
+            shipment.update({
+                'status': 'pre_transit',
+                'tracking_code': f"9400{shipment['id'][4:]:0>18}",
+                'selected_rate': selected,
+                'postage_label': {
+                    'object': 'PostageLabel',
+                    'id': f"pl_{shipment['id']}",
+                    'label_url': f"{self.base_url}/labels/{shipment['id']}.png",
+                    'label_pdf_url': None,
+                    'label_size': '4x6',
+                    'label_type': 'default',
+                },
+            })
+        return 200, shipment
+    
+    def _take_lost(self, method: str, path: str) -> bool:
+        with self._lock:
+            for (lost_method, prefix), count in self.lost.items():
+                if lost_method == method and path.startswith(prefix) and count:
+                    self.lost[(lost_method, prefix)] = count - 1
+                    return True
+        return False
+    
+    def _handler(self):
+        stub = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            
+            def _serve(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                body = json.loads(self.rfile.read(length) or b'{}')
+                with stub._lock:
+                    stub.in_flight += 1
+                    stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+                try:
+                    time.sleep(stub.delay)
+                    url = urlsplit(self.path)
+                    status, payload = stub.handle(self.command, url.path, body, parse_qs(url.query))
+                    if stub._take_lost(self.command, url.path):
+                        status, payload = 504, {'error': {'code': 'STUB.LOST', 'message': 'Response lost'}}
+                finally:
+                    with stub._lock:
+                        stub.in_flight -= 1
+                if isinstance(payload, bytes):
+                    data, content_type = payload, 'image/png'
+                else:
+                    data, content_type = json.dumps(payload).encode(), 'application/json'
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+            
+            do_GET = do_POST = _serve
+            
+            def log_message(self, format, *args):
+                pass
+        
+        return Handler
@@ -0,0 +1,123 @@
+"""
+Tests for the address verification cache and batch validation.
+"""
+
+import tempfile
+import time
+import unittest
+from printshop_os.shipping.address_cache import AddressCache, address_key
+from printshop_os.shipping.easypost_client import EasyPostClient
+from tests.shipping.easypost_stub import EasyPostStub
+
+ADDRESS = {"street1": "123 Main St.", "city": "San Francisco", "state": "CA", "zip": "94105", "country": "US"}
+INVALID = {"street1": "1 Invalid Way", "city": "Nowhere", "state": "CA", "zip": "00000"}
+
+
+class TestAddressCache(unittest.TestCase):
+    """Test the SQLite address cache."""
+    
+    def test_canonical_key(self):
+        """Test that case, punctuation and spacing do not change the key."""
+        messy = {"street1": " 123  MAIN st ", "city": "san francisco", "state": "ca", "zip": "94105"}
+        self.assertEqual(address_key(ADDRESS), address_key(messy))
+        self.assertNotEqual(address_key(ADDRESS), address_key(dict(ADDRESS, street2="Apt 2")))
+    
+    def test_persists_across_instances(self):
+        """Test that results survive reopening the database file."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = f"{tmp}/cache/addresses.sqlite3"
+            cache = AddressCache(path)
+            cache.put(ADDRESS, {"valid": True, "address": ADDRESS, "errors": []})
+            cache.close()
+            
+            reopened = AddressCache(path)
+            self.assertTrue(reopened.get(ADDRESS)["valid"])
+            reopened.close()
+    
+    def test_expiry(self):
+        """Test that expired results are misses and can be purged."""
+        cache = AddressCache(ttl=0.05)
+        cache.put(ADDRESS, {"valid": True, "address": ADDRESS, "errors": []})
+        time.sleep(0.1)
+        
+        self.assertIsNone(cache.get(ADDRESS))
+        self.assertEqual(cache.purge(), 1)
+        self.assertEqual(cache.stats(), {"hits": 0, "misses": 1, "hit_ratio": 0.0, "entries": 0})
+
+
+class TestValidateAddresses(unittest.TestCase):
+    """Test cached single and batch validation against the stub server."""
+    
+    def setUp(self):
+        self.stub = EasyPostStub().__enter__()
+        self.addCleanup(self.stub.__exit__)
+        self.cache = AddressCache()
+        self.client = EasyPostClient(
+            api_key="test_key_123", api_base=self.stub.api_base, address_cache=self.cache
+        )
+    
+    def verifications(self):
+        return self.stub.count("POST", "/v2/addresses/create_and_verify")
+    
+    def test_repeat_address_is_not_reverified(self):
+        first = self.client.validate_address(ADDRESS)
+        second = self.client.validate_address(dict(ADDRESS, street1="123 MAIN ST"))
+        
+        self.assertTrue(first["valid"])
+        self.assertEqual(second, first)
+        self.assertEqual(self.verifications(), 1)
+    
+    def test_invalid_address(self):
+        """Test that rejections are reported and cached."""
+        result = self.client.validate_address(INVALID)
+        self.client.validate_address(INVALID)
+        
+        self.assertFalse(result["valid"])
+        self.assertIn("Address not found", result["errors"][0])
+        self.assertEqual(self.verifications(), 1)
+    
+    def test_transient_failure_is_not_cached(self):
+        self.stub.fail("POST", "/v2/addresses", 503)
+        
+        self.assertFalse(self.client.validate_address(ADDRESS)["valid"])
+        self.assertTrue(self.client.validate_address(ADDRESS)["valid"])
+    
+    def test_api_errors_are_not_cached(self):
+        """Test that an auth error is reported invalid but never cached as a verification."""
+        self.stub.fail("POST", "/v2/addresses", 401, 401)
+        
+        result = self.client.validate_address(ADDRESS)
+        batch = self.client.validate_addresses([dict(ADDRESS, street1="9 Oak St")], retry_delay=0.01)
+        
+        self.assertFalse(result["valid"])
+        self.assertFalse(batch[0]["valid"])
+        self.assertEqual(self.cache.stats()["entries"], 0)
+        self.assertTrue(self.client.validate_address(ADDRESS)["valid"])
+        self.assertEqual(self.verifications(), 3)
+    
+    def test_batch_verifies_only_distinct_misses(self):
+        """Test cache hits, in-batch duplicates and input order."""
+        self.client.validate_address(ADDRESS)
+        other = {"street1": "456 Market St", "city": "Los Angeles", "state": "CA", "zip": "90001"}
+        batch = [INVALID, ADDRESS, other, dict(other, street1="456 market st."), INVALID]
+        
+        results = self.client.validate_addresses(batch, max_workers=4)
+        
+        self.assertEqual([r["valid"] for r in results], [False, True, True, True, False])
+        self.assertEqual(results[3]["address"]["street1"], "456 MARKET ST")
+        self.assertIs(results[4]["address"], INVALID)
+        self.assertEqual(self.verifications(), 3)
+        
+        self.client.validate_addresses(batch)
+        self.assertEqual(self.verifications(), 3)
+    
+    def test_batch_retries_transient_errors(self):
+        self.stub.fail("POST", "/v2/addresses", 500)
+        
+        results = self.client.validate_addresses([ADDRESS], retry_delay=0.01)
+        
+        self.assertTrue(results[0]["valid"])
+
+
+if __name__ == '__main__':
+    unittest.main()
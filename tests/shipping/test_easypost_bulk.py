@@ -0,0 +1,131 @@
+"""
+Tests for bulk shipment creation and purchase, against a local stub server.
+"""
+
+import unittest
+from printshop_os.shipping.easypost_client import EasyPostClient
+from tests.shipping.easypost_stub import EasyPostStub
+
+FROM_ADDRESS = {
+    "name": "PrintShop OS", "street1": "123 Main St", "city": "San Francisco",
+    "state": "CA", "zip": "94105", "country": "US"
+}
+PARCEL = {"length": 10, "width": 8, "height": 4, "weight": 15.5}
+
+
+def shipment_spec(number):
+    """create_shipment() arguments for a numbered order."""
+    return {
+        "from_address": FROM_ADDRESS,
+        "to_address": {
+            "name": f"Customer {number}", "street1": f"{number} Market St", "city": "Los Angeles",
+            "state": "CA", "zip": "90001", "country": "US"
+        },
+        "parcel": PARCEL,
+    }
+
+
+class TestBulkShipments(unittest.TestCase):
+    """Test create_shipments_bulk and buy_shipments_bulk."""
+    
+    def setUp(self):
+        self.stub = EasyPostStub().__enter__()
+        self.addCleanup(self.stub.__exit__)
+        self.client = EasyPostClient(api_key="test_key_123", api_base=self.stub.api_base, timeout=5)
+    
+    def test_create_results_in_input_order(self):
+        """Test that results line up with the input however calls complete."""
+        results = self.client.create_shipments_bulk([shipment_spec(n) for n in range(12)], max_workers=4)
+        
+        self.assertEqual([r["index"] for r in results], list(range(12)))
+        self.assertTrue(all(r["error"] is None for r in results))
+        names = [self.stub.shipments[r["shipment"].id]["to_address"]["name"] for r in results]
+        self.assertEqual(names, [f"Customer {n}" for n in range(12)])
+        self.assertEqual(len(results[0]["shipment"].rates), 3)
+    
+    def test_concurrency_cap(self):
+        """Test that no more than max_workers calls are in flight."""
+        self.stub.delay = 0.05
+        
+        self.client.create_shipments_bulk([shipment_spec(n) for n in range(10)], max_workers=3)
+        
+        self.assertEqual(self.stub.count("POST", "/v2/shipments"), 10)
+        self.assertGreater(self.stub.max_in_flight, 1)
+        self.assertLessEqual(self.stub.max_in_flight, 3)
+    
+    def test_transient_errors_are_retried(self):
+        """Test that 5xx and 429 responses are retried until they succeed."""
+        self.stub.fail("POST", "/v2/shipments", 500, 429)
+        
+        results = self.client.create_shipments_bulk([shipment_spec(1)], retries=2, retry_delay=0.01)
+        
+        self.assertIsNone(results[0]["error"])
+        self.assertEqual(results[0]["attempts"], 3)
+    
+    def test_errors_reported_per_shipment(self):
+        """Test that a failed shipment does not affect the others."""
+        self.stub.fail("POST", "/v2/shipments", 422)
+        
+        results = self.client.create_shipments_bulk(
+            [shipment_spec(n) for n in range(3)], max_workers=1, retry_delay=0.01
+        )
+        
+        self.assertEqual(results[0]["error"]["http_status"], 422)
+        self.assertEqual(results[0]["error"]["type"], "InvalidRequestError")
+        self.assertEqual(results[0]["attempts"], 1)
+        self.assertIsNone(results[0]["shipment"])
+        self.assertTrue(all(r["shipment"] for r in results[1:]))
+    
+    def test_retries_exhausted(self):
+        """Test that the last transient error is reported after all retries."""
+        self.stub.fail("POST", "/v2/shipments", 503, 503, 503)
+        
+        results = self.client.create_shipments_bulk([shipment_spec(1)], retries=2, retry_delay=0.01)
+        
+        self.assertEqual(results[0]["error"]["type"], "ServiceUnavailableError")
+        self.assertEqual(results[0]["attempts"], 3)
+    
+    def test_buy_bulk(self):
+        """Test buying the lowest rate by ID and a chosen rate by tuple."""
+        created = self.client.create_shipments_bulk([shipment_spec(n) for n in range(2)])
+        first, second = (r["shipment"] for r in created)
+        express = next(rate.id for rate in second.rates if rate.service == "NextDayAir")
+        
+        results = self.client.buy_shipments_bulk([first.id, (second.id, express), "shp_missing"])
+        
+        self.assertEqual(results[0]["shipment"].selected_rate.service, "GroundAdvantage")
+        self.assertEqual(results[1]["shipment"].selected_rate.id, express)
+        self.assertTrue(results[1]["shipment"].postage_label.label_url)
+        self.assertEqual(results[2]["error"]["http_status"], 404)
+    
+    def test_lost_buy_response_not_bought_again(self):
+        """Test that a purchase whose response was lost is returned, not retried."""
+        shipment = self.client.create_shipment(**shipment_spec(1))
+        self.stub.lose("POST", f"/v2/shipments/{shipment.id}/buy")
+        
+        results = self.client.buy_shipments_bulk([shipment], retry_delay=0.01)
+        
+        self.assertIsNone(results[0]["error"])
+        self.assertTrue(results[0]["shipment"].postage_label.label_url)
+        self.assertEqual(results[0]["attempts"], 1)
+        self.assertEqual(self.stub.count("POST", f"/v2/shipments/{shipment.id}/buy"), 1)
+    
+    def test_failed_buy_retried_when_nothing_bought(self):
+        """Test that a purchase is retried once the shipment is found without a label."""
+        shipment = self.client.create_shipment(**shipment_spec(1))
+        self.stub.fail("POST", f"/v2/shipments/{shipment.id}/buy", 503)
+        
+        results = self.client.buy_shipments_bulk([shipment], retry_delay=0.01)
+        
+        self.assertIsNone(results[0]["error"])
+        self.assertEqual(results[0]["attempts"], 2)
+        self.assertEqual(self.stub.count("GET", f"/v2/shipments/{shipment.id}"), 1)
+    
+    def test_empty_input(self):
+        """Test that an empty batch makes no calls."""
+        self.assertEqual(self.client.buy_shipments_bulk([]), [])
+        self.assertEqual(self.stub.requests, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -99,13 +99,16 @@ class TestEasyPostClientMethods(unittest.TestCase):
         
         result = self.client.create_shipment(from_addr, to_addr, parcel)
         
-        self.assertEqual(result["id"], "shp_test123")
-        self.assertEqual(result["tracking_code"], "TRACK123")
+        self.assertEqual(result.id, "shp_test123")
+        self.assertEqual(result.tracking_code, "TRACK123")
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual(result["id"], "shp_test123")
         self.mock_easypost_client.shipment.create.assert_called_once()
     
     def test_get_label_url(self):
         """Test retrieving label URL."""
         mock_shipment = Mock()
+        mock_shipment.rates = []
         mock_label = Mock()
         mock_label.label_url = "https://easypost.com/label/test123.pdf"
         mock_shipment.postage_label = mock_label
@@ -120,6 +123,7 @@ class TestEasyPostClientMethods(unittest.TestCase):
     def test_get_label_url_no_label(self):
         """Test retrieving label URL when no label exists."""
         mock_shipment = Mock()
+        mock_shipment.rates = []
         mock_shipment.postage_label = None
         
         self.mock_easypost_client.shipment.retrieve.return_value = mock_shipment
@@ -158,8 +162,10 @@ class TestEasyPostClientMethods(unittest.TestCase):
         rates = self.client.list_rates("shp_test123")
         
         self.assertEqual(len(rates), 2)
-        self.assertEqual(rates[0]["carrier"], "USPS")
-        self.assertEqual(rates[1]["carrier"], "UPS")
+        self.assertEqual(rates[0].carrier, "USPS")
+        self.assertEqual(rates[1].carrier, "UPS")
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual(rates[0]["carrier"], "USPS")
 
 
 class TestEasyPostClientAddressValidation(unittest.TestCase):
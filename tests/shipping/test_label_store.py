@@ -0,0 +1,147 @@
+"""
+Tests for the label store, against a local stub server.
+"""
+
+import io
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest.mock import patch
+from PIL import Image, ImageDraw
+from printshop_os.labels import LabelFormatter
+from printshop_os.shipping.easypost_client import EasyPostClient
+from printshop_os.shipping.label_store import LabelStore, label_extension
+from tests.shipping.easypost_stub import EasyPostStub
+from tests.shipping.test_easypost_bulk import FROM_ADDRESS, PARCEL, shipment_spec
+
+
+def label_png() -> bytes:
+    """A 4x6 inch label image at 203 DPI."""
+    image = Image.new('RGB', (812, 1218), 'white')
+    draw = ImageDraw.Draw(image)
+    draw.rectangle([40, 40, 772, 1178], outline='black', width=4)
+    draw.rectangle([100, 300, 700, 450], fill='black')
+    output = io.BytesIO()
+    image.save(output, format='PNG')
+    return output.getvalue()
+
+
+class TestLabelExtension(unittest.TestCase):
+    """Test label type detection."""
+    
+    def test_detects_content(self):
+        self.assertEqual(label_extension(b"%PDF-1.7 ..."), "pdf")
+        self.assertEqual(label_extension(b"\x89PNG\r\n\x1a\n..."), "png")
+        self.assertEqual(label_extension(b"\n^XA^FO50,50^FS^XZ"), "zpl")
+    
+    def test_falls_back_to_url(self):
+        self.assertEqual(label_extension(b"....", "https://x/label.EPL2?sig=1"), "epl2")
+        self.assertEqual(label_extension(b"....", "https://x/label"), "bin")
+
+
+class TestLabelStore(unittest.TestCase):
+    """Test one-time download, local reprints and thermal pre-rendering."""
+    
+    def setUp(self):
+        self.stub = EasyPostStub().__enter__()
+        self.addCleanup(self.stub.__exit__)
+        self.stub.label_data = label_png()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.store = LabelStore(self.tmp.name, formatter=LabelFormatter())
+        self.addCleanup(self.store.close)
+        self.client = EasyPostClient(api_key="test_key_123", api_base=self.stub.api_base, timeout=5)
+    
+    def buy(self, n=0):
+        spec = shipment_spec(n)
+        return self.client.buy_shipment(self.client.create_shipment(**spec))
+    
+    def test_label_downloaded_once(self):
+        """Test that saves, prints and reprints share a single download."""
+        shipment = self.buy()
+        record = self.store.save(shipment)
+        self.store.save(shipment)
+        
+        for _ in range(3):
+            self.assertEqual(self.store.get(shipment.id), self.stub.label_data)
+        
+        self.assertEqual(self.stub.count("GET", "/labels"), 1)
+        self.assertEqual(record["ext"], "png")
+        self.assertEqual(record["tracking_code"], shipment.tracking_code)
+        self.assertTrue((Path(self.tmp.name) / "labels" / record["digest"][:2] / f"{record['digest']}.png").is_file())
+    
+    def test_thermal_prerendered(self):
+        """Test that the thermal label is rendered in the background, once."""
+        shipment = self.buy()
+        self.store.save(shipment)
+        
+        zpl = self.store.get_thermal(shipment.id)
+        self.assertTrue(zpl.startswith(b"^XA"))
+        self.assertEqual(self.store.get_thermal(shipment.id), zpl)
+        self.assertEqual(self.store.stats()["renders"], 1)
+    
+    def test_identical_labels_stored_once(self):
+        """Test that labels are content-addressed."""
+        first = self.store.save(self.buy(0), render=False)
+        second = self.store.save(self.buy(1), render=False)
+        
+        self.assertEqual(first["digest"], second["digest"])
+        self.assertEqual(len(list(Path(self.tmp.name).glob("labels/*/*"))), 1)
+        self.assertEqual(self.store.stats()["labels"], 2)
+    
+    def test_index_survives_reopen(self):
+        """Test that a reopened store serves reprints without downloading."""
+        shipment = self.buy()
+        self.store.save(shipment, render=False)
+        
+        reopened = LabelStore(self.tmp.name, formatter=LabelFormatter())
+        self.addCleanup(reopened.close)
+        self.assertEqual(reopened.get(shipment.id), self.stub.label_data)
+        self.assertEqual(self.stub.count("GET", "/labels"), 1)
+    
+    def test_get_shipment_downloads_on_first_use(self):
+        shipment = self.buy()
+        self.assertEqual(self.store.get(shipment), self.stub.label_data)
+        with self.assertRaises(KeyError):
+            self.store.get("shp_missing")
+    
+    def test_unpurchased_shipment_rejected(self):
+        shipment = self.client.create_shipment(FROM_ADDRESS, FROM_ADDRESS, PARCEL)
+        with self.assertRaises(ValueError):
+            self.store.save(shipment)
+    
+    def test_concurrent_thermal_requests_render_once(self):
+        shipment = self.buy()
+        self.store.save(shipment, render=False)
+        
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(lambda _: self.store.get_thermal(shipment.id), range(4)))
+        
+        self.assertEqual(len(set(results)), 1)
+        self.assertEqual(self.store.stats()["renders"], 1)
+    
+    def test_client_stores_purchased_labels(self):
+        """Test that buy_shipment() hands the label to the store in the background."""
+        client = EasyPostClient(
+            api_key="test_key_123", api_base=self.stub.api_base, timeout=5, label_store=self.store
+        )
+        shipment = client.buy_shipment(client.create_shipment(**shipment_spec(0)))
+        
+        self.assertTrue(self.store.get_thermal(shipment.id).startswith(b"^XA"))
+        self.assertEqual(self.store.get(shipment.id), self.stub.label_data)
+        self.assertEqual(self.stub.count("GET", "/labels"), 1)
+    
+    def test_client_without_label_store(self):
+        """Test that label_store=False never opens the EASYPOST_LABEL_DIR store."""
+        label_dir = Path(self.tmp.name) / "env_labels"
+        with patch.dict(os.environ, {"EASYPOST_LABEL_DIR": str(label_dir)}):
+            client = EasyPostClient(api_key="test_key_123", api_base=self.stub.api_base, label_store=False)
+        
+        self.assertIsNone(client.label_store)
+        self.assertFalse(label_dir.exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+"""
+Tests for the slotted shipping result models.
+"""
+
+import unittest
+from easypost.easypost_object import convert_to_easypost_object
+from printshop_os.shipping.models import Rate, Shipment, Tracker
+
+
+def sdk_shipment(purchased=False):
+    """An EasyPost SDK shipment object with three rates."""
+    rates = [
+        {"object": "Rate", "id": f"rate_{n}", "carrier": "USPS", "service": service, "rate": price,
+         "currency": "USD", "delivery_days": days, "delivery_date": None, "delivery_date_guaranteed": False}
+        for n, (service, price, days) in enumerate([("Priority", "7.58", 2), ("Ground", "5.93", 5), ("Express", "31.20", 1)])
+    ]
+    return convert_to_easypost_object({
+        "object": "Shipment", "id": "shp_1", "tracking_code": "9400" if purchased else None,
+        "status": "pre_transit" if purchased else "unknown",
+        "created_at": "2024-01-01T00:00:00Z", "updated_at": "2024-01-01T00:00:00Z", "rates": rates,
+        "postage_label": {"object": "PostageLabel", "id": "pl_1", "label_url": "https://labels.example.com/1.png",
+                          "label_pdf_url": None, "label_size": "4x6", "label_type": "default"} if purchased else None,
+        "selected_rate": rates[1] if purchased else None,
+    })
+
+
+class TestShipmentModel(unittest.TestCase):
+    """Test Shipment, Rate and Label."""
+    
+    def test_slotted(self):
+        shipment = Shipment.from_sdk(sdk_shipment(purchased=True))
+        
+        for model in (shipment, shipment.postage_label, shipment.selected_rate):
+            self.assertFalse(hasattr(model, "__dict__"))
+    
+    def test_rates(self):
+        shipment = Shipment.from_sdk(sdk_shipment())
+        
+        self.assertEqual(shipment.lowest_rate().service, "Ground")
+        self.assertEqual([rate.service for rate in shipment.rates], ["Priority", "Ground", "Express"])
+        self.assertTrue(all(isinstance(rate, Rate) for rate in shipment.rates))
+        self.assertEqual(shipment.find_rate("rate_2").price, 31.2)
+        self.assertIsNone(shipment.find_rate("rate_9"))
+    
+    def test_to_dict(self):
+        """Test the dictionary form, with optional sections only when present."""
+        unpurchased = Shipment.from_sdk(sdk_shipment()).to_dict()
+        purchased = Shipment.from_sdk(sdk_shipment(purchased=True)).to_dict()
+        
+        self.assertEqual(len(unpurchased["rates"]), 3)
+        self.assertNotIn("postage_label", unpurchased)
+        self.assertEqual(purchased["postage_label"]["label_size"], "4x6")
+        self.assertEqual(purchased["selected_rate"]["rate"], "5.93")
+    
+    def test_dict_access_deprecated(self):
+        """Test that the dictionary access of the old dict results still works, with a warning."""
+        shipment = Shipment.from_sdk(sdk_shipment(purchased=True))
+        
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual(shipment["postage_label"]["label_url"], "https://labels.example.com/1.png")
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual(shipment.rates[0]["carrier"], "USPS")
+        self.assertIn("tracking_code", shipment)
+        self.assertEqual(list(shipment.selected_rate), list(shipment.selected_rate.to_dict()))
+    
+    def test_no_rates(self):
+        shipment = Shipment("shp_1", None, "unknown")
+        
+        self.assertIsNone(shipment.lowest_rate())
+        self.assertEqual(shipment.rates, ())
+        self.assertNotIn("rates", shipment.to_dict())
+    
+    def test_rate_positional_fields(self):
+        rate = Rate("rate_1", "UPS", "Ground", "9.25", delivery_days=3)
+        
+        self.assertEqual(rate.to_dict()["currency"], "USD")
+
+
+class TestTrackerModel(unittest.TestCase):
+    """Test Tracker and TrackingEvent."""
+    
+    def test_from_sdk(self):
+        tracker = Tracker.from_sdk(convert_to_easypost_object({
+            "object": "Tracker", "id": "trk_1", "tracking_code": "9400", "status": "in_transit",
+            "status_detail": "arrived_at_facility", "est_delivery_date": None, "carrier": "USPS",
+            "tracking_details": [
+                {"object": "TrackingDetail", "message": "Accepted", "status": "in_transit",
+                 "datetime": "2024-01-02T00:00:00Z",
+                 "tracking_location": {"object": "TrackingLocation", "city": "Oakland", "state": "CA",
+                                       "country": "US", "zip": None}},
+                {"object": "TrackingDetail", "message": "Label created", "status": "pre_transit",
+                 "datetime": "2024-01-01T00:00:00Z", "tracking_location": None},
+            ],
+        }))
+        
+        self.assertEqual(tracker.events[0].city, "Oakland")
+        result = tracker.to_dict()
+        self.assertEqual(result["tracking_details"][0]["tracking_location"]["state"], "CA")
+        self.assertIsNone(result["tracking_details"][1]["tracking_location"])
+    
+    def test_from_webhook_dict(self):
+        """Test building a tracker from the plain dictionary of a webhook event."""
+        tracker = Tracker.from_sdk({
+            "object": "Tracker", "id": "trk_1", "tracking_code": "9400", "status": "delivered",
+            "updated_at": "2024-01-04T00:00:00Z", "public_url": "https://track.example.com/9400",
+            "tracking_details": [{"message": "Delivered", "status": "delivered", "datetime": "2024-01-04T00:00:00Z",
+                                  "tracking_location": {"city": "Oakland", "state": "CA", "country": "US"}}],
+        })
+        
+        self.assertEqual(tracker.updated_at, "2024-01-04T00:00:00Z")
+        self.assertEqual(tracker.public_url, "https://track.example.com/9400")
+        self.assertEqual(tracker.events[0].city, "Oakland")
+
+
+if __name__ == '__main__':
+    unittest.main()
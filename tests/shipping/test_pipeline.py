@@ -0,0 +1,203 @@
+"""
+Tests for the ship-day pipeline and CLI, against a local stub server.
+"""
+
+import csv
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+from printshop_os.labels import LabelFormatter
+from printshop_os.shipping import cli
+from printshop_os.shipping.easypost_client import EasyPostClient
+from printshop_os.shipping.label_store import LabelStore
+from printshop_os.shipping.pipeline import Checkpoint, ShipPipeline, normalize_order, read_orders
+from tests.shipping.easypost_stub import EasyPostStub
+from tests.shipping.test_easypost_bulk import FROM_ADDRESS
+from tests.shipping.test_label_store import label_png
+
+
+def write_orders_csv(path, count):
+    """Write count orders as flat CSV rows."""
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["order_id", "name", "street1", "city", "state", "zip", "weight"])
+        writer.writeheader()
+        for n in range(count):
+            writer.writerow({
+                "order_id": f"ORD-{n:03d}", "name": f"Customer {n}", "street1": f"{n} Market St",
+                "city": "Los Angeles", "state": "CA", "zip": "90001", "weight": "15.5",
+            })
+
+
+class TestOrders(unittest.TestCase):
+    """Test order parsing."""
+    
+    def test_flat_row(self):
+        order = normalize_order({
+            "order_id": "A1", "name": "Jane", "street1": "1 Main St", "street2": "", "zip": "90001",
+            "length": "10", "width": "8", "height": "", "weight": "15.5",
+        })
+        self.assertEqual(order["to_address"], {"name": "Jane", "street1": "1 Main St", "zip": "90001"})
+        self.assertEqual(order["parcel"], {"length": 10.0, "width": 8.0, "weight": 15.5})
+    
+    def test_nested_row(self):
+        order = normalize_order({
+            "order_id": 7, "to_address": {"street1": "1 Main St", "zip": "90001"},
+            "parcel": {"predefined_package": "FlatRateEnvelope", "weight": 8}, "from_address": FROM_ADDRESS,
+        })
+        self.assertEqual(order["order_id"], "7")
+        self.assertEqual(order["from_address"], FROM_ADDRESS)
+    
+    def test_invalid_rows(self):
+        with self.assertRaises(ValueError):
+            normalize_order({"street1": "1 Main St", "zip": "90001", "weight": 1})
+        with self.assertRaises(ValueError):
+            normalize_order({"order_id": "A1", "street1": "1 Main St", "zip": "90001"})
+    
+    def test_read_jsonl(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "orders.jsonl"
+            path.write_text('{"order_id": "A1"}\n\n{"order_id": "A2"}\n')
+            self.assertEqual([row["order_id"] for row in read_orders(path)], ["A1", "A2"])
+
+
+class TestShipPipeline(unittest.TestCase):
+    """Test the streaming pipeline end to end."""
+    
+    def setUp(self):
+        self.stub = EasyPostStub().__enter__()
+        self.addCleanup(self.stub.__exit__)
+        self.stub.label_data = label_png()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = Path(tmp.name)
+        self.orders = self.tmp / "orders.csv"
+        self.client = EasyPostClient(api_key="test_key_123", api_base=self.stub.api_base, timeout=5)
+        self.formatter = LabelFormatter()
+        self.store = LabelStore(self.tmp / "store", formatter=self.formatter)
+        self.addCleanup(self.store.close)
+    
+    def pipeline(self, **kwargs):
+        checkpoint = Checkpoint(self.tmp / "checkpoint.jsonl")
+        self.addCleanup(checkpoint.close)
+        options = dict(
+            from_address=FROM_ADDRESS, formatter=self.formatter, checkpoint=checkpoint,
+            workers={"create": 4, "buy": 4, "download": 2, "format": 2}, retry_delay=0.01,
+        )
+        options.update(kwargs)
+        return ShipPipeline(self.client, self.store, self.tmp / "out", **options)
+    
+    def test_ships_every_order(self):
+        """Test that each order is bought once and written as a formatted label."""
+        write_orders_csv(self.orders, 12)
+        report = self.pipeline(window=4).run(read_orders(self.orders))
+        
+        self.assertEqual(len(report.succeeded), 12)
+        self.assertEqual([r.order_id for r in report.results], [f"ORD-{n:03d}" for n in range(12)])
+        self.assertEqual(self.stub.count("POST", "/v2/shipments"), 24)
+        for result in report.results:
+            self.assertTrue(result.output.read_bytes().startswith(b"^XA"))
+            self.assertEqual(result.rate, "USPS GroundAdvantage 5.93")
+        self.assertEqual(report.stages["format"]["orders"], 12)
+        self.assertGreater(report.orders_per_second, 0)
+    
+    def test_policy(self):
+        write_orders_csv(self.orders, 1)
+        report = self.pipeline(policy="fastest", output_format="png").run(read_orders(self.orders))
+        self.assertEqual(report.results[0].rate, "UPS NextDayAir 31.20")
+        self.assertTrue(report.results[0].output.name.endswith(".png"))
+    
+    def test_failures_do_not_stop_the_run(self):
+        write_orders_csv(self.orders, 3)
+        rows = list(read_orders(self.orders))
+        rows[1]["street1"] = ""
+        self.stub.fail("POST", "/v2/shipments", 422)
+        report = self.pipeline().run(rows)
+        
+        failed = {r.order_id: r.stage for r in report.failed}
+        self.assertIn("parse", failed.values())
+        self.assertIn("create", failed.values())
+        self.assertEqual(len(report.succeeded), 1)
+    
+    def test_resume_never_buys_twice(self):
+        """Test that a rerun skips finished orders and resumes purchased ones at download."""
+        write_orders_csv(self.orders, 4)
+        self.stub.fail("GET", "/labels", 404)
+        first = self.pipeline().run(read_orders(self.orders))
+        
+        self.assertEqual(len(first.succeeded), 3)
+        self.assertEqual(first.failed[0].stage, "download")
+        buys = self.stub.count("POST", "/v2/shipments/")
+        
+        second = self.pipeline().run(read_orders(self.orders))
+        
+        self.assertEqual(len(second.skipped), 3)
+        self.assertEqual(len(second.succeeded), 1)
+        self.assertEqual(self.stub.count("POST", "/v2/shipments/"), buys)
+        self.assertEqual(second.succeeded[0].tracking_code, first.failed[0].tracking_code)
+        self.assertEqual(second.stages["create"]["orders"], 0)
+    
+    def test_lost_buy_response_not_bought_again(self):
+        """Test that a purchase whose response is lost is found, not bought again."""
+        write_orders_csv(self.orders, 2)
+        self.stub.lose("POST", "/v2/shipments/", 2)
+        report = self.pipeline().run(read_orders(self.orders))
+        
+        self.assertEqual(len(report.succeeded), 2)
+        self.assertEqual(self.stub.count("POST", "/v2/shipments/"), 2)
+        self.assertTrue(all(r.tracking_code for r in report.succeeded))
+    
+    def test_resume_created_order_checks_for_label(self):
+        """Test that an order created before a crash is retrieved, not bought again."""
+        write_orders_csv(self.orders, 1)
+        rows = list(read_orders(self.orders))
+        order = normalize_order(rows[0])
+        shipment = self.client.buy_shipment(
+            self.client.create_shipment(FROM_ADDRESS, order["to_address"], order["parcel"])
+        )
+        checkpoint = Checkpoint(self.tmp / "checkpoint.jsonl")
+        checkpoint.write({"order_id": "ORD-000", "stage": "created", "shipment_id": shipment.id})
+        checkpoint.close()
+        
+        report = self.pipeline().run(rows)
+        
+        self.assertEqual(self.stub.count("POST", "/v2/shipments"), 2)
+        self.assertEqual(report.succeeded[0].tracking_code, shipment.tracking_code)
+    
+    def test_resume_created_order_buys_once(self):
+        write_orders_csv(self.orders, 1)
+        self.stub.fail("POST", "/v2/shipments/", 422)
+        first = self.pipeline().run(read_orders(self.orders))
+        self.assertEqual(first.failed[0].stage, "buy")
+        
+        second = self.pipeline().run(read_orders(self.orders))
+        
+        self.assertEqual(len(second.succeeded), 1)
+        self.assertEqual(self.stub.count("POST", "/v2/shipments"), 3)
+        self.assertEqual(second.succeeded[0].shipment_id, first.failed[0].shipment_id)
+    
+    def test_cli_ship(self):
+        write_orders_csv(self.orders, 2)
+        shop = self.tmp / "shop.json"
+        shop.write_text(json.dumps(FROM_ADDRESS))
+        argv = [
+            "cli", "ship", str(self.orders), str(self.tmp / "out"), "--from-address", str(shop),
+            "--label-dir", str(self.tmp / "store"), "--report", str(self.tmp / "report.json"),
+        ]
+        env = {"EASYPOST_API_KEY": "test_key_123", "EASYPOST_API_BASE": self.stub.api_base}
+        
+        with mock.patch.object(sys, "argv", argv), mock.patch.dict(os.environ, env):
+            with self.assertRaises(SystemExit) as exit_info:
+                cli.main()
+        
+        self.assertEqual(exit_info.exception.code, 0)
+        report = json.loads((self.tmp / "report.json").read_text())
+        self.assertEqual(report["succeeded"], 2)
+        self.assertTrue((self.tmp / "out" / "checkpoint.jsonl").exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
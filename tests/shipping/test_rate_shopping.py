@@ -0,0 +1,113 @@
+"""
+Tests for the rate-shopping layer, against a local stub server.
+"""
+
+import time
+import unittest
+from printshop_os.shipping.easypost_client import EasyPostClient
+from printshop_os.shipping.models import Rate
+from printshop_os.shipping.rate_shopping import RateShopper, parcel_profile, select_rate
+from tests.shipping.easypost_stub import EasyPostStub
+from tests.shipping.test_easypost_bulk import shipment_spec
+
+RATES = [
+    Rate("rate_1", "USPS", "Priority", "7.58", delivery_days=2),
+    Rate("rate_2", "USPS", "GroundAdvantage", "5.93", delivery_days=5),
+    Rate("rate_3", "UPS", "NextDayAir", "31.20", delivery_days=1),
+    Rate("rate_4", "UPS", "NextDayAirSaver", "28.40", delivery_days=1),
+    Rate("rate_5", "Freight", "Economy", "4.10"),
+]
+
+
+class TestSelectRate(unittest.TestCase):
+    """Test rate selection policies."""
+    
+    def test_cheapest(self):
+        self.assertEqual(select_rate(RATES, "cheapest").id, "rate_5")
+    
+    def test_fastest_prefers_cheaper_on_tie(self):
+        self.assertEqual(select_rate(RATES, "fastest").id, "rate_4")
+    
+    def test_cheapest_within(self):
+        """Test that rates without a delivery estimate never meet the deadline."""
+        self.assertEqual(select_rate(RATES, "cheapest_within", max_days=3).id, "rate_1")
+        self.assertEqual(select_rate(RATES, "cheapest_within", max_days=5).id, "rate_2")
+    
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            select_rate(RATES, "slowest")
+        with self.assertRaises(ValueError):
+            select_rate(RATES, "cheapest_within")
+        with self.assertRaises(ValueError):
+            select_rate(RATES, "cheapest_within", max_days=0)
+    
+    def test_parcel_profile(self):
+        """Test that re-weighed copies of a box share a profile."""
+        box = {"length": 10, "width": 8, "height": 4}
+        self.assertEqual(parcel_profile(dict(box, weight=15.2)), parcel_profile(dict(box, weight=15.9)))
+        self.assertNotEqual(parcel_profile(dict(box, weight=15.9)), parcel_profile(dict(box, weight=16.1)))
+        self.assertEqual(parcel_profile({"predefined_package": "FlatRateEnvelope", "weight": 3}),
+                         ("FlatRateEnvelope", 3))
+
+
+class TestRateShopper(unittest.TestCase):
+    """Test cached quotes and purchases."""
+    
+    def setUp(self):
+        self.stub = EasyPostStub().__enter__()
+        self.addCleanup(self.stub.__exit__)
+        self.client = EasyPostClient(api_key="test_key_123", api_base=self.stub.api_base, timeout=5)
+        self.shopper = RateShopper(self.client)
+    
+    def test_same_lane_is_cached(self):
+        """Test that customers sharing a ZIP and box share one live quote."""
+        first = self.shopper.quote(**shipment_spec(1))
+        second = self.shopper.shop(**shipment_spec(2), policy="fastest")
+        
+        self.assertEqual(self.stub.count("POST", "/v2/shipments"), 1)
+        self.assertEqual(len(first), 3)
+        self.assertEqual(second.service, "NextDayAir")
+        self.assertEqual(self.shopper.stats(), {"hits": 1, "misses": 1, "hit_ratio": 0.5, "quotes": 1})
+    
+    def test_key_includes_lane_parcel_and_options(self):
+        """Test that a different ZIP, box or option set is a miss."""
+        spec = shipment_spec(1)
+        self.shopper.quote(**spec)
+        self.shopper.quote(spec["from_address"], dict(spec["to_address"], zip="10001"), spec["parcel"])
+        self.shopper.quote(spec["from_address"], spec["to_address"], dict(spec["parcel"], weight=40))
+        self.shopper.quote(**spec, options={"saturday_delivery": True})
+        
+        self.assertEqual(self.shopper.stats()["misses"], 4)
+    
+    def test_ttl_expiry(self):
+        """Test that expired quotes are fetched live again."""
+        shopper = RateShopper(self.client, ttl=0.05)
+        shopper.quote(**shipment_spec(1))
+        time.sleep(0.1)
+        shopper.quote(**shipment_spec(1))
+        
+        self.assertEqual(shopper.stats()["misses"], 2)
+    
+    def test_buy_uses_live_quote(self):
+        """Test that a purchase creates its own shipment and costs two calls."""
+        self.shopper.quote(**shipment_spec(1))
+        requests_before = len(self.stub.requests)
+        
+        label = self.shopper.buy(**shipment_spec(2), policy="cheapest_within", max_days=3)
+        
+        self.assertEqual(len(self.stub.requests) - requests_before, 2)
+        self.assertEqual(label.selected_rate.service, "Priority")
+        self.assertEqual(self.stub.shipments[label.id]["to_address"]["name"], "Customer 2")
+    
+    def test_lru_bound(self):
+        """Test that the least recently used quote is evicted."""
+        shopper = RateShopper(self.client, max_quotes=2)
+        spec = shipment_spec(1)
+        for zip_code in ("10001", "10002", "10003"):
+            shopper.quote(spec["from_address"], dict(spec["to_address"], zip=zip_code), spec["parcel"])
+        
+        self.assertEqual(shopper.stats()["quotes"], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
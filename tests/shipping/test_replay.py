@@ -0,0 +1,114 @@
+"""
+Tests for the record/replay transport.
+"""
+
+import json
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from easypost.errors import EasyPostError, TimeoutError as EasyPostTimeoutError
+from printshop_os.shipping.easypost_client import EasyPostClient
+from printshop_os.shipping.replay import load_fixtures, record, replay
+from printshop_os.shipping.tracking import TrackingService
+from tests.shipping.bench_shipping import SYNTHETIC_FIXTURES
+from tests.shipping.easypost_stub import EasyPostStub
+from tests.shipping.test_easypost_bulk import shipment_spec
+
+
+def replay_client(latency=0.0, **kwargs):
+    """Client answering from the checked-in (synthetic) fixtures."""
+    client = EasyPostClient(api_key="replay", api_base="https://api.easypost.com/v2", label_store=False, **kwargs)
+    adapter = replay(client, SYNTHETIC_FIXTURES, latency=latency)
+    return client, adapter
+
+
+class TestRecord(unittest.TestCase):
+    """Test recording against the stub server."""
+    
+    def test_record_then_replay_offline(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "fixtures.json"
+            with EasyPostStub() as stub:
+                client = EasyPostClient(api_key="test_key_123", api_base=stub.api_base, timeout=5)
+                recorder = record(client)
+                created = client.create_shipment(**shipment_spec(1))
+                client.buy_shipment(created)
+                recorder.save(path)
+            
+            interactions = load_fixtures(path)
+            self.assertEqual([i["operation"] for i in interactions], ["create", "buy"])
+            self.assertEqual(interactions[0]["body"]["id"], created.id)
+            self.assertGreaterEqual(interactions[0]["elapsed_ms"], 0)
+            
+            # The stub is gone: only the fixtures can answer
+            client = EasyPostClient(api_key="test_key_123", api_base=stub.api_base, timeout=5)
+            replay(client, path)
+            bought = client.buy_shipment(client.create_shipment(**shipment_spec(2)))
+            self.assertEqual(bought.selected_rate.rate, "5.93")
+
+
+class TestReplay(unittest.TestCase):
+    """Test replaying the checked-in fixtures."""
+    
+    def test_every_shipment_is_distinct(self):
+        client, adapter = replay_client()
+        results = client.create_shipments_bulk([shipment_spec(n) for n in range(20)], max_workers=4)
+        bought = client.buy_shipments_bulk([r["shipment"] for r in results], max_workers=4)
+        
+        shipments = [r["shipment"] for r in bought]
+        self.assertTrue(all(r["error"] is None for r in bought))
+        self.assertEqual(len({s.id for s in shipments}), 20)
+        self.assertEqual(len({s.tracking_code for s in shipments}), 20)
+        self.assertEqual(adapter.requests, 40)
+    
+    def test_shipment_keeps_its_ids(self):
+        """Test that a retrieved and bought shipment matches the one created."""
+        client, _ = replay_client(cache_ttl=0)
+        created = client.create_shipment(**shipment_spec(1))
+        
+        rates = client.list_rates(created.id)
+        bought = client.buy_shipment(created.id, rate_id=rates[0].id)
+        
+        self.assertEqual({r.id for r in rates}, {r.id for r in created.rates})
+        self.assertEqual(bought.id, created.id)
+        self.assertEqual(bought.selected_rate.id, rates[0].id)
+        self.assertIsNotNone(bought.postage_label)
+    
+    def test_tracking(self):
+        client, _ = replay_client()
+        service = TrackingService(client)
+        self.addCleanup(service.store.close)
+        
+        record = service.register("9400TEST1")
+        self.assertEqual(record["tracking_code"], "9400TEST1")
+        self.assertEqual(service.poll_due(now=time.time() + 86400), 1)
+    
+    def test_latency_injection(self):
+        client, _ = replay_client(latency=0.05)
+        start = time.perf_counter()
+        client.create_shipments_bulk([shipment_spec(n) for n in range(8)], max_workers=8)
+        elapsed = time.perf_counter() - start
+        
+        self.assertGreaterEqual(elapsed, 0.05)
+        self.assertLess(elapsed, 0.3)
+        self.assertGreaterEqual(client.stats()["latency_ms"]["create"]["p50"], 50)
+    
+    def test_latency_over_timeout(self):
+        client, _ = replay_client(latency={"create": 0.2}, timeouts={"create": 0.05})
+        with self.assertRaises(EasyPostTimeoutError):
+            client.create_shipment(**shipment_spec(1))
+        self.assertTrue(client.validate_address(shipment_spec(1)["to_address"])["valid"])
+    
+    def test_missing_fixture(self):
+        client = EasyPostClient(api_key="replay", api_base="https://api.easypost.com/v2")
+        interactions = [i for i in load_fixtures(SYNTHETIC_FIXTURES) if i["operation"] != "buy"]
+        replay(client, interactions)
+        
+        with self.assertRaises(EasyPostError) as error:
+            client.buy_shipment(client.create_shipment(**shipment_spec(1)))
+        self.assertIn("REPLAY.NO_FIXTURE", json.dumps(error.exception.json_body))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+"""
+Tests for the EasyPostClient shipment cache, against a local stub server.
+"""
+
+import time
+import unittest
+from printshop_os.shipping.easypost_client import EasyPostClient
+from tests.shipping.easypost_stub import EasyPostStub
+from tests.shipping.test_easypost_bulk import shipment_spec
+
+
+class TestShipmentCache(unittest.TestCase):
+    """Test that created shipments are not retrieved again."""
+    
+    def setUp(self):
+        self.stub = EasyPostStub().__enter__()
+        self.addCleanup(self.stub.__exit__)
+        self.client = EasyPostClient(api_key="test_key_123", api_base=self.stub.api_base, timeout=5)
+    
+    def test_buy_created_shipment_in_two_calls(self):
+        """Test the create -> list rates -> buy flow without a retrieve."""
+        shipment = self.client.create_shipment(**shipment_spec(1))
+        rates = self.client.list_rates(shipment.id)
+        label = self.client.buy_shipment(shipment)
+        
+        self.assertEqual(len(rates), 3)
+        self.assertEqual(label.selected_rate.service, "GroundAdvantage")
+        self.assertEqual(self.stub.count("GET"), 0)
+        self.assertEqual(len(self.stub.requests), 2)
+    
+    def test_buy_by_id_uses_cache(self):
+        """Test that buying by ID reuses the cached shipment's rates."""
+        shipment = self.client.create_shipment(**shipment_spec(1))
+        express = next(rate.id for rate in shipment.rates if rate.service == "NextDayAir")
+        
+        label = self.client.buy_shipment(shipment.id, rate_id=express)
+        
+        self.assertEqual(label.selected_rate.id, express)
+        self.assertEqual(self.stub.count("GET"), 0)
+    
+    def test_buy_replaces_cached_shipment(self):
+        """Test that the purchased shipment, not the stale one, is served after buy."""
+        shipment = self.client.create_shipment(**shipment_spec(1))
+        self.client.buy_shipment(shipment)
+        
+        url = self.client.get_label_url(shipment.id)
+        
+        self.assertTrue(url.endswith(f"{shipment.id}.png"))
+        self.assertEqual(self.stub.count("GET"), 0)
+    
+    def test_unknown_rate(self):
+        """Test that a rate from another shipment is rejected before calling buy."""
+        shipment = self.client.create_shipment(**shipment_spec(1))
+        
+        with self.assertRaises(ValueError):
+            self.client.buy_shipment(shipment, rate_id="rate_other")
+        self.assertEqual(self.stub.count("POST", f"/v2/shipments/{shipment.id}/buy"), 0)
+    
+    def test_uncached_shipment_is_retrieved_once(self):
+        """Test that a shipment created elsewhere is retrieved, then cached."""
+        other = EasyPostClient(api_key="test_key_123", api_base=self.stub.api_base)
+        shipment_id = other.create_shipment(**shipment_spec(1)).id
+        
+        self.client.list_rates(shipment_id)
+        self.client.list_rates(shipment_id)
+        
+        self.assertEqual(self.stub.count("GET"), 1)
+    
+    def test_ttl_expiry(self):
+        """Test that expired entries are retrieved again."""
+        client = EasyPostClient(api_key="test_key_123", api_base=self.stub.api_base, cache_ttl=0.05)
+        shipment = client.create_shipment(**shipment_spec(1))
+        
+        time.sleep(0.1)
+        client.list_rates(shipment.id)
+        
+        self.assertEqual(self.stub.count("GET"), 1)
+    
+    def test_cache_disabled(self):
+        """Test that cache_ttl=0 always retrieves."""
+        client = EasyPostClient(api_key="test_key_123", api_base=self.stub.api_base, cache_ttl=0)
+        shipment = client.create_shipment(**shipment_spec(1))
+        
+        client.list_rates(shipment.id)
+        client.get_label_url(shipment.id)
+        
+        self.assertEqual(self.stub.count("GET"), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,210 @@
+"""
+Tests for the tracking service, store and webhook API, against a local stub server.
+"""
+
+import hashlib
+import hmac
+import json
+import time
+import unittest
+from printshop_os.shipping.api import create_app
+from printshop_os.shipping.easypost_client import EasyPostClient
+from printshop_os.shipping.tracking import (
+    FINAL_POLL_WINDOW,
+    POLL_INTERVALS,
+    TrackingService,
+    next_poll_at,
+)
+from tests.shipping.easypost_stub import EasyPostStub
+
+
+def tracker_event(tracker, description="tracker.updated"):
+    """An EasyPost webhook Event wrapping a tracker."""
+    return {"object": "Event", "description": description, "result": tracker}
+
+
+class TestPollSchedule(unittest.TestCase):
+    """Test adaptive poll intervals."""
+    
+    def test_intervals_follow_status(self):
+        self.assertEqual(next_poll_at("out_for_delivery", 0, 100), 100 + 15 * 60)
+        self.assertLess(POLL_INTERVALS["out_for_delivery"], POLL_INTERVALS["in_transit"])
+        self.assertLess(POLL_INTERVALS["in_transit"], POLL_INTERVALS["delivered"])
+        self.assertEqual(next_poll_at("something_new", 0, 0), POLL_INTERVALS["unknown"])
+    
+    def test_final_statuses_stop_polling(self):
+        self.assertIsNotNone(next_poll_at("delivered", 0, 3600))
+        self.assertIsNone(next_poll_at("delivered", 0, FINAL_POLL_WINDOW))
+        self.assertIsNone(next_poll_at("cancelled", 0, 0))
+
+
+class TestTrackingService(unittest.TestCase):
+    """Test registration, webhooks and polling."""
+    
+    def setUp(self):
+        self.stub = EasyPostStub().__enter__()
+        self.addCleanup(self.stub.__exit__)
+        self.client = EasyPostClient(api_key="test_key_123", api_base=self.stub.api_base, timeout=5)
+        self.tracking = TrackingService(self.client, poll_batch_size=2)
+    
+    def test_register_once(self):
+        """Test that a tracking code creates one tracker, however often it is registered."""
+        first = self.tracking.register("9400100000000000000001", carrier="USPS")
+        second = self.tracking.register("9400100000000000000001")
+        
+        self.assertEqual(self.stub.count("POST", "/v2/trackers"), 1)
+        self.assertEqual(second["id"], first["id"])
+        self.assertEqual(first["status"], "pre_transit")
+        self.assertEqual(first["carrier"], "USPS")
+    
+    def test_status_reads_are_local(self):
+        self.tracking.register("9400100000000000000001")
+        requests_before = len(self.stub.requests)
+        
+        for _ in range(5):
+            self.assertEqual(self.tracking.get("9400100000000000000001")["status"], "pre_transit")
+        self.assertIsNone(self.tracking.get("unknown"))
+        self.assertEqual(len(self.stub.requests), requests_before)
+    
+    def test_webhook_updates_store(self):
+        self.tracking.register("9400100000000000000001")
+        tracker = self.stub.set_tracker_status("9400100000000000000001", "in_transit", "2024-01-02T00:00:00Z")
+        
+        record = self.tracking.handle_webhook(tracker_event(tracker))
+        
+        self.assertEqual(record["status"], "in_transit")
+        self.assertEqual(record["tracking_details"][0]["message"], "In Transit")
+        self.assertEqual(self.tracking.get("9400100000000000000001")["status"], "in_transit")
+    
+    def test_stale_and_unrelated_webhooks_ignored(self):
+        self.tracking.register("9400100000000000000001")
+        newer = self.stub.set_tracker_status("9400100000000000000001", "out_for_delivery", "2024-01-03T00:00:00Z")
+        self.tracking.handle_webhook(tracker_event(newer))
+        older = dict(newer, status="in_transit", updated_at="2024-01-02T00:00:00Z")
+        
+        self.assertIsNone(self.tracking.handle_webhook(tracker_event(older)))
+        self.assertIsNone(self.tracking.handle_webhook({"description": "batch.updated", "result": {}}))
+        self.assertEqual(self.tracking.get("9400100000000000000001")["status"], "out_for_delivery")
+    
+    def test_poll_due_in_batches(self):
+        """Test that only due trackers are polled, a batch per request."""
+        codes = [f"94001000000000000000{n:02d}" for n in range(5)]
+        for code in codes:
+            self.tracking.register(code)
+        self.stub.set_tracker_status(codes[0], "out_for_delivery", "2024-01-02T00:00:00Z")
+        
+        self.assertEqual(self.tracking.poll_due(), 0)
+        
+        now = time.time() + POLL_INTERVALS["pre_transit"] + 1
+        self.assertEqual(self.tracking.poll_due(now), 5)
+        
+        self.assertEqual(self.stub.count("GET", "/v2/trackers"), 3)
+        record = self.tracking.get(codes[0])
+        self.assertEqual(record["status"], "out_for_delivery")
+        self.assertEqual(record["next_poll_at"], now + POLL_INTERVALS["out_for_delivery"])
+        self.assertEqual(self.tracking.stats()["trackers"], {"out_for_delivery": 1, "pre_transit": 4})
+        
+        # Only the out-for-delivery package is due 15 minutes later
+        self.assertEqual(self.tracking.poll_due(now + POLL_INTERVALS["out_for_delivery"]), 1)
+    
+    def test_background_poller(self):
+        self.tracking.start(interval=0.01)
+        self.tracking.stop(timeout=1)
+        
+        self.assertIsNone(self.tracking._thread)
+    
+    def test_background_poll_errors_logged_and_counted(self):
+        self.tracking.register("9400100000000000000001")
+        self.stub.fail("GET", "/v2/trackers", 401)
+        self.tracking.store.put(dict(self.tracking.get("9400100000000000000001"), next_poll_at=0))
+        
+        with self.assertLogs("printshop_os.shipping.tracking", level="ERROR") as logs:
+            self.tracking.start(interval=60)
+            deadline = time.time() + 2
+            while not self.tracking.stats()["poll_errors"] and time.time() < deadline:
+                time.sleep(0.01)
+            self.tracking.stop(timeout=1)
+        
+        self.assertEqual(self.tracking.stats()["poll_errors"], 1)
+        self.assertIn("Tracking poll failed", logs.output[0])
+
+
+class TestTrackingAPI(unittest.TestCase):
+    """Test the webhook and tracking endpoints."""
+    
+    SECRET = "whsec_test"
+    
+    def setUp(self):
+        self.stub = EasyPostStub().__enter__()
+        self.addCleanup(self.stub.__exit__)
+        client = EasyPostClient(api_key="test_key_123", api_base=self.stub.api_base, timeout=5)
+        self.tracking = TrackingService(client)
+        app = create_app(self.tracking, webhook_secret=self.SECRET)
+        app.config['TESTING'] = True
+        self.api = app.test_client()
+    
+    def post_webhook(self, event, secret=SECRET):
+        body = json.dumps(event).encode()
+        signature = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+        return self.api.post(
+            '/api/shipping/webhooks/easypost', data=body, content_type='application/json',
+            headers={'X-Hmac-Signature': f"hmac-sha256-hex={signature}"}
+        )
+    
+    def test_register_and_read(self):
+        created = self.api.post('/api/shipping/tracking', json={'tracking_code': '9400100000000000000001'})
+        again = self.api.post('/api/shipping/tracking', json={'tracking_code': '9400100000000000000001'})
+        status = self.api.get('/api/shipping/tracking/9400100000000000000001')
+        
+        self.assertEqual(created.status_code, 201)
+        self.assertEqual(again.status_code, 200)
+        self.assertEqual(status.get_json()["status"], "pre_transit")
+        self.assertEqual(self.api.get('/api/shipping/tracking/nope').status_code, 404)
+        self.assertEqual(self.api.post('/api/shipping/tracking', json={}).status_code, 400)
+    
+    def test_register_api_error(self):
+        """Test that an EasyPost error while registering answers with a JSON 500."""
+        self.stub.fail("POST", "/v2/trackers", 422)
+        
+        response = self.api.post('/api/shipping/tracking', json={'tracking_code': '9400100000000000000001'})
+        
+        self.assertEqual(response.status_code, 500)
+        self.assertIn('error', response.get_json())
+        self.assertIsNone(self.tracking.get("9400100000000000000001"))
+    
+    def test_signed_webhook(self):
+        self.tracking.register("9400100000000000000001")
+        tracker = self.stub.set_tracker_status("9400100000000000000001", "delivered", "2024-01-04T00:00:00Z")
+        
+        response = self.post_webhook(tracker_event(tracker))
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.get_json()["updated"])
+        self.assertEqual(self.tracking.get("9400100000000000000001")["status"], "delivered")
+    
+    def test_bad_signature_rejected(self):
+        response = self.post_webhook(tracker_event({}), secret="wrong")
+        
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(self.tracking.stats()["webhooks"], 0)
+    
+    def test_webhooks_rejected_without_secret(self):
+        """Test that unsigned webhooks need an explicit opt-in when no secret is set."""
+        self.tracking.register("9400100000000000000001")
+        tracker = self.stub.set_tracker_status("9400100000000000000001", "delivered", "2024-01-04T00:00:00Z")
+        
+        with self.assertLogs("printshop_os.shipping.api", level="WARNING"):
+            closed = create_app(self.tracking).test_client()
+            insecure = create_app(self.tracking, allow_unsigned_webhooks=True).test_client()
+        
+        rejected = closed.post('/api/shipping/webhooks/easypost', json=tracker_event(tracker))
+        self.assertEqual(rejected.status_code, 403)
+        self.assertEqual(self.tracking.get("9400100000000000000001")["status"], "pre_transit")
+        
+        accepted = insecure.post('/api/shipping/webhooks/easypost', json=tracker_event(tracker))
+        self.assertEqual(accepted.status_code, 200)
+        self.assertEqual(self.tracking.get("9400100000000000000001")["status"], "delivered")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,191 @@
+"""
+Tests for the EasyPost client's HTTP transport, against a local stub server.
+"""
+
+import time
+import unittest
+from unittest import mock
+import easypost
+import requests
+from easypost.errors import EasyPostError, ServiceUnavailableError, TimeoutError as EasyPostTimeoutError
+from printshop_os.shipping.easypost_client import EasyPostClient
+from printshop_os.shipping.transport import (
+    CircuitBreaker,
+    CircuitOpenError,
+    PooledSession,
+    RetryPolicy,
+    operation_for,
+)
+from tests.shipping.easypost_stub import EasyPostStub
+from tests.shipping.test_easypost_bulk import shipment_spec
+
+
+class TestOperations(unittest.TestCase):
+    """Test operation names, backoff and the circuit breaker on their own."""
+    
+    def test_operation_for(self):
+        base = "http://127.0.0.1:8080/v2"
+        self.assertEqual(operation_for("POST", f"{base}/shipments"), "create")
+        self.assertEqual(operation_for("POST", f"{base}/shipments/shp_1/buy"), "buy")
+        self.assertEqual(operation_for("GET", f"{base}/shipments/shp_1"), "retrieve")
+        self.assertEqual(operation_for("POST", f"{base}/addresses/create_and_verify"), "verify")
+        self.assertEqual(operation_for("POST", f"{base}/trackers"), "track")
+        self.assertEqual(operation_for("GET", f"{base}/trackers?tracking_codes[]=1"), "poll")
+        self.assertEqual(operation_for("GET", f"{base}/users"), "other")
+    
+    def test_jittered_delay(self):
+        policy = RetryPolicy(base_delay=1.0, max_delay=3.0)
+        delays = [policy.delay(3) for _ in range(200)]
+        self.assertTrue(all(0 <= delay <= 3.0 for delay in delays))
+        self.assertGreater(len(set(delays)), 100)
+        self.assertLessEqual(policy.delay(1, base_delay=0.01), 0.01)
+    
+    def test_trial_released_on_unexpected_error(self):
+        """Test that a half-open trial failing with a non-requests error does not wedge the circuit."""
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+        session = PooledSession(breaker=breaker)
+        breaker.record_failure()
+        time.sleep(0.06)
+        
+        with mock.patch.object(requests.Session, "request", side_effect=ValueError("bad response")):
+            with self.assertRaises(ValueError):
+                session.request("GET", "http://127.0.0.1:1/v2/shipments/shp_1")
+        
+        self.assertEqual(breaker.state, "open")
+        time.sleep(0.06)
+        breaker.before_request()
+    
+    def test_circuit_breaker(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+        breaker.record_failure()
+        breaker.before_request()
+        breaker.record_failure()
+        
+        self.assertEqual(breaker.state, "open")
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_request()
+        
+        time.sleep(0.06)
+        breaker.before_request()
+        with self.assertRaises(CircuitOpenError):
+            # Only one trial request while half open
+            breaker.before_request()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, "open")
+        
+        time.sleep(0.06)
+        breaker.before_request()
+        breaker.record_success()
+        self.assertEqual(breaker.stats(), {"state": "closed", "consecutive_failures": 0, "opened": 2, "rejected": 2})
+
+
+class TestClientTransport(unittest.TestCase):
+    """Test retries, timeouts, the circuit breaker and stats through the client."""
+    
+    def setUp(self):
+        self.stub = EasyPostStub().__enter__()
+        self.addCleanup(self.stub.__exit__)
+    
+    def client(self, **kwargs):
+        options = dict(api_key="test_key_123", api_base=self.stub.api_base, timeout=5, cache_ttl=0,
+                       retry_policy=RetryPolicy(base_delay=0.01))
+        options.update(kwargs)
+        return EasyPostClient(**options)
+    
+    def test_sdk_uses_pooled_session(self):
+        """
+        Test that the SDK sends requests through the client's session (a private SDK hook).
+        
+        Run against the minimum easypost in requirements.txt: an SDK without
+        the hook would silently drop pooling, timeouts, retries and the
+        circuit breaker, so this fails instead of relying on the log warning.
+        """
+        client = self.client()
+        client.create_shipment(**shipment_spec(1))
+        
+        self.assertTrue(
+            client.pooled,
+            f"easypost {easypost.__version__} has no _requests_session; "
+            "the pooled transport is not in effect with this release",
+        )
+        self.assertIs(client.client._requests_session, client.session)
+        self.assertEqual(client.stats()["requests"], 1)
+    
+    def test_sdk_transport_fallback(self):
+        """Test that an SDK without the private session keeps its transport and still reports stats."""
+        with mock.patch("printshop_os.shipping.easypost_client.hasattr", return_value=False, create=True):
+            client = self.client()
+        client.create_shipment(**shipment_spec(1))
+        
+        self.assertFalse(client.pooled)
+        self.assertIsNot(client.client._requests_session, client.session)
+        stats = client.stats()
+        self.assertEqual(stats["requests"], 1)
+        self.assertEqual(stats["latency_ms"]["create"]["count"], 1)
+    
+    def test_idempotent_calls_retried(self):
+        """Test that a retrieve survives transient 5xx responses."""
+        client = self.client()
+        shipment = client.create_shipment(**shipment_spec(1))
+        self.stub.fail("GET", "/v2/shipments/", 503, 502)
+        
+        self.assertEqual(len(client.list_rates(shipment.id)), 3)
+        self.assertEqual(self.stub.count("GET", "/v2/shipments/"), 3)
+        self.assertEqual(client.stats()["retries"], 2)
+    
+    def test_posts_not_retried(self):
+        """Test that creates and purchases are left to the caller to retry."""
+        client = self.client()
+        self.stub.fail("POST", "/v2/shipments", 503)
+        
+        with self.assertRaises(ServiceUnavailableError):
+            client.create_shipment(**shipment_spec(1))
+        self.assertEqual(self.stub.count("POST", "/v2/shipments"), 1)
+    
+    def test_circuit_opens_and_fails_fast(self):
+        client = self.client(circuit_breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60))
+        self.stub.fail("POST", "/v2/shipments", 500, 500)
+        for _ in range(2):
+            with self.assertRaises(EasyPostError):
+                client.create_shipment(**shipment_spec(1))
+        
+        results = client.create_shipments_bulk([shipment_spec(n) for n in range(3)], retry_delay=0.01)
+        
+        self.assertEqual(self.stub.count("POST", "/v2/shipments"), 2)
+        self.assertEqual({r["error"]["type"] for r in results}, {"CircuitOpenError"})
+        self.assertEqual({r["attempts"] for r in results}, {1})
+        self.assertEqual(client.stats()["circuit"]["state"], "open")
+    
+    def test_circuit_disabled(self):
+        client = self.client(circuit_breaker=False)
+        self.stub.fail("POST", "/v2/shipments", *[500] * 6)
+        for _ in range(6):
+            with self.assertRaises(EasyPostError):
+                client.create_shipment(**shipment_spec(1))
+        self.assertIsNotNone(client.create_shipment(**shipment_spec(1)).id)
+        self.assertIsNone(client.stats()["circuit"])
+    
+    def test_per_operation_timeouts(self):
+        self.stub.delay = 0.2
+        client = self.client(timeouts={"create": 0.05})
+        
+        with self.assertRaises(EasyPostTimeoutError):
+            client.create_shipment(**shipment_spec(1))
+        self.assertTrue(client.validate_address(shipment_spec(1)["to_address"])["valid"])
+    
+    def test_stats(self):
+        client = self.client()
+        client.create_shipments_bulk([shipment_spec(n) for n in range(10)], max_workers=4)
+        
+        stats = client.stats()
+        self.assertEqual(stats["requests"], 10)
+        self.assertEqual(stats["failures"], 0)
+        latency = stats["latency_ms"]["create"]
+        self.assertEqual(latency["count"], 10)
+        self.assertLessEqual(latency["p50"], latency["p99"])
+        self.assertLessEqual(latency["p99"], latency["max"])
+        self.assertEqual(stats["circuit"]["state"], "closed")
+
+
+if __name__ == '__main__':
+    unittest.main()